@@ -4,12 +4,12 @@ from __future__ import annotations
 
 import logging
 import re
-import subprocess  # nosec
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+from bitrab.git_state import repo_state
 from bitrab.mutation import load_bitrab_section
 
 logger = logging.getLogger(__name__)
@@ -27,22 +27,6 @@ class ChangeSet:
     evaluable: bool
 
 
-def _git(project_dir: Path, *args: str) -> subprocess.CompletedProcess[bytes]:
-    return subprocess.run(  # nosec
-        ["git", "-C", str(project_dir), *args],
-        capture_output=True,
-        check=False,
-    )
-
-
-def _successful(project_dir: Path, *args: str) -> bytes | None:
-    try:
-        result = _git(project_dir, *args)
-    except OSError:
-        return None
-    return result.stdout if result.returncode == 0 else None
-
-
 def _paths(output: bytes) -> set[str]:
     return {raw.decode("utf-8", errors="surrogateescape").replace("\\", "/") for raw in output.split(b"\0") if raw}
 
@@ -58,13 +42,14 @@ def configured_changes_base(project_dir: Path) -> str | None:
 
 def detect_default_branch(project_dir: Path) -> str | None:
     """Detect the default branch using the documented local fallback order."""
-    symbolic = _successful(project_dir, "symbolic-ref", "--quiet", "--short", "refs/remotes/origin/HEAD")
+    state = repo_state(project_dir)
+    symbolic = state.symbolic_ref_short("refs/remotes/origin/HEAD")
     candidates: list[str] = []
     if symbolic:
-        candidates.append(symbolic.decode("utf-8", errors="replace").strip())
+        candidates.append(symbolic)
     candidates.extend(["origin/main", "origin/master", "main"])
     for candidate in candidates:
-        if candidate and _successful(project_dir, "rev-parse", "--verify", "--quiet", f"{candidate}^{{commit}}"):
+        if candidate and state.is_commit(candidate):
             return candidate
     return None
 
@@ -74,37 +59,30 @@ def resolve_default_baseline(project_dir: Path) -> str | None:
     branch = detect_default_branch(project_dir)
     if branch is None:
         return None
-    output = _successful(project_dir, "merge-base", "HEAD", branch)
-    if not output:
-        return None
-    return output.decode("ascii", errors="replace").strip() or None
+    return repo_state(project_dir).merge_base("HEAD", branch)
 
 
 def discover_changes(project_dir: Path, baseline: str | None = None) -> ChangeSet:
-    """Collect committed, staged, unstaged, and untracked non-ignored paths."""
-    inside = _successful(project_dir, "rev-parse", "--is-inside-work-tree")
-    if inside is None or inside.strip() != b"true":
+    """Collect committed, staged, unstaged, and untracked non-ignored paths.
+
+    Committed changes come from one ``git diff`` against the baseline; the
+    rest from the run's shared ``git status`` (see :mod:`bitrab.git_state`).
+    """
+    state = repo_state(project_dir)
+    if not state.is_repo():
         return ChangeSet(frozenset(), None, False)
 
     resolved = baseline or resolve_default_baseline(project_dir)
     if resolved is None:
         return ChangeSet(frozenset(), None, False)
-    if _successful(project_dir, "rev-parse", "--verify", "--quiet", f"{resolved}^{{commit}}") is None:
+    if not state.is_commit(resolved):
         return ChangeSet(frozenset(), resolved, False)
 
-    commands = [
-        ("diff", "--name-only", "-z", resolved, "HEAD"),
-        ("diff", "--cached", "--name-only", "-z"),
-        ("diff", "--name-only", "-z"),
-        ("ls-files", "--others", "--exclude-standard", "-z"),
-    ]
-    files: set[str] = set()
-    for command in commands:
-        output = _successful(project_dir, *command)
-        if output is None:
-            return ChangeSet(frozenset(), resolved, False)
-        files.update(_paths(output))
-    return ChangeSet(frozenset(files), resolved, True)
+    committed = state.committed_changes(resolved)
+    uncommitted = state.worktree_changes()
+    if committed is None or uncommitted is None:
+        return ChangeSet(frozenset(), resolved, False)
+    return ChangeSet(frozenset(_paths(committed) | uncommitted), resolved, True)
 
 
 class ChangeResolver:
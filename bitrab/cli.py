@@ -6,6 +6,7 @@ A tool for running GitLab CI pipelines locally.
 from __future__ import annotations
 
 import argparse
+import codecs
 import logging
 import sys
 from pathlib import Path
@@ -20,6 +21,7 @@ logger = logging.getLogger(__name__)
 if TYPE_CHECKING:
     from bitrab.config.loader import ConfigurationLoader as ConfigurationLoaderType
     from bitrab.config.validate_pipeline import GitLabCIValidator as GitLabCIValidatorType
+    from bitrab.folder import RunRecord as RunRecordType
     from bitrab.plan import LocalGitLabRunner as LocalGitLabRunnerType
     from bitrab.plan import PipelineProcessor as PipelineProcessorType
 else:
@@ -27,6 +29,7 @@ else:
     GitLabCIValidatorType = Any
     LocalGitLabRunnerType = Any
     PipelineProcessorType = Any
+    RunRecordType = Any
 
 configure_stdio()
 
@@ -261,72 +264,83 @@ def cmd_run(args: argparse.Namespace) -> None:
         sys.exit(1)
 
     try:
-        runner = _get_local_gitlab_runner()(base_path=config_path.parent)
+        from bitrab.git_state import shared_repo_state
 
-        job_filter: list[str] | None = args.jobs if args.jobs else None
-        stage_filter: list[str] | None = args.stage if args.stage else None
+        # The dirty-tree check and the run share one git snapshot.
+        with shared_repo_state(config_path.parent):
+            runner = _get_local_gitlab_runner()(base_path=config_path.parent)
 
-        use_tui = should_use_tui(args)
-        ci_mode = is_ci_mode() and not use_tui
+            job_filter: list[str] | None = args.jobs if args.jobs else None
+            stage_filter: list[str] | None = args.stage if args.stage else None
 
-        if args.dry_run:
-            safe_print("🔎 Dry-run mode enabled — jobs will only report what would run and will succeed.")
+            use_tui = should_use_tui(args)
+            ci_mode = is_ci_mode() and not use_tui
 
-        # --serial forces one-job-at-a-time + no worktrees (for autofixers).
-        # --no-worktrees disables worktrees without forcing serial execution.
-        serial = getattr(args, "serial", False) or None
-        no_worktrees = getattr(args, "no_worktrees", False)
-        use_worktrees = False if no_worktrees else None
+            if args.dry_run:
+                safe_print("🔎 Dry-run mode enabled — jobs will only report what would run and will succeed.")
 
-        yes = getattr(args, "yes", False)
-        if not ci_mode and not serial and not no_worktrees and not yes:
-            from bitrab.git_worktree import is_repo_dirty
+            # --serial forces one-job-at-a-time + no worktrees (for autofixers).
+            # --no-worktrees disables worktrees without forcing serial execution.
+            serial = getattr(args, "serial", False) or None
+            no_worktrees = getattr(args, "no_worktrees", False)
+            use_worktrees = False if no_worktrees else None
 
-            if is_repo_dirty(config_path.parent):
-                safe_print(
-                    "⚠️  Your working tree has uncommitted changes.  Worktrees check out HEAD,\n   so those changes will NOT be visible to jobs running in parallel.\n",
-                    file=sys.stderr,
-                )
-                if not sys.stdin.isatty():
+            yes = getattr(args, "yes", False)
+            distributed = getattr(args, "distributed", None)
+            if not ci_mode and not serial and not no_worktrees and not yes and not distributed:
+                from bitrab.git_worktree import is_repo_dirty
+
+                if is_repo_dirty(config_path.parent):
                     safe_print(
-                        "   Non-interactive mode: running in parallel (pass --yes to suppress this warning, --serial to run serially).",
+                        "⚠️  Your working tree has uncommitted changes.  Worktrees check out HEAD,\n   so those changes will NOT be visible to jobs running in parallel.\n",
                         file=sys.stderr,
                     )
-                else:
-                    answer = (
-                        input("   Run anyway in parallel (p), switch to serial (s), or quit (q)? [p/s/q]: ")
-                        .strip()
-                        .lower()
-                    )
-                    if answer == "q":
-                        sys.exit(0)
-                    elif answer == "s":
-                        serial = True
-
-        completed = runner.run_pipeline(
-            config_path=config_path,
-            maximum_degree_of_parallelism=args.parallel,
-            dry_run=args.dry_run,
-            use_tui=use_tui,
-            ci_mode=ci_mode,
-            job_filter=job_filter,
-            stage_filter=stage_filter,
-            parallel_backend=getattr(args, "parallel_backend", None),
-            serial=serial,
-            use_worktrees=use_worktrees,
-            exit_on_completion=getattr(args, "exit_on_completion", False),
-            input_values=parse_input_args(getattr(args, "inputs", None)),
-            prompt_missing_inputs=input_prompt_enabled(args),
-            no_cache=getattr(args, "no_cache", False),
-            incremental=getattr(args, "incremental", False),
-            refresh=getattr(args, "refresh", False),
-            offline=getattr(args, "offline", False),
-            changed=getattr(args, "changed", False),
-            changes_base=getattr(args, "changes_base", None),
-            no_include_cache=getattr(args, "no_include_cache", False),
-        )
-        if completed is False:
-            sys.exit(3)
+                    if not sys.stdin.isatty():
+                        safe_print(
+                            "   Non-interactive mode: running in parallel (pass --yes to suppress this warning, --serial to run serially).",
+                            file=sys.stderr,
+                        )
+                    else:
+                        answer = (
+                            input("   Run anyway in parallel (p), switch to serial (s), or quit (q)? [p/s/q]: ")
+                            .strip()
+                            .lower()
+                        )
+                        if answer == "q":
+                            sys.exit(0)
+                        elif answer == "s":
+                            serial = True
+
+            completed = runner.run_pipeline(
+                config_path=config_path,
+                maximum_degree_of_parallelism=args.parallel,
+                dry_run=args.dry_run,
+                use_tui=use_tui,
+                ci_mode=ci_mode,
+                job_filter=job_filter,
+                stage_filter=stage_filter,
+                parallel_backend=getattr(args, "parallel_backend", None),
+                serial=serial,
+                use_worktrees=use_worktrees,
+                exit_on_completion=getattr(args, "exit_on_completion", False),
+                input_values=parse_input_args(getattr(args, "inputs", None)),
+                prompt_missing_inputs=input_prompt_enabled(args),
+                no_cache=getattr(args, "no_cache", False),
+                incremental=getattr(args, "incremental", False),
+                refresh=getattr(args, "refresh", False),
+                offline=getattr(args, "offline", False),
+                changed=getattr(args, "changed", False),
+                changes_base=getattr(args, "changes_base", None),
+                no_include_cache=getattr(args, "no_include_cache", False),
+                dag_dispatch=getattr(args, "dag_dispatch", None),
+                relax_stages=True if getattr(args, "relax_stages", False) else None,
+                adaptive=True if getattr(args, "adaptive", False) else None,
+                fail_fast=True if getattr(args, "fail_fast", False) else None,
+                distributed=distributed,
+                shard=getattr(args, "shard", None),
+            )
+            if completed is False:
+                sys.exit(3)
 
     except (BitrabError, GitlabRunnerError) as e:
         safe_print(f"❌ Execution error: {e}", file=sys.stderr)
@@ -339,6 +353,39 @@ def cmd_run(args: argparse.Namespace) -> None:
         raise
 
 
+def shard_spec(value: str) -> tuple[int, int]:
+    """Parse a ``--shard I/N`` argument; argparse reports a bad spec as a usage error."""
+    from bitrab.sharding import parse_shard
+
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+
+
+def cmd_agent(args: argparse.Namespace) -> None:
+    """Execute jobs handed out by a ``bitrab run --distributed`` coordinator."""
+    from bitrab.distributed import run_agent
+
+    project_dir = Path(args.project_dir).resolve() if args.project_dir else Path.cwd()
+    safe_print(f"🛰️  bitrab agent: {args.slots} slot(s) in {project_dir}, coordinator {args.address}")
+    try:
+        count = run_agent(
+            args.address,
+            project_dir,
+            slots=args.slots,
+            connect_timeout=args.connect_timeout,
+            name=args.name,
+        )
+    except BitrabError as e:
+        safe_print(f"❌ Agent error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        safe_print("\n🛑 Agent interrupted by user", file=sys.stderr)
+        sys.exit(130)
+    safe_print(f"✅ Coordinator finished the run; this agent ran {count} job(s)")
+
+
 def cmd_list(args: argparse.Namespace) -> None:
     """List all jobs in the pipeline."""
     config_path = resolve_config_path(args.config)
@@ -797,6 +844,11 @@ def cmd_logs(args: argparse.Namespace) -> None:
         else:
             rec = runs[0]  # most recent
 
+        job = getattr(args, "job", None)
+        if job:
+            show_job_log(rec, job, getattr(args, "tail", None))
+            return
+
         summary_file = rec.run_dir / "summary.txt"
         if summary_file.exists():
             safe_print(summary_file.read_text(encoding="utf-8"))
@@ -824,6 +876,25 @@ def cmd_logs(args: argparse.Namespace) -> None:
             safe_print(f"🗑️  Removed all run logs ({human_size(freed)} freed).")
 
 
+def show_job_log(rec: RunRecordType, job: str, tail: int | None) -> None:
+    """Print one job's output log from run *rec*, or only its last *tail* lines."""
+    from bitrab.execution.joblog import iter_log_bytes, tail_job_log
+    from bitrab.folder import find_job_log
+
+    path = find_job_log(rec, job)
+    if path is None:
+        known = ", ".join(sorted(rec.job_logs)) or "none (job logs are kept for CI-mode runs)"
+        safe_print(f"❌ No output log for job {job!r} in run {rec.run_id}. Logged jobs: {known}", file=sys.stderr)
+        sys.exit(1)
+    if tail is not None:
+        safe_print(tail_job_log(path, tail), end="")
+        return
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for data in iter_log_bytes(path):
+        safe_print(decoder.decode(data), end="")
+    safe_print(decoder.decode(b"", final=True), end="")
+
+
 def cmd_folder(args: argparse.Namespace) -> None:
     """Show .bitrab/ folder status or clean it."""
     from bitrab.folder import scan_folder
@@ -857,6 +928,9 @@ Examples:
   bitrab run --dry-run                # Show what would be executed
   bitrab run --jobs build test        # Run specific jobs
   bitrab run --parallel 4             # Use 4 parallel workers
+  bitrab run --no-tui --shard 2/4     # Run the second of four CI slices
+  bitrab run --distributed tcp://0.0.0.0:7878  # Hand jobs to bitrab agents
+  bitrab agent tcp://ci-main:7878     # Run jobs for that coordinator
   bitrab watch                        # Watch and re-run on any config change
   bitrab watch --dry-run              # Dry-run on each file change
   bitrab list                         # List all jobs
@@ -918,9 +992,41 @@ Version: {__version__}
     )
     run_parser.add_argument(
         "--parallel-backend",
-        choices=["thread", "process"],
+        choices=["thread", "process", "asyncio"],
         metavar="BACKEND",
-        help="Parallel execution backend: 'thread' or 'process' (overrides pyproject.toml)",
+        help="Parallel execution backend: 'thread', 'process' or 'asyncio' (overrides pyproject.toml)",
+    )
+    run_parser.add_argument(
+        "--dag-dispatch",
+        choices=["batch", "continuous"],
+        metavar="MODE",
+        help="DAG scheduling: 'batch' waits for each ready set, 'continuous' starts jobs as soon as a slot frees (overrides pyproject.toml)",
+    )
+    run_parser.add_argument(
+        "--relax-stages",
+        action="store_true",
+        help="For pipelines without needs:, start a job as soon as the jobs in its dependencies: list finish instead of waiting for the whole previous stage.",
+    )
+    run_parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="On the first hard job failure, kill running sibling jobs (after_script and on_failure artifacts still run) and stop the pipeline.",
+    )
+    run_parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Hold back new parallel job starts while host load or CPU/memory pressure (Linux PSI) is high. Thresholds live in [tool.bitrab.adaptive].",
+    )
+    run_parser.add_argument(
+        "--shard",
+        type=shard_spec,
+        metavar="I/N",
+        help="Run only the I-th of N duration-balanced slices of the pipeline (e.g. one per CI container). Jobs linked by needs:/artifacts stay together.",
+    )
+    run_parser.add_argument(
+        "--distributed",
+        metavar="ADDRESS",
+        help="Coordinate 'bitrab agent' workers instead of running jobs locally. ADDRESS is tcp://HOST:PORT or unix:/path; --parallel caps jobs in flight across all agents.",
     )
     run_parser.add_argument(
         "--serial",
@@ -995,9 +1101,9 @@ Version: {__version__}
     watch_parser.add_argument("--stage", nargs="*", metavar="STAGE", help="Run only jobs in specified stages")
     watch_parser.add_argument(
         "--parallel-backend",
-        choices=["thread", "process"],
+        choices=["thread", "process", "asyncio"],
         metavar="BACKEND",
-        help="Parallel execution backend: 'thread' or 'process' (overrides pyproject.toml)",
+        help="Parallel execution backend: 'thread', 'process' or 'asyncio' (overrides pyproject.toml)",
     )
     watch_parser.add_argument(
         "--serial",
@@ -1069,6 +1175,29 @@ Version: {__version__}
     )
     hook_parser.set_defaults(func=cmd_install_hook)
 
+    # Agent command
+    agent_parser = subparsers.add_parser(
+        "agent",
+        help="Run jobs for a 'bitrab run --distributed' coordinator",
+        description="Connect to a coordinator and execute the jobs it hands out, in this checkout of the project.",
+    )
+    agent_parser.add_argument("address", metavar="ADDRESS", help="Coordinator address: tcp://HOST:PORT or unix:/path")
+    agent_parser.add_argument(
+        "--slots", type=int, default=1, metavar="N", help="Number of jobs to run at the same time (default: 1)"
+    )
+    agent_parser.add_argument(
+        "--project-dir", metavar="PATH", help="Checkout to run jobs in (default: current directory)"
+    )
+    agent_parser.add_argument("--name", help="Agent name shown by the coordinator (default: HOST:PID)")
+    agent_parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=60.0,
+        metavar="SECONDS",
+        help="Keep retrying the coordinator this long before giving up (default: 60)",
+    )
+    agent_parser.set_defaults(func=cmd_agent)
+
     # Lint command
     lint_parser = subparsers.add_parser(
         "lint",
@@ -1130,8 +1259,10 @@ Version: {__version__}
     logs_list = logs_sub.add_parser("list", help="List all recorded runs (default)")
     logs_list.set_defaults(func=cmd_logs, logs_cmd="list")
 
-    logs_show = logs_sub.add_parser("show", help="Show summary of a run")
+    logs_show = logs_sub.add_parser("show", help="Show a run summary, or one job's output with --job")
     logs_show.add_argument("run_id", nargs="?", help="Run ID prefix (default: most recent)")
+    logs_show.add_argument("--job", metavar="NAME", help="Print this job's output instead of the run summary")
+    logs_show.add_argument("--tail", type=int, metavar="N", help="With --job, print only the last N lines")
     logs_show.set_defaults(func=cmd_logs, logs_cmd="show")
 
     logs_rm = logs_sub.add_parser("rm", help="Remove old run logs")
@@ -1197,6 +1328,12 @@ def main() -> None:
         args.stage = None
         args.no_tui = False
         args.parallel_backend = None
+        args.dag_dispatch = None
+        args.relax_stages = False
+        args.adaptive = False
+        args.fail_fast = False
+        args.distributed = None
+        args.shard = None
         args.serial = False
         args.no_worktrees = False
         args.exit_on_completion = False
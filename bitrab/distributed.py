@@ -0,0 +1,605 @@
+"""Distribute pipeline jobs to ``bitrab agent`` workers over a socket.
+
+``bitrab run --distributed ADDRESS`` turns the run into a coordinator: it
+plans and schedules the pipeline exactly as usual, but instead of running
+scripts itself it hands each job to an idle agent.  ``bitrab agent ADDRESS``
+processes (on this or other machines, each in its own checkout of the same
+project) connect to the coordinator and execute the jobs they are given.
+
+Addresses are ``tcp://HOST:PORT`` (or just ``HOST:PORT``) and
+``unix:/path/to/socket``.
+
+Division of labour:
+
+* The coordinator keeps scheduling, ``needs:`` / stage ordering, rules,
+  fingerprints, ``resource_group`` locks, callbacks, and the artifact store
+  under ``.bitrab/artifacts/``.
+* :class:`RemoteJobExecutor` stands in for :class:`JobExecutor` on the
+  coordinator.  For each job it takes an agent from :class:`AgentHub`, ships
+  the job plus the artifact-store entries it depends on, relays the agent's
+  output into the job's output writer (so streaming, TUI and CI-file modes all
+  work unchanged), and stores the artifacts and dotenv report the agent sends
+  back.
+* :func:`run_agent` runs each job with a plain :class:`JobExecutor` inside
+  a fresh git worktree of the agent's checkout when possible, so one checkout
+  can serve several agents.  Each agent slot keeps its own artifact store
+  under ``.bitrab/agents/<name>/`` so it never touches a coordinator store
+  that happens to live in the same checkout.
+
+The wire format is one JSON header line per message, optionally followed by
+``size`` bytes of payload (a gzipped tar of artifact-store directories).
+Agents trust the coordinator: they run whatever scripts it sends, as any CI
+runner does.  Only connect agents to coordinators you control.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import io
+import logging
+import os
+import queue
+import shutil
+import socket
+import subprocess  # nosec
+import sys
+import tarfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from bitrab import json_backend as json
+from bitrab.__about__ import __version__
+from bitrab.console import safe_print
+from bitrab.exceptions import AgentConnectionError, JobExecutionError, JobTimeoutError
+from bitrab.execution.artifacts import (
+    artifact_dir,
+    collect_artifacts,
+    collect_dotenv_report,
+    dependency_sources,
+    inject_dependencies,
+)
+from bitrab.execution.job import JobExecutor, JobRuntimeContext
+from bitrab.execution.resources import ResourceUsage, total_usage
+from bitrab.execution.shell import RunResult
+from bitrab.execution.variables import VariableManager
+from bitrab.models.pipeline import CacheConfig, JobConfig
+from bitrab.utils import sanitize_job_name
+
+logger = logging.getLogger(__name__)
+
+ACCEPT_POLL_SECONDS = 0.2
+HANDSHAKE_TIMEOUT = 10.0
+DEFAULT_WAIT_TIMEOUT = 600.0
+
+
+@dataclass(frozen=True)
+class Address:
+    """A parsed ``--distributed`` / ``bitrab agent`` address."""
+
+    family: int
+    target: Any  # (host, port) for TCP, a path string for Unix sockets
+
+    def __str__(self) -> str:
+        if self.family == socket.AF_INET:
+            host, port = self.target
+            return f"tcp://{host}:{port}"
+        return f"unix:{self.target}"
+
+
+def parse_address(value: str) -> Address:
+    """Parse ``tcp://HOST:PORT``, ``HOST:PORT`` or ``unix:/path``.
+
+    Raises:
+        AgentConnectionError: If *value* is not a usable address.
+    """
+    if value.startswith("unix:"):
+        path = value[len("unix:") :]
+        if path.startswith("//"):
+            path = path[2:]
+        if not path:
+            raise AgentConnectionError(f"Missing socket path in address {value!r}")
+        if not hasattr(socket, "AF_UNIX"):
+            raise AgentConnectionError("Unix sockets are not available on this platform; use tcp://HOST:PORT")
+        return Address(socket.AF_UNIX, path)
+    rest = value[len("tcp://") :] if value.startswith("tcp://") else value
+    host, sep, port = rest.rpartition(":")
+    if not sep or not port.isdigit():
+        raise AgentConnectionError(f"Expected tcp://HOST:PORT or unix:/path, got {value!r}")
+    return Address(socket.AF_INET, (host or "127.0.0.1", int(port)))
+
+
+# ---------------------------------------------------------------------------
+# Framing
+# ---------------------------------------------------------------------------
+
+
+class Channel:
+    """Length-delimited JSON messages with an optional binary payload."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.reader = sock.makefile("rb")
+        self.lock = threading.Lock()
+
+    def send(self, header: dict[str, Any], payload: bytes = b"") -> None:
+        """Send one message; safe to call from several threads."""
+        if payload:
+            header = {**header, "size": len(payload)}
+        data = json.dumps(header).encode("utf-8") + b"\n" + payload
+        try:
+            with self.lock:
+                self.sock.sendall(data)
+        except OSError as exc:
+            raise AgentConnectionError(f"Connection lost while sending: {exc}") from exc
+
+    def recv(self) -> tuple[dict[str, Any], bytes]:
+        """Receive one message as ``(header, payload)``."""
+        try:
+            line = self.reader.readline()
+            if not line:
+                raise AgentConnectionError("Connection closed by peer")
+            header = json.loads(line)
+            size = int(header.get("size", 0))
+            payload = self.reader.read(size) if size else b""
+        except (OSError, ValueError) as exc:
+            raise AgentConnectionError(f"Connection lost while receiving: {exc}") from exc
+        if len(payload) != size:
+            raise AgentConnectionError("Connection closed in the middle of a message")
+        return header, payload
+
+    def close(self) -> None:
+        """Close the connection, ignoring errors."""
+        for closer in (self.reader.close, self.sock.close):
+            try:
+                closer()
+            except OSError:
+                pass
+
+
+# ---------------------------------------------------------------------------
+# Artifact-store transfer
+# ---------------------------------------------------------------------------
+
+
+def pack_store(project_dir: Path, job_names: list[str]) -> bytes:
+    """Return a gzipped tar of the artifact-store directories of *job_names*.
+
+    Returns empty bytes when none of them has an artifact directory.
+    """
+    buf = io.BytesIO()
+    added = False
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for name in job_names:
+            source = artifact_dir(project_dir, name)
+            if source.is_dir():
+                tar.add(str(source), arcname=sanitize_job_name(name))
+                added = True
+    return buf.getvalue() if added else b""
+
+
+def unpack_store(payload: bytes, project_dir: Path) -> None:
+    """Unpack a :func:`pack_store` payload into *project_dir*'s artifact store.
+
+    Each shipped job directory replaces the local one.  Members that are not
+    plain files or directories, or that would land outside the store, are
+    rejected.
+    """
+    if not payload:
+        return
+    store = project_dir / ".bitrab" / "artifacts"
+    with tarfile.open(fileobj=io.BytesIO(payload), mode="r:gz") as tar:
+        members = tar.getmembers()
+        for member in members:
+            parts = Path(member.name).parts
+            if not (member.isfile() or member.isdir()) or member.name.startswith("/") or ".." in parts:
+                raise AgentConnectionError(f"Refusing unsafe artifact entry {member.name!r}")
+        for top in {Path(member.name).parts[0] for member in members}:
+            shutil.rmtree(store / top, ignore_errors=True)
+        store.mkdir(parents=True, exist_ok=True)
+        if hasattr(tarfile, "data_filter"):
+            tar.extractall(store, members=members, filter="data")
+        else:  # pragma: no cover - Python builds without extraction filters
+            tar.extractall(store, members=members)  # nosec - members validated above
+
+
+# ---------------------------------------------------------------------------
+# Job (de)serialisation
+# ---------------------------------------------------------------------------
+
+
+def job_to_wire(job: JobConfig) -> dict[str, Any]:
+    """Return a JSON-safe dict for *job*.
+
+    Rules were evaluated on the coordinator and ``resource_group`` locks are
+    held there, so neither is sent.
+    """
+    data = dataclasses.asdict(job)
+    data["rules"] = []
+    data["resource_group"] = None
+    return data
+
+
+def job_from_wire(data: dict[str, Any]) -> JobConfig:
+    """Rebuild a :class:`JobConfig` sent by :func:`job_to_wire`."""
+    fields = {f.name for f in dataclasses.fields(JobConfig)}
+    values = {key: value for key, value in data.items() if key in fields}
+    values["cache"] = [CacheConfig(**entry) for entry in values.get("cache", [])]
+    values["rules"] = []
+    return JobConfig(**values)
+
+
+# ---------------------------------------------------------------------------
+# Coordinator
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class AgentLink:
+    """One connected agent slot."""
+
+    name: str
+    channel: Channel
+
+
+class AgentHub:
+    """Accept agent connections and lend idle agents to running jobs.
+
+    Each connection is one job slot; ``bitrab agent --slots N`` opens N of
+    them.  Connections arrive at any time during the run.
+    """
+
+    def __init__(self, address: str, wait_timeout: float = DEFAULT_WAIT_TIMEOUT) -> None:
+        self.address = parse_address(address)
+        self.wait_timeout = wait_timeout
+        self.idle: queue.Queue[AgentLink] = queue.Queue()
+        self.listener: socket.socket | None = None
+        self.closed = threading.Event()
+        self.accept_thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Bind the listening socket and start accepting agents."""
+        listener = socket.socket(self.address.family, socket.SOCK_STREAM)
+        if self.address.family == socket.AF_INET:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        elif os.path.exists(self.address.target):
+            os.unlink(self.address.target)
+        listener.bind(self.address.target)
+        listener.listen()
+        listener.settimeout(ACCEPT_POLL_SECONDS)
+        if self.address.family == socket.AF_INET:
+            # Report the real port when 0 asked the OS to pick one.
+            self.address = Address(socket.AF_INET, (self.address.target[0], listener.getsockname()[1]))
+        self.listener = listener
+        self.accept_thread = threading.Thread(target=self.accept_loop, name="bitrab-agent-hub", daemon=True)
+        self.accept_thread.start()
+
+    def accept_loop(self) -> None:
+        """Accept connections until :meth:`close`, handshaking each one."""
+        while not self.closed.is_set() and self.listener is not None:
+            try:
+                sock, _peer = self.listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            threading.Thread(target=self.handshake, args=(sock,), daemon=True).start()
+
+    def handshake(self, sock: socket.socket) -> None:
+        """Read an agent's hello and queue it as idle."""
+        sock.settimeout(HANDSHAKE_TIMEOUT)
+        channel = Channel(sock)
+        try:
+            header, _payload = channel.recv()
+        except AgentConnectionError:
+            channel.close()
+            return
+        if header.get("type") != "hello":
+            channel.close()
+            return
+        sock.settimeout(None)
+        name = str(header.get("agent", "agent"))
+        if header.get("version") != __version__:
+            logger.warning("Agent %s runs bitrab %s, coordinator runs %s", name, header.get("version"), __version__)
+        logger.info("Agent connected: %s", name)
+        self.idle.put(AgentLink(name=name, channel=channel))
+
+    def acquire(self) -> AgentLink:
+        """Return an idle agent, waiting up to ``wait_timeout`` seconds.
+
+        Raises:
+            JobExecutionError: If no agent becomes free in time.
+        """
+        try:
+            return self.idle.get(timeout=self.wait_timeout)
+        except queue.Empty:
+            raise JobExecutionError(
+                f"No bitrab agent became available on {self.address} within {self.wait_timeout:.0f}s"
+            ) from None
+
+    def release(self, link: AgentLink) -> None:
+        """Return *link* to the idle set (or drop it if the hub is closed)."""
+        if self.closed.is_set():
+            self.dismiss(link)
+        else:
+            self.idle.put(link)
+
+    @staticmethod
+    def dismiss(link: AgentLink) -> None:
+        """Tell *link*'s agent the run is over and close the connection."""
+        try:
+            link.channel.send({"type": "bye"})
+        except AgentConnectionError:
+            pass
+        link.channel.close()
+
+    def close(self) -> None:
+        """Stop accepting, dismiss idle agents, and remove a Unix socket file."""
+        self.closed.set()
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+        if self.accept_thread is not None:
+            self.accept_thread.join(timeout=2 * ACCEPT_POLL_SECONDS)
+        while True:
+            try:
+                self.dismiss(self.idle.get_nowait())
+            except queue.Empty:
+                break
+        if self.address.family != socket.AF_INET and os.path.exists(self.address.target):
+            os.unlink(self.address.target)
+
+
+class RemoteJobExecutor(JobExecutor):
+    """A :class:`JobExecutor` that runs each job on a ``bitrab agent``.
+
+    The inherited :meth:`execute_with_context` still takes ``resource_group``
+    locks, so they serialise jobs across every agent.  The stage runner sees
+    :attr:`remote` and leaves artifact injection and collection to this class.
+    """
+
+    def __init__(
+        self,
+        variable_manager: VariableManager,
+        hub: AgentHub,
+        project_dir: Path | None = None,
+        cache_enabled: bool = True,
+    ) -> None:
+        super().__init__(variable_manager, project_dir=project_dir, cache_enabled=cache_enabled)
+        self.hub = hub
+        self.remote = True
+
+    def _execute_with_context_unlocked(self, ctx: JobRuntimeContext) -> None:
+        """Ship the job to an agent, relay its output, and store its outputs."""
+        job = ctx.job
+        writer = ctx.output_writer or sys.stdout
+        sources = dependency_sources(job, [])  # pinned by the runner
+        link = self.hub.acquire()
+        safe_print(f"🛰️  Running {job.name} on agent {link.name}", file=writer)
+        request = {
+            "type": "job",
+            "job": job_to_wire(job),
+            "variables": self.variable_manager.base_variables,
+            "sources": sources,
+            "timeout": ctx.timeout,
+            "cache": self.cache_enabled,
+            "commit": self.variable_manager.gitlab_ci_vars.get("CI_COMMIT_SHA", ""),
+        }
+        try:
+            link.channel.send(request, pack_store(self.project_dir, sources))
+            while True:
+                header, payload = link.channel.recv()
+                if header.get("type") == "output":
+                    writer.write(str(header.get("text", "")))
+                    writer.flush()
+                elif header.get("type") == "result":
+                    break
+        except AgentConnectionError as exc:
+            link.channel.close()
+            raise JobExecutionError(f"Job {job.name} lost agent {link.name}: {exc}") from exc
+        self.hub.release(link)
+
+        unpack_store(payload, self.project_dir)
+        usage_data = header.get("usage")
+        usage = ResourceUsage.from_dict(usage_data) if usage_data else None
+        if header.get("success"):
+            # Output was already relayed; the entry only carries the agent's usage.
+            self.job_history.append(RunResult(0, "", "", usage))
+            return
+        message = str(header.get("error") or f"Job {job.name} failed on agent {link.name}")
+        error = JobTimeoutError(message) if header.get("kind") == "timeout" else JobExecutionError(message)
+        error.usage = usage
+        returncode = header.get("returncode")
+        if returncode is not None:
+            raise error from subprocess.CalledProcessError(int(returncode), "script")
+        raise error
+
+
+# ---------------------------------------------------------------------------
+# Agent
+# ---------------------------------------------------------------------------
+
+
+class ChannelWriter:
+    """File-like object that streams job output back to the coordinator."""
+
+    def __init__(self, channel: Channel) -> None:
+        self.channel = channel
+
+    def write(self, text: str) -> None:
+        """Send *text* as an ``output`` message."""
+        if text:
+            self.channel.send({"type": "output", "text": text})
+
+    def flush(self) -> None:
+        """No-op flush to satisfy the IO protocol."""
+
+
+def connect(address: Address, connect_timeout: float) -> socket.socket:
+    """Connect to the coordinator, retrying until *connect_timeout* elapses."""
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        sock = socket.socket(address.family, socket.SOCK_STREAM)
+        try:
+            sock.connect(address.target)
+            return sock
+        except OSError as exc:
+            sock.close()
+            if time.monotonic() >= deadline:
+                raise AgentConnectionError(f"Could not reach coordinator at {address}: {exc}") from exc
+            time.sleep(ACCEPT_POLL_SECONDS)
+
+
+def describe_failure(exc: BaseException) -> dict[str, Any]:
+    """Return the ``result`` fields describing a failed job."""
+    if isinstance(exc, JobTimeoutError):
+        return {"kind": "timeout", "error": str(exc)}
+    cause = exc if isinstance(exc, subprocess.CalledProcessError) else exc.__cause__
+    returncode = cause.returncode if isinstance(cause, subprocess.CalledProcessError) else None
+    return {"kind": "failed", "error": str(exc), "returncode": returncode}
+
+
+def usage_to_wire(usage: ResourceUsage | None) -> dict[str, Any] | None:
+    """Return the ``usage`` field of a ``result`` message."""
+    return usage.to_dict() if usage is not None else None
+
+
+class Agent:
+    """Execute jobs sent by a coordinator inside *project_dir*."""
+
+    def __init__(self, project_dir: Path, name: str) -> None:
+        self.project_dir = project_dir
+        self.name = name
+        # Private artifact store: artifact helpers take it as their project_dir.
+        self.store_root = project_dir / ".bitrab" / "agents" / sanitize_job_name(name)
+        self.variable_managers: dict[str, VariableManager] = {}
+        self.warned_commits: set[str] = set()
+
+    def variable_manager(self, variables: dict[str, str]) -> VariableManager:
+        """Return a (cached) :class:`VariableManager` for the pipeline *variables*."""
+        key = json.dumps(variables)
+        if key not in self.variable_managers:
+            self.variable_managers[key] = VariableManager(variables, project_dir=self.project_dir)
+        return self.variable_managers[key]
+
+    def serve(self, channel: Channel) -> int:
+        """Run jobs from *channel* until the coordinator says bye; return jobs run."""
+        channel.send({"type": "hello", "agent": self.name, "version": __version__})
+        count = 0
+        while True:
+            header, payload = channel.recv()
+            if header.get("type") == "bye":
+                return count
+            if header.get("type") == "job":
+                result, outputs = self.run_job(header, payload, channel)
+                channel.send(result, outputs)
+                count += 1
+
+    def run_job(self, request: dict[str, Any], payload: bytes, channel: Channel) -> tuple[dict[str, Any], bytes]:
+        """Run one job request; return the ``result`` message and its payload."""
+        from bitrab.execution.stage_runner import scope_executor_to_worktree
+        from bitrab.git_worktree import can_use_worktrees, job_worktree
+        from bitrab.mutation import load_worktree_config
+
+        job = job_from_wire(request["job"])
+        sources = [str(name) for name in request.get("sources", [])]
+        pdir = self.project_dir
+        vm = self.variable_manager(request.get("variables") or {})
+        commit = str(request.get("commit") or "")
+        local_commit = vm.gitlab_ci_vars.get("CI_COMMIT_SHA", "")
+        if commit and local_commit and commit != local_commit and commit not in self.warned_commits:
+            self.warned_commits.add(commit)
+            safe_print(
+                f"⚠️  Agent {self.name} is at {local_commit[:12]}, coordinator at {commit[:12]}",
+                file=sys.stderr,
+            )
+
+        store = self.store_root
+        unpack_store(payload, store)
+        shutil.rmtree(artifact_dir(store, job.name), ignore_errors=True)
+        executor = JobExecutor(vm, project_dir=pdir, cache_enabled=bool(request.get("cache", True)))
+        job_dir = pdir / ".bitrab" / "temp" / sanitize_job_name(job.name)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        writer = ChannelWriter(channel)
+        worktrees = load_worktree_config(pdir)
+        timeout = request.get("timeout")
+
+        def execute(effective_dir: Path) -> dict[str, Any]:
+            scoped = scope_executor_to_worktree(executor, effective_dir) if effective_dir != pdir else executor
+            inject_dependencies(job, store, sources, effective_dir=effective_dir)
+            succeeded = True
+            try:
+                ctx = scoped.build_context(job, job_dir=job_dir, output_writer=writer, timeout=timeout)
+                scoped.execute_job(ctx=ctx)
+                usage = total_usage(result.usage for result in scoped.job_history)
+                return {"type": "result", "success": True, "usage": usage_to_wire(usage)}
+            except Exception as exc:
+                succeeded = False
+                usage = exc.usage if isinstance(exc, JobExecutionError) else None
+                return {"type": "result", "success": False, **describe_failure(exc), "usage": usage_to_wire(usage)}
+            finally:
+                collect_artifacts(job, store, succeeded, effective_dir=effective_dir)
+                collect_dotenv_report(job, store, succeeded, effective_dir=effective_dir)
+
+        if worktrees.enabled and can_use_worktrees(pdir):
+            with job_worktree(pdir, job.name, root=worktrees.root) as wt_path:
+                result = execute(wt_path)
+        else:
+            result = execute(pdir)
+        return result, pack_store(store, [job.name])
+
+
+def run_agent(
+    address: str,
+    project_dir: Path,
+    *,
+    slots: int = 1,
+    connect_timeout: float = 60.0,
+    name: str | None = None,
+) -> int:
+    """Serve a coordinator with *slots* concurrent job slots; return jobs run.
+
+    Returns once the coordinator ends the run.
+
+    Raises:
+        AgentConnectionError: If the coordinator cannot be reached or the
+            connection breaks mid-run.
+    """
+    parsed = parse_address(address)
+    base_name = name or f"{socket.gethostname()}:{os.getpid()}"
+    if slots <= 1:
+        agents = [Agent(project_dir, base_name)]
+    else:
+        agents = [Agent(project_dir, f"{base_name}/{index}") for index in range(1, slots + 1)]
+    for agent in agents[1:]:
+        agent.variable_managers = agents[0].variable_managers
+    counts: list[int] = []
+    errors: list[BaseException] = []
+
+    def serve_slot(agent: Agent) -> None:
+        try:
+            channel = Channel(connect(parsed, connect_timeout))
+        except AgentConnectionError as exc:
+            errors.append(exc)
+            return
+        try:
+            counts.append(agent.serve(channel))
+        except BaseException as exc:
+            errors.append(exc)
+        finally:
+            channel.close()
+
+    threads = [threading.Thread(target=serve_slot, args=(agent,), daemon=True) for agent in agents]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        for agent in agents:
+            shutil.rmtree(agent.store_root, ignore_errors=True)
+    if errors:
+        raise errors[0]
+    return sum(counts)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Any
+
 
 class BitrabError(Exception):
     """Any error raised from bitrab"""
@@ -10,8 +12,22 @@ class GitlabRunnerError(BitrabError):
 
 
 class JobExecutionError(GitlabRunnerError):
-    """Raised when a job fails to execute successfully."""
+    """Raised when a job fails to execute successfully.
+
+    ``usage`` is the :class:`bitrab.execution.resources.ResourceUsage` of the
+    scripts the job ran before failing, when it is known.
+    """
+
+    usage: Any = None
 
 
 class JobTimeoutError(JobExecutionError):
     """Raised when a job exceeds its configured timeout."""
+
+
+class JobAbortedError(JobExecutionError):
+    """Raised when a running job is stopped because a sibling failed (``--fail-fast``)."""
+
+
+class AgentConnectionError(BitrabError):
+    """Raised when the link between ``bitrab run --distributed`` and a ``bitrab agent`` fails."""
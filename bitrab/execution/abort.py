@@ -0,0 +1,71 @@
+"""Cross-process abort of running jobs for ``--fail-fast``.
+
+Jobs may run in the runner's process, a worker thread, or a spawned worker
+process, so the runner cannot reach their bash child directly.  Instead each
+job's scratch directory (``.bitrab/temp/<job>/``) doubles as a tiny control
+channel:
+
+* ``pgid`` holds the PID of the bash process group currently running the
+  job's ``before_script`` / ``script`` (never ``after_script``);
+* ``abort`` is a marker the runner drops when the job should stop.
+
+:func:`request_abort` writes the marker and then kills the recorded group;
+:func:`register_process_group` records a group and then re-checks the marker,
+so a script that starts while an abort is in flight is still stopped.  The
+job's own ``after_script`` and failure-path artifact collection run as usual.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from bitrab.execution.shell import kill_process_group
+
+ABORT_FILE = "abort"
+PGID_FILE = "pgid"
+
+
+def reset_abort(job_dir: Path) -> None:
+    """Remove control files left behind by a previous run of the job."""
+    for name in (ABORT_FILE, PGID_FILE):
+        try:
+            (job_dir / name).unlink()
+        except OSError:
+            pass
+
+
+def abort_requested(job_dir: Path) -> bool:
+    """Return True once the runner has asked this job to stop."""
+    return (job_dir / ABORT_FILE).exists()
+
+
+def request_abort(job_dir: Path) -> None:
+    """Ask the job using *job_dir* to stop and kill its running script, if any."""
+    try:
+        (job_dir / ABORT_FILE).touch()
+        text = (job_dir / PGID_FILE).read_text(encoding="utf-8")
+    except OSError:
+        return
+    try:
+        pid = int(text.strip())
+    except ValueError:
+        return
+    kill_process_group(pid)
+
+
+def register_process_group(job_dir: Path, pid: int) -> None:
+    """Record the running script's process group; kill it if already aborted."""
+    try:
+        (job_dir / PGID_FILE).write_text(str(pid), encoding="utf-8")
+    except OSError:
+        return
+    if abort_requested(job_dir):
+        kill_process_group(pid)
+
+
+def clear_process_group(job_dir: Path) -> None:
+    """Forget the process group once its script has exited."""
+    try:
+        (job_dir / PGID_FILE).unlink()
+    except OSError:
+        pass
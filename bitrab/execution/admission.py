@@ -0,0 +1,212 @@
+"""Admission control for parallel job starts.
+
+``maximum_degree_of_parallelism`` caps how many jobs run at once, but treats a
+``shellcheck`` job and a 16-thread compile as equal slots.  When weights are in
+play, the runner additionally admits a job only if its CPU and memory weight
+fit in what is left of the host budget.
+
+Weights come from, in order of precedence:
+
+1. ``[tool.bitrab.resources.jobs."<job name>"]`` in ``pyproject.toml``
+   (``cpu = 4``, ``mem_mb = 2048``) — local host tuning wins;
+2. the job's ``variables:`` ``BITRAB_CPU_WEIGHT`` / ``BITRAB_MEM_MB``;
+3. the default weight of one core and no memory reservation.
+
+The budget defaults to every core and all physical RAM of the host and can be
+pinned with ``cpus`` / ``memory_mb`` in ``[tool.bitrab.resources]``.  A job
+whose weight exceeds the whole budget is still admitted once nothing else is
+running, so an oversized job can never deadlock the pipeline.
+
+Adaptive mode (``[tool.bitrab.adaptive]`` / ``--adaptive``) adds a second gate
+for shared hosts: :class:`PressureGate` samples the load average and Linux PSI
+(``/proc/pressure/cpu``, ``/proc/pressure/memory``) and holds back new starts
+while any reading is above its threshold.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from bitrab.models.pipeline import JobConfig
+from bitrab.mutation import AdaptiveConfig, ResourceConfig
+
+CPU_WEIGHT_VAR = "BITRAB_CPU_WEIGHT"
+MEM_WEIGHT_VAR = "BITRAB_MEM_MB"
+
+PSI_CPU = Path("/proc/pressure/cpu")
+PSI_MEMORY = Path("/proc/pressure/memory")
+# Seconds a pressure sample is reused.  Admission is evaluated whenever a job
+# finishes, and once per interval while the gate is holding jobs back.
+PRESSURE_SAMPLE_INTERVAL = 1.0
+
+
+@dataclass(frozen=True)
+class JobWeight:
+    """How much of the host budget a running job reserves."""
+
+    cpu: float = 1.0
+    mem_mb: float = 0.0
+
+
+def parse_weight(value: object, default: float) -> float:
+    """Return *value* as a non-negative float, or *default* if it is unusable."""
+    if value is None:
+        return default
+    try:
+        weight = float(str(value).strip())
+    except ValueError:
+        return default
+    return weight if weight >= 0 else default
+
+
+def job_weight(job: JobConfig, config: ResourceConfig) -> JobWeight:
+    """Resolve *job*'s weight from the resources table and its variables."""
+    table = config.jobs.get(job.name, {})
+    cpu = parse_weight(job.variables.get(CPU_WEIGHT_VAR), 1.0)
+    mem_mb = parse_weight(job.variables.get(MEM_WEIGHT_VAR), 0.0)
+    cpu = parse_weight(table.get("cpu"), cpu)
+    mem_mb = parse_weight(table.get("mem_mb"), mem_mb)
+    return JobWeight(cpu=cpu, mem_mb=mem_mb)
+
+
+def declares_weight(job: JobConfig) -> bool:
+    """Return True if the job's variables ask for a non-default weight."""
+    return CPU_WEIGHT_VAR in job.variables or MEM_WEIGHT_VAR in job.variables
+
+
+def host_memory_mb() -> float | None:
+    """Return total physical memory in MiB, or None when it cannot be determined."""
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as fh:
+            for line in fh:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) / 1024.0
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+class ResourceBudget:
+    """Tracks CPU / memory reserved by running jobs against a host budget."""
+
+    def __init__(self, cpus: float, memory_mb: float | None) -> None:
+        self.cpus = cpus
+        self.memory_mb = memory_mb
+        self.used_cpu = 0.0
+        self.used_mem_mb = 0.0
+        self.holders: dict[str, JobWeight] = {}
+
+    @classmethod
+    def from_config(cls, config: ResourceConfig) -> ResourceBudget:
+        cpus = config.cpus if config.cpus is not None else float(os.cpu_count() or 1)
+        memory_mb = config.memory_mb if config.memory_mb is not None else host_memory_mb()
+        return cls(cpus=cpus, memory_mb=memory_mb)
+
+    def fits(self, weight: JobWeight) -> bool:
+        """Return True if *weight* fits in what is left (always True when idle)."""
+        if not self.holders:
+            return True
+        if self.used_cpu + weight.cpu > self.cpus + 1e-9:
+            return False
+        if self.memory_mb is not None and self.used_mem_mb + weight.mem_mb > self.memory_mb + 1e-9:
+            return False
+        return True
+
+    def acquire(self, name: str, weight: JobWeight) -> None:
+        self.holders[name] = weight
+        self.used_cpu += weight.cpu
+        self.used_mem_mb += weight.mem_mb
+
+    def release(self, name: str) -> None:
+        weight = self.holders.pop(name, None)
+        if weight is None:
+            return
+        self.used_cpu = max(0.0, self.used_cpu - weight.cpu)
+        self.used_mem_mb = max(0.0, self.used_mem_mb - weight.mem_mb)
+
+
+@dataclass(frozen=True)
+class PressureSample:
+    """One reading of host load; None marks a source unavailable here."""
+
+    load_per_cpu: float | None = None
+    cpu_pressure: float | None = None
+    memory_pressure: float | None = None
+
+
+def read_psi_some_avg10(path: Path) -> float | None:
+    """Return the ``some avg10`` percentage from a PSI file, or None."""
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    for line in text.splitlines():
+        if not line.startswith("some "):
+            continue
+        for field in line.split()[1:]:
+            key, _, value = field.partition("=")
+            if key == "avg10":
+                try:
+                    return float(value)
+                except ValueError:
+                    return None
+    return None
+
+
+def sample_pressure() -> PressureSample:
+    """Read the 1-minute load average and CPU / memory PSI of this host."""
+    try:
+        load_per_cpu: float | None = os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        load_per_cpu = None
+    return PressureSample(
+        load_per_cpu=load_per_cpu,
+        cpu_pressure=read_psi_some_avg10(PSI_CPU),
+        memory_pressure=read_psi_some_avg10(PSI_MEMORY),
+    )
+
+
+class PressureGate:
+    """Decides whether the host is too busy to start another job right now.
+
+    Samples are cached for :data:`PRESSURE_SAMPLE_INTERVAL` seconds so the
+    dispatch loop can ask after every job completion without re-reading
+    ``/proc``.
+    """
+
+    def __init__(
+        self,
+        config: AdaptiveConfig,
+        sampler: Callable[[], PressureSample] | None = None,
+        interval: float = PRESSURE_SAMPLE_INTERVAL,
+    ) -> None:
+        self.config = config
+        self.sampler = sampler
+        self.interval = interval
+        self.sampled_at: float | None = None
+        self.holding = False
+
+    def over_threshold(self, sample: PressureSample) -> bool:
+        config = self.config
+        checks = (
+            (sample.load_per_cpu, config.max_load_per_cpu),
+            (sample.cpu_pressure, config.max_cpu_pressure),
+            (sample.memory_pressure, config.max_memory_pressure),
+        )
+        return any(value is not None and value > limit for value, limit in checks)
+
+    def hold(self) -> bool:
+        """Return True while new job starts should wait."""
+        now = time.monotonic()
+        if self.sampled_at is None or now - self.sampled_at >= self.interval:
+            sampler = self.sampler or sample_pressure
+            self.holding = self.over_threshold(sampler())
+            self.sampled_at = now
+        return self.holding
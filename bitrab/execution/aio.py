@@ -0,0 +1,167 @@
+"""asyncio subprocess driver for ``parallel_backend = "asyncio"``.
+
+The ``process`` backend costs a spawned interpreter per worker.  For dozens
+of tiny lint jobs that overhead dominates.  (The ``thread`` backend's
+:func:`bitrab.execution.shell.run_bash` multiplexes output and timeouts on a
+shared reactor thread too, but still spawns bash with a blocking ``Popen``
+per job.)
+
+Under the asyncio backend every bash subprocess is started with
+:func:`asyncio.create_subprocess_exec` on **one** shared event loop
+(:func:`shared_loop`, running in a daemon thread).  Output streaming,
+timeouts, and kills all happen on that loop.  The job lifecycle itself
+(retries, ``after_script``, cache, ``resource_group`` locks) stays in
+:class:`bitrab.execution.job.JobExecutor`; each running job keeps a single
+lightweight control thread that blocks in :func:`run_bash_on_loop` until its
+script coroutine finishes.
+
+Each script always leads its own process group, so a timeout or cancellation
+stops the whole script tree (a background ``sleep`` holding the output pipes
+open would otherwise keep the job alive until it exits).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Callable
+
+from bitrab.exceptions import JobTimeoutError
+from bitrab.execution.shell import (
+    GREEN,
+    READ_CHUNK,
+    RED,
+    RunResult,
+    StreamSink,
+    TextWriter,
+    kill_process_group,
+    make_sink,
+    merge_env,
+    pick_bash,
+    process_group_kwargs,
+)
+
+LOOP: asyncio.AbstractEventLoop | None = None
+LOOP_LOCK = threading.Lock()
+
+
+def shared_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide subprocess event loop, starting it on first use."""
+    global LOOP
+    with LOOP_LOCK:
+        if LOOP is None or LOOP.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="bitrab-asyncio", daemon=True).start()
+            LOOP = loop
+        return LOOP
+
+
+async def pump(stream: asyncio.StreamReader, sink: StreamSink) -> None:
+    """Copy *stream* into *sink* block by block, like the reactor does for the thread backend."""
+    while True:
+        chunk = await stream.read(READ_CHUNK)
+        if not chunk:
+            sink.finish()
+            return
+        sink.feed(chunk)
+
+
+async def run_bash_async(
+    script: str,
+    *,
+    env: Mapping[str, str] | None = None,
+    cwd: str | os.PathLike[str] | None = None,
+    check: bool = True,
+    login_shell: bool = False,
+    force_color: bool | None = None,
+    stdout_target: TextWriter | None = None,
+    stderr_target: TextWriter | None = None,
+    timeout: float | None = None,
+    process_group: bool = True,
+    on_spawn: Callable[[int], None] | None = None,
+    spill_dir: Path | None = None,
+) -> RunResult:
+    """Coroutine twin of :func:`bitrab.execution.shell.run_bash` in stream mode.
+
+    *process_group* is accepted for signature parity and is always in effect.
+
+    Raises:
+        JobTimeoutError: If the script runs longer than *timeout* seconds.
+        subprocess.CalledProcessError: If *check* is set and bash exits non-zero.
+    """
+    if os.name == "nt":
+        script = script.replace("\r\n", "\n")
+    bash = pick_bash(login_shell or bool(os.environ.get("BITRAB_RUN_LOAD_BASHRC")))
+    proc = await asyncio.create_subprocess_exec(
+        *bash,
+        env=merge_env(env),
+        cwd=str(cwd) if cwd is not None else None,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        **process_group_kwargs(),
+    )
+    if on_spawn is not None:
+        on_spawn(proc.pid)
+    if not (proc.stdin is not None and proc.stdout is not None and proc.stderr is not None):
+        raise RuntimeError("asyncio subprocess pipes are missing")
+
+    out_sink = make_sink(stdout_target or sys.stdout, spill_dir, "stdout", GREEN, force_color)
+    err_sink = make_sink(stderr_target or sys.stderr, spill_dir, "stderr", RED, force_color)
+    proc.stdin.write(f"set -eo pipefail\n{script}".encode())
+    proc.stdin.close()
+
+    finished = asyncio.gather(
+        pump(proc.stdout, out_sink),
+        pump(proc.stderr, err_sink),
+        proc.wait(),
+    )
+    try:
+        _out, _err, rc = await asyncio.wait_for(finished, timeout)
+    except asyncio.TimeoutError:
+        kill_process_group(proc.pid)
+        await proc.wait()
+        raise JobTimeoutError(f"Job timed out after {timeout}s") from None
+    except BaseException:  # cancelled: never leave an orphaned script behind
+        kill_process_group(proc.pid)
+        raise
+    finally:
+        stdout_file, stderr_file = out_sink.buf.close(), err_sink.buf.close()
+    result = RunResult(
+        rc, out_sink.buf.getvalue(), err_sink.buf.getvalue(), stdout_file=stdout_file, stderr_file=stderr_file
+    )
+    if check:
+        result.check_returncode()
+    return result
+
+
+def run_bash_on_loop(script: str, **kwargs: Any) -> RunResult:
+    """Run :func:`run_bash_async` on the shared loop and block until it finishes.
+
+    Interrupting the calling thread (e.g. Ctrl-C in a serial run) kills the
+    script's process group right away and cancels the coroutine.
+    """
+    pids: list[int] = []
+    on_spawn = kwargs.pop("on_spawn", None)
+    # Warm shells belong to the threaded run_bash; loop scripts always start fresh.
+    kwargs.pop("warm_shells", None)
+
+    def spawned(pid: int) -> None:
+        pids.append(pid)
+        if on_spawn is not None:
+            on_spawn(pid)
+
+    coroutine = run_bash_async(script, on_spawn=spawned, **kwargs)
+    future = asyncio.run_coroutine_threadsafe(coroutine, shared_loop())
+    try:
+        return future.result()
+    except BaseException:
+        if not future.done():
+            for pid in pids:
+                kill_process_group(pid)
+            future.cancel()
+        raise
@@ -19,8 +19,10 @@ from __future__ import annotations
 import glob
 import os
 import shutil
+from collections.abc import Collection
 from pathlib import Path
 
+from bitrab.execution.copier import copy_files, walk_tree
 from bitrab.execution.variables import parse_dotenv
 from bitrab.models.pipeline import JobConfig
 from bitrab.utils import sanitize_job_name as sanitize_name
@@ -63,7 +65,8 @@ def collect_artifacts(
 
     source_dir = effective_dir if effective_dir is not None else project_dir
     dest_root = artifact_dir(project_dir, job.name)
-    dest_root.mkdir(parents=True, exist_ok=True)
+    dirs = [str(dest_root)]
+    pairs: list[tuple[str, str]] = []
 
     for pattern in job.artifacts_paths:
         full_pattern = os.path.join(str(source_dir), pattern)
@@ -73,13 +76,24 @@ def collect_artifacts(
             if not src.exists():
                 continue
             dest = dest_root / rel_path
-            dest.parent.mkdir(parents=True, exist_ok=True)
             if src.is_dir():
                 if dest.exists():
                     shutil.rmtree(dest)
-                shutil.copytree(src, dest)
+                tree_dirs, tree_pairs = walk_tree(src, dest, follow_symlinks=True)
+                dirs.extend(tree_dirs)
+                pairs.extend(tree_pairs)
             else:
-                shutil.copy2(src, dest)
+                pairs.append((abs_path, str(dest)))
+
+    # One parallel copy for every match; see bitrab.execution.copier.
+    copy_files(pairs, dirs)
+
+
+def dependency_sources(job: JobConfig, completed_jobs: list[str]) -> list[str]:
+    """Return the jobs whose artifacts and dotenv reports *job* receives."""
+    if job.dependencies is None:
+        return list(completed_jobs)
+    return list(job.dependencies)
 
 
 def inject_dependencies(
@@ -87,6 +101,7 @@ def inject_dependencies(
     project_dir: Path,
     completed_jobs: list[str],
     effective_dir: Path | None = None,
+    skip: Collection[str] = (),
 ) -> None:
     """Copy artifacts from dependency jobs into the job's working tree.
 
@@ -98,33 +113,28 @@ def inject_dependencies(
       that have an artifact directory.
     - ``dependencies: []`` → copy nothing.
     - ``dependencies: [a, b]`` → copy only from jobs a and b.
-    """
-    if job.dependencies is not None and len(job.dependencies) == 0:
-        return  # explicit empty list = no artifacts
-
-    if job.dependencies is None:
-        sources = completed_jobs
-    else:
-        sources = job.dependencies
 
+    Jobs in *skip* are left out; a prepare-ahead step that already injected
+    them into the same worktree passes them here.
+    """
     target_dir = effective_dir if effective_dir is not None else project_dir
+    dirs: list[str] = []
+    pairs: list[tuple[str, str]] = []
 
-    for dep_name in sources:
+    for dep_name in dependency_sources(job, completed_jobs):
+        if dep_name in skip:
+            continue
         artifact_src = artifact_dir(project_dir, dep_name)
         if not artifact_src.exists():
             continue
-        # Copy each file from the artifact directory to the target tree,
-        # preserving relative paths.  os.walk pre-separates files and
-        # directories, avoiding a per-entry is_dir() syscall.
-        for dirpath, dirnames, filenames in os.walk(artifact_src):
-            for dname in dirnames:
-                dest_dir = target_dir / Path(dirpath).relative_to(artifact_src) / dname
-                dest_dir.mkdir(parents=True, exist_ok=True)
-            for fname in filenames:
-                src = Path(dirpath) / fname
-                dest = target_dir / src.relative_to(artifact_src)
-                dest.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(src, dest)
+        # Every dependency's files go into one parallel copy, preserving
+        # relative paths; where two dependencies ship the same path the later
+        # one wins, as it did when they were copied one after another.
+        dep_dirs, dep_pairs = walk_tree(artifact_src, target_dir)
+        dirs.extend(dep_dirs)
+        pairs.extend(dep_pairs)
+
+    copy_files(pairs, dirs)
 
 
 # ---------------------------------------------------------------------------
@@ -194,13 +204,8 @@ def load_dotenv_reports(
     ``variables:`` set in ``.gitlab-ci.yml`` take precedence over these (that
     layering happens in :meth:`VariableManager.prepare_environment`).
     """
-    if job.dependencies is not None and len(job.dependencies) == 0:
-        return {}
-
-    sources = completed_jobs if job.dependencies is None else job.dependencies
-
     merged: dict[str, str] = {}
-    for dep_name in sources:
+    for dep_name in dependency_sources(job, completed_jobs):
         store = project_dir / DOTENV_STORE.format(job_name=sanitize_name(dep_name))
         if store.is_file():
             try:
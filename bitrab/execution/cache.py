@@ -8,22 +8,55 @@ Before a job's ``before_script`` runs:
 After a job's scripts finish:
   - Each entry with policy ``pull-push`` or ``push`` is saved, subject to
     ``when:`` (on_success / on_failure / always) vs. whether the job
-    succeeded.
+    succeeded.  An entry whose files still have the sizes and mtimes they
+    had right after its restore is skipped ("cache unchanged").
 
 Storage layout (shared filesystem, multiple writers — see sprints/README.md):
 
     <project>/.bitrab/cache/
-        .tmp/<key>-<pid>-<token>/   staging area for in-flight saves
-        <key>.lock                  per-key advisory lock file
-        <key>/latest                pointer file naming the live generation
-        <key>/<generation>/         one complete, immutable snapshot
-
-Saves stage into ``.tmp/`` then atomically rename the staged directory to a
-fresh generation and atomically publish it by rewriting the ``latest``
-pointer (write temp file + ``os.replace``).  Readers resolve ``latest`` and
-copy from that generation while holding the per-key lock, so they can never
-observe a half-written cache.  On lock timeout the cache step is skipped
-with a warning rather than failing the job.
+        .tmp/                           staging area for in-flight saves
+        blobs/<ab>/<sha256>-<mode>      file contents, stored once per content + mode
+        store.lock                      shared by saves, exclusive for the blob sweep
+        <key>.lock                      per-key advisory lock file
+        <key>/latest                    pointer file naming the live generation
+        <key>/last-used                 touched on every restore and save (LRU eviction)
+        <key>/<generation>.manifest.json  one immutable snapshot: dirs, files, symlinks
+        <key>/<generation>.tar[.gz|.zst]  the same, as one archive (``cache_format``)
+
+A save hashes every matched file, stores contents it has not seen before as
+blobs, and writes a manifest listing each file's path, hash, mode, size and
+mtime.  The manifest is then atomically renamed into place as a fresh
+generation and published by rewriting the ``latest`` pointer (write temp file
++ ``os.replace``).  Readers resolve ``latest`` and restore that generation
+while holding the per-key lock, so they can never observe a half-written
+cache.  On lock timeout the cache step is skipped with a warning rather than
+failing the job.
+
+Restores place each blob with a reflink (``FICLONE``) where the filesystem
+supports it, else a copy, so a restored file never shares storage that a
+write could reach with the blob.  ``[tool.bitrab] cache_link = "hardlink"``
+opts into hard links instead: faster on filesystems without reflinks, but the
+file then *is* the blob, and a job that appends to, rewrites in place or
+chmods it changes that content for every key deduplicated onto it.  Every
+method creates the file under a temporary name and renames it over the
+destination, so a running binary there keeps its inode (see
+:func:`_safe_copy2`).
+
+``[tool.bitrab] cache_format = "tar"`` (or ``"tar.gz"``, or ``"tar.zst"`` on
+Python 3.14+) writes each generation as a single streamed archive instead:
+one file created per save and removed per superseded generation, in exchange
+for no deduplication and a full extraction on restore.  Keys may mix formats
+across generations; restores read whichever one ``latest`` names.
+
+Blobs no manifest refers to any more are swept at most once per
+:data:`GC_INTERVAL_SECONDS`, while no save is in progress.  Generations
+written as plain directory trees by older versions are still restored.
+
+With ``[tool.bitrab] cache_max_bytes`` set, each save that publishes then
+evicts whole keys, least recently used first, until the store fits.  A key is
+only evicted while its lock can be taken at once, so a generation being
+restored by another process is never deleted under it; blobs shared with
+surviving keys stay.
 
 The store lives under the *project root* (never a worktree) so parallel
 worktree jobs share caches.
@@ -31,22 +64,37 @@ worktree jobs share caches.
 
 from __future__ import annotations
 
+import contextlib
+import functools
 import glob
+import gzip
 import hashlib
 import logging
 import os
 import re
 import shutil
 import stat
-import tempfile
+import sys
+import tarfile
 import time
 import uuid
+from collections import Counter
 from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import IO, Any, BinaryIO
 
+from bitrab.execution.copier import copy_file, copy_tree, make_dirs, run_in_batches
+from bitrab.json_backend import dumps as json_dumps
+from bitrab.json_backend import loads as json_loads
 from bitrab.models.pipeline import CacheConfig, JobConfig
 from bitrab.utils.filelock import FileLock, FileLockTimeout
 
+if sys.platform.startswith("linux"):
+    import fcntl
+else:  # pragma: no cover - reflinks are only attempted on Linux
+    fcntl = None  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 
 # GitLab's default cache key when none is given.
@@ -64,9 +112,49 @@ VARIABLE_RE = re.compile(r"\$(\w+)|\$\{(\w+)\}")
 # Characters allowed verbatim in an on-disk cache key directory name.
 UNSAFE_KEY_CHARS_RE = re.compile(r"[^A-Za-z0-9_.-]")
 
+# Wildcard characters in a glob pattern.
+GLOB_MAGIC_RE = re.compile(r"[*?[]")
+
 # Longest key we store verbatim before switching to the hashed form.
 MAX_KEY_LENGTH = 80
 
+# Directory of content-addressed file contents shared by every key.
+BLOBS_DIR = "blobs"
+
+# Suffix of a generation's manifest (``<key>/<generation>.manifest.json``).
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+
+# Lock held shared by saves and exclusively by the blob sweep.
+STORE_LOCK = "store.lock"
+
+# Touched in a key's directory whenever it is restored or saved; drives
+# least-recently-used eviction under [tool.bitrab] cache_max_bytes.
+ACCESS_STAMP = "last-used"
+
+# Marks the last blob sweep; sweeps run at most this often.
+GC_STAMP = ".gc-stamp"
+GC_INTERVAL_SECONDS = 3600.0
+
+# How restores place files; "auto" tries a reflink, then copies.  Hard links
+# (which share the blob's inode) are only used with "hardlink".
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+
+# Linux ioctl that makes a file share another file's extents (btrfs, XFS, bcachefs).
+FICLONE = 0x40049409
+
+HASH_CHUNK = 1024 * 1024
+
+# How new generations are written ([tool.bitrab] cache_format): a blob-store
+# manifest, or one streamed tar archive, optionally compressed.
+CACHE_FORMATS = ("blobs", "tar", "tar.gz", "tar.zst")
+GENERATION_SUFFIXES = (MANIFEST_SUFFIX, ".tar.gz", ".tar.zst", ".tar")
+ARCHIVE_COMPRESSLEVEL = 3
+ARCHIVE_BUFFER = 1024 * 1024
+
+# relative path -> (size, mtime_ns, symlink target); see snapshot_paths().
+CacheSnapshot = dict[str, tuple[int, int, str]]
+
 
 def cache_root(project_dir: Path) -> Path:
     """Return the cache store directory for *project_dir*."""
@@ -137,7 +225,7 @@ def sanitize_cache_key(key: str) -> str:
 
 
 # ---------------------------------------------------------------------------
-# Store internals (call with the per-key lock held)
+# Store internals
 # ---------------------------------------------------------------------------
 
 
@@ -152,7 +240,10 @@ def lock_path(root: Path, sanitized_key: str) -> Path:
 
 
 def read_latest_generation(root: Path, sanitized_key: str) -> Path | None:
-    """Resolve the live generation directory for a key, or None on cache miss."""
+    """Resolve the live generation (a manifest, or a legacy directory) for a key.
+
+    Returns None on cache miss.
+    """
     pointer = key_dir(root, sanitized_key) / LATEST_POINTER
     try:
         generation = pointer.read_text(encoding="utf-8").strip()
@@ -160,26 +251,28 @@ def read_latest_generation(root: Path, sanitized_key: str) -> Path | None:
         return None
     if not generation:
         return None
-    gen_dir = key_dir(root, sanitized_key) / generation
-    return gen_dir if gen_dir.is_dir() else None
+    gen_path = key_dir(root, sanitized_key) / generation
+    return gen_path if gen_path.exists() else None
 
 
-def publish_generation(root: Path, sanitized_key: str, staged_dir: Path) -> Path:
-    """Atomically publish *staged_dir* as the new live generation for a key.
+def publish_generation(root: Path, sanitized_key: str, staged: Path) -> Path:
+    """Atomically publish *staged* as the new live generation for a key.
 
-    Must be called with the per-key lock held.  The staged directory is
-    renamed to ``<key>/<generation>/`` (the target never pre-exists, so the
-    rename is atomic on Windows too), then the ``latest`` pointer is
-    rewritten via temp-file + ``os.replace``.  Superseded generations are
-    removed best-effort — safe because both readers and writers hold the
-    per-key lock.
+    Must be called with the per-key lock held.  The staged manifest or
+    archive (or directory) is renamed to ``<key>/<generation>`` (the target never
+    pre-exists, so the rename is atomic on Windows too), then the ``latest``
+    pointer is rewritten via temp-file + ``os.replace``.  Superseded
+    generations are removed best-effort — safe because both readers and
+    writers hold the per-key lock.  Their blobs are left for
+    :func:`collect_garbage`.
     """
     kdir = key_dir(root, sanitized_key)
     kdir.mkdir(parents=True, exist_ok=True)
 
-    generation = f"{time.time_ns():x}-{uuid.uuid4().hex[:8]}"
-    gen_dir = kdir / generation
-    os.replace(staged_dir, gen_dir)
+    suffix = next((known for known in GENERATION_SUFFIXES if staged.name.endswith(known)), "")
+    generation = f"{time.time_ns():x}-{uuid.uuid4().hex[:8]}{suffix}"
+    gen_path = kdir / generation
+    os.replace(staged, gen_path)
 
     pointer_tmp = kdir / f"{LATEST_POINTER}.{uuid.uuid4().hex[:8]}.tmp"
     pointer_tmp.write_text(generation, encoding="utf-8")
@@ -188,12 +281,138 @@ def publish_generation(root: Path, sanitized_key: str, staged_dir: Path) -> Path
     # Garbage-collect superseded generations.
     try:
         for entry in os.scandir(kdir):
-            if entry.is_dir() and entry.name != generation:
+            if entry.name == generation:
+                continue
+            if entry.is_dir():
                 shutil.rmtree(entry.path, ignore_errors=True)
+            elif entry.name.endswith(GENERATION_SUFFIXES):
+                os.unlink(entry.path)
     except OSError:
         pass
 
-    return gen_dir
+    return gen_path
+
+
+def store_lock_path(root: Path) -> Path:
+    """Return the store-wide lock file path (see :data:`STORE_LOCK`)."""
+    return root / STORE_LOCK
+
+
+def blob_path(root: Path, digest: str, mode: int) -> Path:
+    """Return where the blob for *digest* with permission bits *mode* lives."""
+    return root / BLOBS_DIR / digest[:2] / f"{digest}-{mode:o}"
+
+
+def hash_file(path: str | os.PathLike[str]) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def reflink(src: str | os.PathLike[str], dest: str | os.PathLike[str]) -> bool:
+    """Create *dest* as a copy-on-write clone of *src*; False where unsupported.
+
+    *dest* must not exist.  Nothing is left behind on failure.
+    """
+    if fcntl is None:
+        return False
+    try:
+        fd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except OSError:
+        return False
+    try:
+        with open(src, "rb") as source:
+            fcntl.ioctl(fd, FICLONE, source.fileno())
+        return True
+    except OSError:
+        os.close(fd)
+        fd = -1
+        try:
+            os.unlink(dest)
+        except OSError:
+            pass
+        return False
+    finally:
+        if fd >= 0:
+            os.close(fd)
+
+
+def temp_sibling(dest: Path) -> Path:
+    return dest.parent / f".{dest.name}.{uuid.uuid4().hex[:8]}.tmp"
+
+
+class BlobPlacer:
+    """Put blobs into a target tree with the cheapest method that works.
+
+    A method that fails once (another filesystem, no reflink support) is not
+    tried again for the rest of the restore.
+    """
+
+    def __init__(self, link: str = "auto") -> None:
+        self.reflink = link in ("auto", "reflink")
+        self.hardlink = link == "hardlink"
+
+    def place(self, blob: Path, dest: Path, mode: int, mtime_ns: int) -> None:
+        """Make *dest* a file with *blob*'s content, *mode* and (unless linked) *mtime_ns*.
+
+        Like :func:`_safe_copy2`, never writes into an existing *dest* inode.
+        Raises FileNotFoundError when the blob is missing.
+        """
+        if self.hardlink:
+            try:
+                current, stored = os.lstat(dest), os.stat(blob)
+                if (current.st_dev, current.st_ino) == (stored.st_dev, stored.st_ino):
+                    return  # already linked; renaming a link over itself would be a no-op
+            except FileNotFoundError:
+                pass
+        if self.reflink:
+            tmp = temp_sibling(dest)
+            if reflink(blob, tmp):
+                self.finish(tmp, dest, mode, mtime_ns)
+                return
+            if not blob.exists():
+                raise FileNotFoundError(blob)
+            self.reflink = False
+        if self.hardlink:
+            tmp = temp_sibling(dest)
+            try:
+                os.link(blob, tmp)
+            except FileNotFoundError:
+                raise
+            except OSError:
+                self.hardlink = False
+            else:
+                os.replace(tmp, dest)
+                return
+        _safe_copy2(blob, dest)
+        os.utime(dest, ns=(mtime_ns, mtime_ns))
+
+    @staticmethod
+    def finish(tmp: Path, dest: Path, mode: int, mtime_ns: int) -> None:
+        try:
+            os.chmod(tmp, mode)
+            os.utime(tmp, ns=(mtime_ns, mtime_ns))
+            os.replace(tmp, dest)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+
+def place_symlink(target: str, dest: Path) -> None:
+    """Make *dest* a symlink to *target*, replacing whatever file is there."""
+    tmp = temp_sibling(dest)
+    os.symlink(target, tmp)
+    try:
+        os.replace(tmp, dest)
+    except BaseException:
+        os.unlink(tmp)
+        raise
 
 
 def _safe_copy2(src: Path, dest: Path) -> None:
@@ -203,70 +422,535 @@ def _safe_copy2(src: Path, dest: Path) -> None:
     (errno 26, Text file busy) on Linux when *dest* is a currently-executing
     binary (e.g. ``.venv/bin/python``).  Writing to a sibling temp file then
     atomically renaming it over *dest* creates a fresh inode so the running
-    process's reference to the old inode is left undisturbed.
+    process's reference to the old inode is left undisturbed.  Mode bits
+    are preserved so venv scripts remain runnable.
+    """
+    copy_file(src, dest, replace=True)
+
+
+def copy_tree_into(src_root: Path, target_dir: Path) -> int:
+    """Copy every file under *src_root* into *target_dir*, preserving relative paths.
+
+    Used for generations saved as directory trees by older versions.
+    Returns the number of files copied.
     """
-    fd, tmp_path_str = tempfile.mkstemp(dir=dest.parent)
+    return copy_tree(src_root, target_dir, replace=True)
+
+
+def store_blob(root: Path, src: str | os.PathLike[str], digest: str, mode: int) -> None:
+    """Store *src*'s content as the blob for (*digest*, *mode*) unless it already exists."""
+    blob = blob_path(root, digest, mode)
+    if os.path.exists(blob):
+        return
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    tmp = root / ".tmp" / f"blob-{uuid.uuid4().hex}"
     try:
-        os.close(fd)
-        shutil.copy2(src, tmp_path_str)
-        # Preserve executable bits so venv scripts remain runnable.
-        src_mode = stat.S_IMODE(os.stat(src).st_mode)
-        os.chmod(tmp_path_str, src_mode)
-        os.replace(tmp_path_str, dest)
+        if not reflink(src, tmp):
+            copy_file(src, tmp)
+        os.chmod(tmp, mode)
+        os.replace(tmp, blob)
     except BaseException:
         try:
-            os.unlink(tmp_path_str)
+            os.unlink(tmp)
         except OSError:
             pass
         raise
 
 
-def copy_tree_into(src_root: Path, target_dir: Path) -> int:
-    """Copy every file under *src_root* into *target_dir*, preserving relative paths.
+def below_symlink(rel_path: str, source_dir: Path, linked: dict[str, bool]) -> bool:
+    """True if a directory above *rel_path* (inside *source_dir*) is a symlink.
 
-    Returns the number of files copied.
+    A ``**`` glob descends through symlinked directories, so their contents
+    also match under the link's name; the link itself is saved as a link, and
+    saving those paths too would make the restore write through it.
+    *linked* memoizes the answer per directory.
     """
-    copied = 0
-    for dirpath, dirnames, filenames in os.walk(src_root):
-        rel_dir = Path(dirpath).relative_to(src_root)
-        for dname in dirnames:
-            (target_dir / rel_dir / dname).mkdir(parents=True, exist_ok=True)
-        for fname in filenames:
-            src = Path(dirpath) / fname
-            dest = target_dir / rel_dir / fname
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            _safe_copy2(src, dest)
-            copied += 1
-    return copied
-
-
-def stage_matched_paths(cache: CacheConfig, source_dir: Path, staged_dir: Path) -> int:
-    """Copy paths matched by *cache.paths* from *source_dir* into *staged_dir*.
+    parent = os.path.dirname(rel_path)
+    if not parent or parent == os.curdir:
+        return False
+    if parent not in linked:
+        linked[parent] = below_symlink(parent, source_dir, linked) or os.path.islink(os.path.join(source_dir, parent))
+    return linked[parent]
+
+
+class ManifestBuilder:
+    """Collect matched paths of a save into a manifest and store their new blobs."""
+
+    def __init__(self, root: Path, source_dir: Path) -> None:
+        self.root = root
+        self.source_dir = source_dir
+        self.dirs: set[str] = set()
+        self.files: dict[str, list[Any]] = {}
+        self.links: dict[str, str] = {}
+        # relative path -> absolute path of regular files still to hash.
+        self.pending: dict[str, str] = {}
+        self.linked: dict[str, bool] = {}
+
+    def rel(self, path: str) -> str:
+        return Path(os.path.relpath(path, str(self.source_dir))).as_posix()
+
+    def add_parents(self, rel_path: str) -> None:
+        parent = Path(rel_path).parent
+        while parent != Path("."):
+            self.dirs.add(parent.as_posix())
+            parent = parent.parent
+
+    def store_file(self, item: tuple[str, str]) -> None:
+        path, rel_path = item
+        info = os.lstat(path)
+        if not stat.S_ISREG(info.st_mode):
+            return  # sockets, FIFOs and devices are not cached
+        digest = hash_file(path)
+        mode = stat.S_IMODE(info.st_mode)
+        store_blob(self.root, path, digest, mode)
+        self.files[rel_path] = [rel_path, digest, mode, info.st_size, info.st_mtime_ns]
+
+    def add(self, path: str) -> None:
+        """Add one matched path: a file, a symlink, or a whole directory tree."""
+        rel_path = self.rel(path)
+        if below_symlink(rel_path, self.source_dir, self.linked):
+            return
+        self.add_parents(rel_path)
+        if os.path.islink(path):
+            self.links[rel_path] = os.readlink(path)
+        elif os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                self.dirs.add(self.rel(dirpath))
+                for name in dirnames:
+                    child = os.path.join(dirpath, name)
+                    if os.path.islink(child):
+                        self.links[self.rel(child)] = os.readlink(child)
+                for name in filenames:
+                    child = os.path.join(dirpath, name)
+                    if os.path.islink(child):
+                        self.links[self.rel(child)] = os.readlink(child)
+                    else:
+                        self.pending[self.rel(child)] = child
+        else:
+            self.pending[rel_path] = path
+
+    def manifest(self) -> dict[str, Any]:
+        """Hash and store the collected files (on the copy pool) and return the manifest."""
+        run_in_batches(self.store_file, [(path, rel) for rel, path in self.pending.items()])
+        self.pending.clear()
+        self.dirs.discard(".")
+        return {
+            "version": MANIFEST_VERSION,
+            "dirs": sorted(self.dirs),
+            "files": [self.files[rel] for rel in sorted(self.files)],
+            "links": [[rel, self.links[rel]] for rel in sorted(self.links)],
+        }
+
+
+def matched_paths(cache: CacheConfig, source_dir: Path) -> list[str]:
+    """Return the absolute paths matched by *cache.paths* under *source_dir*.
 
     Glob semantics mirror :func:`bitrab.execution.artifacts.collect_artifacts`.
-    Returns the number of top-level matches staged.
+    Matches outside *source_dir* are skipped with a warning.
     """
-    matched = 0
+    paths = []
     for pattern in cache.paths:
         full_pattern = os.path.join(str(source_dir), pattern)
         for abs_path in glob.glob(full_pattern, recursive=True):
-            src = Path(abs_path)
-            if not src.exists():
+            if not os.path.lexists(abs_path):
                 continue
             rel_path = os.path.relpath(abs_path, str(source_dir))
             if rel_path.startswith(".."):
                 logger.warning("Cache path %r escapes the project directory; skipped.", pattern)
                 continue
-            dest = staged_dir / rel_path
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            if src.is_dir():
-                if dest.exists():
-                    shutil.rmtree(dest)
-                shutil.copytree(src, dest)
-            else:
-                shutil.copy2(src, dest)
-            matched += 1
-    return matched
+            paths.append(abs_path)
+    return paths
+
+
+def store_matched_paths(cache: CacheConfig, source_dir: Path, root: Path) -> tuple[dict[str, Any], int]:
+    """Store the paths matched by *cache.paths* under *source_dir* as blobs.
+
+    Returns the generation manifest and the number of top-level matches.
+    Call with the store lock held shared.
+    """
+    builder = ManifestBuilder(root, source_dir)
+    paths = matched_paths(cache, source_dir)
+    for abs_path in paths:
+        builder.add(abs_path)
+    return builder.manifest(), len(paths)
+
+
+def snapshot_paths(cache: CacheConfig, base_dir: Path) -> CacheSnapshot:
+    """Record what *cache.paths* matches under *base_dir*, cheaply.
+
+    Maps each relative path to ``(size, mtime_ns, symlink target)``;
+    directories get size -1 and symlinks only their target.  Two equal
+    snapshots mean a save would publish the same content again.
+    """
+    snapshot: CacheSnapshot = {}
+
+    def record(path: str) -> os.stat_result:
+        info = os.lstat(path)
+        rel_path = os.path.relpath(path, str(base_dir))
+        if stat.S_ISLNK(info.st_mode):
+            snapshot[rel_path] = (0, 0, os.readlink(path))
+        elif stat.S_ISDIR(info.st_mode):
+            snapshot[rel_path] = (-1, 0, "")
+        else:
+            snapshot[rel_path] = (info.st_size, info.st_mtime_ns, "")
+        return info
+
+    for abs_path in matched_paths(cache, base_dir):
+        if not stat.S_ISDIR(record(abs_path).st_mode):
+            continue
+        for dirpath, dirnames, filenames in os.walk(abs_path):
+            for name in dirnames + filenames:
+                record(os.path.join(dirpath, name))
+    return snapshot
+
+
+def zstd_module() -> Any:
+    """Return :mod:`compression.zstd` (Python 3.14+), or None without it."""
+    try:
+        from compression import zstd  # type: ignore[import-not-found]
+    except ImportError:
+        return None
+    return zstd
+
+
+@functools.cache
+def resolve_cache_format(cache_format: str) -> str:
+    """Map a configured ``cache_format`` to one this interpreter can write."""
+    if cache_format not in CACHE_FORMATS:
+        logger.warning(
+            "Unknown cache_format %r (expected one of %s); using 'blobs'.", cache_format, ", ".join(CACHE_FORMATS)
+        )
+        return "blobs"
+    if cache_format == "tar.zst" and zstd_module() is None:
+        logger.warning("cache_format = 'tar.zst' needs Python 3.14 or later; writing tar.gz archives instead.")
+        return "tar.gz"
+    return cache_format
+
+
+def compressed_stream(raw: BinaryIO, name: str, mode: str) -> Any:
+    """Wrap *raw* in the compressor an archive named *name* calls for."""
+    if name.endswith(".tar.gz"):
+        return gzip.GzipFile(fileobj=raw, mode=mode, compresslevel=ARCHIVE_COMPRESSLEVEL, mtime=0)
+    if name.endswith(".tar.zst"):
+        zstd = zstd_module()
+        if zstd is None:
+            raise ValueError("zstd archives need Python 3.14 or later")
+        if mode == "wb":
+            return zstd.ZstdFile(raw, "w", level=ARCHIVE_COMPRESSLEVEL)
+        return zstd.ZstdFile(raw, "r")
+    return contextlib.nullcontext(raw)
+
+
+def write_archive(cache: CacheConfig, source_dir: Path, dest: Path) -> int:
+    """Stream the paths matched by *cache.paths* into the tar archive *dest*.
+
+    The compression follows *dest*'s suffix.  Symlinks are stored as
+    symlinks, files already in the archive under another name as hard links.
+    Returns the number of top-level matches.
+    """
+    seen: set[str] = set()
+    linked: dict[str, bool] = {}
+
+    def keep(info: tarfile.TarInfo) -> tarfile.TarInfo | None:
+        if info.name in seen or not (info.isreg() or info.isdir() or info.issym() or info.islnk()):
+            return None
+        seen.add(info.name)
+        # Whole seconds keep headers in the ustar fields (no PAX record per file).
+        info.mtime = int(info.mtime)
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        return info
+
+    paths = matched_paths(cache, source_dir)
+    if not paths:
+        return 0
+    with open(dest, "wb", buffering=ARCHIVE_BUFFER) as raw, compressed_stream(raw, dest.name, "wb") as stream:
+        with tarfile.open(fileobj=stream, mode="w|", format=tarfile.GNU_FORMAT) as tar:
+            for abs_path in paths:
+                rel_path = Path(os.path.relpath(abs_path, str(source_dir))).as_posix()
+                if below_symlink(rel_path, source_dir, linked):
+                    continue
+                tar.add(abs_path, arcname=rel_path, filter=keep)
+    return len(paths)
+
+
+def member_path(target_dir: Path, name: str, inside: set[Path]) -> Path:
+    """Resolve an archive member name under *target_dir*, refusing escapes.
+
+    Besides absolute names and ``..``, a member whose parent directory
+    resolves outside *target_dir* (through a symlink restored earlier or
+    already in the workspace) is refused.  *inside* holds the parents
+    already checked; the caller creates each one right after the check, so
+    it cannot turn into a symlink later.
+    """
+    rel = Path(name)
+    if rel.is_absolute() or ".." in rel.parts:
+        raise ValueError(f"archive member {name!r} escapes the target directory")
+    dest = target_dir / rel
+    if dest.parent not in inside:
+        if not dest.parent.resolve().is_relative_to(target_dir.resolve()):
+            raise ValueError(f"archive member {name!r} would be written through a symlink out of the target directory")
+        inside.add(dest.parent)
+    return dest
+
+
+def place_stream(source: IO[bytes], dest: Path, mode: int, mtime: float) -> None:
+    """Write *source* to *dest*, never into an existing inode (see :func:`_safe_copy2`).
+
+    A new *dest* is written directly; an existing one is replaced through a
+    temp sibling.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    path = dest
+    try:
+        fd = os.open(path, flags, 0o600)
+    except FileExistsError:
+        path = temp_sibling(dest)
+        fd = os.open(path, flags, 0o600)
+    try:
+        with open(fd, "wb") as out:
+            shutil.copyfileobj(source, out, HASH_CHUNK)
+        os.chmod(path, mode)
+        os.utime(path, (mtime, mtime))
+        if path != dest:
+            os.replace(path, dest)
+    except BaseException:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        raise
+
+
+def place_hardlink(existing: Path, dest: Path) -> None:
+    """Make *dest* a hard link to *existing* (a copy where links are refused)."""
+    tmp = temp_sibling(dest)
+    try:
+        os.link(existing, tmp)
+    except OSError:
+        _safe_copy2(existing, dest)
+        return
+    os.replace(tmp, dest)
+
+
+def extract_archive(archive: Path, target_dir: Path) -> int:
+    """Extract a generation archive into *target_dir* in one streaming pass.
+
+    Returns the number of files and symlinks restored.
+    """
+    restored = 0
+    made: set[Path] = set()
+    inside: set[Path] = set()
+    with open(archive, "rb", buffering=ARCHIVE_BUFFER) as raw, compressed_stream(raw, archive.name, "rb") as stream:
+        with tarfile.open(fileobj=stream, mode="r|") as tar:
+            for member in tar:
+                dest = member_path(target_dir, member.name, inside)
+                if member.isdir():
+                    dest.mkdir(parents=True, exist_ok=True)
+                    made.add(dest)
+                    continue
+                if dest.parent not in made:
+                    dest.parent.mkdir(parents=True, exist_ok=True)
+                    made.add(dest.parent)
+                if member.issym():
+                    place_symlink(member.linkname, dest)
+                elif member.islnk():
+                    place_hardlink(member_path(target_dir, member.linkname, inside), dest)
+                elif member.isreg():
+                    source = tar.extractfile(member)
+                    if source is None:
+                        continue
+                    place_stream(source, dest, member.mode, member.mtime)
+                else:
+                    continue
+                restored += 1
+    return restored
+
+
+def read_manifest(path: Path) -> dict[str, Any]:
+    """Load a generation manifest written by :func:`save_cache_entry`."""
+    manifest = json_loads(path.read_bytes())
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"unsupported cache manifest {path}")
+    return manifest
+
+
+def restore_manifest(root: Path, manifest_path: Path, target_dir: Path, link: str = "auto") -> tuple[int, int]:
+    """Recreate a manifest's tree under *target_dir*.
+
+    Returns ``(restored, missing)``: entries placed, and files whose blob was
+    gone from the store.
+    """
+    manifest = read_manifest(manifest_path)
+    make_dirs(str(target_dir / rel_dir) for rel_dir in manifest["dirs"])
+    placer = BlobPlacer(link)
+    missing: list[str] = []
+
+    def place(entry: list[Any]) -> None:
+        rel_path, digest, mode, _size, mtime_ns = entry
+        try:
+            placer.place(blob_path(root, digest, mode), target_dir / rel_path, mode, mtime_ns)
+        except FileNotFoundError:
+            missing.append(rel_path)
+
+    run_in_batches(place, manifest["files"])
+    for rel_path, target in manifest["links"]:
+        place_symlink(target, target_dir / rel_path)
+    return len(manifest["files"]) - len(missing) + len(manifest["links"]), len(missing)
+
+
+def stored_keys(root: Path) -> list[str]:
+    """Sanitized names of every key directory in the store."""
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return []
+    return [entry.name for entry in entries if entry.is_dir() and entry.name not in (BLOBS_DIR, ".tmp")]
+
+
+def referenced_blobs(root: Path, sanitized_key: str) -> set[str]:
+    """Names of the blobs a key's live generation refers to (none for archives)."""
+    generation = read_latest_generation(root, sanitized_key)
+    if generation is None or not generation.name.endswith(MANIFEST_SUFFIX):
+        return set()
+    try:
+        manifest = read_manifest(generation)
+    except (OSError, ValueError):
+        return set()
+    return {f"{digest}-{mode:o}" for _rel, digest, mode, _size, _mtime in manifest["files"]}
+
+
+def live_blobs(root: Path) -> set[str]:
+    """Names of the blobs that some key's live generation refers to."""
+    names: set[str] = set()
+    for sanitized in stored_keys(root):
+        names |= referenced_blobs(root, sanitized)
+    return names
+
+
+def tree_size(path: str | os.PathLike[str]) -> int:
+    """Total size of the files under *path*."""
+    total = 0
+    for dirpath, _dirnames, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def blob_sizes(root: Path) -> dict[str, int]:
+    """Map every blob's name to its size."""
+    sizes: dict[str, int] = {}
+    for dirpath, _dirnames, filenames in os.walk(root / BLOBS_DIR):
+        for name in filenames:
+            try:
+                sizes[name] = os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return sizes
+
+
+def touch_access(root: Path, sanitized_key: str) -> None:
+    """Record that a key was just used (see :func:`last_used`)."""
+    try:
+        (key_dir(root, sanitized_key) / ACCESS_STAMP).touch()
+    except OSError:
+        pass
+
+
+def last_used(root: Path, sanitized_key: str) -> float:
+    """When a key was last restored or saved, as a timestamp (0 if unknown)."""
+    kdir = key_dir(root, sanitized_key)
+    for name in (ACCESS_STAMP, LATEST_POINTER):
+        try:
+            return (kdir / name).stat().st_mtime
+        except OSError:
+            continue
+    return 0.0
+
+
+def enforce_size_limit(root: Path, max_bytes: int, keep: str = "") -> int:
+    """Evict least recently used keys until the store fits in *max_bytes*.
+
+    The store's size is its blobs plus each key's directory.  Keys go oldest
+    first (by :func:`last_used`); a key only frees the blobs no remaining key
+    refers to, and those are deleted by the next :func:`collect_garbage`.
+    A key whose lock is held (it is being restored or saved right now) or
+    that was used since the scan is skipped, as is *keep*, the key just
+    saved.  Returns the number of keys evicted.
+    """
+    sizes = blob_sizes(root)
+    keys = {
+        sanitized: (tree_size(key_dir(root, sanitized)), referenced_blobs(root, sanitized))
+        for sanitized in stored_keys(root)
+    }
+    total = sum(sizes.values()) + sum(own for own, _blobs in keys.values())
+    if total <= max_bytes:
+        return 0
+    refs = Counter(name for _own, blobs in keys.values() for name in blobs)
+    used = {sanitized: last_used(root, sanitized) for sanitized in keys if sanitized != keep}
+    evicted = 0
+    for sanitized in sorted(used, key=used.__getitem__):
+        if total <= max_bytes:
+            break
+        try:
+            with FileLock(lock_path(root, sanitized), timeout=0.0):
+                if last_used(root, sanitized) > used[sanitized]:
+                    continue
+                shutil.rmtree(key_dir(root, sanitized), ignore_errors=True)
+        except FileLockTimeout:
+            continue
+        evicted += 1
+        own, blobs = keys[sanitized]
+        total -= own
+        for name in blobs:
+            refs[name] -= 1
+            if refs[name] == 0:
+                total -= sizes.get(name, 0)
+        logger.info("Evicted cache key %r (least recently used) to stay under cache_max_bytes.", sanitized)
+    return evicted
+
+
+def collect_garbage(root: Path, force: bool = False) -> int:
+    """Delete blobs and staging leftovers that no live generation needs.
+
+    Runs at most once per :data:`GC_INTERVAL_SECONDS` (unless *force*) and only
+    when no save holds the store lock; otherwise it returns at once.  Returns
+    the number of bytes freed.
+    """
+    stamp = root / GC_STAMP
+    if not force:
+        try:
+            if time.time() - stamp.stat().st_mtime < GC_INTERVAL_SECONDS:
+                return 0
+        except OSError:
+            pass
+    freed = 0
+    try:
+        with FileLock(store_lock_path(root), timeout=0.0):
+            stamp.touch()
+            live = live_blobs(root)
+            blobs_dir = root / BLOBS_DIR
+            for dirpath, _dirnames, filenames in os.walk(blobs_dir):
+                for name in filenames:
+                    if name in live:
+                        continue
+                    path = os.path.join(dirpath, name)
+                    try:
+                        size = os.lstat(path).st_size
+                        os.unlink(path)
+                    except OSError:
+                        continue
+                    freed += size
+            # No save is running, so anything left in .tmp/ is from a crash.
+            shutil.rmtree(root / ".tmp", ignore_errors=True)
+    except FileLockTimeout:
+        return 0
+    if freed:
+        logger.info("Cache sweep freed %d byte(s) of unreferenced blobs.", freed)
+    return freed
 
 
 # ---------------------------------------------------------------------------
@@ -280,22 +964,39 @@ def restore_cache_entry(
     root: Path,
     target_dir: Path,
     lock_timeout: float = LOCK_TIMEOUT_SECONDS,
+    link: str = "auto",
 ) -> bool:
     """Restore one cache entry into *target_dir*. Returns True if files landed.
 
     A missing key is a silent cache miss.  A lock timeout logs a warning and
-    skips the restore rather than failing the job.
+    skips the restore rather than failing the job.  *link* is one of
+    :data:`LINK_MODES`.
     """
     sanitized = sanitize_cache_key(key)
     try:
         with FileLock(lock_path(root, sanitized), timeout=lock_timeout):
-            gen_dir = read_latest_generation(root, sanitized)
-            if gen_dir is None:
+            generation = read_latest_generation(root, sanitized)
+            if generation is None:
                 logger.info("Cache miss for key %r — nothing to restore.", key)
                 return False
-            copied = copy_tree_into(gen_dir, target_dir)
-            logger.info("Restored cache key %r (%d file(s)).", key, copied)
-            return copied > 0
+            touch_access(root, sanitized)
+            if generation.is_dir():
+                copied = copy_tree_into(generation, target_dir)
+                logger.info("Restored cache key %r (%d file(s)).", key, copied)
+                return copied > 0
+            missing = 0
+            try:
+                if generation.name.endswith(MANIFEST_SUFFIX):
+                    restored, missing = restore_manifest(root, generation, target_dir, link)
+                else:
+                    restored = extract_archive(generation, target_dir)
+            except (OSError, ValueError, tarfile.TarError) as exc:
+                logger.warning("Cache key %r is unreadable (%s) — skipping restore.", key, exc)
+                return False
+            if missing:
+                logger.warning("Cache key %r: %d file(s) missing from the store were not restored.", key, missing)
+            logger.info("Restored cache key %r (%d file(s)).", key, restored)
+            return restored > 0
     except FileLockTimeout:
         logger.warning("Timed out waiting for cache lock on key %r — skipping restore.", key)
         return False
@@ -307,33 +1008,73 @@ def save_cache_entry(
     root: Path,
     source_dir: Path,
     lock_timeout: float = LOCK_TIMEOUT_SECONDS,
+    cache_format: str = "blobs",
+    max_bytes: int | None = None,
 ) -> bool:
     """Save one cache entry from *source_dir*. Returns True if a generation published.
 
-    All content is staged under ``.tmp/`` first; only the atomic
-    rename + pointer rewrite (under the per-key lock) makes it visible.
+    With *cache_format* ``"blobs"`` new contents go to the blob store first
+    and the generation is a manifest; the tar formats stream everything into
+    one archive instead.  Either is staged under the shared store lock, and
+    only the atomic rename + pointer rewrite (under the per-key lock) makes
+    the generation visible.  With *max_bytes* the store is then trimmed to
+    that size (see :func:`enforce_size_limit`).
     """
     sanitized = sanitize_cache_key(key)
-    staged_dir = root / ".tmp" / f"{sanitized}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
-    staged_dir.mkdir(parents=True, exist_ok=True)
+    cache_format = resolve_cache_format(cache_format)
+    suffix = MANIFEST_SUFFIX if cache_format == "blobs" else f".{cache_format}"
+    staging = root / ".tmp"
+    staged = staging / f"{sanitized}-{os.getpid()}-{uuid.uuid4().hex[:8]}{suffix}"
+    published = False
 
     try:
-        matched = stage_matched_paths(cache, source_dir, staged_dir)
-        if matched == 0:
-            logger.info("Cache key %r: no paths matched — nothing to save.", key)
-            return False
-
-        try:
+        with FileLock(store_lock_path(root), timeout=lock_timeout, shared=True):
+            staging.mkdir(parents=True, exist_ok=True)
+            if cache_format == "blobs":
+                manifest, matched = store_matched_paths(cache, source_dir, root)
+                if matched:
+                    staged.write_text(json_dumps(manifest), encoding="utf-8")
+            else:
+                matched = write_archive(cache, source_dir, staged)
+            if matched == 0:
+                logger.info("Cache key %r: no paths matched — nothing to save.", key)
+                return False
             with FileLock(lock_path(root, sanitized), timeout=lock_timeout):
-                publish_generation(root, sanitized, staged_dir)
+                publish_generation(root, sanitized, staged)
+                touch_access(root, sanitized)
+                published = True
                 logger.info("Saved cache key %r (%d match(es)).", key, matched)
-                return True
-        except FileLockTimeout:
-            logger.warning("Timed out waiting for cache lock on key %r — skipping save.", key)
-            return False
+    except FileLockTimeout:
+        logger.warning("Timed out waiting for cache lock on key %r — skipping save.", key)
+        return False
     finally:
-        if staged_dir.exists():
-            shutil.rmtree(staged_dir, ignore_errors=True)
+        staged.unlink(missing_ok=True)
+    if published:
+        evicted = enforce_size_limit(root, max_bytes, keep=sanitized) if max_bytes else 0
+        # Sweep the evicted keys' blobs now rather than within the hour.
+        collect_garbage(root, force=evicted > 0)
+    return published
+
+
+def disjoint_paths(caches: list[CacheConfig]) -> bool:
+    """Return True if no two *caches* can match the same path.
+
+    Judged by the first component of each ``paths:`` pattern, so a pattern
+    that starts with a wildcard counts as overlapping everything.
+    """
+    seen: set[str] = set()
+    for cache in caches:
+        tops = set()
+        for pattern in cache.paths:
+            parts = Path(pattern).parts
+            top = parts[0] if parts else ""
+            if top in ("", ".", "..") or Path(top).is_absolute() or GLOB_MAGIC_RE.search(top):
+                return False
+            tops.add(top)
+        if tops & seen:
+            return False
+        seen |= tops
+    return True
 
 
 def restore_caches(
@@ -342,16 +1083,28 @@ def restore_caches(
     target_dir: Path,
     env: Mapping[str, str],
     lock_timeout: float = LOCK_TIMEOUT_SECONDS,
-) -> None:
+    link: str = "auto",
+) -> dict[str, CacheSnapshot]:
     """Restore every restorable cache entry of *job* into *target_dir*.
 
-    Entries with ``policy: push`` are save-only and skipped here.
+    Entries with ``policy: push`` are save-only and skipped here.  Entries
+    whose paths cannot overlap are restored concurrently; otherwise in order,
+    so a later entry's files win.  *link* is one of :data:`LINK_MODES`.  Returns a :func:`snapshot_paths` record of
+    each key that was hit, taken once every entry is in place; hand it to
+    :func:`save_caches` so unchanged caches are not saved again.
     """
-    for cache in job.cache:
-        if cache.policy == "push":
-            continue
-        key = resolve_cache_key(cache, env, target_dir)
-        restore_cache_entry(cache, key, root, target_dir, lock_timeout=lock_timeout)
+    entries = [(cache, resolve_cache_key(cache, env, target_dir)) for cache in job.cache if cache.policy != "push"]
+
+    def restore(entry: tuple[CacheConfig, str]) -> bool:
+        cache, key = entry
+        return restore_cache_entry(cache, key, root, target_dir, lock_timeout=lock_timeout, link=link)
+
+    if len(entries) > 1 and disjoint_paths([cache for cache, _key in entries]):
+        with ThreadPoolExecutor(max_workers=len(entries), thread_name_prefix="bitrab-cache") as pool:
+            landed = list(pool.map(restore, entries))
+    else:
+        landed = [restore(entry) for entry in entries]
+    return {key: snapshot_paths(cache, target_dir) for (cache, key), hit in zip(entries, landed) if hit}
 
 
 def save_caches(
@@ -361,6 +1114,9 @@ def save_caches(
     env: Mapping[str, str],
     succeeded: bool,
     lock_timeout: float = LOCK_TIMEOUT_SECONDS,
+    cache_format: str = "blobs",
+    restored: Mapping[str, CacheSnapshot] | None = None,
+    max_bytes: int | None = None,
 ) -> None:
     """Save every saveable cache entry of *job* from *source_dir*.
 
@@ -369,6 +1125,11 @@ def save_caches(
     - ``on_success``: save only if *succeeded*
     - ``on_failure``: save only if the job failed
     - ``always``: save regardless
+
+    *cache_format* is one of :data:`CACHE_FORMATS`.  A key whose files still
+    match its snapshot in *restored* (from :func:`restore_caches`) is left
+    alone: the store already holds exactly that content.  *max_bytes* caps
+    the store's size ([tool.bitrab] cache_max_bytes).
     """
     for cache in job.cache:
         if cache.policy == "pull":
@@ -378,4 +1139,9 @@ def save_caches(
         if cache.when == "on_failure" and succeeded:
             continue
         key = resolve_cache_key(cache, env, source_dir)
-        save_cache_entry(cache, key, root, source_dir, lock_timeout=lock_timeout)
+        if restored and key in restored and snapshot_paths(cache, source_dir) == restored[key]:
+            logger.info("Cache key %r: cache unchanged — skipping save.", key)
+            continue
+        save_cache_entry(
+            cache, key, root, source_dir, lock_timeout=lock_timeout, cache_format=cache_format, max_bytes=max_bytes
+        )
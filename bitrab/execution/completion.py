@@ -0,0 +1,49 @@
+"""Wakeup channel for the parallel dispatch loops.
+
+The stage runner used to poll ``concurrent.futures.wait(..., timeout=0.05)``
+in a loop: an idle orchestrator woke twenty times a second, and every job
+completion waited up to 50 ms to be noticed.  :class:`CompletionQueue`
+instead has each submitted future report itself through a done-callback, and
+the dispatch loop sleeps on a single condition variable until one does.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any
+
+# How long one idle wait may last.  POSIX lock waits are interrupted by
+# Ctrl-C, so they block until woken; Windows lock waits are not, so a bounded
+# wait keeps KeyboardInterrupt responsive there.
+IDLE_WAIT: float | None = 0.5 if os.name == "nt" else None
+
+
+class CompletionQueue:
+    """Collects finished futures in completion order and wakes the dispatcher."""
+
+    def __init__(self) -> None:
+        self.condition = threading.Condition()
+        self.finished: list[Future[Any]] = []
+
+    def watch(self, future: Future[Any]) -> None:
+        """Report *future* here once it finishes (immediately if it already has)."""
+        future.add_done_callback(self.push)
+
+    def push(self, future: Future[Any]) -> None:
+        """Done-callback: record *future* and wake the waiting dispatcher."""
+        with self.condition:
+            self.finished.append(future)
+            self.condition.notify_all()
+
+    def wait(self, timeout: float | None = IDLE_WAIT) -> list[Future[Any]]:
+        """Block until at least one watched future finished, then return them all.
+
+        Returns an empty list if *timeout* seconds pass first.
+        """
+        with self.condition:
+            if not self.finished:
+                self.condition.wait(timeout)
+            finished, self.finished = self.finished, []
+        return finished
@@ -0,0 +1,232 @@
+"""Shared file-copy engine for caches and artifacts.
+
+Copying a tree one file at a time with ``shutil.copy2`` spends most of its
+time in per-file Python overhead and in syscalls that wait on the disk one
+after another.  :func:`copy_files` instead creates every destination
+directory up front (each at most once, parents first), then hands the files
+to a shared thread pool in small batches.  Each worker copies with
+``os.copy_file_range``, which stays in the kernel and becomes a server-side
+or reflink copy where the filesystem supports it.  It falls back to
+``os.sendfile`` and then to a plain read/write loop; a method the kernel does
+not implement is not tried again in this process.
+
+Copies keep permission bits and access/modification times, like
+``shutil.copy2``, and follow symlinks; special files (FIFOs, sockets,
+devices) are refused rather than opened.  With ``replace=True`` an existing
+destination is never written in place: the copy goes to a temp sibling that
+is renamed over it, so a running binary there keeps its inode.
+
+:func:`run_in_batches` is the same pool for other per-file work (hashing,
+placing cache blobs).  Functions run on the pool must not call it themselves:
+a worker waiting for its own pool can deadlock it.
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+import stat
+import sys
+import threading
+import uuid
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TypeVar
+
+T = TypeVar("T")
+
+# Threads copying at once: copies mostly wait on the disk, so a few more
+# than the CPUs (the ThreadPoolExecutor default for I/O), capped.
+COPY_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+
+# Files per task: enough to amortise the hand-off, small enough to balance.
+BATCH_FILES = 32
+
+# Bytes per copy_file_range / sendfile / read call.
+COPY_CHUNK = 8 * 1024 * 1024
+
+# errnos that mean "this method cannot copy this pair", not "the copy failed".
+UNSUPPORTED_ERRNOS = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+OPEN_BINARY = getattr(os, "O_BINARY", 0)
+
+# Kernel copy methods still worth trying in this process.
+KERNEL_COPY = {
+    "copy_file_range": hasattr(os, "copy_file_range"),
+    "sendfile": sys.platform.startswith("linux"),
+}
+
+POOL: ThreadPoolExecutor | None = None
+POOL_LOCK = threading.Lock()
+
+
+def copy_pool() -> ThreadPoolExecutor:
+    """Return this process's copy pool, creating it on first use."""
+    global POOL  # pylint: disable=global-statement
+    with POOL_LOCK:
+        if POOL is None:
+            POOL = ThreadPoolExecutor(max_workers=COPY_WORKERS, thread_name_prefix="bitrab-copy")
+        return POOL
+
+
+def forget_copy_pool_in_child() -> None:
+    # The pool's threads do not exist in a forked child.
+    global POOL  # pylint: disable=global-statement
+    POOL = None
+
+
+def run_batch(func: Callable[[T], object], items: Sequence[T]) -> None:
+    for item in items:
+        func(item)
+
+
+def run_in_batches(func: Callable[[T], object], items: Sequence[T]) -> None:
+    """Call *func* on every item, spread over the copy pool.
+
+    Small inputs run on the calling thread.  Every batch finishes before the
+    first error, if any, is raised.
+    """
+    if len(items) <= BATCH_FILES:
+        run_batch(func, items)
+        return
+    pool = copy_pool()
+    futures: list[Future[None]] = [
+        pool.submit(run_batch, func, items[start : start + BATCH_FILES]) for start in range(0, len(items), BATCH_FILES)
+    ]
+    errors = [exc for exc in (future.exception() for future in futures) if exc is not None]
+    if errors:
+        raise errors[0]
+
+
+def kernel_copy(method: str, src_fd: int, dst_fd: int) -> bool:
+    """Copy the rest of *src_fd* into *dst_fd* with *method*; False if it cannot."""
+    if not KERNEL_COPY[method]:
+        return False
+    try:
+        if method == "copy_file_range":
+            while os.copy_file_range(src_fd, dst_fd, COPY_CHUNK) > 0:
+                pass
+        else:
+            while os.sendfile(dst_fd, src_fd, None, COPY_CHUNK) > 0:
+                pass
+    except OSError as exc:
+        if exc.errno not in UNSUPPORTED_ERRNOS:
+            raise
+        if exc.errno == errno.ENOSYS:
+            KERNEL_COPY[method] = False
+        return False
+    return True
+
+
+def copy_data(src_fd: int, dst_fd: int) -> None:
+    """Copy from the current offset of *src_fd* to the end into *dst_fd*.
+
+    The methods share the file offsets, so a fallback picks up wherever the
+    previous one stopped.
+    """
+    if kernel_copy("copy_file_range", src_fd, dst_fd) or kernel_copy("sendfile", src_fd, dst_fd):
+        return
+    while True:
+        chunk = os.read(src_fd, COPY_CHUNK)
+        if not chunk:
+            return
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(dst_fd, view) :]
+
+
+def copy_file(src: str | os.PathLike[str], dest: str | os.PathLike[str], replace: bool = False) -> None:
+    """Copy one file's contents, mode and times to *dest*.
+
+    With *replace* an existing *dest* is replaced by rename instead of being
+    truncated and rewritten.  Like ``shutil.copy2``, a source that is not a
+    regular file (a FIFO would block the open forever) raises
+    :class:`shutil.SpecialFileError`.
+    """
+    kind = stat.S_IFMT(os.stat(src).st_mode)
+    if kind != stat.S_IFREG:
+        what = "a named pipe" if kind == stat.S_IFIFO else "not a regular file"
+        raise shutil.SpecialFileError(f"`{os.fspath(src)}` is {what}")
+    src_fd = os.open(src, os.O_RDONLY | OPEN_BINARY)
+    path = os.fspath(dest)
+    try:
+        info = os.fstat(src_fd)
+        if replace and os.path.lexists(path):
+            head, tail = os.path.split(path)
+            path = os.path.join(head, f".{tail}.{uuid.uuid4().hex[:8]}.tmp")
+        dst_fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | OPEN_BINARY, 0o600)
+        try:
+            copy_data(src_fd, dst_fd)
+        finally:
+            os.close(dst_fd)
+        os.chmod(path, info.st_mode & 0o7777)
+        os.utime(path, ns=(info.st_atime_ns, info.st_mtime_ns))
+        if path != os.fspath(dest):
+            os.replace(path, dest)
+    except BaseException:
+        if path != os.fspath(dest):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        raise
+    finally:
+        os.close(src_fd)
+
+
+def make_dirs(dirs: Iterable[str]) -> None:
+    """Create every directory in *dirs* (and missing parents), each once."""
+    made: set[str] = set()
+    for path in sorted(set(dirs)):
+        if path and path not in made:
+            os.makedirs(path, exist_ok=True)
+            made.add(path)
+
+
+def walk_tree(
+    src_root: str | os.PathLike[str], dest_root: str | os.PathLike[str], follow_symlinks: bool = False
+) -> tuple[list[str], list[tuple[str, str]]]:
+    """List what copying *src_root* to *dest_root* involves.
+
+    Returns the destination directories (including *dest_root* and empty
+    ones) and the ``(src, dest)`` file pairs.  Symlinked directories are
+    descended only with *follow_symlinks*; otherwise they become empty
+    directories.
+    """
+    src_top, dest_top = os.fspath(src_root), os.fspath(dest_root)
+    dirs = [dest_top]
+    pairs: list[tuple[str, str]] = []
+    for dirpath, dirnames, filenames in os.walk(src_top, followlinks=follow_symlinks):
+        rel_dir = os.path.relpath(dirpath, src_top)
+        dest_dir = dest_top if rel_dir == "." else os.path.join(dest_top, rel_dir)
+        dirs.extend(os.path.join(dest_dir, name) for name in dirnames)
+        pairs.extend((os.path.join(dirpath, name), os.path.join(dest_dir, name)) for name in filenames)
+    return dirs, pairs
+
+
+def copy_files(pairs: Iterable[tuple[str, str]], dirs: Iterable[str] = (), replace: bool = False) -> int:
+    """Copy ``(src, dest)`` pairs on the copy pool; returns the number copied.
+
+    *dirs* and every destination's parent are created first.  When several
+    pairs share a destination the last one wins, as with sequential copies.
+    """
+    by_dest = {os.fspath(dest): os.fspath(src) for src, dest in pairs}
+    make_dirs([*map(os.fspath, dirs), *(os.path.dirname(dest) for dest in by_dest)])
+    run_in_batches(lambda pair: copy_file(pair[1], pair[0], replace), list(by_dest.items()))
+    return len(by_dest)
+
+
+def copy_tree(
+    src_root: str | os.PathLike[str],
+    dest_root: str | os.PathLike[str],
+    replace: bool = False,
+    follow_symlinks: bool = False,
+) -> int:
+    """Copy the tree under *src_root* into *dest_root*; returns the files copied."""
+    dirs, pairs = walk_tree(src_root, dest_root, follow_symlinks)
+    return copy_files(pairs, dirs, replace)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=forget_copy_pool_in_child)
@@ -28,6 +28,7 @@ from pathlib import Path
 from typing import Any
 
 from bitrab.execution.job import JobRuntimeContext
+from bitrab.execution.resources import ResourceUsage
 from bitrab.execution.shell import TextWriter
 from bitrab.execution.stage_runner import JobOutcome, PipelineCallbacks, WorkerFunc
 from bitrab.models.pipeline import JobConfig, PipelineConfig
@@ -180,6 +181,8 @@ class EventCollector(PipelineCallbacks):
             status = "cached"
         elif outcome.allowed_failure:
             status = "allowed_failure"
+        elif outcome.aborted:
+            status = "aborted"
         else:
             status = "success" if outcome.success else "failed"
         self.emit(
@@ -192,6 +195,7 @@ class EventCollector(PipelineCallbacks):
                 "memoized": outcome.memoized,
                 "status": status,
                 "error": repr(outcome.error) if outcome.error else None,
+                "usage": outcome.usage.to_dict() if outcome.usage is not None else None,
             },
         )
         self.inner.on_job_complete(outcome)
@@ -228,15 +232,26 @@ class EventCollector(PipelineCallbacks):
 # ---------------------------------------------------------------------------
 
 
+def format_usage(usage: ResourceUsage, wall_s: float) -> str:
+    """One summary line: CPU split, core utilisation, peak RSS, block I/O, profile."""
+    busy = f", {usage.cpu_s / wall_s:.0%} of a core" if wall_s > 0 else ""
+    return (
+        f"cpu {usage.user_cpu_s:.1f}s user + {usage.system_cpu_s:.1f}s sys{busy}; "
+        f"peak rss {usage.max_rss_kb / 1024:.0f} MiB; "
+        f"blocks {usage.block_input} in / {usage.block_output} out; {usage.profile(wall_s)}"
+    )
+
+
 @dataclass
 class JobTiming:
     """Timing and status for a single job."""
 
     name: str
     stage: str
-    status: str  # "success" | "failed" | "allowed_failure" | "cached"
+    status: str  # "success" | "failed" | "allowed_failure" | "cached" | "aborted"
     duration_s: float  # seconds between JOB_START and JOB_COMPLETE
     error: str | None = None
+    usage: ResourceUsage | None = None  # CPU / peak RSS / block I/O, when measured
 
 
 @dataclass
@@ -318,6 +333,7 @@ class PipelineSummary:
                 job = event.job or ""
                 start = job_starts.get(job)
                 duration = (event.timestamp - start) if start is not None else 0.0
+                usage_data = event.data.get("usage")
                 jobs.append(
                     JobTiming(
                         name=job,
@@ -325,6 +341,7 @@ class PipelineSummary:
                         status=event.data.get("status", "unknown"),
                         duration_s=duration,
                         error=event.data.get("error"),
+                        usage=ResourceUsage.from_dict(usage_data) if usage_data else None,
                     )
                 )
 
@@ -370,12 +387,25 @@ class PipelineSummary:
                     mark = "warn"
                 elif jt.status == "cached":
                     mark = "cach"
+                elif jt.status == "aborted":
+                    mark = "kill"
                 else:
                     mark = "FAIL"
                 lines.append(f"    [{mark:>4}] {jt.name} ({jt.duration_s:.1f}s)")
+                if jt.usage is not None:
+                    lines.append(f"           {format_usage(jt.usage, jt.duration_s)}")
                 if jt.error:
                     lines.append(f"           {jt.error}")
 
+            measured = [jt for jt in self.jobs if jt.usage is not None]
+            if measured and self.total_duration_s > 0:
+                cpu_s = sum(jt.usage.cpu_s for jt in measured if jt.usage is not None)
+                lines.append("")
+                lines.append(
+                    f"  CPU: {cpu_s:.1f}s user+sys over {self.total_duration_s:.1f}s wall "
+                    f"(~{cpu_s / self.total_duration_s:.1f} cores busy on average)"
+                )
+
             cached_count = sum(1 for jt in self.jobs if jt.status == "cached")
             if cached_count:
                 lines.append("")
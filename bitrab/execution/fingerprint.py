@@ -46,13 +46,13 @@ import hashlib
 import json
 import logging
 import os
-import subprocess  # nosec
 import uuid
 from dataclasses import dataclass, field
 from pathlib import Path
 
 from bitrab.__about__ import __version__
 from bitrab.execution.artifacts import DOTENV_STORE, artifact_dir
+from bitrab.git_state import repo_state
 from bitrab.models.pipeline import JobConfig, PipelineConfig
 from bitrab.utils import sanitize_job_name
 from bitrab.utils.filelock import FileLock, FileLockTimeout
@@ -214,28 +214,19 @@ def git_tree_digest(project_dir: Path) -> str:
     working tree) to capture unstaged edits.  Returns :data:`NO_GIT_MARKER`
     when git is unavailable or the directory is not a repository.
     """
-    try:
-        ls_files = subprocess.run(  # nosec
-            ["git", "-C", str(project_dir), "ls-files", "-s", "-z"],
-            capture_output=True,
-            check=True,
-        )
-        diff = subprocess.run(  # nosec
-            ["git", "-C", str(project_dir), "diff"],
-            capture_output=True,
-            check=True,
-        )
-    except (OSError, subprocess.CalledProcessError):
+    listing = repo_state(project_dir).tree_listing()
+    if listing is None:
         logger.warning(
             "Project %s is not a git repository — file inputs are excluded from job "
             "fingerprints (declare BITRAB_FINGERPRINT_PATHS to include them).",
             project_dir,
         )
         return NO_GIT_MARKER
+    ls_files, diff = listing
     hasher = hashlib.sha256()
-    hasher.update(ls_files.stdout)
+    hasher.update(ls_files)
     hasher.update(b"\x00")
-    hasher.update(diff.stdout)
+    hasher.update(diff)
     return hasher.hexdigest()
 
 
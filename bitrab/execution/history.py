@@ -0,0 +1,101 @@
+"""Historical job durations read back from persisted run logs.
+
+:func:`bitrab.plan.persist_run_log` writes every run's structured events to
+``.bitrab/logs/<run_id>/events.jsonl``.  Replaying the ``job_start`` /
+``job_complete`` pairs of recent runs gives a per-job duration estimate, which
+the scheduler uses to start the longest dependency chains first.
+
+Only the raw JSON lines are read here (not :mod:`bitrab.execution.events`) so
+the stage runner can depend on this module without an import cycle.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from bitrab.folder import list_runs
+from bitrab.json_backend import loads as json_loads
+
+# How many of the most recent runs contribute to a job's estimate.
+HISTORY_RUNS = 5
+
+
+def read_job_durations(events_path: Path) -> dict[str, float]:
+    """Return ``{job_name: seconds}`` for every job that really ran in one run log.
+
+    Memoized (``cached``) jobs are ignored — their near-zero duration says
+    nothing about how long the job takes when it actually executes.
+    """
+    starts: dict[str, float] = {}
+    durations: dict[str, float] = {}
+    try:
+        lines = events_path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return durations
+    for line in lines:
+        try:
+            event = json_loads(line)
+        except ValueError:
+            continue
+        job = event.get("job")
+        if not job:
+            continue
+        event_type = event.get("event_type")
+        if event_type == "job_start":
+            starts[job] = float(event.get("timestamp", 0.0))
+        elif event_type == "job_complete" and job in starts:
+            if (event.get("data") or {}).get("status") == "cached":
+                continue
+            durations[job] = max(0.0, float(event.get("timestamp", 0.0)) - starts[job])
+    return durations
+
+
+def load_job_durations(project_dir: Path, max_runs: int = HISTORY_RUNS) -> dict[str, float]:
+    """Average each job's duration over the *max_runs* most recent run logs."""
+    samples: dict[str, list[float]] = {}
+    for record in list_runs(project_dir)[:max_runs]:
+        for job, seconds in read_job_durations(record.run_dir / "events.jsonl").items():
+            samples.setdefault(job, []).append(seconds)
+    return {job: sum(values) / len(values) for job, values in samples.items()}
+
+
+def remaining_path_lengths(
+    dependencies: dict[str, list[str]],
+    durations: dict[str, float],
+    default: float | None = None,
+) -> dict[str, float]:
+    """Return, per job, the longest duration-weighted path from it to the end of the DAG.
+
+    The value counts the job itself plus its slowest chain of dependents, so
+    sorting ready jobs by it (descending) starts critical-path work first.
+    Jobs without history are estimated at *default*, which falls back to the
+    median known duration (or one second when nothing is known).
+    """
+    if default is None:
+        known = sorted(durations[name] for name in dependencies if name in durations)
+        default = known[len(known) // 2] if known else 1.0
+
+    dependents: dict[str, list[str]] = {name: [] for name in dependencies}
+    for name, deps in dependencies.items():
+        for dep in deps:
+            if dep in dependents:
+                dependents[dep].append(name)
+
+    lengths: dict[str, float] = {}
+    visiting: set[str] = set()
+
+    def length(name: str) -> float:
+        if name in lengths:
+            return lengths[name]
+        own = durations.get(name, default)
+        if name in visiting:  # cycle — the DAG builder reports it; don't recurse forever
+            return own
+        visiting.add(name)
+        tail = max((length(child) for child in dependents[name]), default=0.0)
+        visiting.discard(name)
+        lengths[name] = own + tail
+        return lengths[name]
+
+    for name in dependencies:
+        length(name)
+    return lengths
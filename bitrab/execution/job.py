@@ -3,14 +3,18 @@ from __future__ import annotations
 import os
 import subprocess  # nosec
 import time
+from collections.abc import Mapping, MutableMapping
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 from bitrab.console import safe_print
-from bitrab.exceptions import BitrabError, JobExecutionError, JobTimeoutError
-from bitrab.execution.cache import cache_root, restore_caches, save_caches
-from bitrab.execution.shell import RunResult, TextWriter, run_bash
+from bitrab.exceptions import BitrabError, JobAbortedError, JobExecutionError, JobTimeoutError
+from bitrab.execution.abort import abort_requested, clear_process_group, register_process_group
+from bitrab.execution.aio import run_bash_on_loop
+from bitrab.execution.cache import CacheSnapshot, cache_root, restore_caches, save_caches
+from bitrab.execution.resources import total_usage
+from bitrab.execution.shell import SPILL_SUFFIX, RunResult, TextWriter, run_bash
 from bitrab.execution.variables import VariableManager
 from bitrab.models.pipeline import JobConfig
 from bitrab.utils import sanitize_job_name
@@ -26,7 +30,9 @@ class JobRuntimeContext:
 
     Attributes:
         job: The job configuration.
-        env: Fully resolved environment dict (os.environ + CI vars + job vars).
+        env: Fully resolved environment (os.environ + CI vars + job vars), normally
+            a :class:`~bitrab.execution.variables.LayeredEnv` over the run's
+            shared base.
         job_dir: Per-job workspace directory (e.g. ``.bitrab/<job>/``).
         project_dir: The project root directory (used as cwd for scripts).
         output_writer: File-like sink for job output; ``None`` → sys.stdout.
@@ -34,7 +40,7 @@ class JobRuntimeContext:
     """
 
     job: JobConfig
-    env: dict[str, str] = field(default_factory=dict)
+    env: MutableMapping[str, str] = field(default_factory=dict)
     job_dir: Path = field(default_factory=Path)
     project_dir: Path = field(default_factory=Path)
     output_writer: Any | None = None
@@ -74,6 +80,34 @@ class JobExecutor:
         # already there — and could hit ETXTBSY when overwriting a running
         # interpreter.  scope_executor_to_worktree() flips this to True.
         self.in_worktree: bool = False
+        # Set on a worktree-scoped copy whose cache a prepare-ahead step
+        # (bitrab.execution.prefetch) already restored.
+        self.cache_restored: bool = False
+        # What that restore put in place (cache.restore_caches), so an
+        # unchanged cache is not saved again.
+        self.cache_snapshots: dict[str, CacheSnapshot] = {}
+        # --fail-fast: run before_script / script in their own process group
+        # and register it under the job dir so the runner can kill the job
+        # when a sibling fails.  Set by the stage runner.
+        self.process_groups: bool = False
+        # parallel_backend = "asyncio": run scripts on the shared event loop
+        # (bitrab.execution.aio) instead of run_bash's reader/timer threads.
+        self.async_subprocess: bool = False
+        # [tool.bitrab] warm_shells: size of the pre-started bash pool
+        # (bitrab.execution.warm_shell) run_bash draws from; 0 disables it.
+        self.warm_shells: int = 0
+        # [tool.bitrab] cache_link: how cache restores place files
+        # (bitrab.execution.cache.LINK_MODES).
+        self.cache_link: str = "auto"
+        # [tool.bitrab] cache_format: how cache saves write generations
+        # (bitrab.execution.cache.CACHE_FORMATS).
+        self.cache_format: str = "blobs"
+        # [tool.bitrab] cache_max_bytes: size cap enforced by LRU eviction
+        # after each cache save; None means unbounded.
+        self.cache_max_bytes: int | None = None
+        # True for bitrab.distributed.RemoteJobExecutor: jobs run on an agent,
+        # which injects and collects artifacts itself.
+        self.remote: bool = False
 
     # ---- retry helpers ----
 
@@ -196,7 +230,29 @@ class JobExecutor:
                 raise ValueError("Either 'job' or 'ctx' must be provided")
             ctx = self.build_context(job, job_dir=job_dir, output_writer=output_writer, timeout=timeout)
 
-        self.execute_with_context(ctx)
+        first_result = len(self.job_history)
+        try:
+            self.execute_with_context(ctx)
+        except JobExecutionError as exc:
+            if exc.usage is None:
+                exc.usage = total_usage(result.usage for result in self.job_history[first_result:])
+            raise
+        finally:
+            self.discard_spills(ctx, first_result)
+
+    def discard_spills(self, ctx: JobRuntimeContext, first_result: int) -> None:
+        """Delete the job's spilled output once it has finished.
+
+        Spill files only bound memory while scripts run: the output already went
+        to the job's log or terminal, and each :class:`RunResult` keeps its tail.
+        Timed-out or failed scripts never produce a result, so the job dir is
+        swept rather than just the files the results point at.
+        """
+        for result in self.job_history[first_result:]:
+            result.stdout_file = result.stderr_file = None
+        if ctx.job_dir != ctx.project_dir:
+            for path in ctx.job_dir.glob(f"*{SPILL_SUFFIX}"):
+                path.unlink(missing_ok=True)
 
     def execute_with_context(self, ctx: JobRuntimeContext) -> None:
         """Execute with optional cross-process ``resource_group`` serialization."""
@@ -224,13 +280,17 @@ class JobExecutor:
         # resolve correctly. job_dir is exposed as CI_JOB_DIR for scripts that need
         # an isolated workspace, but it is NOT used as cwd.
         execution_dir = ctx.project_dir
-        env = dict(ctx.env)  # mutable copy (frozen dataclass stores the original)
+        env = ctx.env.copy()  # type: ignore[attr-defined]  # copies only a LayeredEnv's overlay
 
         job_print = (lambda msg: safe_print(msg, file=output_writer)) if output_writer else safe_print
         job_print(f"🔧 Running job: {job.name} (stage: {job.stage})")
 
         job_timeout = ctx.timeout
         deadline: float | None = (time.monotonic() + job_timeout) if job_timeout is not None else None
+        abort_dir = ctx.job_dir if self.process_groups and not self.dry_run else None
+        # Output beyond the in-memory tail spills into the job's scratch dir;
+        # without one (bare execute_job calls) it is kept in memory as before.
+        spill_dir = ctx.job_dir if ctx.job_dir != ctx.project_dir else None
 
         # cache: restore (pull) before before_script; save (push) after
         # scripts.  Active only inside a git worktree — in the default
@@ -239,9 +299,13 @@ class JobExecutor:
         # and risks ETXTBSY when overwriting a running interpreter at worst.
         # Skipped entirely under --dry-run and --no-cache regardless.
         use_cache = bool(job.cache) and self.cache_enabled and self.in_worktree and not self.dry_run
-        if use_cache:
+        restored: dict[str, CacheSnapshot] = {}
+        if use_cache and self.cache_restored:
+            job_print("  📦 Cache restored ahead of start")
+            restored = self.cache_snapshots
+        elif use_cache:
             job_print("  📦 Restoring cache...")
-            restore_caches(job, self.cache_store_dir, execution_dir, env)
+            restored = restore_caches(job, self.cache_store_dir, execution_dir, env, link=self.cache_link)
 
         max_attempts = 1 + max(0, int(job.retry_max))
         attempt = 0
@@ -261,23 +325,37 @@ class JobExecutor:
                 if job.before_script:
                     job_print("  📋 Running before_script...")
                     self.execute_scripts(
-                        job.before_script, env, execution_dir, output_writer=output_writer, deadline=deadline
+                        job.before_script,
+                        env,
+                        execution_dir,
+                        output_writer=output_writer,
+                        deadline=deadline,
+                        abort_dir=abort_dir,
+                        spill_dir=spill_dir,
                     )
 
                 if job.script:
                     job_print("  🚀 Running script...")
-                    self.execute_scripts(job.script, env, execution_dir, output_writer=output_writer, deadline=deadline)
+                    self.execute_scripts(
+                        job.script,
+                        env,
+                        execution_dir,
+                        output_writer=output_writer,
+                        deadline=deadline,
+                        abort_dir=abort_dir,
+                        spill_dir=spill_dir,
+                    )
 
                 job_print(f"✅ Job {job.name} completed successfully")
                 if use_cache:
                     job_print("  📦 Saving cache...")
-                    save_caches(job, self.cache_store_dir, execution_dir, env, succeeded=True)
+                    self.save_job_caches(job, execution_dir, env, True, restored)
                 return
 
             except JobTimeoutError:
                 job_print(f"  ⏱️ Job {job.name} timed out after {job_timeout}s")
                 if use_cache:
-                    save_caches(job, self.cache_store_dir, execution_dir, env, succeeded=False)
+                    self.save_job_caches(job, execution_dir, env, False, restored)
                 raise
             except subprocess.CalledProcessError as e:
                 last_exc = e
@@ -290,7 +368,12 @@ class JobExecutor:
                     job_print("  📋 Running after_script...")
                     try:
                         self.execute_scripts(
-                            job.after_script, env, execution_dir, output_writer=output_writer, deadline=deadline
+                            job.after_script,
+                            env,
+                            execution_dir,
+                            output_writer=output_writer,
+                            deadline=deadline,
+                            spill_dir=spill_dir,
                         )
                     except subprocess.CalledProcessError as e2:
                         last_exc = last_exc or e2
@@ -300,6 +383,9 @@ class JobExecutor:
             if attempt >= max_attempts:
                 break
 
+            if abort_dir is not None and abort_requested(abort_dir):
+                break  # --fail-fast: a sibling failed, don't retry
+
             # honor exit_codes restriction first; then when
             if not self.should_retry_exit_codes(job.retry_exit_codes, last_exc or Exception("unknown failure")):
                 job_print("  ↩️  Retry blocked by exit_codes; will not retry.")
@@ -317,20 +403,45 @@ class JobExecutor:
 
         # out of attempts
         if use_cache:
-            save_caches(job, self.cache_store_dir, execution_dir, env, succeeded=False)
+            self.save_job_caches(job, execution_dir, env, False, restored)
+        if abort_dir is not None and abort_requested(abort_dir):
+            job_print(f"  🛑 Job {job.name} aborted: another job failed (--fail-fast)")
+            raise JobAbortedError(f"Job {job.name} aborted by --fail-fast") from last_exc
         if isinstance(last_exc, subprocess.CalledProcessError):
             raise JobExecutionError(
                 f"Job {job.name} failed after {attempt} attempt(s) with exit code {last_exc.returncode}"
             ) from last_exc
         raise JobExecutionError(f"Job {job.name} failed after {attempt} attempt(s).") from last_exc
 
+    def save_job_caches(
+        self,
+        job: JobConfig,
+        execution_dir: Path,
+        env: Mapping[str, str],
+        succeeded: bool,
+        restored: dict[str, CacheSnapshot],
+    ) -> None:
+        """Run the ``cache:`` save step; *restored* is what the restore step returned."""
+        save_caches(
+            job,
+            self.cache_store_dir,
+            execution_dir,
+            env,
+            succeeded=succeeded,
+            cache_format=self.cache_format,
+            restored=restored,
+            max_bytes=self.cache_max_bytes,
+        )
+
     def execute_scripts(
         self,
         scripts: list[str],
-        env: dict[str, str],
+        env: Mapping[str, str],
         cwd: Path | None = None,
         output_writer: TextWriter | None = None,
         deadline: float | None = None,
+        abort_dir: Path | None = None,
+        spill_dir: Path | None = None,
     ) -> None:
         """
         Execute a list of script commands.
@@ -342,10 +453,16 @@ class JobExecutor:
             output_writer: Optional file-like object to direct all output into.
             deadline: monotonic clock deadline; if set, remaining time is passed
                       as the timeout to run_bash.
+            abort_dir: ``--fail-fast`` control directory (see
+                      :mod:`bitrab.execution.abort`); if set, bash runs in its
+                      own process group registered there.
+            spill_dir: Directory for output beyond the in-memory tail (see
+                      :class:`bitrab.execution.shell.Buffer`).
 
         Raises:
             subprocess.CalledProcessError: If a script exits with a non-zero code.
             JobTimeoutError: If the deadline is reached before the script finishes.
+            JobAbortedError: If the job was aborted before the script started.
         """
         job_print = (lambda msg: safe_print(msg, file=output_writer)) if output_writer else safe_print
 
@@ -373,16 +490,28 @@ class JobExecutor:
                 remaining = deadline - time.monotonic()
                 if remaining <= 0:
                     raise JobTimeoutError("Job timeout before script start")
+            if abort_dir is not None and abort_requested(abort_dir):
+                raise JobAbortedError("Job aborted before script start")
 
-            result = run_bash(
-                full_script,
-                env=env,
-                cwd=target_cwd,
-                check=False,
-                stdout_target=output_writer,
-                stderr_target=output_writer,
-                timeout=remaining,
-            )
+            runner = run_bash_on_loop if self.async_subprocess else run_bash
+            warm_shells = self.warm_shells if self.warm_shells and not self.async_subprocess else None
+            try:
+                result = runner(
+                    full_script,
+                    env=env,
+                    cwd=target_cwd,
+                    check=False,
+                    stdout_target=output_writer,
+                    stderr_target=output_writer,
+                    timeout=remaining,
+                    process_group=abort_dir is not None,
+                    on_spawn=(lambda pid: register_process_group(abort_dir, pid)) if abort_dir is not None else None,
+                    spill_dir=spill_dir,
+                    warm_shells=warm_shells,
+                )
+            finally:
+                if abort_dir is not None:
+                    clear_process_group(abort_dir)
         self.job_history.append(result)
 
         if result.returncode != 0:
@@ -0,0 +1,243 @@
+"""Compressed, seekable job output logs.
+
+A job log is a sequence of independent gzip members, one per
+:data:`BLOCK_BYTES` of output, so the file is an ordinary ``.gz`` that
+``zcat`` / :func:`gzip.open` read from start to end.  When the writer is
+closed, it also writes a small index next to the log (``<log>.idx``, JSON)
+with each block's uncompressed offset, compressed offset, compressed length
+and newline count.  :func:`tail_job_log` uses the index to decompress only the
+last few blocks, however long the log is.
+
+Blocks are compressed on a small shared thread pool (zlib releases the GIL),
+so the thread writing job output, often the shell reactor, only copies
+bytes.  At most :data:`MAX_PENDING_BLOCKS` blocks per log wait for
+compression; beyond that the writer waits, so memory stays bounded.
+
+A log whose writer never closed (a killed worker) has no index.  Readers then
+decompress it from the start and stop at the truncated member.  Plain-text
+logs are read as they are.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import os
+import threading
+import zlib
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+from bitrab.json_backend import dumps as json_dumps
+from bitrab.json_backend import loads as json_loads
+
+if TYPE_CHECKING:
+    from _typeshed import ReadableBuffer
+
+# Uncompressed bytes per gzip member; the unit :func:`tail_job_log` decompresses.
+BLOCK_BYTES = 1024 * 1024
+COMPRESSLEVEL = 3
+MAX_PENDING_BLOCKS = 4
+INDEX_SUFFIX = ".idx"
+# A job's log inside its ``.bitrab/temp/<job>/`` directory.
+JOB_LOG_NAME = "output.log.gz"
+GZIP_MAGIC = b"\x1f\x8b"
+
+COMPRESSOR: ThreadPoolExecutor | None = None
+COMPRESSOR_LOCK = threading.Lock()
+
+
+def compressor() -> ThreadPoolExecutor:
+    """Return this process's block compression pool, creating it on first use."""
+    global COMPRESSOR  # pylint: disable=global-statement
+    with COMPRESSOR_LOCK:
+        if COMPRESSOR is None:
+            COMPRESSOR = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="bitrab-log")
+        return COMPRESSOR
+
+
+def forget_compressor_in_child() -> None:
+    # The pool's threads do not exist in a forked child.
+    global COMPRESSOR  # pylint: disable=global-statement
+    COMPRESSOR = None
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def compress_block(block: bytes, level: int) -> bytes:
+    return gzip.compress(block, compresslevel=level, mtime=0)
+
+
+class BlockLog(io.RawIOBase):
+    """Binary writer for a job log; see the module docstring for the format.
+
+    ``flush()`` does not end a block (callers flush after every line), so
+    output still being written is only on disk once a block fills up or the
+    log is closed.
+    """
+
+    def __init__(
+        self, path: str | os.PathLike[str], block_bytes: int = BLOCK_BYTES, level: int = COMPRESSLEVEL
+    ) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.block_bytes = block_bytes
+        self.level = level
+        self.file = open(self.path, "wb")  # noqa: SIM115
+        # A previous run's index would describe the wrong blocks.
+        index_path(self.path).unlink(missing_ok=True)
+        self.block = bytearray()
+        self.pending: deque[tuple[Future[bytes], int, int]] = deque()
+        # [uncompressed offset, compressed offset, compressed length, newlines]
+        self.blocks: list[list[int]] = []
+        self.size = 0
+        self.compressed_size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: ReadableBuffer, /) -> int:
+        if self.closed:
+            raise ValueError("write to closed job log")
+        view = memoryview(b)
+        self.block += view
+        if len(self.block) >= self.block_bytes:
+            self.cut()
+        return view.nbytes
+
+    def cut(self) -> None:
+        """Hand the current block to the compression pool."""
+        block, self.block = bytes(self.block), bytearray()
+        self.pending.append((compressor().submit(compress_block, block, self.level), len(block), block.count(b"\n")))
+        while self.pending and (len(self.pending) > MAX_PENDING_BLOCKS or self.pending[0][0].done()):
+            self.store()
+
+    def store(self) -> None:
+        """Write the oldest compressed block (waiting for it if needed)."""
+        future, size, newlines = self.pending.popleft()
+        member = future.result()
+        self.file.write(member)
+        self.blocks.append([self.size, self.compressed_size, len(member), newlines])
+        self.size += size
+        self.compressed_size += len(member)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            if self.block:
+                self.cut()
+            while self.pending:
+                self.store()
+        finally:
+            self.file.close()
+            super().close()
+        index = {"block_bytes": self.block_bytes, "size": self.size, "blocks": self.blocks}
+        index_path(self.path).write_text(json_dumps(index), encoding="utf-8")
+
+
+def open_job_log(path: str | os.PathLike[str]) -> IO[str]:
+    """Open a compressed job log for writing as a text file.
+
+    The text layer's ``buffer`` accepts raw bytes, so
+    :class:`bitrab.execution.shell.StreamSink` passes script output through
+    without decoding it.
+    """
+    return io.TextIOWrapper(io.BufferedWriter(BlockLog(path)), encoding="utf-8", errors="replace")
+
+
+def read_index(path: Path) -> list[list[int]] | None:
+    """Return the block index of a closed log, or None without a usable one."""
+    try:
+        index = json_loads(index_path(path).read_text(encoding="utf-8"))
+        blocks = index["blocks"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return blocks if isinstance(blocks, list) else None
+
+
+def is_compressed(path: Path) -> bool:
+    with open(path, "rb") as handle:
+        return handle.read(2) == GZIP_MAGIC
+
+
+def iter_log_bytes(path: str | os.PathLike[str], chunk_size: int = BLOCK_BYTES) -> Iterator[bytes]:
+    """Yield a job log's uncompressed bytes from the start.
+
+    Decompresses member by member and stops quietly at a truncated last member.
+    Plain-text logs are yielded as they are.
+    """
+    path = Path(path)
+    with open(path, "rb") as handle:
+        if handle.read(2) != GZIP_MAGIC:
+            handle.seek(0)
+            for chunk in iter(lambda: handle.read(chunk_size), b""):
+                yield chunk
+            return
+        handle.seek(0)
+        decomp = zlib.decompressobj(wbits=31)
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            while chunk:
+                data = decomp.decompress(chunk)
+                if data:
+                    yield data
+                if not decomp.eof:
+                    break
+                # End of one member; the rest of the chunk starts the next.
+                chunk = decomp.unused_data
+                decomp = zlib.decompressobj(wbits=31)
+
+
+def decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
+
+
+def read_job_log(path: str | os.PathLike[str]) -> str:
+    """Return a whole job log as text."""
+    return decode(b"".join(iter_log_bytes(path)))
+
+
+def tail_job_log(path: str | os.PathLike[str], lines: int) -> str:
+    """Return the last *lines* lines of a job log.
+
+    With an index only the blocks holding those lines are read and
+    decompressed; otherwise the log is streamed once, keeping only a tail.
+    """
+    path = Path(path)
+    if lines <= 0:
+        return ""
+    blocks = read_index(path) if is_compressed(path) else None
+    if blocks is None:
+        kept: deque[tuple[bytes, int]] = deque()
+        newlines = 0
+        for data in iter_log_bytes(path):
+            kept.append((data, data.count(b"\n")))
+            newlines += kept[-1][1]
+            while len(kept) > 1 and newlines - kept[0][1] > lines:
+                newlines -= kept.popleft()[1]
+        return last_lines(b"".join(data for data, _count in kept), lines)
+    # One newline more than asked for marks where the first wanted line starts.
+    start = len(blocks)
+    newlines = 0
+    while start > 0 and newlines <= lines:
+        start -= 1
+        newlines += blocks[start][3]
+    parts: list[bytes] = []
+    with open(path, "rb") as handle:
+        for _offset, compressed_offset, length, _newlines in blocks[start:]:
+            handle.seek(compressed_offset)
+            parts.append(gzip.decompress(handle.read(length)))
+    return last_lines(b"".join(parts), lines)
+
+
+def last_lines(data: bytes, lines: int) -> str:
+    return "".join(decode(data).splitlines(keepends=True)[-lines:])
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=forget_compressor_in_child)
@@ -0,0 +1,173 @@
+"""Prepare-ahead setup for jobs that are about to start.
+
+Under worktree isolation every parallel job pays for its setup right before
+its script runs: ``git worktree add``, copying upstream artifacts into the
+fresh checkout, and restoring ``cache:`` entries.  All of that sits on the
+critical path.
+
+With continuous DAG dispatch the runner knows which jobs are next: ready jobs
+waiting for a free slot, and jobs whose only unfinished upstream is currently
+running.  :class:`Prefetcher` does their setup on a small side pool while the
+upstream still runs.  When the job is finally submitted, the worker adopts
+the prepared worktree (:class:`PreparedJob`) and only injects the artifacts
+of the upstreams that finished after the prefetch.
+
+Preparation is best-effort: if it fails, or the job ends up skipped, the
+worktree is discarded and the worker falls back to its normal setup.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from bitrab.console import safe_print
+from bitrab.execution.artifacts import dependency_sources, inject_dependencies, load_dotenv_reports
+from bitrab.execution.cache import CacheSnapshot, restore_caches
+from bitrab.execution.job import JobExecutor
+from bitrab.git_worktree import WorktreeContext, create_worktree, remove_worktree
+from bitrab.models.pipeline import JobConfig
+
+
+@dataclass(frozen=True)
+class PreparedJob:
+    """A worktree set up ahead of time for one job.
+
+    Attributes:
+        worktree: The detached-HEAD checkout the job will run in.
+        injected: Upstream jobs whose artifacts are already in the worktree.
+        cache_restored: True if the job's ``cache:`` entries were restored.
+        cache_snapshots: What :func:`restore_caches` returned for them.
+    """
+
+    worktree: Path
+    injected: list[str] = field(default_factory=list)
+    cache_restored: bool = False
+    cache_snapshots: dict[str, CacheSnapshot] = field(default_factory=dict)
+
+
+def prepare_job(
+    job: JobConfig,
+    executor: JobExecutor,
+    *,
+    project_dir: Path,
+    root: Path | None,
+    completed_jobs: list[str],
+    restore_cache: bool,
+) -> PreparedJob:
+    """Create *job*'s worktree and inject what its finished upstreams produced.
+
+    Only sources that are already in *completed_jobs* are injected.  The cache
+    is restored when *restore_cache* is set; the caller only sets it once no
+    later artifact could land on top of the restored files (see
+    :meth:`Prefetcher.can_restore_cache`).
+    """
+    finished = set(completed_jobs)
+    sources = dependency_sources(job, completed_jobs)
+    injected = [name for name in sources if name in finished]
+    pending = [name for name in sources if name not in finished]
+    ctx = create_worktree(project_dir, job.name, root=root)
+    snapshots: dict[str, CacheSnapshot] = {}
+    try:
+        inject_dependencies(job, project_dir, completed_jobs, effective_dir=ctx.worktree_path, skip=pending)
+        if restore_cache:
+            dotenv_vars = load_dotenv_reports(job, project_dir, injected)
+            if dotenv_vars:
+                job = dataclasses.replace(job, variables={**dotenv_vars, **job.variables})
+            env = executor.variable_manager.prepare_environment(job)
+            snapshots = restore_caches(job, executor.cache_store_dir, ctx.worktree_path, env, link=executor.cache_link)
+    except BaseException:
+        remove_worktree(ctx)
+        raise
+    return PreparedJob(
+        worktree=ctx.worktree_path, injected=injected, cache_restored=restore_cache, cache_snapshots=snapshots
+    )
+
+
+def discard(future: Future[PreparedJob], project_dir: Path) -> None:
+    """Remove the worktree of a preparation that will not be used."""
+    try:
+        prepared = future.result()
+    except BaseException:  # a failed preparation removed its own worktree
+        return
+    remove_worktree(WorktreeContext(worktree_path=prepared.worktree, project_dir=project_dir))
+
+
+class Prefetcher:
+    """Run :func:`prepare_job` for upcoming jobs on a side thread pool.
+
+    Setup is git and file I/O, so threads are used whatever the job backend.
+    At most *limit* preparations are outstanding at once; more than the
+    number of worker slots could not start any sooner.
+    """
+
+    def __init__(self, executor: JobExecutor, project_dir: Path, root: Path | None, limit: int) -> None:
+        self.executor = executor
+        self.project_dir = project_dir
+        self.root = root
+        self.limit = max(1, limit)
+        self.pool = ThreadPoolExecutor(max_workers=self.limit, thread_name_prefix="bitrab-prefetch")
+        self.futures: dict[str, Future[PreparedJob]] = {}
+
+    def has_room(self) -> bool:
+        """Return True if another preparation may be started."""
+        return len(self.futures) < self.limit
+
+    def wants(self, name: str) -> bool:
+        """Return True if *name* is not being prepared yet and there is room."""
+        return name not in self.futures and self.has_room()
+
+    def start(self, job: JobConfig, completed_jobs: list[str], restore_cache: bool) -> None:
+        """Begin preparing *job* against the upstreams finished so far."""
+        self.futures[job.name] = self.pool.submit(
+            prepare_job,
+            job,
+            self.executor,
+            project_dir=self.project_dir,
+            root=self.root,
+            completed_jobs=list(completed_jobs),
+            restore_cache=restore_cache,
+        )
+
+    def can_restore_cache(self, job: JobConfig, completed_jobs: list[str]) -> bool:
+        """Return True if *job*'s cache may be restored ahead of its start.
+
+        A job normally restores its cache *after* upstream artifacts are
+        injected, so cached files win on overlap and ``key: files:`` hashes
+        see the final tree.  Ahead of time that order only holds when the
+        job's artifact sources are fixed and all finished: an explicit
+        ``dependencies:`` list (possibly empty) whose jobs are all done.
+        """
+        if not job.cache or not self.executor.cache_enabled:
+            return False
+        return job.dependencies is not None and set(job.dependencies) <= set(completed_jobs)
+
+    def take(self, name: str) -> PreparedJob | None:
+        """Return the prepared setup for *name*, waiting for it if still running.
+
+        Returns None when nothing was prepared or preparation failed; the job
+        then does its own setup.
+        """
+        future = self.futures.pop(name, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as exc:
+            safe_print(f"⚠️  Prepare-ahead for {name} failed, setting up on start: {exc}", file=sys.stderr)
+            return None
+
+    def drop(self, name: str) -> None:
+        """Discard *name*'s preparation (the job was skipped or memoized)."""
+        future = self.futures.pop(name, None)
+        if future is not None:
+            self.pool.submit(discard, future, self.project_dir)
+
+    def close(self) -> None:
+        """Discard every unused preparation and wait for the side pool."""
+        for name in list(self.futures):
+            self.drop(name)
+        self.pool.shutdown(wait=True)
@@ -0,0 +1,129 @@
+"""Per-job resource accounting captured when a script's bash process is reaped.
+
+:func:`reap` waits for bash with :func:`os.wait4` instead of
+:meth:`subprocess.Popen.wait`, which hands back the kernel's ``rusage`` for
+bash *and every descendant it waited for* — i.e. the whole script tree, short
+of daemons that detached from it.  The numbers travel on
+:class:`bitrab.execution.shell.RunResult`, are summed per job into
+:class:`bitrab.execution.stage_runner.JobOutcome`, and end up in the
+``job_complete`` event of the persisted run log.
+
+Platforms without ``wait4`` (Windows) and the asyncio backend, whose event
+loop reaps children itself, report no usage.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from subprocess import Popen  # nosec
+from typing import Any
+
+# CPU time per wall-clock second above which a job counts as CPU-bound.
+CPU_BOUND_RATIO = 0.5
+
+
+@dataclass(frozen=True)
+class ResourceUsage:
+    """What a script (or a whole job) consumed.
+
+    Attributes:
+        user_cpu_s: CPU seconds spent in user mode.
+        system_cpu_s: CPU seconds spent in the kernel.
+        max_rss_kb: Peak resident set size of the largest single process, KiB.
+            Linux counts a forked child from before its ``exec``, so this is
+            never below bitrab's own footprint at spawn time.
+        block_input: Filesystem input operations that hit the block layer.
+        block_output: Filesystem output operations that hit the block layer.
+    """
+
+    user_cpu_s: float = 0.0
+    system_cpu_s: float = 0.0
+    max_rss_kb: int = 0
+    block_input: int = 0
+    block_output: int = 0
+
+    @property
+    def cpu_s(self) -> float:
+        """User plus system CPU seconds."""
+        return self.user_cpu_s + self.system_cpu_s
+
+    def __add__(self, other: ResourceUsage) -> ResourceUsage:
+        return ResourceUsage(
+            user_cpu_s=self.user_cpu_s + other.user_cpu_s,
+            system_cpu_s=self.system_cpu_s + other.system_cpu_s,
+            max_rss_kb=max(self.max_rss_kb, other.max_rss_kb),
+            block_input=self.block_input + other.block_input,
+            block_output=self.block_output + other.block_output,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-safe dict (the ``usage`` field of ``job_complete`` events)."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ResourceUsage:
+        """Rebuild a usage record written by :meth:`to_dict`; unknown keys are ignored."""
+        return cls(
+            user_cpu_s=float(data.get("user_cpu_s", 0.0)),
+            system_cpu_s=float(data.get("system_cpu_s", 0.0)),
+            max_rss_kb=int(data.get("max_rss_kb", 0)),
+            block_input=int(data.get("block_input", 0)),
+            block_output=int(data.get("block_output", 0)),
+        )
+
+    def profile(self, wall_s: float) -> str:
+        """Classify a job that ran for *wall_s* seconds.
+
+        ``cpu-bound`` when it kept at least half a core busy; otherwise
+        ``io-bound`` if it touched the block layer, else ``waiting`` (sleeps,
+        network, locks).
+        """
+        if wall_s > 0 and self.cpu_s / wall_s >= CPU_BOUND_RATIO:
+            return "cpu-bound"
+        if self.block_input or self.block_output:
+            return "io-bound"
+        return "waiting"
+
+
+def from_rusage(rusage: Any) -> ResourceUsage:
+    """Convert a :class:`resource.struct_rusage` (``ru_maxrss`` is bytes on macOS)."""
+    max_rss = int(rusage.ru_maxrss)
+    if sys.platform == "darwin":
+        max_rss //= 1024
+    return ResourceUsage(
+        user_cpu_s=float(rusage.ru_utime),
+        system_cpu_s=float(rusage.ru_stime),
+        max_rss_kb=max_rss,
+        block_input=int(rusage.ru_inblock),
+        block_output=int(rusage.ru_oublock),
+    )
+
+
+def reap(proc: Popen[Any]) -> tuple[int, ResourceUsage | None]:
+    """Wait for *proc* to exit; return its return code and resource usage.
+
+    Falls back to ``proc.wait()`` (and no usage) without ``os.wait4``, for
+    Popen stand-ins, or when someone else already reaped the child — e.g.
+    the timeout killer, whose ``Popen.kill`` polls first.
+    """
+    wait4 = getattr(os, "wait4", None)
+    if wait4 is None or not isinstance(proc, Popen):
+        return proc.wait(), None
+    try:
+        _pid, status, rusage = wait4(proc.pid, 0)
+    except ChildProcessError:
+        return proc.wait(), None
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return proc.returncode, from_rusage(rusage)
+
+
+def total_usage(usages: Iterable[ResourceUsage | None]) -> ResourceUsage | None:
+    """Sum the known usages; None when none of them is known."""
+    total: ResourceUsage | None = None
+    for usage in usages:
+        if usage is not None:
+            total = usage if total is None else total + usage
+    return total
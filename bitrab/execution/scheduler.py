@@ -11,7 +11,7 @@ from bitrab.execution.fingerprint import FingerprintManager
 from bitrab.execution.job import JobExecutor
 from bitrab.execution.stage_runner import JobOutcome, PipelineCallbacks, StagePipelineRunner
 from bitrab.models.pipeline import JobConfig, PipelineConfig
-from bitrab.mutation import MutationConfig, ParallelBackendConfig, WorktreeConfig
+from bitrab.mutation import MutationConfig, ParallelBackendConfig, SchedulerConfig, WorktreeConfig
 
 
 class StreamingCallbacks(PipelineCallbacks):
@@ -74,6 +74,7 @@ class StageOrchestrator:
         parallel_backend: ParallelBackendConfig | None = None,
         worktree_config: WorktreeConfig | None = None,
         fingerprints: FingerprintManager | None = None,
+        scheduler_config: SchedulerConfig | None = None,
     ) -> None:
         self.job_executor = job_executor
         self.event_collector = EventCollector(inner=StreamingCallbacks(dry_run=dry_run))
@@ -85,6 +86,7 @@ class StageOrchestrator:
             parallel_backend=parallel_backend,
             worktree_config=worktree_config,
             fingerprints=fingerprints,
+            scheduler_config=scheduler_config,
         )
 
     def execute_pipeline(self, pipeline: PipelineConfig) -> None:
@@ -37,17 +37,35 @@ Deterministic (captured) tests:
 
 from __future__ import annotations
 
+import codecs
+import heapq
+import io
+import itertools
+import locale
+import logging
 import os
 import re
+import selectors
 import shutil
+import signal
 import subprocess  # nosec
 import sys
+import tempfile
 import threading
+import time
+from collections import deque
+from collections.abc import Mapping
 from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import IO, Any, Protocol, runtime_checkable
+from pathlib import Path
+from typing import IO, Any, Callable, Protocol, runtime_checkable
 
 from bitrab.exceptions import BitrabError, JobTimeoutError
+from bitrab.execution.resources import ResourceUsage, reap
+from bitrab.execution.variables import LayeredEnv
+from bitrab.execution.warm_shell import warm_shell_for
+
+logger = logging.getLogger(__name__)
 
 
 @runtime_checkable
@@ -79,6 +97,30 @@ class RunResult:
     returncode: int
     stdout: str
     stderr: str
+    # CPU / memory / block I/O of the script tree (stream mode on POSIX only).
+    usage: ResourceUsage | None = None
+    # The complete stream on disk when it outgrew the in-memory tail (see
+    # Buffer); stdout / stderr then hold only the last OUTPUT_TAIL_CHARS.
+    stdout_file: Path | None = None
+    stderr_file: Path | None = None
+
+    def open_stdout(self) -> IO[str]:
+        """Open the complete stdout for reading, from its spill file if it has one."""
+        return open_output(self.stdout, self.stdout_file)
+
+    def open_stderr(self) -> IO[str]:
+        """Open the complete stderr for reading, from its spill file if it has one."""
+        return open_output(self.stderr, self.stderr_file)
+
+    def full_stdout(self) -> str:
+        """Return the complete stdout (loads a spilled log into memory)."""
+        with self.open_stdout() as handle:
+            return handle.read()
+
+    def full_stderr(self) -> str:
+        """Return the complete stderr (loads a spilled log into memory)."""
+        with self.open_stderr() as handle:
+            return handle.read()
 
     @property
     def stdout_clean(self) -> str:
@@ -97,33 +139,171 @@ class RunResult:
 
 
 # ---------- Env merge ----------
-def merge_env(env: dict[str, str] | None = None) -> dict[str, str]:
-    """Return a merged environment where `env` overrides current process env."""
+def merge_env(env: Mapping[str, str] | None = None) -> dict[str, str]:
+    """Return a merged environment where `env` overrides current process env.
+
+    A job's :class:`~bitrab.execution.variables.LayeredEnv` already sits on
+    top of ``os.environ`` (minus leaked per-job ``CI_JOB_*`` variables), so it
+    is materialized as it is, with a single copy of its base.
+    """
+    if isinstance(env, LayeredEnv):
+        return env.materialize()
     current_env = os.environ.copy()
-    if env:
-        return {**current_env, **env}
+    if env is not None:
+        current_env.update(env)
     return current_env
 
 
-# ---------- Core runner ----------
+def open_output(text: str, path: Path | None) -> IO[str]:
+    if path is None:
+        return io.StringIO(text)
+    return open(path, encoding=locale.getpreferredencoding(False), errors="replace")
+
+
+# ---------- Output pipeline ----------
+# Bytes read from a pipe at a time.
+READ_CHUNK = 64 * 1024
+# Bytes of each stream kept in memory once it spills to disk.
+OUTPUT_TAIL_BYTES = 1024 * 1024
+# Spill files are named ``<stream>-<random>.spill.log``.
+SPILL_SUFFIX = ".spill.log"
+# A partial line is passed on once it grows this long, so output without
+# newlines cannot pile up.
+PARTIAL_LINE_BYTES = 64 * 1024
+
+
+def output_decoder() -> io.IncrementalNewlineDecoder:
+    """Decode pipe bytes the way a text-mode Popen pipe would (locale encoding, universal newlines)."""
+    inner = codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors="replace")
+    return io.IncrementalNewlineDecoder(inner, translate=True)
+
+
+def is_terminal(target: Any) -> bool:
+    try:
+        return bool(target.isatty())
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def binary_layer(target: Any) -> IO[bytes] | None:
+    """Return the byte stream under a text file (e.g. a log file or redirected stdout), if any."""
+    raw = getattr(target, "buffer", None)
+    return raw if raw is not None and hasattr(raw, "write") else None
+
+
 class Buffer:
-    """A very small helper to collect text while also acting like a file-like object."""
+    """Collects one stream's raw bytes for the :class:`RunResult`.
 
-    def __init__(self, target: Any = None) -> None:
-        self.buf: list[str] = []
-        self.target = target
+    With *spill_dir*, memory is bounded: once more than *tail_bytes* have
+    been written, everything goes to a ``<name>-*.spill.log`` file in *spill_dir*
+    and only the last *tail_bytes* (rounded up to whole blocks) stay in
+    memory.  Nothing is decoded until :meth:`getvalue`.
+    """
+
+    def __init__(
+        self, spill_dir: Path | None = None, name: str = "output", tail_bytes: int = OUTPUT_TAIL_BYTES
+    ) -> None:
+        self.buf: deque[bytes] = deque()
+        self.size = 0
+        self.spill_dir = spill_dir
+        self.name = name
+        self.tail_bytes = tail_bytes
+        self.spill: IO[bytes] | None = None
+        self.path: Path | None = None
+
+    def write(self, data: bytes | memoryview) -> None:
+        if self.spill is None and self.spill_dir is not None and self.size + len(data) > self.tail_bytes:
+            self.start_spill(self.spill_dir)
+        if self.spill is not None:
+            self.spill.write(data)
+        self.buf.append(bytes(data))
+        self.size += len(data)
+        if self.spill is not None:
+            while len(self.buf) > 1 and self.size - len(self.buf[0]) >= self.tail_bytes:
+                self.size -= len(self.buf.popleft())
+
+    def start_spill(self, spill_dir: Path) -> None:
+        spill_dir.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(prefix=f"{self.name}-", suffix=SPILL_SUFFIX, dir=spill_dir)
+        self.path = Path(name)
+        self.spill = open(fd, "wb")
+        self.spill.writelines(self.buf)
+
+    def getvalue(self) -> str:
+        """Decode everything written, or only the in-memory tail if it spilled."""
+        return output_decoder().decode(b"".join(self.buf), final=True)
 
-    def write(self, s: str) -> None:  # type: ignore[override]
-        self.buf.append(s)
-        if self.target is not None:
-            self.target.write(s)
+    def close(self) -> Path | None:
+        """Finish the spill file, if any, and return its path."""
+        if self.spill is not None:
+            self.spill.close()
+        return self.path
+
+
+class StreamSink:
+    """Routes one stream's raw blocks: every byte to its :class:`Buffer`, whole lines to the live target.
+
+    Blocks are cut at their last line break, so concurrent jobs sharing a
+    target interleave by line, without per-line work.  A target with a
+    binary layer that is not a terminal (log files, redirected stdout) gets
+    the bytes unchanged; others get decoded text, wrapped in *color* /
+    *reset* once per block.
+    """
 
-    def flush(self) -> None:  # type: ignore[override]
-        if self.target is not None:
+    def __init__(self, buf: Buffer, target: Any, color: str = "", reset: str = "") -> None:
+        self.buf = buf
+        self.target = target
+        self.raw = None if is_terminal(target) else binary_layer(target)
+        self.decoder = output_decoder() if self.raw is None else None
+        self.color = color
+        self.reset = reset
+        self.pending = bytearray()
+
+    def feed(self, data: bytes) -> None:
+        self.buf.write(data)
+        cut = max(data.rfind(b"\n"), data.rfind(b"\r")) + 1
+        if not cut:
+            self.pending += data
+            if len(self.pending) >= PARTIAL_LINE_BYTES:
+                self.emit(self.pending)
+                self.pending = bytearray()
+            return
+        view = memoryview(data)
+        if self.pending:
+            self.pending += view[:cut]
+            self.emit(self.pending)
+            self.pending = bytearray(view[cut:])
+        else:
+            self.emit(view[:cut])
+            self.pending += view[cut:]
+
+    def finish(self) -> None:
+        """Pass on what is left at EOF."""
+        if self.pending:
+            self.emit(self.pending)
+            self.pending = bytearray()
+        if self.decoder is not None:
+            self.write_text(self.decoder.decode(b"", final=True))
+
+    def emit(self, block: bytes | bytearray | memoryview) -> None:
+        if self.decoder is not None:
+            self.write_text(self.decoder.decode(bytes(block)))
+            return
+        assert self.raw is not None  # nosec B101
+        self.target.flush()  # keep lines printed through the text layer in order
+        self.raw.write(block)
+        self.raw.flush()
+
+    def write_text(self, text: str) -> None:
+        if text:
+            self.target.write(f"{self.color}{text}{self.reset}" if self.color else text)
             self.target.flush()
 
-    def getvalue(self) -> str:
-        return "".join(self.buf)
+
+def make_sink(target: Any, spill_dir: Path | None, name: str, color: str, force_color: bool | None) -> StreamSink:
+    """Build the sink for one stream; *color* is applied for terminals, or anywhere with *force_color*."""
+    painted = colors_enabled(force_color) and (force_color is True or is_terminal(target))
+    return StreamSink(Buffer(spill_dir, name), target, color if painted else "", RESET if painted else "")
 
 
 BASH_WINDOWS_CANDIDATES = [
@@ -207,10 +387,290 @@ def pick_bash(login_shell: bool) -> list[str]:
     return cmd
 
 
+def process_group_kwargs() -> dict[str, Any]:
+    """Popen kwargs that start the child as the leader of a new process group."""
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}  # type: ignore[attr-defined]
+    return {"start_new_session": True}
+
+
+def kill_process_group(pid: int) -> None:
+    """Terminate the process group led by *pid* (best effort, never raises)."""
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/T", "/F", "/PID", str(pid)], check=False, capture_output=True)  # nosec
+        else:
+            os.killpg(pid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError, OSError):
+        pass
+
+
+# ---------- Output reactor ----------
+class ReactorTimer:
+    """A deadline on the :class:`Reactor`; :meth:`cancel` is safe from any thread."""
+
+    def __init__(self, deadline: float, callback: Callable[[], None]) -> None:
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class Reactor:
+    """One thread that multiplexes every stream-mode script's pipes and timeouts.
+
+    Pipe readiness comes from :mod:`selectors` (epoll / kqueue), deadlines
+    from a heap, and other threads hand work over through :meth:`call_soon`
+    and a self-pipe.  Callbacks run on the reactor thread and must not block.
+    """
+
+    def __init__(self) -> None:
+        self.selector = selectors.DefaultSelector()
+        self.lock = threading.Lock()
+        self.calls: list[Callable[[], None]] = []
+        self.timers: list[tuple[float, int, ReactorTimer]] = []
+        self.sequence = itertools.count()
+        self.wake_read, self.wake_write = os.pipe()
+        os.set_blocking(self.wake_read, False)
+        os.set_blocking(self.wake_write, False)
+        self.selector.register(self.wake_read, selectors.EVENT_READ, None)
+        self.thread = threading.Thread(target=self.run, name="bitrab-reactor", daemon=True)
+        self.thread.start()
+
+    def call_soon(self, callback: Callable[[], None]) -> None:
+        """Run *callback* on the reactor thread."""
+        with self.lock:
+            self.calls.append(callback)
+        try:
+            os.write(self.wake_write, b"\0")
+        except BlockingIOError:
+            pass  # the wakeup pipe is full, so the reactor is awake anyway
+
+    def add_reader(self, fd: int, callback: Callable[[], None]) -> None:
+        """Call *callback* on the reactor thread whenever *fd* is readable."""
+
+        def register() -> None:
+            self.selector.register(fd, selectors.EVENT_READ, callback)
+
+        self.call_soon(register)
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> ReactorTimer:
+        """Call *callback* on the reactor thread after *delay* seconds unless cancelled."""
+        timer = ReactorTimer(time.monotonic() + delay, callback)
+        self.call_soon(lambda: heapq.heappush(self.timers, (timer.deadline, next(self.sequence), timer)))
+        return timer
+
+    def next_timeout(self) -> float | None:
+        while self.timers and self.timers[0][2].cancelled:
+            heapq.heappop(self.timers)
+        if not self.timers:
+            return None
+        return max(0.0, self.timers[0][0] - time.monotonic())
+
+    def run(self) -> None:
+        while True:
+            for key, _events in self.selector.select(self.next_timeout()):
+                if key.data is None:
+                    try:
+                        while os.read(self.wake_read, 4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                else:
+                    self.guard(key.data)
+            now = time.monotonic()
+            while self.timers and self.timers[0][0] <= now:
+                _deadline, _seq, timer = heapq.heappop(self.timers)
+                if not timer.cancelled:
+                    self.guard(timer.callback)
+            with self.lock:
+                calls, self.calls = self.calls, []
+            for call in calls:
+                self.guard(call)
+
+    @staticmethod
+    def guard(callback: Callable[[], None]) -> None:
+        # One job's failing callback must not stop output for every other job.
+        try:
+            callback()
+        except Exception:  # nosec B110
+            logger.exception("bitrab reactor callback failed")
+
+
+REACTOR: Reactor | None = None
+REACTOR_LOCK = threading.Lock()
+
+
+def shared_reactor() -> Reactor:
+    """Return this process's :class:`Reactor`, starting it on first use."""
+    global REACTOR
+    with REACTOR_LOCK:
+        if REACTOR is None:
+            REACTOR = Reactor()
+        return REACTOR
+
+
+def forget_reactor_in_child() -> None:
+    global REACTOR
+    # The reactor thread does not survive fork(); a forked child starts its own.
+    REACTOR = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=forget_reactor_in_child)
+
+
+class ReactorWatch:
+    """Follows one script's stdout, stderr and timeout on the shared :class:`Reactor`.
+
+    The watch owns the pipes and closes each on EOF; they are detached from
+    *proc* so that leaving the ``Popen`` context early (e.g. Ctrl-C) cannot
+    close a descriptor the reactor is still polling.
+    """
+
+    def __init__(
+        self,
+        reactor: Reactor,
+        proc: Any,
+        streams: list[tuple[Any, StreamSink]],
+        timeout: float | None,
+    ) -> None:
+        self.reactor = reactor
+        self.proc = proc
+        self.finished = threading.Event()
+        self.open_streams = len(streams)
+        self.timed_out = False
+        self.error: BaseException | None = None
+        self.timer = reactor.call_later(timeout, self.expire) if timeout is not None else None
+        for pipe, sink in streams:
+            self.watch(pipe, sink)
+        proc.stdout = proc.stderr = None
+
+    def watch(self, pipe: Any, sink: StreamSink) -> None:
+        """Feed *pipe* to *sink* from the reactor thread as data arrives."""
+        fd = pipe.fileno()
+        os.set_blocking(fd, False)
+
+        def on_readable() -> None:
+            self.readable(pipe, fd, sink)
+
+        self.reactor.add_reader(fd, on_readable)
+
+    def readable(self, pipe: Any, fd: int, sink: StreamSink) -> None:
+        try:
+            data = os.read(fd, READ_CHUNK)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        try:
+            if data:
+                sink.feed(data)
+                return
+            sink.finish()
+        except Exception as exc:  # a failing output target ends this stream, not the reactor
+            self.error = self.error or exc
+        self.reactor.selector.unregister(fd)
+        pipe.close()
+        self.open_streams -= 1
+        if self.open_streams == 0:
+            self.finished.set()
+
+    def expire(self) -> None:
+        self.timed_out = True
+        try:
+            self.proc.kill()
+        except OSError:
+            pass
+
+    def wait(self) -> None:
+        """Block until both streams reached EOF."""
+        self.finished.wait()
+
+    def close(self) -> None:
+        """Disarm the timeout once the script has been reaped."""
+        if self.timer is not None:
+            self.timer.cancel()
+
+
+class ThreadedWatch:
+    """:class:`ReactorWatch` stand-in using two reader threads and a timer thread.
+
+    Used where pipes cannot be polled: on Windows, and for Popen stand-ins
+    whose pipes have no file descriptor.
+    """
+
+    def __init__(self, proc: Any, streams: list[tuple[Any, StreamSink]], timeout: float | None) -> None:
+        self.proc = proc
+        self.timed_out = False
+        self.error: BaseException | None = None
+        self.cancel_timer = threading.Event()
+        self.readers = [threading.Thread(target=self.stream, args=(pipe, sink), daemon=True) for pipe, sink in streams]
+        for reader in self.readers:
+            reader.start()
+        self.killer: threading.Thread | None = None
+        if timeout is not None:
+            self.killer = threading.Thread(target=self.kill_on_timeout, args=(timeout,), daemon=True)
+            self.killer.start()
+
+    def stream(self, pipe: Any, sink: StreamSink) -> None:
+        # Real text-mode pipes are read through their byte layer; stand-ins may only offer text.
+        source = binary_layer(pipe) or pipe
+        try:
+            while True:
+                chunk = source.read(READ_CHUNK)
+                if not chunk:
+                    sink.finish()
+                    break
+                sink.feed(chunk.encode(locale.getpreferredencoding(False)) if isinstance(chunk, str) else chunk)
+        finally:
+            try:
+                pipe.close()
+            except Exception:  # nosec B110
+                pass
+
+    def kill_on_timeout(self, timeout: float) -> None:
+        if not self.cancel_timer.wait(timeout):
+            self.timed_out = True
+            try:
+                self.proc.kill()
+            except OSError:
+                pass
+
+    def wait(self) -> None:
+        for reader in self.readers:
+            reader.join()
+
+    def close(self) -> None:
+        self.cancel_timer.set()
+        if self.killer is not None:
+            # Bound the join so a stuck killer thread can't hang the run;
+            # daemon=True still lets the process exit if this overruns.
+            self.killer.join(timeout=0.1)
+
+
+def pollable_fd(pipe: Any) -> int | None:
+    try:
+        return int(pipe.fileno())
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def watch_output(
+    proc: Any, streams: list[tuple[Any, StreamSink]], timeout: float | None
+) -> ReactorWatch | ThreadedWatch:
+    """Start following *streams* of *proc* and enforcing *timeout*."""
+    if os.name != "nt" and all(pollable_fd(pipe) is not None for pipe, _sink in streams):
+        return ReactorWatch(shared_reactor(), proc, streams, timeout)
+    return ThreadedWatch(proc, streams, timeout)
+
+
 def run_bash(
     script: str,
     *,
-    env: dict[str, str] | None = None,
+    env: Mapping[str, str] | None = None,
     cwd: str | os.PathLike[str] | None = None,
     mode: str = "stream",
     check: bool = True,
@@ -219,16 +679,36 @@ def run_bash(
     stdout_target: TextWriter | None = None,
     stderr_target: TextWriter | None = None,
     timeout: float | None = None,
+    process_group: bool = False,
+    on_spawn: Callable[[int], None] | None = None,
+    warm_shells: int | None = None,
+    spill_dir: Path | None = None,
 ) -> RunResult:
-    """Run a bash script via stdin."""
+    """Run a bash script via stdin.
+
+    With *process_group*, bash leads its own process group so the whole
+    script tree can be stopped with :func:`kill_process_group`; the group is
+    also killed if the caller is interrupted, since a detached group no longer
+    receives the terminal's Ctrl-C.  *on_spawn* receives bash's PID right
+    after it starts.
+
+    With *warm_shells* set (> 0), stream mode runs the script in an already started
+    bash from a :class:`bitrab.execution.warm_shell.ShellPool` of that size
+    when one is ready (such shells always lead their own process group).
+
+    With *spill_dir*, stream mode keeps only a bounded tail of each stream in
+    memory and writes the full output to files there, exposed as
+    :attr:`RunResult.stdout_file` / :attr:`RunResult.stderr_file`.
+
+    Stream mode colours output (stdout green, stderr red) only on targets
+    that are terminals, unless *force_color* is True; see :class:`StreamSink`.
+    """
     env_merged = merge_env(env)
+    group_kwargs = process_group_kwargs() if process_group else {}
 
     if os.name == "nt":
         script = script.replace("\r\n", "\n")
 
-    colors = colors_enabled(force_color)
-    g, r, reset = (GREEN, RED, RESET) if colors else ("", "", "")
-
     bash = pick_bash(login_shell or bool(os.environ.get("BITRAB_RUN_LOAD_BASHRC")))
     robust_script_content = f"set -eo pipefail\n{script}"
 
@@ -244,107 +724,76 @@ def run_bash(
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
+            **group_kwargs,
         ) as proc:
+            if on_spawn is not None:
+                on_spawn(proc.pid)
             try:
                 out, err = proc.communicate(robust_script_content, timeout=timeout)
             except subprocess.TimeoutExpired as toe:
                 proc.kill()
                 proc.communicate()
                 raise JobTimeoutError(f"Job timed out after {timeout}s") from toe
+            except BaseException:
+                if process_group:
+                    kill_process_group(proc.pid)
+                raise
             rc = proc.returncode
         result = RunResult(rc, out, err)
         if check:
             result.check_returncode()
         return result
 
-    out_buf = Buffer(stdout_target or sys.stdout)
-    err_buf = Buffer(stderr_target or sys.stderr)
-
-    def stream(pipe: IO[str], color: str, buf: Buffer) -> None:
-        # Read in blocks for efficiency while still streaming lines.
-        # Downstream consumers (e.g. QueueWriter → TUI) receive coherent lines.
-        try:
-            pending: list[str] = []
-            while True:
-                chunk = pipe.read(1024)
-                if not chunk:
-                    # EOF: flush any remaining partial line
-                    if pending:
-                        buf.write(f"{color}{''.join(pending)}{reset}")
-                        buf.flush()
-                    break
+    out_sink = make_sink(stdout_target or sys.stdout, spill_dir, "stdout", GREEN, force_color)
+    err_sink = make_sink(stderr_target or sys.stderr, spill_dir, "stderr", RED, force_color)
 
-                # Split the chunk into lines, keeping track of any partial line at the end
-                lines = chunk.splitlines(keepends=True)
-                if not lines:
-                    continue
-
-                for _i, line in enumerate(lines):
-                    pending.append(line)
-                    if line.endswith(("\n", "\r")):
-                        buf.write(f"{color}{''.join(pending)}{reset}")
-                        buf.flush()
-                        pending = []
-        finally:
-            try:
-                pipe.close()
-            except Exception:  # nosec B110
-                pass
+    warm = warm_shell_for(bash, warm_shells, env_merged, cwd) if warm_shells else None
+    if warm is not None:
+        warm_shell, preamble = warm
+        started = warm_shell.proc
+        robust_script_content = preamble + robust_script_content
+        process_group = True
+    else:
+        started = subprocess.Popen(  # nosec
+            bash,
+            env=env_merged,
+            cwd=str(cwd) if cwd is not None else None,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=0,
+            **group_kwargs,
+        )
 
-    process_killed_by_timeout = False
-
-    with subprocess.Popen(  # nosec
-        bash,
-        env=env_merged,
-        cwd=str(cwd) if cwd is not None else None,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        bufsize=0,
-    ) as proc:
+    with started as proc:
         if not (proc.stdout is not None and proc.stderr is not None and proc.stdin is not None):
             raise BitrabError("proc properties are None")
+        if on_spawn is not None:
+            on_spawn(proc.pid)
 
-        t_out = threading.Thread(target=stream, args=(proc.stdout, g, out_buf), daemon=True)
-        t_err = threading.Thread(target=stream, args=(proc.stderr, r, err_buf), daemon=True)
-        t_out.start()
-        t_err.start()
+        watch = watch_output(proc, [(proc.stdout, out_sink), (proc.stderr, err_sink)], timeout)
 
         proc.stdin.write(robust_script_content)
         proc.stdin.close()
 
-        cancel_timer = threading.Event()
-        t_kill: threading.Thread | None = None
-        if timeout is not None:
-
-            def kill_on_timeout() -> None:
-                nonlocal process_killed_by_timeout
-                if not cancel_timer.wait(timeout):
-                    process_killed_by_timeout = True
-                    try:
-                        proc.kill()
-                    except OSError:
-                        pass
-
-            t_kill = threading.Thread(target=kill_on_timeout, daemon=True)
-            t_kill.start()
-
-        t_out.join()
-        t_err.join()
-        rc = proc.wait()
-
-        if timeout is not None:
-            cancel_timer.set()
-            if t_kill is not None:
-                # Bound the join so a stuck killer thread can't hang the run;
-                # daemon=True still lets the process exit if this overruns.
-                t_kill.join(timeout=0.1)
+        try:
+            watch.wait()
+            rc, usage = reap(proc)
+        except BaseException:
+            if process_group:
+                kill_process_group(proc.pid)
+            raise
+        finally:
+            watch.close()
 
-    if process_killed_by_timeout:
+    stdout_file, stderr_file = out_sink.buf.close(), err_sink.buf.close()
+    if watch.timed_out:
         raise JobTimeoutError(f"Job timed out after {timeout}s")
+    if watch.error is not None:
+        raise watch.error
 
-    result = RunResult(rc, out_buf.getvalue(), err_buf.getvalue())
+    result = RunResult(rc, out_sink.buf.getvalue(), err_sink.buf.getvalue(), usage, stdout_file, stderr_file)
     if check:
         result.check_returncode()
     return result
@@ -15,29 +15,41 @@ from __future__ import annotations
 
 import copy
 import dataclasses
+import importlib
 import multiprocessing as mp
 import os
 import subprocess  # nosec
 import sys
-from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from graphlib import CycleError, TopologicalSorter
 from pathlib import Path
 from typing import Any, Callable
 
+from bitrab.exceptions import JobExecutionError
+from bitrab.execution.abort import request_abort, reset_abort
+from bitrab.execution.admission import JobWeight, PressureGate, ResourceBudget, declares_weight, job_weight
 from bitrab.execution.artifacts import (
     collect_artifacts,
     collect_dotenv_report,
+    dependency_sources,
     inject_dependencies,
     load_dotenv_reports,
 )
+from bitrab.execution.completion import IDLE_WAIT, CompletionQueue
 from bitrab.execution.fingerprint import FingerprintManager
+from bitrab.execution.history import load_job_durations, remaining_path_lengths
 from bitrab.execution.job import JobExecutor, JobRuntimeContext, RunResult
+from bitrab.execution.prefetch import Prefetcher, PreparedJob
+from bitrab.execution.resources import ResourceUsage, total_usage
 from bitrab.execution.shell import TextWriter
+from bitrab.execution.variables import SharedEnv, receive_env, ship_env
 from bitrab.folder import ensure_bitrab_dir
 from bitrab.git_worktree import can_use_worktrees, job_worktree
 from bitrab.models.pipeline import JobConfig, PipelineConfig
-from bitrab.mutation import MutationConfig, MutationSnapshot, ParallelBackendConfig, WorktreeConfig
+from bitrab.mutation import MutationConfig, MutationSnapshot, ParallelBackendConfig, SchedulerConfig, WorktreeConfig
 from bitrab.utils import sanitize_job_name
 
 WorkerFunc = Callable[[JobConfig, JobExecutor, Path], list[RunResult]]
@@ -57,6 +69,8 @@ class JobOutcome:
     history: list[RunResult] = field(default_factory=list)
     allowed_failure: bool = False  # True if job failed but allow_failure was set
     memoized: bool = False  # True if the job was skipped via --incremental fingerprint match
+    aborted: bool = False  # True if --fail-fast killed the job after a sibling failed
+    usage: ResourceUsage | None = None  # summed over the job's scripts, when measured
 
 
 # ---------------------------------------------------------------------------
@@ -125,11 +139,12 @@ class PipelineCallbacks:
         return None
 
     def poll_during_parallel(self, futures: dict[Any, JobConfig]) -> None:
-        """Called repeatedly while parallel futures are running.
+        """Called each time the dispatch loop is about to sleep while jobs run.
 
-        Use this to drain queues, update progress, etc.  The default
-        implementation does nothing.  Implementations should be non-blocking
-        or use a very short timeout.
+        The loop sleeps until a job finishes rather than on a fixed tick, so
+        this is not a place to stream output from; use a reader of your own
+        for that.  The default implementation does nothing.  Implementations
+        must not block.
         """
 
     def on_cancelled(self) -> None:
@@ -156,6 +171,30 @@ class PipelineCallbacks:
 # Default (picklable) worker
 # ---------------------------------------------------------------------------
 
+# Modules a spawned worker needs to unpickle submitted jobs and run them.
+# Importing them once in the pool initializer keeps that cost off the first
+# job each worker receives.
+WARM_IMPORTS = (
+    "bitrab.execution.job",
+    "bitrab.execution.stage_runner",
+    "bitrab.execution.cache",
+    "bitrab.execution.artifacts",
+    "bitrab.tui.orchestrator",
+)
+
+
+def warm_worker(env_payload: tuple[str, dict[str, str]] | None = None) -> None:
+    """Pool initializer: pre-import the execution modules in a fresh worker.
+
+    *env_payload* (from :func:`bitrab.execution.variables.ship_env`) installs
+    the run's shared base environment once per worker, so submitted jobs
+    carry only a reference to it.
+    """
+    for module in WARM_IMPORTS:
+        importlib.import_module(module)
+    if env_payload is not None:
+        receive_env(env_payload)
+
 
 def is_failure_allowed(job: JobConfig, exc: BaseException) -> bool:
     """Check if the job's failure should be treated as a warning (not a hard failure)."""
@@ -239,6 +278,7 @@ def worktree_worker(
     project_dir: str,
     worktree_root: str | None = None,
     completed_jobs: list[str],
+    prepared: PreparedJob | None = None,
     **extra: Any,
 ) -> tuple[list[RunResult], str]:
     """Parallel worker that isolates execution inside a git worktree.
@@ -254,16 +294,25 @@ def worktree_worker(
        stable store under the real ``project_dir/.bitrab/artifacts/``.
     5. Remove the worktree — even if the job failed.
 
+    With a *prepared* setup (see :mod:`bitrab.execution.prefetch`) step 1 is
+    skipped and step 2 only covers upstreams that finished after it was made.
+
     Returns ``(history, worktree_path_str)``.  The path is returned purely for
     diagnostics; artifacts are already copied out by the time the caller sees it.
     """
     pdir = Path(project_dir)
     root = Path(worktree_root) if worktree_root is not None else None
-    with job_worktree(pdir, job.name, root=root) as wt_path:
+    prepared_path = prepared.worktree if prepared is not None else None
+    with job_worktree(pdir, job.name, root=root, prepared=prepared_path) as wt_path:
         scoped_executor = scope_executor_to_worktree(executor, wt_path)
+        injected: list[str] = []
+        if prepared is not None:
+            injected = prepared.injected
+            scoped_executor.cache_restored = prepared.cache_restored
+            scoped_executor.cache_snapshots = prepared.cache_snapshots
 
         # Upstream artifacts land in the worktree so the job can consume them.
-        inject_dependencies(job, pdir, completed_jobs, effective_dir=wt_path)
+        inject_dependencies(job, pdir, completed_jobs, effective_dir=wt_path, skip=injected)
         dotenv_vars = load_dotenv_reports(job, pdir, completed_jobs)
         if dotenv_vars:
             merged = {**dotenv_vars, **job.variables}
@@ -333,6 +382,7 @@ class BaseRunner:
         parallel_backend: ParallelBackendConfig | None = None,
         worktree_config: WorktreeConfig | None = None,
         fingerprints: FingerprintManager | None = None,
+        scheduler_config: SchedulerConfig | None = None,
     ) -> None:
         self.job_executor = job_executor
         self.callbacks = callbacks or PipelineCallbacks()
@@ -346,6 +396,16 @@ class BaseRunner:
         self.mutation_config = mutation_config or MutationConfig()
         self.parallel_backend = parallel_backend or ParallelBackendConfig()
         self.worktree_config = worktree_config or WorktreeConfig()
+        self.scheduler_config = scheduler_config or SchedulerConfig()
+        if self.parallel_backend.backend == "asyncio":
+            self.job_executor.async_subprocess = True
+        self.job_executor.warm_shells = self.parallel_backend.warm_shells
+        if self.scheduler_config.fail_fast:
+            # Scripts must run in their own process group to be killable
+            # without taking the (shared, warm) pool worker down with them.
+            self.job_executor.process_groups = True
+        # Jobs stopped by --fail-fast (see abort_jobs).
+        self.aborted_jobs: set[str] = set()
         # Cache the one-time "is this repo worktree-capable?" check so we
         # don't shell out to git per job.
         self.worktrees_available: bool | None = None
@@ -353,26 +413,142 @@ class BaseRunner:
         self.completed_jobs: list[str] = []
         # --incremental fingerprint memoization; None when the feature is off.
         self.fingerprints = fingerprints
+        # Pipeline-lifetime pool (see pipeline_pool); None outside a run or
+        # when warm_pool is disabled.
+        self.shared_pool: Any = None
+        # Longest remaining duration-weighted path per job (see prepare_priorities).
+        self.job_priorities: dict[str, float] = {}
+        # CPU / memory admission (see prepare_admission); None when off.
+        self.budget: ResourceBudget | None = None
+        self.job_weights: dict[str, JobWeight] = {}
+        # Load / PSI gate for adaptive admission; None when off.
+        self.pressure: PressureGate | None = None
 
     def use_worktrees(self) -> bool:
         """Return True if we should create per-job worktrees for parallel jobs."""
         if not self.worktree_config.enabled:
             return False
-        if self.job_executor.dry_run:
-            return False
+        if self.job_executor.dry_run or self.job_executor.remote:
+            return False  # remote agents isolate jobs in their own checkouts
         if self.worktrees_available is None:
             self.worktrees_available = can_use_worktrees(self.job_executor.project_dir)
         return self.worktrees_available
 
+    def prepare_priorities(self, pipeline: PipelineConfig) -> None:
+        """Rank jobs by their longest remaining path to the end of the pipeline.
+
+        Durations come from recent run logs; with no history every job gets the
+        same estimate and the ranking reduces to dependency depth.  Skipped for
+        serial runs (order cannot change the total) and ``job_priority = "yaml"``.
+        """
+        if self.scheduler_config.job_priority != "critical_path" or self.maximum_degree_of_parallelism == 1:
+            self.job_priorities = {}
+            return
+        durations = load_job_durations(self.job_executor.state_root)
+        self.job_priorities = remaining_path_lengths(dag_dependencies(pipeline), durations)
+
+    def order_by_priority(self, jobs: list[JobConfig]) -> list[JobConfig]:
+        """Return *jobs* critical-path first; ties keep their YAML order."""
+        if not self.job_priorities:
+            return list(jobs)
+        return sorted(jobs, key=lambda job: -self.job_priorities.get(job.name, 0.0))
+
+    def prepare_admission(self, pipeline: PipelineConfig) -> None:
+        """Set up the CPU / memory budget and the pressure gate for this run.
+
+        The budget is on when ``[tool.bitrab.resources]`` exists or a job sets
+        ``BITRAB_CPU_WEIGHT`` / ``BITRAB_MEM_MB``; the pressure gate when
+        adaptive admission is enabled.  Otherwise only the job-count limit
+        applies, exactly as before.  Serial runs never need either.
+        """
+        self.budget = None
+        self.job_weights = {}
+        self.pressure = None
+        if self.maximum_degree_of_parallelism == 1:
+            return
+        config = self.scheduler_config.resources
+        if config.enabled or any(declares_weight(job) for job in pipeline.jobs):
+            self.budget = ResourceBudget.from_config(config)
+            self.job_weights = {job.name: job_weight(job, config) for job in pipeline.jobs}
+        if self.scheduler_config.adaptive.enabled:
+            self.pressure = PressureGate(self.scheduler_config.adaptive)
+
+    def next_admissible(self, queue: list[JobConfig], running: int, slots: int) -> JobConfig | None:
+        """Pop and return the first queued job that may start now, or None.
+
+        *queue* is expected in priority order.  Without a resource budget this
+        is the head of the queue whenever a slot is free.  With one, a job that
+        does not fit is passed over for a later, smaller job that does; it
+        gets its turn once enough running work has finished.
+
+        Under adaptive admission nothing new starts while the host is under
+        pressure, unless nothing of ours is running (so the run never stalls).
+        """
+        if not queue or running >= slots:
+            return None
+        if running and self.pressure is not None and self.pressure.hold():
+            return None
+        if self.budget is None:
+            return queue.pop(0)
+        for index, job in enumerate(queue):
+            if self.budget.fits(self.job_weights.get(job.name, JobWeight())):
+                return queue.pop(index)
+        return None
+
+    def idle_timeout(self, queue: list[JobConfig]) -> float | None:
+        """Return how long the dispatch loop may sleep waiting for a completion.
+
+        Only a job held back by adaptive admission needs a timed wakeup: the
+        host may calm down before anything of ours finishes.  Everything else
+        that unblocks a queued job is a completion.
+        """
+        if queue and self.pressure is not None:
+            return self.pressure.interval if IDLE_WAIT is None else min(self.pressure.interval, IDLE_WAIT)
+        return IDLE_WAIT
+
+    def job_dir_for(self, job: JobConfig) -> Path:
+        """Return the per-job working directory under ``.bitrab/temp/``."""
+        return self.job_executor.project_dir / ".bitrab" / "temp" / sanitize_job_name(job.name)
+
     def make_job_dir(self, job: JobConfig) -> Path:
         """Create and return the per-job working directory under ``.bitrab/temp/``."""
         if not self.job_executor.dry_run:
             ensure_bitrab_dir(self.job_executor.project_dir)
-        job_dir = self.job_executor.project_dir / ".bitrab" / "temp" / sanitize_job_name(job.name)
+        job_dir = self.job_dir_for(job)
         if not self.job_executor.dry_run:
             job_dir.mkdir(parents=True, exist_ok=True)
+            if self.job_executor.process_groups:
+                reset_abort(job_dir)
         return job_dir
 
+    def fails_fast(self, outcome: JobOutcome) -> bool:
+        """Return True if *outcome* should stop the run under ``--fail-fast``."""
+        return self.scheduler_config.fail_fast and not outcome.success and not outcome.aborted
+
+    def abort_jobs(self, jobs: list[JobConfig]) -> None:
+        """Kill the running scripts of *jobs* (``--fail-fast``); a no-op otherwise."""
+        if not self.job_executor.process_groups or self.job_executor.dry_run:
+            return
+        for job in jobs:
+            if job.name not in self.aborted_jobs:
+                self.aborted_jobs.add(job.name)
+                request_abort(self.job_dir_for(job))
+
+    def remote_job(self, job: JobConfig) -> JobConfig:
+        """Return *job* ready to ship to a ``bitrab agent``.
+
+        Upstream dotenv variables are baked into ``job.variables`` and the
+        artifact sources are pinned as an explicit ``dependencies:`` list, so
+        the inherit-all default resolves against the jobs completed so far.
+        """
+        project_dir = self.job_executor.project_dir
+        dotenv_vars = load_dotenv_reports(job, project_dir, self.completed_jobs)
+        return dataclasses.replace(
+            job,
+            variables={**dotenv_vars, **job.variables},
+            dependencies=dependency_sources(job, self.completed_jobs),
+        )
+
     def check_memoized(self, job: JobConfig) -> JobOutcome | None:
         """Return a memoized :class:`JobOutcome` if *job* can be skipped, else None.
 
@@ -410,13 +586,64 @@ class BaseRunner:
 
     def make_pool(self, max_workers: int):
         """Create the appropriate executor pool based on backend config."""
-        if self.parallel_backend.backend == "thread":
+        if self.parallel_backend.backend in ("thread", "asyncio") or self.job_executor.remote:
+            # Under asyncio the pool threads only run job control flow; each
+            # blocks on its script coroutine in the shared event loop.  Remote
+            # jobs only need a thread to relay an agent's output.
             return ThreadPoolExecutor(max_workers=max_workers)
+        base = self.job_executor.variable_manager.shared_base_env
         return ProcessPoolExecutor(
             max_workers=max_workers,
             mp_context=self.mp_ctx,
+            initializer=warm_worker,
+            initargs=(ship_env(base) if isinstance(base, SharedEnv) else None,),
         )
 
+    @contextmanager
+    def pipeline_pool(self) -> Iterator[None]:
+        """Keep one warm pool alive for the whole pipeline run.
+
+        Every stage and DAG batch borrows this pool via :meth:`borrow_pool`
+        instead of spawning its own, so worker interpreters start and import
+        bitrab once per run.  Process workers are started eagerly so their
+        spawn overlaps with the first stage's setup.  A no-op for serial runs,
+        when ``warm_pool`` is off, or when an outer runner already owns a pool.
+        """
+        if (
+            self.shared_pool is not None
+            or self.maximum_degree_of_parallelism == 1
+            or not self.parallel_backend.warm_pool
+        ):
+            yield
+            return
+        pool = self.make_pool(self.maximum_degree_of_parallelism)
+        if isinstance(pool, ProcessPoolExecutor):
+            for _ in range(self.maximum_degree_of_parallelism):
+                pool.submit(warm_worker)
+        self.shared_pool = pool
+        try:
+            yield
+        finally:
+            self.shared_pool = None
+            pool.shutdown(wait=True)
+
+    @contextmanager
+    def borrow_pool(self, max_workers: int) -> Iterator[Any]:
+        """Yield the pipeline pool if one is alive, else a throwaway pool.
+
+        A pool whose worker died (e.g. a job cancelled from the TUI kills its
+        process) is broken for good, so it is replaced before being handed out.
+        """
+        pool = self.shared_pool
+        if pool is not None and getattr(pool, "_broken", False):
+            pool.shutdown(wait=False)
+            pool = self.shared_pool = self.make_pool(self.maximum_degree_of_parallelism)
+        if pool is not None:
+            yield pool
+            return
+        with self.make_pool(max_workers) as temporary:
+            yield temporary
+
     def run_jobs_serial(
         self,
         jobs: list[JobConfig],
@@ -443,7 +670,9 @@ class BaseRunner:
             job_dir = self.make_job_dir(job)
             cb.on_job_start(job)
             dotenv_vars: dict[str, str] = {}
-            if not self.job_executor.dry_run:
+            if self.job_executor.remote:
+                job = self.remote_job(job)
+            elif not self.job_executor.dry_run:
                 inject_dependencies(job, self.job_executor.project_dir, self.completed_jobs)
                 dotenv_vars = load_dotenv_reports(job, self.job_executor.project_dir, self.completed_jobs)
             writer = cb.make_output_writer(job, job_dir)
@@ -461,6 +690,7 @@ class BaseRunner:
                 )
                 snap.take()
 
+            first_result = len(self.job_executor.job_history)
             try:
                 self.job_executor.execute_job(ctx=ctx)
                 outcome = JobOutcome(job=job, success=True, history=list(self.job_executor.job_history))
@@ -475,10 +705,11 @@ class BaseRunner:
                     allowed_failure=allowed,
                 )
             finally:
-                if not self.job_executor.dry_run:
+                if not self.job_executor.dry_run and not self.job_executor.remote:
                     collect_artifacts(job, self.job_executor.project_dir, succeeded)
                     collect_dotenv_report(job, self.job_executor.project_dir, succeeded)
                 self.completed_jobs.append(job.name)
+            outcome.usage = total_usage(result.usage for result in self.job_executor.job_history[first_result:])
 
             mutations: list[str] = []
             if snap is not None:
@@ -490,11 +721,107 @@ class BaseRunner:
             outcomes.append(outcome)
             cb.on_job_complete(outcome)
 
-            if stop_on_failure and not outcome.success:
+            if (stop_on_failure or self.scheduler_config.fail_fast) and not outcome.success:
                 break  # stop stage on first hard failure
 
         return outcomes
 
+    def submit_job(
+        self,
+        pool: Any,
+        job: JobConfig,
+        *,
+        inner_worker: WorkerFunc,
+        use_worktrees: bool,
+        prepared: PreparedJob | None = None,
+    ) -> tuple[Any, JobConfig]:
+        """Prepare *job* and hand it to *pool*; return ``(future, job)``.
+
+        The returned job may differ from the one passed in: upstream dotenv
+        variables are baked into ``job.variables`` so they survive the process
+        boundary.  Memoization is the caller's responsibility.  *prepared* is
+        a worktree set up ahead of time (worktree mode only).
+        """
+        cb = self.callbacks
+        job_dir = self.make_job_dir(job)
+        if self.budget is not None:
+            self.budget.acquire(job.name, self.job_weights.get(job.name, JobWeight()))
+        cb.on_job_start(job)
+        if self.job_executor.remote:
+            job = self.remote_job(job)
+        elif not self.job_executor.dry_run and not use_worktrees:
+            # Outside worktree mode, inject/collect bracket the outer
+            # pool.submit.  Under worktrees, worktree_worker handles
+            # both inside the isolated checkout.
+            inject_dependencies(job, self.job_executor.project_dir, self.completed_jobs)
+            # Bake upstream dotenv-report variables into this job's variables
+            # so they survive the process boundary.  Job-level variables win
+            # (they are already in job.variables and override dotenv).
+            dotenv_vars = load_dotenv_reports(job, self.job_executor.project_dir, self.completed_jobs)
+            if dotenv_vars:
+                merged = {**dotenv_vars, **job.variables}
+                job = dataclasses.replace(job, variables=merged)
+        extra = cb.make_worker_args(job, job_dir)
+        # Each job records into its own history.  Thread workers would
+        # otherwise all append to (and return) this executor's shared list.
+        worker_executor = copy.copy(self.job_executor)
+        worker_executor.job_history = []
+
+        if use_worktrees:
+            fut = pool.submit(
+                worktree_worker,
+                job,
+                worker_executor,
+                job_dir,
+                inner_worker=inner_worker,
+                project_dir=str(self.job_executor.project_dir),
+                worktree_root=(str(self.worktree_config.root) if self.worktree_config.root is not None else None),
+                completed_jobs=list(self.completed_jobs),
+                prepared=prepared,
+                **extra,
+            )
+        else:
+            fut = pool.submit(inner_worker, job, worker_executor, job_dir, **extra)
+        return fut, job
+
+    def finish_job(self, fut: Any, job: JobConfig, *, use_worktrees: bool) -> JobOutcome:
+        """Turn a finished future into a :class:`JobOutcome` and do the bookkeeping."""
+        succeeded = True
+        try:
+            result = fut.result()
+            if use_worktrees:
+                history, _wt_path = result  # type: ignore[misc]
+            else:
+                history = result
+            self.job_executor.job_history.extend(history)
+            usage = total_usage(run.usage for run in history)
+            outcome = JobOutcome(job=job, success=True, history=history, usage=usage)
+        except BaseException as exc:
+            succeeded = False
+            allowed = is_failure_allowed(job, exc)
+            outcome = JobOutcome(
+                job=job,
+                success=allowed,
+                error=exc,
+                allowed_failure=allowed,
+                usage=exc.usage if isinstance(exc, JobExecutionError) else None,
+            )
+        if not self.job_executor.dry_run and not use_worktrees and not self.job_executor.remote:
+            # Under worktrees the worker already collected before tearing
+            # the worktree down, including the failure path.  Remote agents
+            # ship their outputs back themselves.
+            collect_artifacts(job, self.job_executor.project_dir, succeeded)
+            collect_dotenv_report(job, self.job_executor.project_dir, succeeded)
+        if not succeeded and job.name in self.aborted_jobs:
+            outcome.aborted = True
+        self.record_fingerprint(job, succeeded)
+        self.completed_jobs.append(job.name)
+        if self.budget is not None:
+            self.budget.release(job.name)
+
+        self.callbacks.on_job_complete(outcome)
+        return outcome
+
     def run_jobs_parallel(
         self,
         jobs: list[JobConfig],
@@ -509,86 +836,49 @@ class BaseRunner:
         inner_worker: WorkerFunc = wf if wf is not None else default_worker
         use_worktrees = self.use_worktrees()
 
-        with self.make_pool(pool_size) as pool:
+        with self.borrow_pool(pool_size) as pool:
             futures: dict[Any, JobConfig] = {}
-            for job in jobs:
-                memoized = self.check_memoized(job)
-                if memoized is not None:
-                    self.complete_memoized(memoized)
-                    outcomes.append(memoized)
-                    continue
-
-                job_dir = self.make_job_dir(job)
-                cb.on_job_start(job)
-                if not self.job_executor.dry_run and not use_worktrees:
-                    # Outside worktree mode, inject/collect bracket the outer
-                    # pool.submit.  Under worktrees, worktree_worker handles
-                    # both inside the isolated checkout.
-                    inject_dependencies(job, self.job_executor.project_dir, self.completed_jobs)
-                    # Bake upstream dotenv-report variables into this job's variables
-                    # so they survive the process boundary.  Job-level variables win
-                    # (they are already in job.variables and override dotenv).
-                    dotenv_vars = load_dotenv_reports(job, self.job_executor.project_dir, self.completed_jobs)
-                    if dotenv_vars:
-                        merged = {**dotenv_vars, **job.variables}
-                        job = dataclasses.replace(job, variables=merged)
-                extra = cb.make_worker_args(job, job_dir)
-
-                if use_worktrees:
-                    fut = pool.submit(
-                        worktree_worker,
-                        job,
-                        self.job_executor,
-                        job_dir,
-                        inner_worker=inner_worker,
-                        project_dir=str(self.job_executor.project_dir),
-                        worktree_root=(
-                            str(self.worktree_config.root) if self.worktree_config.root is not None else None
-                        ),
-                        completed_jobs=list(self.completed_jobs),
-                        **extra,
-                    )
-                else:
-                    fut = pool.submit(inner_worker, job, self.job_executor, job_dir, **extra)
-                futures[fut] = job
-
-            # Poll while futures are running (allows TUI queue draining etc.)
-            pending = set(futures.keys())
-            while pending:
-                cb.poll_during_parallel(futures)
-                done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
-                if not done:
-                    continue
-                for fut in done:
-                    job = futures[fut]
-                    succeeded = True
-                    try:
-                        result = fut.result()
-                        if use_worktrees:
-                            history, _wt_path = result  # type: ignore[misc]
-                        else:
-                            history = result
-                        self.job_executor.job_history.extend(history)
-                        outcome = JobOutcome(job=job, success=True, history=history)
-                    except BaseException as exc:
-                        succeeded = False
-                        allowed = is_failure_allowed(job, exc)
-                        outcome = JobOutcome(
-                            job=job,
-                            success=allowed,
-                            error=exc,
-                            allowed_failure=allowed,
+            pending: set[Any] = set()
+            completions = CompletionQueue()
+            # Jobs are handed to the pool only when a slot (and, with weights,
+            # enough CPU / memory budget) is free, so on_job_start marks a
+            # real start and priority order is start order.
+            queue = self.order_by_priority(jobs)
+            try:
+                while queue or pending:
+                    while True:
+                        job = self.next_admissible(queue, len(pending), pool_size)
+                        if job is None:
+                            break
+                        memoized = self.check_memoized(job)
+                        if memoized is not None:
+                            self.complete_memoized(memoized)
+                            outcomes.append(memoized)
+                            continue
+
+                        fut, submitted = self.submit_job(
+                            pool, job, inner_worker=inner_worker, use_worktrees=use_worktrees
                         )
-                    if not self.job_executor.dry_run and not use_worktrees:
-                        # Under worktrees the worker already collected before tearing
-                        # the worktree down, including the failure path.
-                        collect_artifacts(job, self.job_executor.project_dir, succeeded)
-                        collect_dotenv_report(job, self.job_executor.project_dir, succeeded)
-                    self.record_fingerprint(job, succeeded)
-                    self.completed_jobs.append(job.name)
-
-                    outcomes.append(outcome)
-                    cb.on_job_complete(outcome)
+                        futures[fut] = submitted
+                        pending.add(fut)
+                        completions.watch(fut)
+
+                    if not pending:
+                        break
+
+                    cb.poll_during_parallel(futures)
+                    done = completions.wait(self.idle_timeout(queue))
+                    pending.difference_update(done)
+                    for fut in done:
+                        outcome = self.finish_job(fut, futures[fut], use_worktrees=use_worktrees)
+                        outcomes.append(outcome)
+                        if self.fails_fast(outcome):
+                            queue.clear()
+                            self.abort_jobs([futures[other] for other in pending])
+            except BaseException:
+                # Detached process groups don't see the terminal's Ctrl-C.
+                self.abort_jobs([futures[fut] for fut in pending])
+                raise
 
         return outcomes
 
@@ -605,8 +895,16 @@ class StagePipelineRunner(BaseRunner):
         """Run all stages sequentially; jobs within a stage run in parallel.
 
         If any job declares ``needs:``, automatically switches to DAG execution
-        via :class:`DagPipelineRunner`.
+        via :class:`DagPipelineRunner`.  With ``relax_stages`` enabled, a
+        ``needs:``-free pipeline whose jobs list ``dependencies:`` is run as the
+        implicit DAG those edges describe, dispatched continuously so a job
+        starts the moment its upstream jobs finish.
         """
+        scheduler_config = self.scheduler_config
+        if scheduler_config.relax_stages and not has_dag_jobs(pipeline):
+            pipeline = needs_from_dependencies(pipeline)
+            if has_dag_jobs(pipeline):
+                scheduler_config = dataclasses.replace(scheduler_config, dag_dispatch="continuous")
         if has_dag_jobs(pipeline):
             dag_runner = DagPipelineRunner(
                 job_executor=self.job_executor,
@@ -617,13 +915,21 @@ class StagePipelineRunner(BaseRunner):
                 parallel_backend=self.parallel_backend,
                 worktree_config=self.worktree_config,
                 fingerprints=self.fingerprints,
+                scheduler_config=scheduler_config,
             )
             dag_runner.execute_pipeline(pipeline)
             return
 
+        with self.pipeline_pool():
+            self.execute_stages(pipeline)
+
+    def execute_stages(self, pipeline: PipelineConfig) -> None:
+        """Stage loop behind :meth:`execute_pipeline` for pipelines without ``needs:``."""
         cb = self.callbacks
         if self.fingerprints is not None:
             self.fingerprints.prepare(pipeline)
+        self.prepare_priorities(pipeline)
+        self.prepare_admission(pipeline)
         cb.on_pipeline_start(pipeline, self.maximum_degree_of_parallelism)
 
         jobs_by_stage = organize_jobs_by_stage(pipeline)
@@ -669,7 +975,10 @@ class StagePipelineRunner(BaseRunner):
                     prior_had_failure = True
                     success = False
                     if first_error is None:
-                        first_error = hard_failures[0].error
+                        genuine = [o for o in hard_failures if not o.aborted] or hard_failures
+                        first_error = genuine[0].error
+                    if self.scheduler_config.fail_fast:
+                        break
 
                 # Allowed failures count as "failure" for on_failure job filtering
                 if any(o.allowed_failure for o in outcomes):
@@ -706,8 +1015,36 @@ def has_dag_jobs(pipeline: PipelineConfig) -> bool:
     return any(job.needs for job in pipeline.jobs)
 
 
-def build_dag(pipeline: PipelineConfig) -> TopologicalSorter:
-    """Build a TopologicalSorter from pipeline jobs.
+def needs_from_dependencies(pipeline: PipelineConfig) -> PipelineConfig:
+    """Return a copy of *pipeline* whose jobs ``need`` the jobs they take artifacts from.
+
+    Only non-empty ``dependencies:`` lists are translated, and only entries
+    naming a job in an earlier stage (the ones GitLab accepts) count.  Jobs
+    left without a usable edge keep strict stage ordering, so an omitted or
+    empty ``dependencies:`` never lets a job jump ahead of side effects it
+    may rely on.  Returns *pipeline* unchanged when nothing qualifies.
+    """
+    stage_index = {stage: i for i, stage in enumerate(pipeline.stages)}
+    job_stage = {job.name: stage_index.get(job.stage, -1) for job in pipeline.jobs}
+    jobs: list[JobConfig] = []
+    relaxed = False
+    for job in pipeline.jobs:
+        upstream = [
+            dep
+            for dep in (job.dependencies or [])
+            if dep in job_stage and job_stage[dep] < stage_index.get(job.stage, -1)
+        ]
+        if upstream:
+            job = dataclasses.replace(job, needs=upstream)
+            relaxed = True
+        jobs.append(job)
+    if not relaxed:
+        return pipeline
+    return dataclasses.replace(pipeline, jobs=jobs)
+
+
+def dag_dependencies(pipeline: PipelineConfig) -> dict[str, list[str]]:
+    """Return ``{job_name: [upstream job names]}`` in pipeline order.
 
     Mixed mode: jobs without ``needs:`` get synthetic dependencies on every job
     in all prior stages, preserving stage ordering.  Jobs with ``needs:`` only
@@ -717,22 +1054,27 @@ def build_dag(pipeline: PipelineConfig) -> TopologicalSorter:
     # Build a set of jobs in each stage, ordered by pipeline.stages
     prior_stage_jobs: list[str] = []
 
-    ts: TopologicalSorter = TopologicalSorter()
+    dependencies: dict[str, list[str]] = {}
     for stage in pipeline.stages:
         stage_jobs = jobs_by_stage.get(stage, [])
         for job in stage_jobs:
             if job.needs:
                 # Explicit DAG dependencies — ignore stage ordering
-                ts.add(job.name, *job.needs)
+                dependencies[job.name] = list(job.needs)
             else:
                 # Stage-based ordering: depend on all jobs from prior stages
-                if prior_stage_jobs:
-                    ts.add(job.name, *prior_stage_jobs)
-                else:
-                    ts.add(job.name)
+                dependencies[job.name] = list(prior_stage_jobs)
         # Accumulate prior stage jobs for next iteration
         prior_stage_jobs.extend(j.name for j in stage_jobs)
 
+    return dependencies
+
+
+def build_dag(pipeline: PipelineConfig) -> TopologicalSorter:
+    """Build a TopologicalSorter from pipeline jobs (see :func:`dag_dependencies`)."""
+    ts: TopologicalSorter = TopologicalSorter()
+    for name, deps in dag_dependencies(pipeline).items():
+        ts.add(name, *deps)
     return ts
 
 
@@ -753,19 +1095,49 @@ def report_mutations(job_name: str, changed: list[str], writer: Any) -> None:
         printer("   If these are intentional, add the pattern(s) to [tool.bitrab.mutation] whitelist in pyproject.toml")
 
 
+def dag_should_skip(job: JobConfig, failed_jobs: set[str]) -> bool:
+    """Return True if a ready DAG job must be skipped given its ``when`` and upstream failures."""
+    when = job.when
+    if when in {"never", "manual"}:
+        return True
+    if when == "on_failure":
+        return not failed_jobs
+    if when == "always":
+        return False
+    # on_success: check if any dependency failed
+    if job.needs:
+        return any(dep in failed_jobs for dep in job.needs)
+    return bool(failed_jobs)
+
+
 class DagPipelineRunner(BaseRunner):
     """Execute a pipeline using DAG scheduling based on ``needs:`` dependencies.
 
     Jobs become ready as soon as their dependencies complete, potentially
     ignoring stage boundaries.  Uses :class:`PipelineCallbacks` for the same
     customisation hooks as :class:`StagePipelineRunner`.
+
+    Two dispatch strategies are available via
+    :attr:`SchedulerConfig.dag_dispatch`:
+
+    * ``batch`` runs the whole ready set and waits for every job in it before
+      asking the graph for more work.
+    * ``continuous`` keeps one pool for the whole pipeline and refills free
+      worker slots the moment any single job completes.
     """
 
     def execute_pipeline(self, pipeline: PipelineConfig) -> None:
         """Run all jobs respecting DAG dependencies."""
+        with self.pipeline_pool():
+            self.execute_dag(pipeline)
+
+    def execute_dag(self, pipeline: PipelineConfig) -> None:
+        """DAG loop behind :meth:`execute_pipeline`."""
         cb = self.callbacks
         if self.fingerprints is not None:
             self.fingerprints.prepare(pipeline)
+        self.prepare_priorities(pipeline)
+        self.prepare_admission(pipeline)
         cb.on_pipeline_start(pipeline, self.maximum_degree_of_parallelism)
 
         # Build the DAG (raises CycleError if cyclic)
@@ -774,80 +1146,19 @@ class DagPipelineRunner(BaseRunner):
 
         # Index jobs by name for fast lookup
         job_map: dict[str, JobConfig] = {j.name: j for j in pipeline.jobs}
-        all_outcomes: list[JobOutcome] = []
         success = True
-        first_error: BaseException | None = None
-        failed_jobs: set[str] = set()  # jobs that hard-failed
 
         try:
-            while ts.is_active():
-                if cb.is_cancelled():
-                    cb.on_cancelled()
-                    success = False
-                    return
-
-                ready_names = ts.get_ready()
-                if not ready_names:
-                    break
-
-                # Filter by when-condition
-                ready_jobs = []
-                for name in ready_names:
-                    job = job_map.get(name)
-                    if job is None:
-                        # Dependency named a job that doesn't exist — mark done and skip
-                        ts.done(name)
-                        continue
-                    when = job.when
-                    skip = False
-                    if when in {"never", "manual"}:
-                        skip = True
-                    elif when == "on_failure":
-                        if not failed_jobs:
-                            skip = True
-                    elif when == "always":
-                        pass  # always runs
-                    else:  # on_success
-                        # Check if any dependency failed
-                        if job.needs:
-                            if any(dep in failed_jobs for dep in job.needs):
-                                skip = True
-                        elif failed_jobs:
-                            skip = True
-
-                    if skip:
-                        ts.done(name)
-                        continue
-                    ready_jobs.append(job)
-
-                if not ready_jobs:
-                    continue
-
-                # Notify stage start (use first job's stage as label)
-                stages_in_batch = sorted({j.stage for j in ready_jobs})
-                for stage in stages_in_batch:
-                    stage_jobs = [j for j in ready_jobs if j.stage == stage]
-                    cb.on_stage_start(stage, stage_jobs)
-
-                # Execute ready jobs
-                outcomes = self.run_batch(ready_jobs)
-                all_outcomes.extend(outcomes)
-
-                # Notify stage completion
-                for stage in stages_in_batch:
-                    stage_outcomes = [o for o in outcomes if o.job.stage == stage]
-                    cb.on_stage_complete(stage, stage_outcomes)
-
-                # Process outcomes
-                for outcome in outcomes:
-                    ts.done(outcome.job.name)
-                    if not outcome.success:
-                        failed_jobs.add(outcome.job.name)
-                        success = False
-                        if first_error is None:
-                            first_error = outcome.error
-                    if outcome.allowed_failure:
-                        failed_jobs.add(outcome.job.name)
+            if self.use_continuous_dispatch():
+                cancelled, first_error = self.run_continuous(pipeline, ts, job_map)
+            else:
+                cancelled, first_error = self.run_batches(ts, job_map)
+            if cancelled:
+                cb.on_cancelled()
+                success = False
+                return
+            if first_error is not None:
+                success = False
 
             if cb.is_cancelled():
                 cb.on_cancelled()
@@ -864,6 +1175,257 @@ class DagPipelineRunner(BaseRunner):
         finally:
             cb.on_pipeline_complete(success)
 
+    def use_continuous_dispatch(self) -> bool:
+        """Return True when ready jobs should be dispatched one completion at a time.
+
+        With a single worker there is nothing to overlap, so the serial batch
+        path (which also snapshots mutations) is kept.
+        """
+        return self.scheduler_config.dag_dispatch == "continuous" and self.maximum_degree_of_parallelism > 1
+
+    def run_batches(self, ts: TopologicalSorter, job_map: dict[str, JobConfig]) -> tuple[bool, BaseException | None]:
+        """Batch dispatch: run each ready set to completion before looking again.
+
+        Returns ``(cancelled, first_error)``.
+        """
+        cb = self.callbacks
+        first_error: BaseException | None = None
+        failed_jobs: set[str] = set()  # jobs that hard-failed
+
+        while ts.is_active():
+            if cb.is_cancelled():
+                return True, first_error
+
+            ready_names = ts.get_ready()
+            if not ready_names:
+                break
+
+            # Filter by when-condition
+            ready_jobs = []
+            for name in ready_names:
+                job = job_map.get(name)
+                if job is None:
+                    # Dependency named a job that doesn't exist — mark done and skip
+                    ts.done(name)
+                    continue
+                if dag_should_skip(job, failed_jobs):
+                    ts.done(name)
+                    continue
+                ready_jobs.append(job)
+
+            if not ready_jobs:
+                continue
+
+            # Notify stage start (use first job's stage as label)
+            stages_in_batch = sorted({j.stage for j in ready_jobs})
+            for stage in stages_in_batch:
+                stage_jobs = [j for j in ready_jobs if j.stage == stage]
+                cb.on_stage_start(stage, stage_jobs)
+
+            # Execute ready jobs
+            outcomes = self.run_batch(ready_jobs)
+
+            # Notify stage completion
+            for stage in stages_in_batch:
+                stage_outcomes = [o for o in outcomes if o.job.stage == stage]
+                cb.on_stage_complete(stage, stage_outcomes)
+
+            # Process outcomes
+            for outcome in outcomes:
+                ts.done(outcome.job.name)
+                if not outcome.success:
+                    failed_jobs.add(outcome.job.name)
+                    if first_error is None and not outcome.aborted:
+                        first_error = outcome.error
+                if outcome.allowed_failure:
+                    failed_jobs.add(outcome.job.name)
+
+            if first_error is not None and self.scheduler_config.fail_fast:
+                break
+
+        return False, first_error
+
+    def run_continuous(
+        self,
+        pipeline: PipelineConfig,
+        ts: TopologicalSorter,
+        job_map: dict[str, JobConfig],
+    ) -> tuple[bool, BaseException | None]:
+        """Continuous dispatch: refill worker slots as soon as any job finishes.
+
+        One pool sized by ``maximum_degree_of_parallelism`` lives for the whole
+        pipeline.  Ready jobs wait in a local queue and are only submitted when
+        a slot is free, so ``on_job_start`` fires when a job really starts.
+
+        Stage callbacks are emitted per stage rather than per batch: a stage
+        starts when its first job is dispatched and completes once every job
+        in it has finished or been skipped.
+
+        Under worktree isolation, jobs about to start are prepared ahead of
+        time (see :meth:`prefetch_ahead`).
+
+        On cancellation no further jobs are started; jobs already running are
+        allowed to finish.  Under ``--fail-fast`` the first hard failure also
+        stops dispatch and kills the jobs still running.  Returns
+        ``(cancelled, first_error)``.
+        """
+        cb = self.callbacks
+        wf = cb.get_worker_func()
+        inner_worker: WorkerFunc = wf if wf is not None else default_worker
+        use_worktrees = self.use_worktrees()
+        prefetcher = self.make_prefetcher(use_worktrees)
+        upstreams = dag_dependencies(pipeline)
+        resolved: set[str] = set()
+
+        jobs_by_stage = organize_jobs_by_stage(pipeline)
+        unresolved = {stage: len(jobs) for stage, jobs in jobs_by_stage.items()}
+        stage_outcomes: dict[str, list[JobOutcome]] = {}
+        failed_jobs: set[str] = set()
+        first_error: BaseException | None = None
+        cancelled = False
+        halted = False  # --fail-fast tripped
+
+        ready: list[JobConfig] = []
+        running: dict[Any, JobConfig] = {}
+
+        def resolve(job: JobConfig, outcome: JobOutcome | None) -> None:
+            nonlocal first_error, halted
+            ts.done(job.name)
+            resolved.add(job.name)
+            if prefetcher is not None and (outcome is None or outcome.memoized):
+                prefetcher.drop(job.name)
+            if outcome is not None:
+                stage_outcomes[job.stage].append(outcome)
+                if self.fails_fast(outcome):
+                    halted = True
+                    self.abort_jobs(list(running.values()))
+                if not outcome.success:
+                    failed_jobs.add(job.name)
+                    if first_error is None and not outcome.aborted:
+                        first_error = outcome.error
+                if outcome.allowed_failure:
+                    failed_jobs.add(job.name)
+            unresolved[job.stage] -= 1
+            if unresolved[job.stage] == 0 and job.stage in stage_outcomes:
+                cb.on_stage_complete(job.stage, stage_outcomes[job.stage])
+
+        def collect_ready() -> None:
+            while True:
+                names = ts.get_ready()
+                if not names:
+                    return
+                for name in names:
+                    job = job_map.get(name)
+                    if job is None:
+                        ts.done(name)
+                    elif dag_should_skip(job, failed_jobs):
+                        resolve(job, None)
+                    else:
+                        ready.append(job)
+
+        def start_stage(stage: str) -> None:
+            if stage in stage_outcomes:
+                return
+            stage_outcomes[stage] = []
+            runnable = [j for j in jobs_by_stage.get(stage, []) if j.when not in {"never", "manual"}]
+            cb.on_stage_start(stage, runnable)
+
+        completions = CompletionQueue()
+        with self.borrow_pool(self.maximum_degree_of_parallelism) as pool:
+            try:
+                while True:
+                    if not cancelled and cb.is_cancelled():
+                        cancelled = True
+
+                    if not cancelled and not halted:
+                        while True:
+                            collect_ready()
+                            ready[:] = self.order_by_priority(ready)
+                            job = self.next_admissible(ready, len(running), self.maximum_degree_of_parallelism)
+                            if job is None:
+                                break
+                            start_stage(job.stage)
+                            memoized = self.check_memoized(job)
+                            if memoized is not None:
+                                self.complete_memoized(memoized)
+                                resolve(job, memoized)
+                                continue
+                            prepared = prefetcher.take(job.name) if prefetcher is not None else None
+                            fut, submitted = self.submit_job(
+                                pool, job, inner_worker=inner_worker, use_worktrees=use_worktrees, prepared=prepared
+                            )
+                            running[fut] = submitted
+                            completions.watch(fut)
+                        if prefetcher is not None:
+                            running_names = {job.name for job in running.values()}
+                            self.prefetch_ahead(
+                                prefetcher, ready, running_names, upstreams, resolved, job_map, failed_jobs
+                            )
+
+                    if not running:
+                        break
+
+                    cb.poll_during_parallel(running)
+                    try:
+                        done = completions.wait(self.idle_timeout(ready))
+                    except BaseException:
+                        # Detached process groups don't see the terminal's Ctrl-C.
+                        self.abort_jobs(list(running.values()))
+                        raise
+                    for fut in done:
+                        job = running.pop(fut)
+                        resolve(job, self.finish_job(fut, job, use_worktrees=use_worktrees))
+            finally:
+                if prefetcher is not None:
+                    prefetcher.close()
+
+        return cancelled, first_error
+
+    def make_prefetcher(self, use_worktrees: bool) -> Prefetcher | None:
+        """Return a :class:`Prefetcher` when prepare-ahead applies, else None."""
+        if not use_worktrees or not self.scheduler_config.prefetch:
+            return None
+        return Prefetcher(
+            self.job_executor,
+            self.job_executor.project_dir,
+            self.worktree_config.root,
+            self.maximum_degree_of_parallelism,
+        )
+
+    def prefetch_ahead(
+        self,
+        prefetcher: Prefetcher,
+        ready: list[JobConfig],
+        running: set[str],
+        upstreams: dict[str, list[str]],
+        resolved: set[str],
+        job_map: dict[str, JobConfig],
+        failed_jobs: set[str],
+    ) -> None:
+        """Start preparing the jobs most likely to be submitted next.
+
+        Candidates are ready jobs still waiting for a slot, and jobs whose only
+        unresolved upstream is running right now.  They are prepared in
+        priority order, up to the prefetcher's limit.
+        """
+        queued = {job.name for job in ready}
+        candidates = list(ready)
+        for name, deps in upstreams.items():
+            if name in resolved or name in running or name in queued:
+                continue
+            pending = [dep for dep in deps if dep not in resolved]
+            if len(pending) != 1 or pending[0] not in running:
+                continue
+            job = job_map.get(name)
+            if job is not None and not dag_should_skip(job, failed_jobs):
+                candidates.append(job)
+        for job in self.order_by_priority(candidates):
+            if not prefetcher.has_room():
+                return
+            if prefetcher.wants(job.name):
+                restore = prefetcher.can_restore_cache(job, self.completed_jobs)
+                prefetcher.start(job, self.completed_jobs, restore)
+
     def run_batch(self, jobs: list[JobConfig]) -> list[JobOutcome]:
         """Execute a batch of ready jobs, serial or parallel."""
         if self.maximum_degree_of_parallelism == 1 or len(jobs) == 1:
@@ -2,14 +2,16 @@ from __future__ import annotations
 
 import os
 import re
-import subprocess  # nosec B404
 import time
+import uuid
+import weakref
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping
 from pathlib import Path
 
+from bitrab.git_state import repo_state
 from bitrab.models.pipeline import JobConfig
 
 REMOTE_URL_RE = re.compile(r"[:/]([^/]+)/([^/.]+?)(?:\.git)?$")
-GIT_FIELD_SEP = "\x1f"
 
 
 def parse_dotenv(text: str) -> dict[str, str]:
@@ -74,49 +76,150 @@ def load_dotenv_files(project_dir: Path) -> dict[str, str]:
     return combined
 
 
+class SharedEnv(Mapping[str, str]):
+    """The read-only environment every job of a run starts from.
+
+    After :func:`ship_env` has handed it to a process pool's workers it pickles
+    as its key alone, so submitting a job no longer copies ``os.environ`` into
+    the worker.
+    """
+
+    def __init__(self, data: Mapping[str, str], key: str | None = None) -> None:
+        self.data = dict(data)
+        self.key = key or uuid.uuid4().hex
+
+    def __getitem__(self, name: str) -> str:
+        return self.data[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __reduce__(self) -> tuple[object, tuple[object, ...]]:
+        if SHIPPED_ENVS.get(self.key) is self:
+            return (shipped_env, (self.key,))
+        return (SharedEnv, (self.data, self.key))
+
+
+# Bases delivered to pool workers, by key.  Parent side: everything shipped
+# and still alive.  Worker side: what the pool initializer received.
+SHIPPED_ENVS: weakref.WeakValueDictionary[str, SharedEnv] = weakref.WeakValueDictionary()
+# Keeps received bases alive in a worker; a worker serves only one pool.
+RECEIVED_ENVS: list[SharedEnv] = []
+
+
+def ship_env(base: SharedEnv) -> tuple[str, dict[str, str]]:
+    """Return *base* as a pool initializer argument for :func:`receive_env`.
+
+    From now on *base* pickles by reference, so only pass jobs that use it to
+    pools created with this payload.
+    """
+    SHIPPED_ENVS[base.key] = base
+    return (base.key, base.data)
+
+
+def receive_env(payload: tuple[str, dict[str, str]]) -> None:
+    """Worker side of :func:`ship_env`: install the base under its key."""
+    key, data = payload
+    if key not in SHIPPED_ENVS:
+        base = SharedEnv(data, key)
+        RECEIVED_ENVS.append(base)
+        SHIPPED_ENVS[key] = base
+
+
+def shipped_env(key: str) -> SharedEnv:
+    """Unpickle a :class:`SharedEnv` sent by reference."""
+    base = SHIPPED_ENVS.get(key)
+    if base is None:
+        raise RuntimeError(f"Shared job environment {key} was never shipped to this process")
+    return base
+
+
+class LayeredEnv(MutableMapping[str, str]):
+    """A job's environment: a shared base plus the job's own changes.
+
+    Writes and deletions only touch the small overlay, so building or copying
+    a job environment costs the size of the job's variables rather than of
+    ``os.environ``.  :meth:`materialize` builds the plain dict for ``Popen``.
+    """
+
+    def __init__(
+        self,
+        base: Mapping[str, str],
+        overlay: Mapping[str, str] | None = None,
+        removed: Iterable[str] | None = None,
+    ) -> None:
+        self.base = base
+        self.overlay: dict[str, str] = dict(overlay or {})
+        self.removed: set[str] = set(removed or ())
+
+    def __getitem__(self, name: str) -> str:
+        if name in self.overlay:
+            return self.overlay[name]
+        if name in self.removed:
+            raise KeyError(name)
+        return self.base[name]
+
+    def __setitem__(self, name: str, value: str) -> None:
+        self.overlay[name] = value
+        self.removed.discard(name)
+
+    def __delitem__(self, name: str) -> None:
+        if name not in self:
+            raise KeyError(name)
+        self.overlay.pop(name, None)
+        if name in self.base:
+            self.removed.add(name)
+
+    def __contains__(self, name: object) -> bool:
+        if name in self.overlay:
+            return True
+        return name not in self.removed and name in self.base
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.overlay
+        for name in self.base:
+            if name not in self.overlay and name not in self.removed:
+                yield name
+
+    def __len__(self) -> int:
+        # ``removed`` only ever holds base names that are not in the overlay.
+        return len(self.base) + sum(1 for name in self.overlay if name not in self.base) - len(self.removed)
+
+    def __repr__(self) -> str:
+        return f"LayeredEnv(<{len(self.base)} shared>, overlay={self.overlay!r}, removed={sorted(self.removed)!r})"
+
+    def copy(self) -> LayeredEnv:
+        """Copy the overlay; the base stays shared."""
+        return LayeredEnv(self.base, self.overlay, self.removed)
+
+    def materialize(self) -> dict[str, str]:
+        """Return the whole environment as one plain dict (one copy of the base)."""
+        env = self.base.data.copy() if isinstance(self.base, SharedEnv) else dict(self.base)
+        for name in self.removed:
+            env.pop(name, None)
+        env.update(self.overlay)
+        return env
+
+
 # A simple incrementing counter used to generate unique-per-process job IDs.
 # GitLab uses globally unique integer IDs; we just need something non-empty and
 # distinct across jobs within a single run.
 job_id_counter = 0
 
 
-def git(args: list[str], cwd: Path) -> str:
-    """Run a git command and return stripped stdout, or '' on any failure."""
-    try:
-        result = subprocess.run(  # nosec B603 B607
-            ["git", *args],
-            capture_output=True,
-            text=True,
-            cwd=cwd,
-            timeout=5,
-            check=False,
-        )
-        return result.stdout.strip() if result.returncode == 0 else ""
-    except Exception:
-        return ""
-
-
 def git_head_metadata(project_dir: Path) -> tuple[str, str, str, str, str, str]:
-    """Return HEAD-derived metadata in one git call.
+    """Return HEAD-derived metadata from the run's shared :class:`~bitrab.git_state.GitRepoState`.
 
     The tuple contains:
       sha, author_name, author_email, timestamp, commit_title, commit_message
     """
-    output = git(
-        [
-            "log",
-            "-1",
-            f"--pretty=%H{GIT_FIELD_SEP}%an{GIT_FIELD_SEP}%ae{GIT_FIELD_SEP}%cI{GIT_FIELD_SEP}%s{GIT_FIELD_SEP}%B",
-            "HEAD",
-        ],
-        project_dir,
-    )
-    if not output:
-        return ("", "", "", "", "", "")
-    parts = output.split(GIT_FIELD_SEP, 5)
-    if len(parts) != 6:
-        return ("", "", "", "", "", "")
-    return tuple(parts)  # type: ignore[return-value]
+    return repo_state(project_dir).head_metadata()
 
 
 def project_identity_from_remote(remote_url: str) -> tuple[str, str, str]:
@@ -285,7 +388,8 @@ def derive_git_variables(project_dir: Path) -> dict[str, str]:
     (``[ -n "$CI_COMMIT_TAG" ]``) behave the same as they would in GitLab when
     there is no tag.
     """
-    sha, author_name, author_email, timestamp, commit_title, commit_message = git_head_metadata(project_dir)
+    state = repo_state(project_dir)
+    sha, author_name, author_email, timestamp, commit_title, commit_message = state.head_metadata()
     if not sha:
         return {
             "CI_COMMIT_SHA": "",
@@ -305,13 +409,13 @@ def derive_git_variables(project_dir: Path) -> dict[str, str]:
         }
 
     short_sha = sha[:8] if sha else ""
-    branch = git(["branch", "--show-current"], project_dir)
-    tag = git(["describe", "--tags", "--exact-match", "HEAD"], project_dir)
+    branch = state.branch()
+    tag = state.tag()
     ref_name = tag if tag else branch
     ref_slug = ref_name.replace("/", "-")[:63]  # GitLab slugifies refs
 
     # Remote URL → derive CI_PROJECT_NAMESPACE / CI_PROJECT_PATH
-    remote_url = git(["remote", "get-url", "origin"], project_dir)
+    remote_url = state.remote_url("origin")
     project_namespace, project_path, project_url = project_identity_from_remote(remote_url)
 
     return {
@@ -361,13 +465,14 @@ class VariableManager:
         # Strip per-job CI vars that may be leaking in from a parent bitrab/GitLab
         # process — otherwise a nested run inherits stale per-job state (e.g. a
         # pytest job inside `bitrab run` seeing the outer job's CI_JOB_DIR).
+        # Jobs only ever layer on top of it (see :class:`LayeredEnv`).
         base = os.environ.copy()
         for leaked in ("CI_JOB_DIR", "CI_JOB_ID", "CI_JOB_STAGE", "CI_JOB_NAME", "CI_JOB_URL"):
             base.pop(leaked, None)
-        self.shared_base_env = base
-        self.shared_base_env.update(self.gitlab_ci_vars)
-        self.shared_base_env.update(self.dotenv_vars)
-        self.shared_base_env.update(self.base_variables)
+        base.update(self.gitlab_ci_vars)
+        base.update(self.dotenv_vars)
+        base.update(self.base_variables)
+        self.shared_base_env = SharedEnv(base)
 
     def get_gitlab_ci_variables(self) -> dict[str, str]:
         """
@@ -426,7 +531,7 @@ class VariableManager:
         base.update(derive_git_variables(self.project_dir))
         return base
 
-    def prepare_environment(self, job: JobConfig) -> dict[str, str]:
+    def prepare_environment(self, job: JobConfig) -> LayeredEnv:
         """
         Prepare environment variables for job execution.
 
@@ -434,13 +539,13 @@ class VariableManager:
             job: The job configuration.
 
         Returns:
-            A dictionary of prepared environment variables.
+            The job's variables layered over the shared base environment.
         """
         global job_id_counter
         job_id_counter += 1
 
-        # Start from the pre-computed base instead of os.environ.copy()
-        env = self.shared_base_env.copy()
+        # Layer over the pre-computed base instead of copying it
+        env = LayeredEnv(self.shared_base_env)
 
         # Apply job-specific variables
         env.update(job.variables)
@@ -0,0 +1,238 @@
+"""Pre-started bash processes that each run exactly one script.
+
+Every ``execute_scripts`` call used to pay for a fresh ``bash`` — fork, exec,
+dynamic linking and, with ``BITRAB_RUN_LOAD_BASHRC``, the whole login
+profile — on the job's critical path.  A :class:`ShellPool` keeps ``size``
+bash processes started ahead of time, blocked on reading their (still empty)
+stdin.  :func:`bitrab.execution.shell.run_bash` takes one, sends it a short
+preamble that turns the environment and working directory it was started
+with into the ones the script asked for, then the script itself.  A shell is
+never reused, so each script still gets a clean interpreter; a replacement is
+started in the background as soon as one is taken.
+
+When the pool is empty, or the requested environment touches a variable bash
+only reads at startup (see :data:`STARTUP_VARS`), the caller falls back to
+spawning bash the usual way.
+
+Enable it with ``warm_shells = N`` under ``[tool.bitrab]``.  The asyncio
+backend, whose event loop owns its subprocesses, does not use it.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import re
+import shlex
+import subprocess  # nosec
+import threading
+from collections import deque
+from typing import Any
+
+# Variables bash maintains itself; a fresh bash would overwrite them too.
+BASH_MANAGED = frozenset({"PWD", "OLDPWD", "SHLVL", "_"})
+
+# Variables that only take effect while bash starts up, or that bash refuses
+# to assign.  A script whose environment changes one of them gets a cold shell.
+STARTUP_VARS = frozenset(
+    {
+        "BASH_ENV",
+        "BASHOPTS",
+        "ENV",
+        "HOME",
+        "POSIXLY_CORRECT",
+        "SHELLOPTS",
+        "BASH_VERSINFO",
+        "EUID",
+        "PPID",
+        "UID",
+        "GROUPS",
+    }
+)
+
+SHELL_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*\Z")
+
+
+def env_preamble(spawn_env: dict[str, str], env: dict[str, str], cwd: str | os.PathLike[str] | None) -> str | None:
+    """Return bash lines that turn *spawn_env* into *env* and enter *cwd*.
+
+    Returns None when a warm shell cannot reproduce what a fresh ``bash``
+    started with *env* would see: a changed name is not a valid shell
+    identifier (e.g. an exported function), or it is one of
+    :data:`STARTUP_VARS`.
+    """
+    lines: list[str] = []
+    for name in spawn_env:
+        if name in env or name in BASH_MANAGED:
+            continue
+        if name in STARTUP_VARS or not SHELL_NAME_RE.match(name):
+            return None
+        lines.append(f"unset {name}")
+    for name, value in env.items():
+        if name in BASH_MANAGED or spawn_env.get(name) == value:
+            continue
+        if name in STARTUP_VARS or not SHELL_NAME_RE.match(name):
+            return None
+        lines.append(f"export {name}={shlex.quote(value)}")
+    if cwd is not None:
+        # Popen(cwd=...) fails before bash starts; exit like bash does for a missing command.
+        lines.append(f"cd -- {shlex.quote(str(cwd))} || exit 127")
+    return "\n".join(lines) + "\n"
+
+
+class WarmShell:
+    """A started bash waiting for its script, with the environment it was started with."""
+
+    def __init__(self, proc: subprocess.Popen[str], spawn_env: dict[str, str]) -> None:
+        self.proc = proc
+        self.spawn_env = spawn_env
+
+    def discard(self) -> None:
+        """Close stdin so the unused bash exits, and reap it."""
+        try:
+            self.proc.communicate(timeout=5)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            self.proc.kill()
+            self.proc.wait()
+
+
+class ShellPool:
+    """Keeps up to *size* bash processes running *command* ready to be handed a script.
+
+    Shells are started in their own process group (see
+    :func:`bitrab.execution.shell.process_group_kwargs`), because whether the
+    script will need one is not known in advance.
+    """
+
+    def __init__(self, command: list[str], size: int) -> None:
+        self.command = command
+        self.size = size
+        self.lock = threading.Lock()
+        self.ready: deque[WarmShell] = deque()
+        self.refilling = False
+        self.closed = False
+
+    def spawn(self) -> WarmShell:
+        """Start one bash with a snapshot of the current environment."""
+        from bitrab.execution.shell import process_group_kwargs
+
+        spawn_env = os.environ.copy()
+        proc = subprocess.Popen(  # nosec
+            self.command,
+            env=spawn_env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=0,
+            **process_group_kwargs(),
+        )
+        return WarmShell(proc, spawn_env)
+
+    def take(self) -> WarmShell | None:
+        """Hand out a ready shell (None if none is ready) and start refilling."""
+        shell: WarmShell | None = None
+        with self.lock:
+            while self.ready:
+                candidate = self.ready.popleft()
+                if candidate.proc.poll() is None:
+                    shell = candidate
+                    break
+                # Died while idle (e.g. a failing profile); reap it.
+                candidate.discard()
+        self.refill()
+        return shell
+
+    def refill(self) -> None:
+        """Top the pool back up to *size* on a background thread."""
+        with self.lock:
+            if self.refilling or self.closed or len(self.ready) >= self.size:
+                return
+            self.refilling = True
+        threading.Thread(target=self.fill, name="bitrab-warm-shells", daemon=True).start()
+
+    def fill(self) -> None:
+        try:
+            while True:
+                with self.lock:
+                    if self.closed or len(self.ready) >= self.size:
+                        return
+                try:
+                    shell = self.spawn()
+                except OSError:
+                    return
+                with self.lock:
+                    if not self.closed:
+                        self.ready.append(shell)
+                        continue
+                shell.discard()
+                return
+        finally:
+            with self.lock:
+                self.refilling = False
+
+    def close(self) -> None:
+        """Stop refilling and let every idle shell exit."""
+        with self.lock:
+            self.closed = True
+            idle, self.ready = list(self.ready), deque()
+        for shell in idle:
+            shell.discard()
+
+
+POOLS: dict[tuple[tuple[str, ...], int], ShellPool] = {}
+POOLS_LOCK = threading.Lock()
+
+
+def shell_pool(command: list[str], size: int) -> ShellPool:
+    """Return this process's pool for *command*, creating it on first use."""
+    key = (tuple(command), size)
+    with POOLS_LOCK:
+        pool = POOLS.get(key)
+        if pool is None:
+            pool = POOLS[key] = ShellPool(command, size)
+    return pool
+
+
+def close_pools() -> None:
+    """Shut down every pool of this process (registered with :mod:`atexit`)."""
+    with POOLS_LOCK:
+        pools = list(POOLS.values())
+        POOLS.clear()
+    for pool in pools:
+        pool.close()
+
+
+def forget_pools_in_child() -> None:
+    # A forked child shares the parent's warm shells' pipes.  Closing its
+    # copies keeps a parent's shell from waiting forever for a stdin EOF.
+    for pool in POOLS.values():
+        for shell in pool.ready:
+            for pipe in (shell.proc.stdin, shell.proc.stdout, shell.proc.stderr):
+                if pipe is not None:
+                    try:
+                        pipe.close()
+                    except OSError:
+                        pass
+    POOLS.clear()
+
+
+def warm_shell_for(command: list[str], size: int, env: dict[str, str], cwd: Any) -> tuple[WarmShell, str] | None:
+    """Take a warm shell for a script that should see *env* in *cwd*.
+
+    Returns the shell and the preamble to send before the script, or None
+    when the caller should start bash itself.
+    """
+    shell = shell_pool(command, size).take()
+    if shell is None:
+        return None
+    preamble = env_preamble(shell.spawn_env, env, cwd)
+    if preamble is None:
+        shell.discard()
+        return None
+    return shell, preamble
+
+
+atexit.register(close_pools)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=forget_pools_in_child)
@@ -7,8 +7,9 @@ The ``.bitrab/`` directory accumulates several kinds of content:
 * **Artifact directories** – ``.bitrab/artifacts/<job_name>/`` – files
   collected from job output by the artifacts subsystem.
 * **Log directories** – ``.bitrab/logs/<run_id>/`` – one directory per
-  pipeline run containing a JSON event log and a text summary.  The
-  ``run_id`` is a ``YYYYMMDD_HHMMSS_<short-uuid>`` string.
+  pipeline run containing a JSON event log, a text summary and, for runs
+  that wrote job logs (CI mode), each job's compressed output under
+  ``jobs/``.  The ``run_id`` is a ``YYYYMMDD_HHMMSS_<short-uuid>`` string.
 
 Public API
 ----------
@@ -16,6 +17,7 @@ Public API
 - :func:`scan_folder` – return a :class:`FolderSummary` describing current state
 - :func:`list_runs` – return :class:`RunRecord` objects for every persisted run
 - :func:`prune_runs` – delete the oldest runs, keeping *keep* most recent
+- :func:`find_job_log` – locate one job's output log inside a run
 - :func:`clean_artifacts` – delete all artifact directories
 - :func:`clean_cache` – delete the shared cache store
 - :func:`clean_fingerprints` – delete the fingerprint store
@@ -163,6 +165,8 @@ class RunRecord:
     total_duration_s: float
     job_count: int
     size_bytes: int  # pre-recorded in meta.json; 0 if missing
+    # job name -> output log path relative to run_dir (see bitrab.execution.joblog)
+    job_logs: dict[str, str] = field(default_factory=dict)
 
     @property
     def human_size(self) -> str:
@@ -357,6 +361,7 @@ def list_runs(project_dir: Path) -> list[RunRecord]:
                     total_duration_s=float(meta.get("total_duration_s", 0.0)),
                     job_count=int(meta.get("job_count", 0)),
                     size_bytes=int(meta.get("size_bytes", 0)),
+                    job_logs=dict(meta.get("job_logs") or {}),
                 )
             )
     except OSError:
@@ -366,6 +371,23 @@ def list_runs(project_dir: Path) -> list[RunRecord]:
     return records
 
 
+def find_job_log(rec: RunRecord, job: str) -> Path | None:
+    """Return the output log of *job* in run *rec*, or None if it has none.
+
+    *job* may be the job's name or its sanitized directory name.
+    """
+    from bitrab.utils import sanitize_job_name
+
+    relative = rec.job_logs.get(job)
+    if relative is None:
+        matches = [path for name, path in rec.job_logs.items() if sanitize_job_name(name) == job]
+        relative = matches[0] if len(matches) == 1 else None
+    if relative is None:
+        return None
+    path = rec.run_dir / relative
+    return path if path.exists() else None
+
+
 def prune_runs(project_dir: Path, keep: int) -> list[str]:
     """Delete the oldest run directories, keeping the *keep* most recent.
 
@@ -486,17 +508,22 @@ def write_run_log(
     events_json: list[dict[str, Any]],
     summary_text: str,
     meta: dict[str, Any],
+    job_logs: dict[str, Path] | None = None,
 ) -> Path:
     """Persist a run log to ``.bitrab/logs/<run_id>/``.
 
     Creates three files:
 
     * ``meta.json`` – lightweight metadata (success, duration, job count,
-      started_at, size_bytes).  Size is computed *after* writing the other
-      two files and then patched in.
+      started_at, size_bytes, job_logs).  Size is computed *after* writing
+      the other files and then patched in.
     * ``events.jsonl`` – one JSON object per line, one event per line.
     * ``summary.txt`` – the human-readable text summary.
 
+    *job_logs* maps job names to compressed output logs (see
+    :mod:`bitrab.execution.joblog`); they are moved, with their indexes,
+    into ``jobs/``.
+
     Returns the run directory path.
     """
     run_id = make_run_id()
@@ -514,6 +541,9 @@ def write_run_log(
     summary_path = run_dir / "summary.txt"
     summary_path.write_text(summary_text, encoding="utf-8")
 
+    if job_logs:
+        meta["job_logs"] = move_job_logs(run_dir, job_logs)
+
     # Compute size and write meta (size_bytes includes events + summary)
     size_bytes = dir_size_bytes(run_dir)
     meta["size_bytes"] = size_bytes
@@ -524,6 +554,29 @@ def write_run_log(
     return run_dir
 
 
+def move_job_logs(run_dir: Path, job_logs: dict[str, Path]) -> dict[str, str]:
+    """Move job output logs into ``run_dir/jobs/``; return name -> relative path."""
+    from bitrab.execution.joblog import index_path
+    from bitrab.utils import sanitize_job_name
+
+    jobs_dir = run_dir / "jobs"
+    jobs_dir.mkdir(exist_ok=True)
+    moved: dict[str, str] = {}
+    for name, source in job_logs.items():
+        target = jobs_dir / f"{sanitize_job_name(name)}{''.join(source.suffixes) or '.log'}"
+        try:
+            shutil.move(str(source), str(target))
+        except OSError:
+            continue
+        if index_path(source).exists():
+            try:
+                shutil.move(str(index_path(source)), str(index_path(target)))
+            except OSError:
+                pass
+        moved[name] = target.relative_to(run_dir).as_posix()
+    return moved
+
+
 def maybe_warn_size(
     project_dir: Path,
     warn_threshold_bytes: int = SIZE_WARN_BYTES_DEFAULT,
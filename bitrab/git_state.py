@@ -0,0 +1,496 @@
+"""One shared view of a git checkout for a whole run.
+
+Several parts of bitrab ask git about the project:
+
+* :func:`bitrab.execution.variables.derive_git_variables` wants HEAD's commit,
+  branch, tag and ``origin`` URL.
+* :mod:`bitrab.changes` wants the default branch, a merge-base and the changed
+  paths.
+* :func:`bitrab.execution.fingerprint.git_tree_digest` wants the index and the
+  unstaged diff.
+* :mod:`bitrab.git_worktree` wants to know whether this is a repository, and
+  whether it is dirty.
+
+Each used to start its own ``git`` processes, and some were started twice per
+run (the variables are built once for ``workflow:rules`` and once for the
+jobs).  On a slow or network-mounted filesystem every one of them costs tens
+of milliseconds.
+
+:class:`GitRepoState` answers all of these questions and remembers the
+answers.  Whatever can be read straight from ``.git`` is: HEAD, loose refs,
+``packed-refs`` and the ``origin`` URL in ``config``.  That covers whether
+this is a repository, the current branch, the remote URL and most baseline
+lookups.  The rest is batched:
+
+* one ``git log`` yields the commit metadata together with HEAD's tags;
+* one ``git status -z`` yields staged, unstaged and untracked paths, and
+  answers the dirty check too.
+
+Git is asked instead of reading the files whenever they might not tell the
+whole story, for example:
+
+* ``GIT_DIR`` and similar variables relocate the repository;
+* the repository uses the reftable ref backend;
+* the checkout belongs to another user (git's ``safe.directory`` check);
+* the repository lies across a filesystem boundary;
+* the config rewrites URLs with ``insteadOf``.
+
+:func:`shared_repo_state` makes one snapshot current for a project while a
+pipeline runs; :func:`repo_state` returns it to every caller.  Outside that
+scope each call gets a fresh state, so later changes to the repository are
+always seen.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import subprocess  # nosec
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+FIELD_SEP = "\x1f"
+HEX_SHA_RE = re.compile(r"[0-9a-f]{40}(?:[0-9a-f]{24})?\Z")
+# A revision that can only be a ref name: no ``~``/``^``/``@{}`` syntax, not an
+# abbreviated object id and not a pseudo-ref such as ``FETCH_HEAD``.
+PLAIN_REF_RE = re.compile(r"(?![0-9a-fA-F]{4,64}\Z)(?![A-Z_]+\Z)[A-Za-z0-9_./-]+\Z")
+# Where git looks for a short ref name, in order (see gitrevisions(7)).
+REF_RULES = ("{}", "refs/{}", "refs/tags/{}", "refs/heads/{}", "refs/remotes/{}", "refs/remotes/{}/HEAD")
+# Refs that live in a linked worktree's own git dir rather than the shared one.
+PER_WORKTREE_REFS = ("HEAD", "refs/worktree/", "refs/bisect/", "refs/rewritten/")
+# Environment variables that change where git finds the repository.
+GIT_LOCATION_VARS = (
+    "GIT_DIR",
+    "GIT_WORK_TREE",
+    "GIT_COMMON_DIR",
+    "GIT_CEILING_DIRECTORIES",
+    "GIT_DISCOVERY_ACROSS_FILESYSTEM",
+)
+CONFIG_SECTION_RE = re.compile(r'\[\s*([A-Za-z0-9.-]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]')
+
+
+@dataclass(frozen=True)
+class RepoLayout:
+    """Where a checkout keeps its git data; all None when there is no checkout."""
+
+    work_tree: Path | None
+    git_dir: Path | None
+    common_dir: Path | None
+
+
+NOT_A_REPO = RepoLayout(None, None, None)
+
+
+def read_text(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return None
+
+
+def find_layout(start: Path) -> RepoLayout | None:
+    """Find the checkout containing *start* the way git would.
+
+    Returns :data:`NOT_A_REPO` when there is none, or None when only git
+    itself can tell (see the module docstring).
+    """
+    if any(name in os.environ for name in GIT_LOCATION_VARS):
+        return None
+    try:
+        directory = start.resolve()
+        device = directory.stat().st_dev
+    except OSError:
+        return None
+    while True:
+        dotgit = directory / ".git"
+        if dotgit.is_dir():
+            git_dir = dotgit
+            break
+        if dotgit.is_file():
+            text = read_text(dotgit) or ""
+            if not text.startswith("gitdir:"):
+                return None
+            git_dir = (directory / text[len("gitdir:") :].strip()).resolve()
+            break
+        if (directory / "HEAD").is_file() and (directory / "objects").is_dir():
+            return None  # inside a git dir or a bare repository
+        parent = directory.parent
+        if parent == directory:
+            return NOT_A_REPO
+        try:
+            if parent.stat().st_dev != device:
+                return None  # git stops at filesystem boundaries unless told otherwise
+        except OSError:
+            return None
+        directory = parent
+    if not (git_dir / "HEAD").is_file():
+        return None
+    commondir = read_text(git_dir / "commondir")
+    common_dir = (git_dir / commondir.strip()).resolve() if commondir else git_dir
+    if (common_dir / "reftable").exists():
+        return None
+    getuid = getattr(os, "getuid", None)
+    if getuid is not None:
+        try:
+            if directory.stat().st_uid != getuid():
+                return None
+        except OSError:
+            return None
+    return RepoLayout(directory, git_dir, common_dir)
+
+
+def shorten_ref(ref: str) -> str:
+    """Return *ref* the way ``git symbolic-ref --short`` prints it."""
+    for prefix in ("refs/heads/", "refs/tags/", "refs/remotes/", "refs/"):
+        if ref.startswith(prefix):
+            return ref[len(prefix) :]
+    return ref
+
+
+def config_value(value: str) -> str:
+    """Unquote a git config value and drop a trailing comment."""
+    out: list[str] = []
+    quoted = False
+    index = 0
+    while index < len(value):
+        char = value[index]
+        if char == "\\" and index + 1 < len(value):
+            index += 1
+            out.append({"n": "\n", "t": "\t", "b": "\b"}.get(value[index], value[index]))
+        elif char == '"':
+            quoted = not quoted
+        elif char in "#;" and not quoted:
+            break
+        else:
+            out.append(char)
+        index += 1
+    return "".join(out).strip()
+
+
+def user_config_files() -> list[Path]:
+    """Config files besides the repository's own that git reads."""
+    files = [Path("/etc/gitconfig")]
+    xdg = os.environ.get("XDG_CONFIG_HOME")
+    files.append(Path(xdg) / "git" / "config" if xdg else Path.home() / ".config" / "git" / "config")
+    files.append(Path.home() / ".gitconfig")
+    for name in ("GIT_CONFIG_GLOBAL", "GIT_CONFIG_SYSTEM"):
+        if os.environ.get(name):
+            files.append(Path(os.environ[name]))
+    return files
+
+
+class GitRepoState:
+    """Answers for one checkout, each computed at most once.
+
+    Every public method is safe to call from several threads; concurrent
+    callers of the same query wait for one git process.
+    """
+
+    def __init__(self, project_dir: Path) -> None:
+        self.project_dir = Path(project_dir)
+        self.lock = threading.RLock()
+        self.memo: dict[tuple[Any, ...], Any] = {}
+        # git processes started, for tests and ``--verbose`` diagnostics.
+        self.calls = 0
+        self.worktrees_pruned = False
+
+    def cached(self, key: tuple[Any, ...], compute: Callable[[], Any]) -> Any:
+        with self.lock:
+            if key not in self.memo:
+                self.memo[key] = compute()
+            return self.memo[key]
+
+    def git(self, *args: str) -> bytes | None:
+        """Run ``git -C <project> *args``; stdout on success, None otherwise."""
+        with self.lock:
+            self.calls += 1
+        try:
+            result = subprocess.run(  # nosec
+                ["git", "-C", str(self.project_dir), *args],
+                capture_output=True,
+                check=False,
+                timeout=60,
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return result.stdout if result.returncode == 0 else None
+
+    # ----- layout and refs ---------------------------------------------------
+
+    def git_available(self) -> bool:
+        return bool(self.cached(("git-available",), lambda: shutil.which("git") is not None))
+
+    def layout(self) -> RepoLayout | None:
+        """The checkout's git directories, or None when git must be asked."""
+        return self.cached(("layout",), lambda: find_layout(self.project_dir))
+
+    def is_repo(self) -> bool:
+        """True inside a git working tree (``git rev-parse --is-inside-work-tree``)."""
+
+        def compute() -> bool:
+            if not self.git_available():
+                return False
+            layout = self.layout()
+            if layout is not None:
+                return layout.work_tree is not None
+            output = self.git("rev-parse", "--is-inside-work-tree")
+            return output is not None and output.strip() == b"true"
+
+        return bool(self.cached(("is-repo",), compute))
+
+    def packed_refs(self) -> dict[str, str]:
+        """Map ref names in ``packed-refs`` to the objects they point at."""
+
+        def compute() -> dict[str, str]:
+            layout = self.layout()
+            text = read_text(layout.common_dir / "packed-refs") if layout and layout.common_dir else None
+            refs: dict[str, str] = {}
+            for line in (text or "").splitlines():
+                if line and line[0] not in "#^":
+                    sha, _, name = line.partition(" ")
+                    refs[name.strip()] = sha
+            return refs
+
+        return dict(self.cached(("packed-refs",), compute))
+
+    def read_ref_file(self, name: str) -> str | None:
+        layout = self.layout()
+        if layout is None or layout.git_dir is None or layout.common_dir is None:
+            return None
+        base = layout.git_dir if name.startswith(PER_WORKTREE_REFS) else layout.common_dir
+        text = read_text(base / name)
+        return text.strip() if text is not None else None
+
+    def symbolic_target(self, name: str) -> str | None:
+        """The full ref *name* points to if it is a symbolic ref (direct reads only)."""
+        content = self.read_ref_file(name)
+        if content is not None and content.startswith("ref:"):
+            return content[len("ref:") :].strip()
+        return None
+
+    def resolve_ref(self, name: str) -> str | None:
+        """Object id of the full ref *name*, following symbolic refs; None if it does not exist."""
+        for _ in range(5):
+            content = self.read_ref_file(name)
+            if content is None:
+                return self.packed_refs().get(name)
+            if not content.startswith("ref:"):
+                return content if HEX_SHA_RE.match(content) else None
+            name = content[len("ref:") :].strip()
+        return None
+
+    # ----- commit and identity -----------------------------------------------
+
+    def head_log(self) -> tuple[str, ...]:
+        """HEAD's sha, author name, author email, commit date, title, tags (``%D``) and message."""
+
+        def compute() -> tuple[str, ...]:
+            pretty = FIELD_SEP.join(("%H", "%an", "%ae", "%cI", "%s", "%D", "%B"))
+            output = self.git("log", "-1", "--decorate-refs=refs/tags/", f"--pretty={pretty}", "HEAD")
+            parts = output.decode("utf-8", errors="replace").strip().split(FIELD_SEP, 6) if output else []
+            return tuple(parts) if len(parts) == 7 else ("",) * 7
+
+        return tuple(self.cached(("head-log",), compute))
+
+    def head_metadata(self) -> tuple[str, str, str, str, str, str]:
+        """sha, author_name, author_email, timestamp, commit_title, commit_message."""
+        sha, name, email, timestamp, title, _decorations, message = self.head_log()
+        return sha, name, email, timestamp, title, message
+
+    def branch(self) -> str:
+        """The checked-out branch (``git branch --show-current``); '' when detached."""
+
+        def compute() -> str:
+            if self.layout() is None:
+                output = self.git("branch", "--show-current")
+                return output.decode("utf-8", errors="replace").strip() if output else ""
+            target = self.symbolic_target("HEAD")
+            return target[len("refs/heads/") :] if target and target.startswith("refs/heads/") else ""
+
+        return str(self.cached(("branch",), compute))
+
+    def tag(self) -> str:
+        """The tag at HEAD (``git describe --tags --exact-match``); '' when there is none."""
+
+        def compute() -> str:
+            decorations = self.head_log()[5]
+            tags = [part[len("tag: ") :] for part in decorations.split(", ") if part.startswith("tag: ")]
+            if len(tags) <= 1:
+                return tags[0] if tags else ""
+            # Several tags: let git apply its preference (annotated, then newest).
+            output = self.git("describe", "--tags", "--exact-match", "HEAD")
+            return output.decode("utf-8", errors="replace").strip() if output else ""
+
+        return str(self.cached(("tag",), compute))
+
+    def remote_url(self, remote: str = "origin") -> str:
+        """URL of *remote* (``git remote get-url``); '' when it is not configured."""
+
+        def compute() -> str:
+            url = self.config_remote_url(remote)
+            if url is None:
+                output = self.git("remote", "get-url", remote)
+                return output.decode("utf-8", errors="replace").strip() if output else ""
+            return url
+
+        return str(self.cached(("remote-url", remote), compute))
+
+    def config_remote_url(self, remote: str) -> str | None:
+        """Read the remote's URL from ``.git/config``; None when git must resolve it."""
+        layout = self.layout()
+        if layout is None or layout.common_dir is None:
+            return None
+        text = read_text(layout.common_dir / "config")
+        if text is None:
+            return None
+        if re.search(r"^\s*\[\s*include", text, re.IGNORECASE | re.MULTILINE):
+            return None
+        for path in user_config_files():
+            other = read_text(path)
+            if other and "insteadof" in other.lower():
+                return None
+        if "insteadof" in text.lower():
+            return None
+        section: tuple[str, str | None] | None = None
+        for raw in text.splitlines():
+            line = raw.strip()
+            match = CONFIG_SECTION_RE.match(line)
+            if match:
+                section = (match.group(1).lower(), match.group(2))
+                line = line[match.end() :].strip()
+            if section != ("remote", remote) or "=" not in line:
+                continue
+            key, _, value = line.partition("=")
+            if key.strip().lower() == "url":
+                return config_value(value)
+        return ""
+
+    # ----- working tree -------------------------------------------------------
+
+    def status(self) -> bytes | None:
+        """``git status --porcelain -z --untracked-files=all`` output, None on failure."""
+        return self.cached(("status",), lambda: self.git("status", "--porcelain", "-z", "--untracked-files=all"))
+
+    def is_dirty(self) -> bool:
+        """True with uncommitted changes or untracked (non-ignored) files."""
+        return bool(self.status())
+
+    def worktree_changes(self) -> set[str] | None:
+        """Staged, unstaged and untracked paths; None when git failed."""
+        output = self.status()
+        if output is None:
+            return None
+        paths: set[str] = set()
+        entries = iter(output.split(b"\0"))
+        for entry in entries:
+            if len(entry) < 4:
+                continue
+            paths.add(entry[3:].decode("utf-8", errors="surrogateescape").replace("\\", "/"))
+            if entry[:1] in (b"R", b"C") or entry[1:2] in (b"R", b"C"):
+                next(entries, None)  # the rename / copy source follows
+        return paths
+
+    def tree_listing(self) -> tuple[bytes, bytes] | None:
+        """``git ls-files -s -z`` and ``git diff`` output, None outside a repository."""
+
+        def compute() -> tuple[bytes, bytes] | None:
+            ls_files = self.git("ls-files", "-s", "-z")
+            diff = self.git("diff") if ls_files is not None else None
+            return (ls_files, diff) if ls_files is not None and diff is not None else None
+
+        return self.cached(("tree-listing",), compute)
+
+    # ----- revisions ------------------------------------------------------------
+
+    def symbolic_ref_short(self, name: str) -> str | None:
+        """``git symbolic-ref --quiet --short <name>``; None when *name* is not symbolic."""
+
+        def compute() -> str | None:
+            if self.layout() is None:
+                output = self.git("symbolic-ref", "--quiet", "--short", name)
+                return output.decode("utf-8", errors="replace").strip() if output else None
+            target = self.symbolic_target(name)
+            return shorten_ref(target) if target else None
+
+        return self.cached(("symbolic-ref", name), compute)
+
+    def is_commit(self, rev: str) -> bool:
+        """True when *rev* names a commit (``git rev-parse --verify --quiet <rev>^{commit}``)."""
+
+        def compute() -> bool:
+            if self.layout() is not None:
+                found = False
+                for rule in REF_RULES:
+                    name = rule.format(rev)
+                    if self.resolve_ref(name):
+                        if name.startswith(("refs/heads/", "refs/remotes/")):
+                            return True  # branches always point at commits
+                        found = True
+                if not found and PLAIN_REF_RE.match(rev) and ".." not in rev:
+                    return False  # no such ref, and nothing else git could read it as
+            return self.git("rev-parse", "--verify", "--quiet", f"{rev}^{{commit}}") is not None
+
+        return bool(self.cached(("is-commit", rev), compute))
+
+    def merge_base(self, left: str, right: str) -> str | None:
+        def compute() -> str | None:
+            output = self.git("merge-base", left, right)
+            base = output.decode("ascii", errors="replace").strip() if output else ""
+            if not base:
+                return None
+            with self.lock:
+                self.memo[("is-commit", base)] = True
+            return base
+
+        return self.cached(("merge-base", left, right), compute)
+
+    def committed_changes(self, baseline: str) -> bytes | None:
+        """``git diff --name-only -z <baseline> HEAD`` output, None on failure."""
+        return self.cached(("diff", baseline), lambda: self.git("diff", "--name-only", "-z", baseline, "HEAD"))
+
+    def claim_worktree_prune(self) -> bool:
+        """True the first time it is called: ``git worktree prune`` once per run is enough."""
+        with self.lock:
+            first = not self.worktrees_pruned
+            self.worktrees_pruned = True
+            return first
+
+
+ACTIVE: dict[str, GitRepoState] = {}
+ACTIVE_LOCK = threading.Lock()
+
+
+def state_key(project_dir: Path) -> str:
+    return os.path.normcase(os.path.realpath(project_dir))
+
+
+def repo_state(project_dir: Path) -> GitRepoState:
+    """Return the shared state for *project_dir* during a run, or a fresh one otherwise."""
+    with ACTIVE_LOCK:
+        state = ACTIVE.get(state_key(project_dir))
+    return state if state is not None else GitRepoState(project_dir)
+
+
+@contextmanager
+def shared_repo_state(project_dir: Path) -> Iterator[GitRepoState]:
+    """Make one :class:`GitRepoState` current for *project_dir* until the block ends.
+
+    Nested use for the same directory reuses the outer snapshot.
+    """
+    key = state_key(project_dir)
+    with ACTIVE_LOCK:
+        state = ACTIVE.get(key)
+        owner = state is None
+        if state is None:
+            state = ACTIVE[key] = GitRepoState(project_dir)
+    try:
+        yield state
+    finally:
+        if owner:
+            with ACTIVE_LOCK:
+                ACTIVE.pop(key, None)
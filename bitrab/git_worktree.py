@@ -39,7 +39,9 @@ from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
 
+from bitrab.git_state import repo_state
 from bitrab.utils import sanitize_job_name
+from bitrab.utils.filelock import FileLock
 
 WORKTREES_SUBDIR = ".bitrab/worktrees"
 # Cap sanitized worktree directory names. A long matrix job name combined
@@ -74,19 +76,13 @@ def is_git_available() -> bool:
 
 
 def is_git_repo(project_dir: Path) -> bool:
-    """Return True if *project_dir* lives inside a git working copy."""
-    if not is_git_available():
-        return False
-    try:
-        result = run_git(["rev-parse", "--is-inside-work-tree"], cwd=project_dir)
-    except (OSError, FileNotFoundError):
-        return False
-    return result.returncode == 0 and result.stdout.strip() == "true"
+    """Return True if *project_dir* lives inside a git working copy (see :mod:`bitrab.git_state`)."""
+    return repo_state(project_dir).is_repo()
 
 
 def can_use_worktrees(project_dir: Path) -> bool:
     """Return True iff git is available and *project_dir* is a git repo."""
-    return is_git_available() and is_git_repo(project_dir)
+    return is_git_repo(project_dir)
 
 
 def is_repo_dirty(project_dir: Path) -> bool:
@@ -95,10 +91,8 @@ def is_repo_dirty(project_dir: Path) -> bool:
     Worktrees check out HEAD, so dirty working-tree changes are not present in
     the worktree.  Callers should warn the user before running in parallel mode.
     """
-    if not can_use_worktrees(project_dir):
-        return False
-    result = run_git(["status", "--porcelain"], cwd=project_dir)
-    return result.returncode == 0 and bool(result.stdout.strip())
+    state = repo_state(project_dir)
+    return state.is_repo() and state.is_dirty()
 
 
 def sanitize_name(name: str) -> str:
@@ -127,6 +121,16 @@ def worktree_path_for(project_dir: Path, name: str, root: Path | None = None) ->
     return worktree_root(project_dir, root=root) / sanitize_name(name)
 
 
+def metadata_lock(project_dir: Path) -> FileLock:
+    """Lock serialising ``git worktree`` metadata changes for *project_dir*.
+
+    Parallel jobs create worktrees concurrently; one job's ``worktree prune``
+    can otherwise discard another's half-written ``.git/worktrees/<name>``
+    entry, failing its ``worktree add`` with "failed to read ... commondir".
+    """
+    return FileLock(project_dir / ".bitrab" / "locks" / ".git-worktree.lock", timeout=120.0)
+
+
 def create_worktree(project_dir: Path, name: str, root: Path | None = None) -> WorktreeContext:
     """Create a detached-HEAD worktree for *project_dir* at the configured path.
 
@@ -137,20 +141,24 @@ def create_worktree(project_dir: Path, name: str, root: Path | None = None) -> W
     target = worktree_path_for(project_dir, name, root=root)
     target.parent.mkdir(parents=True, exist_ok=True)
 
-    # If something is already there, tear it down — a stale entry would make
-    # `git worktree add` fail.  We try git first (so the metadata is cleaned),
-    # then fall back to a plain directory removal.
-    if target.exists():
-        run_git(["worktree", "remove", "--force", str(target)], cwd=project_dir)
-        if target.exists():
-            shutil.rmtree(target, ignore_errors=True)
-    # Prune dangling metadata in case a previous run left orphans behind.
-    run_git(["worktree", "prune"], cwd=project_dir)
-
-    result = run_git(
-        ["worktree", "add", "--detach", str(target)],
-        cwd=project_dir,
-    )
+    with metadata_lock(project_dir):
+        # If something is already there, tear it down — a stale entry would make
+        # `git worktree add` fail.  We try git first (so the metadata is cleaned),
+        # then fall back to a plain directory removal.
+        stale = target.exists()
+        if stale:
+            run_git(["worktree", "remove", "--force", str(target)], cwd=project_dir)
+            if target.exists():
+                shutil.rmtree(target, ignore_errors=True)
+        # Prune dangling metadata in case a previous run left orphans behind.
+        # Once per run is enough, unless this target itself was left over.
+        if repo_state(project_dir).claim_worktree_prune() or stale:
+            run_git(["worktree", "prune"], cwd=project_dir)
+
+        result = run_git(
+            ["worktree", "add", "--detach", str(target)],
+            cwd=project_dir,
+        )
     if result.returncode != 0:
         raise RuntimeError(f"git worktree add failed for {target}: {result.stderr.strip() or result.stdout.strip()}")
     return WorktreeContext(worktree_path=target, project_dir=project_dir)
@@ -164,18 +172,28 @@ def remove_worktree(ctx: WorktreeContext) -> None:
     braces step in case git left artifacts behind (happens occasionally on
     Windows when a subprocess still holds a handle).
     """
-    run_git(
-        ["worktree", "remove", "--force", str(ctx.worktree_path)],
-        cwd=ctx.project_dir,
-    )
+    with metadata_lock(ctx.project_dir):
+        run_git(
+            ["worktree", "remove", "--force", str(ctx.worktree_path)],
+            cwd=ctx.project_dir,
+        )
     if ctx.worktree_path.exists():
         shutil.rmtree(ctx.worktree_path, ignore_errors=True)
 
 
 @contextmanager
-def job_worktree(project_dir: Path, name: str, root: Path | None = None) -> Iterator[Path]:
-    """Context manager: create a worktree, yield its path, always remove it."""
-    ctx = create_worktree(project_dir, name, root=root)
+def job_worktree(
+    project_dir: Path, name: str, root: Path | None = None, prepared: Path | None = None
+) -> Iterator[Path]:
+    """Context manager: create a worktree, yield its path, always remove it.
+
+    A *prepared* worktree (created ahead of time by :func:`create_worktree`)
+    is adopted instead of creating a new one; it is still removed on exit.
+    """
+    if prepared is not None:
+        ctx = WorktreeContext(worktree_path=prepared, project_dir=project_dir)
+    else:
+        ctx = create_worktree(project_dir, name, root=root)
     try:
         yield ctx.worktree_path
     finally:
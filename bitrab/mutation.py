@@ -24,6 +24,7 @@ Configuration (``[tool.bitrab]`` in ``pyproject.toml``)::
 from __future__ import annotations
 
 import fnmatch
+import logging
 import os
 import time
 from dataclasses import dataclass, field
@@ -32,6 +33,8 @@ from typing import Any
 
 from bitrab.toml_backend import load_file as load_toml_file
 
+logger = logging.getLogger(__name__)
+
 # Cache for parsed pyproject.toml: maps (path, mtime) -> parsed dict
 TOML_CACHE: dict[tuple[str, float], dict[str, Any]] = {}
 
@@ -75,17 +78,127 @@ class ParallelBackendConfig:
     """Configuration for the parallel execution backend.
 
     Attributes:
-        backend: ``"process"`` (default) or ``"thread"``.
+        backend: ``"process"`` (default), ``"thread"`` or ``"asyncio"``.
             - ``"process"``: uses ``ProcessPoolExecutor`` (full isolation, GIL-free).
             - ``"thread"``: uses ``ThreadPoolExecutor`` (lighter weight, shared memory,
               but subject to the GIL for CPU-bound work).
+            - ``"asyncio"``: like ``"thread"``, but every bash subprocess is
+              started and driven by one shared asyncio event loop (output,
+              timeouts, kills).  Cheapest for many tiny jobs.
+        warm_pool: If True (default), one pool is created per pipeline run and
+            reused by every stage / DAG batch, so worker interpreters are
+            spawned and import bitrab once instead of once per stage.
+        warm_shells: Number of bash processes each worker keeps started ahead
+            of time so scripts skip interpreter startup (see
+            :mod:`bitrab.execution.warm_shell`).  0 (default) starts a fresh
+            bash per script.  Ignored by the ``"asyncio"`` backend.
     """
 
-    backend: str = "process"  # "process" | "thread"
+    backend: str = "process"  # "process" | "thread" | "asyncio"
+    warm_pool: bool = True
+    warm_shells: int = 0
 
     def __post_init__(self) -> None:
-        if self.backend not in ("process", "thread"):
+        if self.backend not in ("process", "thread", "asyncio"):
             self.backend = "process"
+        if self.warm_shells < 0:
+            self.warm_shells = 0
+
+
+@dataclass
+class ResourceConfig:
+    """Host budget and per-job weights for resource-aware admission.
+
+    Attributes:
+        enabled: True when ``[tool.bitrab.resources]`` is present.  Admission
+            is also switched on when any job sets ``BITRAB_CPU_WEIGHT`` or
+            ``BITRAB_MEM_MB`` in its ``variables:``.
+        cpus: CPU budget in cores; None means ``os.cpu_count()``.
+        memory_mb: Memory budget in MiB; None means total physical RAM.
+        jobs: Per-job weights keyed by job name, e.g.
+            ``{"build": {"cpu": 8, "mem_mb": 4096}}``.
+    """
+
+    enabled: bool = False
+    cpus: float | None = None
+    memory_mb: float | None = None
+    jobs: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+
+@dataclass
+class AdaptiveConfig:
+    """Thresholds for load- / pressure-adaptive admission.
+
+    While any reading is above its threshold, no new parallel job is started
+    (jobs already running keep going, and at least one job is always allowed
+    so the pipeline never stalls).  Readings that are unavailable on this
+    platform are ignored.
+
+    Attributes:
+        enabled: Sample host pressure before each parallel job start.
+        max_load_per_cpu: 1-minute load average divided by the CPU count.
+        max_cpu_pressure: PSI ``some avg10`` from ``/proc/pressure/cpu`` (percent).
+        max_memory_pressure: PSI ``some avg10`` from ``/proc/pressure/memory`` (percent).
+    """
+
+    enabled: bool = False
+    max_load_per_cpu: float = 1.5
+    max_cpu_pressure: float = 50.0
+    max_memory_pressure: float = 10.0
+
+
+@dataclass
+class SchedulerConfig:
+    """Configuration for how the DAG runner hands ready jobs to workers.
+
+    Attributes:
+        dag_dispatch: ``"batch"`` (default) or ``"continuous"``.
+            - ``"batch"``: run the whole ready set, then look at the graph
+              again only after every job in that batch has finished.
+            - ``"continuous"``: keep one pool for the whole pipeline and start
+              newly-ready jobs the moment any running job completes, so wall
+              time follows the critical path instead of the slowest job of
+              each batch.
+        job_priority: ``"critical_path"`` (default) or ``"yaml"``.
+            - ``"critical_path"``: when more jobs are ready than there are
+              worker slots, start the ones with the longest remaining
+              duration-weighted path first, using durations from recent run
+              logs under ``.bitrab/logs/``.
+            - ``"yaml"``: submit ready jobs in the order they are declared.
+        relax_stages: If True, pipelines that never use ``needs:`` are run as
+            an implicit DAG: a job with a non-empty ``dependencies:`` list
+            waits only for those jobs instead of the whole previous stage
+            (the derived DAG always uses continuous dispatch).
+            Jobs without ``dependencies:`` (or with ``dependencies: []``) keep
+            strict stage ordering.
+        resources: CPU / memory budget that parallel job starts are admitted
+            against, on top of the job-count limit.
+        adaptive: Hold back new job starts while the host is under load or
+            CPU / memory pressure (see :class:`AdaptiveConfig`).
+        fail_fast: On the first hard (non-``allow_failure``) job failure,
+            terminate the process groups of running sibling jobs, start
+            nothing new, and end the pipeline.  Killed jobs still run their
+            ``after_script`` and collect ``artifacts: when: on_failure``.
+        prefetch: If True (default), continuous DAG dispatch under worktree
+            isolation prepares jobs before they start: the worktree, the
+            artifacts of finished upstreams, and (when safe) the cache are
+            set up while the job's last upstream is still running or while
+            it waits for a free slot.
+    """
+
+    dag_dispatch: str = "batch"  # "batch" | "continuous"
+    job_priority: str = "critical_path"  # "critical_path" | "yaml"
+    relax_stages: bool = False
+    resources: ResourceConfig = field(default_factory=ResourceConfig)
+    adaptive: AdaptiveConfig = field(default_factory=AdaptiveConfig)
+    fail_fast: bool = False
+    prefetch: bool = True
+
+    def __post_init__(self) -> None:
+        if self.dag_dispatch not in ("batch", "continuous"):
+            self.dag_dispatch = "batch"
+        if self.job_priority not in ("critical_path", "yaml"):
+            self.job_priority = "critical_path"
 
 
 @dataclass
@@ -121,6 +234,40 @@ class SerialConfig:
     enabled: bool = False
 
 
+@dataclass
+class CacheStoreConfig:
+    """How the local ``cache:`` store places restored files.
+
+    Attributes:
+        link: ``"auto"`` (default) and ``"reflink"`` try a reflink, then
+            copy; ``"copy"`` always copies.  ``"hardlink"`` hard-links files
+            to the store (copying when the filesystem refuses): fastest
+            without reflinks, but a job that edits or chmods a restored file
+            in place changes the stored content for every key sharing it.
+        format: How new generations are written.  ``"blobs"`` (default)
+            stores each file once by content hash; ``"tar"``, ``"tar.gz"``
+            and ``"tar.zst"`` (Python 3.14+) write one streamed archive per
+            generation, which keeps many-small-file caches to a single inode.
+        max_bytes: Size cap for the whole store.  After each save the least
+            recently used keys are evicted until it fits.  ``None`` (default)
+            or a non-positive value means unbounded.
+    """
+
+    link: str = "auto"
+    format: str = "blobs"
+    max_bytes: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.link not in ("auto", "reflink", "hardlink", "copy"):
+            logger.warning("Unknown cache_link %r in [tool.bitrab]; using 'auto'.", self.link)
+            self.link = "auto"
+        if self.format not in ("blobs", "tar", "tar.gz", "tar.zst"):
+            logger.warning("Unknown cache_format %r in [tool.bitrab]; using 'blobs'.", self.format)
+            self.format = "blobs"
+        if self.max_bytes is not None and self.max_bytes <= 0:
+            self.max_bytes = None
+
+
 def load_toml(file_path: Path) -> dict[str, Any]:
     """Load a TOML file, caching the result by path + mtime."""
     try:
@@ -157,7 +304,84 @@ def load_parallel_config(project_dir: Path) -> ParallelBackendConfig:
     if bitrab_section is None:
         return ParallelBackendConfig()
     backend = str(bitrab_section.get("parallel_backend", "process")).lower()
-    return ParallelBackendConfig(backend=backend)
+    warm_pool = bool(bitrab_section.get("warm_pool", True))
+    warm_shells = int(bitrab_section.get("warm_shells", 0))
+    return ParallelBackendConfig(backend=backend, warm_pool=warm_pool, warm_shells=warm_shells)
+
+
+def load_scheduler_config(project_dir: Path) -> SchedulerConfig:
+    """Read ``[tool.bitrab]`` from ``pyproject.toml`` and return scheduler config.
+
+    Returns the default (batch) config if ``pyproject.toml`` is missing or the
+    section is absent.
+    """
+    bitrab_section = load_bitrab_section(project_dir)
+    if bitrab_section is None:
+        return SchedulerConfig()
+    dag_dispatch = str(bitrab_section.get("dag_dispatch", "batch")).lower()
+    job_priority = str(bitrab_section.get("job_priority", "critical_path")).lower().replace("-", "_")
+    relax_stages = bool(bitrab_section.get("relax_stages", False))
+    return SchedulerConfig(
+        dag_dispatch=dag_dispatch,
+        job_priority=job_priority,
+        relax_stages=relax_stages,
+        fail_fast=bool(bitrab_section.get("fail_fast", False)),
+        prefetch=bool(bitrab_section.get("prefetch", True)),
+        resources=load_resource_config(bitrab_section),
+        adaptive=load_adaptive_config(bitrab_section),
+    )
+
+
+def load_adaptive_config(bitrab_section: dict[str, Any]) -> AdaptiveConfig:
+    """Parse ``[tool.bitrab.adaptive]`` out of an already-loaded bitrab section.
+
+    The table switches adaptive admission on unless it sets ``enabled = false``::
+
+        [tool.bitrab.adaptive]
+        max_load_per_cpu = 1.5
+        max_cpu_pressure = 50
+        max_memory_pressure = 10
+    """
+    section = bitrab_section.get("adaptive")
+    if not isinstance(section, dict):
+        return AdaptiveConfig()
+    defaults = AdaptiveConfig()
+    return AdaptiveConfig(
+        enabled=bool(section.get("enabled", True)),
+        max_load_per_cpu=float(section.get("max_load_per_cpu", defaults.max_load_per_cpu)),
+        max_cpu_pressure=float(section.get("max_cpu_pressure", defaults.max_cpu_pressure)),
+        max_memory_pressure=float(section.get("max_memory_pressure", defaults.max_memory_pressure)),
+    )
+
+
+def load_resource_config(bitrab_section: dict[str, Any]) -> ResourceConfig:
+    """Parse ``[tool.bitrab.resources]`` out of an already-loaded bitrab section.
+
+    Example::
+
+        [tool.bitrab.resources]
+        cpus = 8
+        memory_mb = 16384
+
+        [tool.bitrab.resources.jobs.build]
+        cpu = 4
+        mem_mb = 6000
+    """
+    section = bitrab_section.get("resources")
+    if not isinstance(section, dict):
+        return ResourceConfig()
+    cpus = section.get("cpus")
+    memory_mb = section.get("memory_mb")
+    jobs: dict[str, dict[str, Any]] = {}
+    jobs_section = section.get("jobs", {})
+    if isinstance(jobs_section, dict):
+        jobs = {str(name): dict(value) for name, value in jobs_section.items() if isinstance(value, dict)}
+    return ResourceConfig(
+        enabled=True,
+        cpus=float(cpus) if cpus is not None else None,
+        memory_mb=float(memory_mb) if memory_mb is not None else None,
+        jobs=jobs,
+    )
 
 
 def load_worktree_config(project_dir: Path) -> WorktreeConfig:
@@ -189,6 +413,27 @@ def load_serial_config(project_dir: Path) -> SerialConfig:
     return SerialConfig(enabled=enabled)
 
 
+def load_cache_store_config(project_dir: Path) -> CacheStoreConfig:
+    """Read ``[tool.bitrab] cache_link`` / ``cache_format`` / ``cache_max_bytes`` from ``pyproject.toml``."""
+    bitrab_section = load_bitrab_section(project_dir)
+    if bitrab_section is None:
+        return CacheStoreConfig()
+    raw_max_bytes = bitrab_section.get("cache_max_bytes")
+    max_bytes: int | None = None
+    if raw_max_bytes is not None:
+        try:
+            max_bytes = int(raw_max_bytes)
+        except (TypeError, ValueError):
+            logger.warning(
+                "cache_max_bytes = %r is not a whole number of bytes; the cache is unbounded.", raw_max_bytes
+            )
+    return CacheStoreConfig(
+        link=str(bitrab_section.get("cache_link", "auto")).lower(),
+        format=str(bitrab_section.get("cache_format", "blobs")).lower(),
+        max_bytes=max_bytes,
+    )
+
+
 def load_mutation_config(project_dir: Path) -> MutationConfig:
     """Read ``[tool.bitrab]`` from ``pyproject.toml`` and return a MutationConfig.
 
@@ -15,6 +15,7 @@ from bitrab.exceptions import GitlabRunnerError
 from bitrab.execution.job import JobExecutor
 from bitrab.execution.scheduler import StageOrchestrator
 from bitrab.execution.variables import VariableManager
+from bitrab.git_state import shared_repo_state
 from bitrab.models.pipeline import CacheConfig, DefaultConfig, JobConfig, PipelineConfig, RuleConfig
 
 DURATION_RE = re.compile(
@@ -798,6 +799,12 @@ class LocalGitLabRunner:
         changed: bool = False,
         changes_base: str | None = None,
         no_include_cache: bool = False,
+        dag_dispatch: str | None = None,
+        relax_stages: bool | None = None,
+        adaptive: bool | None = None,
+        fail_fast: bool | None = None,
+        distributed: str | None = None,
+        shard: tuple[int, int] | None = None,
     ) -> bool:
         """
         Run the complete pipeline.
@@ -825,152 +832,235 @@ class LocalGitLabRunner:
             changed: Run jobs affected by the local changed-file set.
             changes_base: Explicit git ref used as the local changes baseline.
             no_include_cache: Bypass transparent remote-include cache reads and writes.
+            dag_dispatch: DAG dispatch strategy (``"batch"`` or ``"continuous"``);
+                overrides ``[tool.bitrab] dag_dispatch``.
+            relax_stages: Derive an implicit DAG from ``dependencies:`` for
+                pipelines without ``needs:``; overrides ``[tool.bitrab] relax_stages``.
+            adaptive: Hold back new job starts while host load / PSI pressure
+                is high; overrides ``[tool.bitrab.adaptive] enabled``.
+            fail_fast: Kill running sibling jobs and stop the pipeline on the
+                first hard failure; overrides ``[tool.bitrab] fail_fast``.
+            distributed: Coordinate ``bitrab agent`` workers listening on
+                this address (``tcp://HOST:PORT`` or ``unix:/path``) instead of
+                running scripts locally.  Ignored for dry runs.
+            shard: ``(index, count)`` — run only the index-th (1-based) of
+                *count* duration-balanced slices of the selected jobs.
 
         Raises:
             GitLabCIError: If there is an error in the pipeline configuration.
             Exception: For unexpected errors.
         """
-        # Load and process configuration
-        self.loader.offline = offline
-        self.loader.no_include_cache = no_include_cache
-        raw_config = self.loader.load_config_with_inputs(
-            config_path=config_path,
-            input_values=input_values,
-            prompt_missing_inputs=prompt_missing_inputs,
-        )
-        from bitrab.changes import ChangeResolver, select_changed_jobs
-
-        change_resolver = ChangeResolver(self.base_path, changes_base)
-        raw_config, workflow_skipped = apply_workflow_rules(raw_config, self.base_path, change_resolver)
-        if workflow_skipped:
-            safe_print("⏭️  Pipeline skipped by workflow:rules (run exit code 3).")
-            return False
-        pipeline = self.processor.process_config(raw_config)
-        if changed:
-            changed_names = select_changed_jobs(pipeline, change_resolver.resolve())
-            pipeline = filter_pipeline(pipeline, jobs=sorted(changed_names))
-            if not pipeline.jobs:
-                safe_print("✅ No jobs are affected by the changed-file set.")
-                return True
-            safe_print(f"🧭 Changed-file selection kept {len(pipeline.jobs)} job(s).")
-
-        # Apply job/stage filters with warnings for unknown names
-        if job_filter is not None or stage_filter is not None:
-            if job_filter is not None:
-                known_jobs = {j.name for j in pipeline.jobs}
-                for name in job_filter:
-                    if name not in known_jobs:
-                        safe_print(f"⚠️  Unknown job: '{name}' (not found in pipeline)")
-            if stage_filter is not None:
-                known_stages = set(pipeline.stages)
-                for name in stage_filter:
-                    if name not in known_stages:
-                        safe_print(f"⚠️  Unknown stage: '{name}' (not found in pipeline)")
-            pipeline = filter_pipeline(pipeline, jobs=job_filter, stages=stage_filter)
-            if not pipeline.jobs:
-                safe_print("⚠️  No jobs match the given filter — nothing to run.")
-                return True
-
-        # Set up execution components
-        variable_manager = VariableManager(pipeline.variables, project_dir=self.base_path)
-
-        # Evaluate rules for each job
-        # We use a base environment (os + global + builtin) for rule evaluation
-        base_env = os.environ.copy()
-        base_env.update(variable_manager.gitlab_ci_vars)
-        base_env.update(variable_manager.base_variables)
-
-        for job in pipeline.jobs:
-            evaluate_rules(job, base_env, project_dir=self.base_path, change_resolver=change_resolver)
-
-        self.job_executor = JobExecutor(
-            variable_manager, dry_run=dry_run, project_dir=self.base_path, cache_enabled=not no_cache
-        )
-
-        # --incremental fingerprint memoization.  --refresh implies the
-        # machinery is active (fingerprints are recorded) but every job runs.
-        fingerprints = None
-        if incremental or refresh:
-            from bitrab.execution.fingerprint import FingerprintManager
-
-            fingerprints = FingerprintManager(self.base_path, refresh=refresh)
-
-        from bitrab.mutation import (
-            WorktreeConfig,
-            load_mutation_config,
-            load_parallel_config,
-            load_serial_config,
-            load_worktree_config,
-        )
-
-        mutation_config = load_mutation_config(self.base_path)
-        parallel_config = load_parallel_config(self.base_path)
-        if parallel_backend is not None:
-            from bitrab.mutation import ParallelBackendConfig
-
-            parallel_config = ParallelBackendConfig(backend=parallel_backend)
-
-        worktree_config = load_worktree_config(self.base_path)
-        if use_worktrees is not None:
-            worktree_config = WorktreeConfig(enabled=use_worktrees, root=worktree_config.root)
-
-        serial_config = load_serial_config(self.base_path)
-        serial_active = serial_config.enabled if serial is None else bool(serial)
-        if dry_run and not serial_active and parallel_backend is None and parallel_config.backend == "process":
-            from bitrab.mutation import ParallelBackendConfig
-
-            # Dry runs never execute user scripts, so process isolation adds spawn
-            # cost without providing any safety benefit.
-            parallel_config = ParallelBackendConfig(backend="thread")
-        if serial_active:
-            # Pin degree of parallelism to 1 — one job at a time, shared cwd.
-            # Formatters / autofixers that mutate the real tree must run like
-            # this so their changes land in the working copy, not a throwaway
-            # worktree.
-            maximum_degree_of_parallelism = 1
-            worktree_config = WorktreeConfig(enabled=False, root=worktree_config.root)
-            safe_print("🔒 Serial mode: running one job at a time in the project root (worktrees disabled).")
-
-        event_collector = None
-        started_at = __import__("time").time()
-
-        if use_tui or (ci_mode and not dry_run):
-            from bitrab.tui.orchestrator import TUIOrchestrator
-
-            tui_orchestrator = TUIOrchestrator(
-                self.job_executor,
-                maximum_degree_of_parallelism=maximum_degree_of_parallelism,
-                mutation_config=mutation_config,
-                parallel_backend=parallel_config,
-                worktree_config=worktree_config,
-                fingerprints=fingerprints,
+        # One git snapshot for the whole run: variables, rules:changes, fingerprints
+        # and worktrees share its answers instead of each starting git.
+        with shared_repo_state(self.base_path):
+            # Load and process configuration
+            self.loader.offline = offline
+            self.loader.no_include_cache = no_include_cache
+            raw_config = self.loader.load_config_with_inputs(
+                config_path=config_path,
+                input_values=input_values,
+                prompt_missing_inputs=prompt_missing_inputs,
             )
-            if use_tui:
-                from bitrab.tui.app import PipelineApp
-
-                app = PipelineApp(pipeline, tui_orchestrator, close_on_completion=exit_on_completion)
-                exit_code = app.run()
-                if exit_code:
-                    raise RuntimeError("Pipeline failed — see TUI output for details")
+            from bitrab.changes import ChangeResolver, select_changed_jobs
+
+            change_resolver = ChangeResolver(self.base_path, changes_base)
+            raw_config, workflow_skipped = apply_workflow_rules(raw_config, self.base_path, change_resolver)
+            if workflow_skipped:
+                safe_print("⏭️  Pipeline skipped by workflow:rules (run exit code 3).")
+                return False
+            pipeline = self.processor.process_config(raw_config)
+            if changed:
+                changed_names = select_changed_jobs(pipeline, change_resolver.resolve())
+                pipeline = filter_pipeline(pipeline, jobs=sorted(changed_names))
+                if not pipeline.jobs:
+                    safe_print("✅ No jobs are affected by the changed-file set.")
+                    return True
+                safe_print(f"🧭 Changed-file selection kept {len(pipeline.jobs)} job(s).")
+
+            # Apply job/stage filters with warnings for unknown names
+            if job_filter is not None or stage_filter is not None:
+                if job_filter is not None:
+                    known_jobs = {j.name for j in pipeline.jobs}
+                    for name in job_filter:
+                        if name not in known_jobs:
+                            safe_print(f"⚠️  Unknown job: '{name}' (not found in pipeline)")
+                if stage_filter is not None:
+                    known_stages = set(pipeline.stages)
+                    for name in stage_filter:
+                        if name not in known_stages:
+                            safe_print(f"⚠️  Unknown stage: '{name}' (not found in pipeline)")
+                pipeline = filter_pipeline(pipeline, jobs=job_filter, stages=stage_filter)
+                if not pipeline.jobs:
+                    safe_print("⚠️  No jobs match the given filter — nothing to run.")
+                    return True
+
+            if shard is not None:
+                from bitrab.execution.history import load_job_durations
+                from bitrab.sharding import assign_shards
+
+                index, count = shard
+                selected = assign_shards(pipeline, count, load_job_durations(self.base_path))[index - 1]
+                safe_print(
+                    f"🧩 Shard {index}/{count}: {len(selected.jobs)} of {len(pipeline.jobs)} job(s), "
+                    f"~{selected.estimate:.0f}s estimated"
+                )
+                pipeline = filter_pipeline(pipeline, jobs=selected.jobs)
+                if not pipeline.jobs:
+                    safe_print("✅ This shard has no jobs — nothing to run.")
+                    return True
+
+            # Set up execution components
+            variable_manager = VariableManager(pipeline.variables, project_dir=self.base_path)
+
+            # Evaluate rules for each job
+            # We use a base environment (os + global + builtin) for rule evaluation
+            base_env = os.environ.copy()
+            base_env.update(variable_manager.gitlab_ci_vars)
+            base_env.update(variable_manager.base_variables)
+
+            for job in pipeline.jobs:
+                evaluate_rules(job, base_env, project_dir=self.base_path, change_resolver=change_resolver)
+
+            hub = None
+            if distributed and not dry_run:
+                from bitrab.distributed import AgentHub, RemoteJobExecutor
+
+                hub = AgentHub(distributed)
+                self.job_executor = RemoteJobExecutor(
+                    variable_manager, hub, project_dir=self.base_path, cache_enabled=not no_cache
+                )
             else:
-                tui_orchestrator.execute_pipeline_ci(pipeline)
-            event_collector = tui_orchestrator.event_collector
-        else:
-            self.orchestrator = StageOrchestrator(
-                self.job_executor,
-                maximum_degree_of_parallelism=maximum_degree_of_parallelism,
-                dry_run=dry_run,
-                mutation_config=mutation_config,
-                parallel_backend=parallel_config,
-                worktree_config=worktree_config,
-                fingerprints=fingerprints,
+                self.job_executor = JobExecutor(
+                    variable_manager, dry_run=dry_run, project_dir=self.base_path, cache_enabled=not no_cache
+                )
+
+            # --incremental fingerprint memoization.  --refresh implies the
+            # machinery is active (fingerprints are recorded) but every job runs.
+            fingerprints = None
+            if incremental or refresh:
+                from bitrab.execution.fingerprint import FingerprintManager
+
+                fingerprints = FingerprintManager(self.base_path, refresh=refresh)
+
+            from bitrab.mutation import (
+                WorktreeConfig,
+                load_cache_store_config,
+                load_mutation_config,
+                load_parallel_config,
+                load_scheduler_config,
+                load_serial_config,
+                load_worktree_config,
             )
-            self.orchestrator.execute_pipeline(pipeline)
-            event_collector = getattr(self.orchestrator, "event_collector", None)
 
-        if not dry_run and event_collector is not None:
-            persist_run_log(self.base_path, event_collector, started_at, pipeline)
-        return True
+            mutation_config = load_mutation_config(self.base_path)
+            parallel_config = load_parallel_config(self.base_path)
+            if parallel_backend is not None:
+                parallel_config = dataclasses.replace(parallel_config, backend=parallel_backend)
+
+            worktree_config = load_worktree_config(self.base_path)
+            if use_worktrees is not None:
+                worktree_config = WorktreeConfig(enabled=use_worktrees, root=worktree_config.root)
+
+            scheduler_config = load_scheduler_config(self.base_path)
+            if dag_dispatch is not None:
+                scheduler_config = dataclasses.replace(scheduler_config, dag_dispatch=dag_dispatch)
+            if relax_stages is not None:
+                scheduler_config = dataclasses.replace(scheduler_config, relax_stages=relax_stages)
+            if fail_fast is not None:
+                scheduler_config = dataclasses.replace(scheduler_config, fail_fast=fail_fast)
+            if adaptive is not None:
+                scheduler_config = dataclasses.replace(
+                    scheduler_config, adaptive=dataclasses.replace(scheduler_config.adaptive, enabled=adaptive)
+                )
+
+            cache_store_config = load_cache_store_config(self.base_path)
+            self.job_executor.cache_link = cache_store_config.link
+            self.job_executor.cache_format = cache_store_config.format
+            self.job_executor.cache_max_bytes = cache_store_config.max_bytes
+
+            serial_config = load_serial_config(self.base_path)
+            serial_active = serial_config.enabled if serial is None else bool(serial)
+            if dry_run and not serial_active and parallel_backend is None and parallel_config.backend == "process":
+                # Dry runs never execute user scripts, so process isolation adds spawn
+                # cost without providing any safety benefit.
+                parallel_config = dataclasses.replace(parallel_config, backend="thread")
+            if serial_active:
+                # Pin degree of parallelism to 1 — one job at a time, shared cwd.
+                # Formatters / autofixers that mutate the real tree must run like
+                # this so their changes land in the working copy, not a throwaway
+                # worktree.
+                maximum_degree_of_parallelism = 1
+                worktree_config = WorktreeConfig(enabled=False, root=worktree_config.root)
+                safe_print("🔒 Serial mode: running one job at a time in the project root (worktrees disabled).")
+            if hub is not None:
+                # Pool threads only relay agent output; agents own isolation.
+                parallel_config = dataclasses.replace(parallel_config, backend="thread")
+                worktree_config = WorktreeConfig(enabled=False, root=worktree_config.root)
+                hub.start()
+                safe_print(f"🛰️  Distributing jobs to bitrab agents on {hub.address}")
+
+            event_collector = None
+            started_at = __import__("time").time()
+
+            try:
+                if use_tui or (ci_mode and not dry_run):
+                    from bitrab.tui.orchestrator import TUIOrchestrator
+
+                    tui_orchestrator = TUIOrchestrator(
+                        self.job_executor,
+                        maximum_degree_of_parallelism=maximum_degree_of_parallelism,
+                        mutation_config=mutation_config,
+                        parallel_backend=parallel_config,
+                        worktree_config=worktree_config,
+                        fingerprints=fingerprints,
+                        scheduler_config=scheduler_config,
+                    )
+                    if use_tui:
+                        from bitrab.tui.app import PipelineApp
+
+                        app = PipelineApp(pipeline, tui_orchestrator, close_on_completion=exit_on_completion)
+                        exit_code = app.run()
+                        if exit_code:
+                            raise RuntimeError("Pipeline failed — see TUI output for details")
+                    else:
+                        tui_orchestrator.execute_pipeline_ci(pipeline)
+                    event_collector = tui_orchestrator.event_collector
+                else:
+                    self.orchestrator = StageOrchestrator(
+                        self.job_executor,
+                        maximum_degree_of_parallelism=maximum_degree_of_parallelism,
+                        dry_run=dry_run,
+                        mutation_config=mutation_config,
+                        parallel_backend=parallel_config,
+                        worktree_config=worktree_config,
+                        fingerprints=fingerprints,
+                        scheduler_config=scheduler_config,
+                    )
+                    self.orchestrator.execute_pipeline(pipeline)
+                    event_collector = getattr(self.orchestrator, "event_collector", None)
+            finally:
+                if hub is not None:
+                    hub.close()
+
+            if not dry_run and event_collector is not None:
+                persist_run_log(self.base_path, event_collector, started_at, pipeline)
+            return True
+
+
+def run_job_logs(project_dir: Path, pipeline: Any, started_at: float) -> dict[str, Path]:
+    """Return the compressed output logs this run left in its job directories (CI mode only)."""
+    from bitrab.execution.joblog import JOB_LOG_NAME
+    from bitrab.utils import sanitize_job_name
+
+    logs: dict[str, Path] = {}
+    for job in pipeline.jobs:
+        path = project_dir / ".bitrab" / "temp" / sanitize_job_name(job.name) / JOB_LOG_NAME
+        try:
+            if path.stat().st_mtime >= started_at:
+                logs[job.name] = path
+        except OSError:
+            continue
+    return logs
 
 
 def persist_run_log(
@@ -1035,7 +1125,8 @@ def persist_run_log(
         if matrix_jobs:
             meta["matrix_jobs"] = matrix_jobs
 
-        write_run_log(project_dir, events_json, summary.format_text(), meta)
+        job_logs = run_job_logs(project_dir, pipeline, started_at)
+        write_run_log(project_dir, events_json, summary.format_text(), meta, job_logs=job_logs)
 
         warn = maybe_warn_size(project_dir)
         if warn:
@@ -0,0 +1,148 @@
+"""Duration-balanced splitting of one pipeline across N CI containers.
+
+``bitrab run --shard I/N`` runs the I-th of N disjoint slices of the
+pipeline.  Every container computes the same split independently, so the
+slices cover each job exactly once without any coordination.
+
+Jobs are first grouped so that no artifact edge crosses a shard: a job is
+kept with the jobs it ``needs:``, the jobs in its explicit ``dependencies:``,
+and, for a stage-ordered job that inherits all artifacts, the earlier-stage
+jobs that actually declare artifacts.  The groups are then bin-packed
+longest-first by their historical duration (see
+:func:`bitrab.execution.history.load_job_durations`).  Ties are broken by
+pipeline order, so the split only changes when the config or the history
+changes.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from bitrab.models.pipeline import JobConfig, PipelineConfig
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One slice of a sharded pipeline.
+
+    Attributes:
+        index: 1-based shard number.
+        count: Total number of shards.
+        jobs: Names of the jobs this shard runs, in pipeline order.
+        estimate: Summed duration estimate of those jobs, in seconds.
+    """
+
+    index: int
+    count: int
+    jobs: list[str]
+    estimate: float
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse an ``I/N`` shard spec into ``(index, count)``.
+
+    Raises:
+        ValueError: If the spec is malformed or ``I`` is not in ``1..N``.
+    """
+    index_text, sep, count_text = value.partition("/")
+    try:
+        if not sep:
+            raise ValueError
+        index, count = int(index_text), int(count_text)
+    except ValueError:
+        raise ValueError(f"Invalid shard {value!r}: expected I/N, e.g. 2/4") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {value!r}: I must be between 1 and N")
+    return index, count
+
+
+def produces_artifacts(job: JobConfig) -> bool:
+    """Return True if *job* hands files or variables to later jobs."""
+    return bool(job.artifacts_paths or job.artifacts_dotenv)
+
+
+def artifact_edges(pipeline: PipelineConfig) -> dict[str, list[str]]:
+    """Return ``{job_name: [jobs it must share a shard with]}``.
+
+    Unknown names (e.g. an optional ``needs:`` that was filtered out) are
+    dropped.
+    """
+    known = {job.name for job in pipeline.jobs}
+    stage_rank = {stage: rank for rank, stage in enumerate(pipeline.stages)}
+    edges: dict[str, list[str]] = {}
+    for job in pipeline.jobs:
+        linked = list(job.needs)
+        if job.dependencies is not None:
+            linked.extend(job.dependencies)
+        elif not job.needs:
+            rank = stage_rank.get(job.stage, len(stage_rank))
+            linked.extend(
+                other.name
+                for other in pipeline.jobs
+                if stage_rank.get(other.stage, len(stage_rank)) < rank and produces_artifacts(other)
+            )
+        edges[job.name] = [name for name in linked if name in known and name != job.name]
+    return edges
+
+
+def shard_groups(pipeline: PipelineConfig) -> list[list[str]]:
+    """Split the jobs into groups that must run in the same shard.
+
+    Groups are the connected components of :func:`artifact_edges`; both the
+    groups and the names inside them follow pipeline order.
+    """
+    order = [job.name for job in pipeline.jobs]
+    parent = {name: name for name in order}
+
+    def find(name: str) -> str:
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    position = {name: index for index, name in enumerate(order)}
+    for name, linked in artifact_edges(pipeline).items():
+        for other in linked:
+            a, b = find(name), find(other)
+            if a != b:
+                # The earlier job stays the root, keeping the result order-stable.
+                if position[a] > position[b]:
+                    a, b = b, a
+                parent[b] = a
+
+    groups: dict[str, list[str]] = {}
+    for name in order:
+        groups.setdefault(find(name), []).append(name)
+    return list(groups.values())
+
+
+def assign_shards(pipeline: PipelineConfig, count: int, durations: dict[str, float]) -> list[Shard]:
+    """Bin-pack :func:`shard_groups` into *count* shards, longest group first.
+
+    Jobs without history are estimated at the median known duration (or one
+    second when nothing is known).  Each group goes to the currently
+    lightest shard, the lowest-numbered one on a tie.
+    """
+    names = [job.name for job in pipeline.jobs]
+    known = sorted(durations[name] for name in names if name in durations)
+    default = known[len(known) // 2] if known else 1.0
+
+    groups = shard_groups(pipeline)
+    weights = [sum(durations.get(name, default) for name in group) for group in groups]
+    loads = [0.0] * count
+    members: list[set[str]] = [set() for _ in range(count)]
+    for group_index in sorted(range(len(groups)), key=lambda i: (-weights[i], i)):
+        target = min(range(count), key=lambda shard: (loads[shard], shard))
+        loads[target] += weights[group_index]
+        members[target].update(groups[group_index])
+    return [
+        Shard(
+            index=shard + 1,
+            count=count,
+            jobs=[name for name in names if name in members[shard]],
+            estimate=loads[shard],
+        )
+        for shard in range(count)
+    ]
@@ -3,14 +3,16 @@
 Runs jobs in parallel via ProcessPoolExecutor, routing output through a
 multiprocessing.Manager().Queue() so the Textual app can display per-job logs.
 
-For CI mode (no TUI), jobs write to per-job log files and the files are printed
-to stdout after each stage completes.
+For CI mode (no TUI), jobs write to per-job compressed log files (see
+:mod:`bitrab.execution.joblog`) and the files are printed to stdout after each
+stage completes.
 
 Both modes are thin callback wrappers around :class:`StagePipelineRunner`.
 """
 
 from __future__ import annotations
 
+import itertools
 import multiprocessing as mp
 import os
 import queue
@@ -19,16 +21,16 @@ import subprocess  # nosec
 import sys
 import threading
 from pathlib import Path
-from queue import Empty
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable
 
 from bitrab.execution.events import EventCollector
 from bitrab.execution.fingerprint import FingerprintManager
 from bitrab.execution.job import JobExecutor, RunResult
+from bitrab.execution.joblog import JOB_LOG_NAME, open_job_log, read_job_log
 from bitrab.execution.shell import TextWriter
 from bitrab.execution.stage_runner import JobOutcome, PipelineCallbacks, StagePipelineRunner, sanitize_job_name
 from bitrab.models.pipeline import JobConfig, PipelineConfig
-from bitrab.mutation import MutationConfig, ParallelBackendConfig, WorktreeConfig
+from bitrab.mutation import MutationConfig, ParallelBackendConfig, SchedulerConfig, WorktreeConfig
 
 if TYPE_CHECKING:
     from bitrab.tui.app import PipelineApp
@@ -58,6 +60,73 @@ class QueueWriter:
         """No-op flush to satisfy IO protocol."""
 
 
+# Control items use ``None`` as the job name; this text ends the pump thread.
+PUMP_STOP = "stop"
+# Upper bound for a flush, in case the queue's owner went away underneath us.
+FLUSH_TIMEOUT = 5.0
+
+
+class OutputPump:
+    """Forward ``(job_name, text)`` items from an output queue as they arrive.
+
+    A single reader thread blocks on the queue, so output reaches the app as
+    soon as a job writes it and nothing wakes up while jobs are quiet.  Items
+    with a ``None`` job name are control items: :meth:`flush` sends a barrier
+    through the queue and :meth:`stop` ends the thread.
+    """
+
+    def __init__(self, output_queue: Any, deliver: Callable[[str, str | None], None]) -> None:
+        self.output_queue = output_queue
+        self.deliver = deliver
+        self.thread: threading.Thread | None = None
+        self.barriers: dict[str, threading.Event] = {}
+        self.lock = threading.Lock()
+        self.tokens = itertools.count()
+
+    def start(self) -> None:
+        """Start the reader thread; a no-op if it is already running."""
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self.run, name="bitrab-output", daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        while True:
+            try:
+                job_name, text = self.output_queue.get()
+            except (EOFError, OSError):  # Manager queue shut down
+                return
+            if job_name is not None:
+                self.deliver(job_name, text)
+                continue
+            if text == PUMP_STOP:
+                return
+            with self.lock:
+                barrier = self.barriers.pop(str(text), None)
+            if barrier is not None:
+                barrier.set()
+
+    def flush(self) -> None:
+        """Block until everything queued before this call has been delivered."""
+        if self.thread is None or not self.thread.is_alive():
+            return
+        token = str(next(self.tokens))
+        barrier = threading.Event()
+        with self.lock:
+            self.barriers[token] = barrier
+        self.output_queue.put((None, token))
+        barrier.wait(FLUSH_TIMEOUT)
+
+    def stop(self) -> None:
+        """Deliver what is still queued, then end the reader thread."""
+        if self.thread is None:
+            return
+        if self.thread.is_alive():
+            self.output_queue.put((None, PUMP_STOP))
+            self.thread.join(FLUSH_TIMEOUT)
+        self.thread = None
+
+
 # ---------------------------------------------------------------------------
 # Picklable worker functions (module-level)
 # ---------------------------------------------------------------------------
@@ -95,7 +164,7 @@ def run_single_job_file(
     job_dir.mkdir(parents=True, exist_ok=True)
     log_path = Path(log_path)
     log_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(log_path, "w", encoding="utf-8") as fh:
+    with open_job_log(log_path) as fh:
         ctx = executor.build_context(job, job_dir=job_dir, output_writer=fh)
         executor.execute_job(ctx=ctx)
     return executor.job_history
@@ -123,8 +192,7 @@ class TUICallbacks(PipelineCallbacks):
         self.cancel_event = cancel_event
         self.backend_label = backend_label
         self.active_jobs: set[str] = set()
-        self.serial_drain_stop: threading.Event | None = None
-        self.serial_drain_thread: threading.Thread | None = None
+        self.pump = OutputPump(output_queue, self.deliver_output)
 
     def on_stage_start(self, stage: str, jobs: list[JobConfig]) -> None:
         self.app.call_from_thread(self.app.update_stage_status, stage, len(jobs), self.backend_label)
@@ -134,50 +202,32 @@ class TUICallbacks(PipelineCallbacks):
 
         self.app.call_from_thread(self.app.post_message, JobStatusChanged(job.name, "running"))
         self.active_jobs.add(job.name)
-        self.start_serial_drain()
+        self.pump.start()
+
+    def deliver_output(self, job_name: str, text: str | None) -> None:
+        """Post one queued output chunk to the app (``None`` marks a job's end)."""
+        from bitrab.tui.app import JobOutput
 
-    def start_serial_drain(self) -> None:
-        """Start a background thread that continuously drains the output queue.
+        if text is None:
+            self.active_jobs.discard(job_name)
+        else:
+            self.app.call_from_thread(self.app.post_message, JobOutput(job_name, text))
 
-        Only one drain thread runs at a time; starting a second is a no-op.
-        Used during serial job execution where poll_during_parallel is never called.
-        """
-        if self.serial_drain_thread is not None and self.serial_drain_thread.is_alive():
-            return
-        self.serial_drain_stop = threading.Event()
-        stop = self.serial_drain_stop
-
-        def drain_loop() -> None:
-            from bitrab.tui.app import JobOutput
-
-            while not stop.is_set():
-                try:
-                    while True:
-                        job_name, text = self.output_queue.get(timeout=0.02)
-                        if text is not None:
-                            self.app.call_from_thread(self.app.post_message, JobOutput(job_name, text))
-                except Empty:
-                    pass
-
-        self.serial_drain_thread = threading.Thread(target=drain_loop, daemon=True)
-        self.serial_drain_thread.start()
-
-    def stop_serial_drain(self) -> None:
-        if self.serial_drain_stop is not None:
-            self.serial_drain_stop.set()
-        if self.serial_drain_thread is not None:
-            self.serial_drain_thread.join(timeout=0.5)
-        self.serial_drain_stop = None
-        self.serial_drain_thread = None
+    def close(self) -> None:
+        """Stop the output pump once the pipeline is over."""
+        self.pump.stop()
 
     def on_job_complete(self, outcome: JobOutcome) -> None:
         from bitrab.tui.app import JobStatusChanged
 
-        self.stop_serial_drain()
+        # Show the job's last output before its final status.
+        self.pump.flush()
         if outcome.memoized:
             status = "cached"
         elif outcome.allowed_failure:
             status = "warned"
+        elif outcome.aborted:
+            status = "cancelled"
         elif outcome.success:
             status = "success"
         else:
@@ -188,6 +238,7 @@ class TUICallbacks(PipelineCallbacks):
         self.app.call_from_thread(self.app.on_pipeline_awaiting_manual)
 
     def on_pipeline_complete(self, success: bool) -> None:
+        self.pump.flush()
         if self.cancel_event.is_set():
             self.app.call_from_thread(self.app.on_pipeline_cancelled)
         else:
@@ -209,34 +260,7 @@ class TUICallbacks(PipelineCallbacks):
         return {"output_queue": self.output_queue, "worker_pids": self.worker_pids}
 
     def on_stage_complete(self, stage: str, outcomes: list[JobOutcome]) -> None:
-        # Drain any remaining queue items after serial execution
-        self.drain_remaining()
-
-    def poll_during_parallel(self, futures: dict) -> None:
-        """Drain the output queue while parallel futures are running."""
-        from bitrab.tui.app import JobOutput
-
-        try:
-            while True:
-                job_name, text = self.output_queue.get(timeout=0.02)
-                if text is None:
-                    self.active_jobs.discard(job_name)
-                else:
-                    self.app.call_from_thread(self.app.post_message, JobOutput(job_name, text))
-        except Empty:
-            pass
-
-    def drain_remaining(self) -> None:
-        """Drain any remaining items from the output queue."""
-        from bitrab.tui.app import JobOutput
-
-        while True:
-            try:
-                job_name, text = self.output_queue.get_nowait()
-                if text is not None:
-                    self.app.call_from_thread(self.app.post_message, JobOutput(job_name, text))
-            except Empty:
-                break
+        self.pump.flush()
 
 
 # ---------------------------------------------------------------------------
@@ -251,6 +275,11 @@ class CIFileCallbacks(PipelineCallbacks):
         self.log_paths: dict[str, Path] = {}
         self.open_writers: dict[str, Any] = {}
         self.current_stage_jobs: list[JobConfig] = []
+        # Continuous DAG dispatch can start a stage while jobs of another are
+        # still running, so stage job lists and in-flight logs are tracked
+        # per stage / per job rather than only for the latest stage.
+        self.stage_jobs: dict[str, list[JobConfig]] = {}
+        self.running_jobs: set[str] = set()
 
     def on_pipeline_start(self, pipeline: PipelineConfig, max_workers: int) -> None:
         print("🚀 Starting pipeline (CI mode - parallel jobs, sequential stages)")
@@ -262,16 +291,19 @@ class CIFileCallbacks(PipelineCallbacks):
 
     def on_stage_start(self, stage: str, jobs: list[JobConfig]) -> None:
         self.current_stage_jobs = jobs
-        self.log_paths = {}
+        self.stage_jobs[stage] = jobs
+        self.log_paths = {name: path for name, path in self.log_paths.items() if name in self.running_jobs}
         print(f"\n🎯 Stage: {stage} ({len(jobs)} job(s) running in parallel)")
 
     def on_stage_skip(self, stage: str) -> None:
         print(f"⏭️  Skipping empty stage: {stage}")
 
     def on_job_start(self, job: JobConfig) -> None:
+        self.running_jobs.add(job.name)
         print(f"  ▶ {job.name}")
 
     def on_job_complete(self, outcome: JobOutcome) -> None:
+        self.running_jobs.discard(outcome.job.name)
         writer = self.open_writers.pop(outcome.job.name, None)
         if writer is not None:
             try:
@@ -290,10 +322,13 @@ class CIFileCallbacks(PipelineCallbacks):
 
         failures = {o.job.name for o in outcomes if not o.success}
         cached = {o.job.name for o in outcomes if o.memoized}
-        for job in self.current_stage_jobs:
+        aborted = {o.job.name for o in outcomes if o.aborted}
+        for job in self.stage_jobs.pop(stage, self.current_stage_jobs):
             log_path = self.log_paths.get(job.name)
             if job.name in cached:
                 status = "↷"
+            elif job.name in aborted:
+                status = "🛑"
             elif job.name in failures:
                 status = "❌"
             else:
@@ -304,7 +339,7 @@ class CIFileCallbacks(PipelineCallbacks):
             if job.name in cached:
                 print("(cached — fingerprint unchanged, execution skipped)")
             elif log_path and log_path.exists():
-                print(log_path.read_text(encoding="utf-8"))
+                print(read_job_log(log_path))
             else:
                 print("(no output)")
 
@@ -312,10 +347,10 @@ class CIFileCallbacks(PipelineCallbacks):
             print(f"\n🛑 Stage {stage} failed. Stopping pipeline.")
 
     def make_output_writer(self, job: JobConfig, job_dir: Path) -> Any:
-        log_path = job_dir / "output.log"
+        log_path = job_dir / JOB_LOG_NAME
         log_path.parent.mkdir(parents=True, exist_ok=True)
         self.log_paths[job.name] = log_path
-        writer = open(log_path, "w", encoding="utf-8")  # noqa: SIM115
+        writer = open_job_log(log_path)
         self.open_writers[job.name] = writer
         return writer
 
@@ -323,7 +358,7 @@ class CIFileCallbacks(PipelineCallbacks):
         return run_single_job_file
 
     def make_worker_args(self, job: JobConfig, job_dir: Path) -> dict[str, Any]:
-        log_path = job_dir / "output.log"
+        log_path = job_dir / JOB_LOG_NAME
         self.log_paths[job.name] = log_path
         return {"log_path": str(log_path)}
 
@@ -350,6 +385,7 @@ class TUIOrchestrator:
         parallel_backend: ParallelBackendConfig | None = None,
         worktree_config: WorktreeConfig | None = None,
         fingerprints: FingerprintManager | None = None,
+        scheduler_config: SchedulerConfig | None = None,
     ) -> None:
         self.job_executor = job_executor
         self.fingerprints = fingerprints
@@ -363,6 +399,7 @@ class TUIOrchestrator:
         self.mutation_config = mutation_config or MutationConfig()
         self.parallel_backend = parallel_backend or ParallelBackendConfig()
         self.worktree_config = worktree_config or WorktreeConfig()
+        self.scheduler_config = scheduler_config or SchedulerConfig()
 
         # Cancel/control state
         self.cancel_event: threading.Event = threading.Event()
@@ -412,20 +449,12 @@ class TUIOrchestrator:
         app.call_from_thread(app.post_message, JobStatusChanged(job.name, "running"))
         writer = QueueWriter(output_queue, job.name)
 
-        stop_drain = threading.Event()
+        def deliver(job_name: str, text: str | None) -> None:
+            if text is not None:
+                app.call_from_thread(app.post_message, JobOutput(job_name, text))
 
-        def drain_loop() -> None:
-            while not stop_drain.is_set():
-                try:
-                    while True:
-                        job_name, text = output_queue.get(timeout=0.02)
-                        if text is not None:
-                            app.call_from_thread(app.post_message, JobOutput(job_name, text))
-                except Empty:
-                    pass
-
-        drain_thread = threading.Thread(target=drain_loop, daemon=True)
-        drain_thread.start()
+        pump = OutputPump(output_queue, deliver)
+        pump.start()
 
         try:
             ctx = self.job_executor.build_context(job, job_dir=job_dir, output_writer=writer)
@@ -434,13 +463,11 @@ class TUIOrchestrator:
         except Exception:
             app.call_from_thread(app.post_message, JobStatusChanged(job.name, "failed"))
         finally:
-            stop_drain.set()
-            drain_thread.join(timeout=0.5)
-            self.drain_queue_sync(output_queue, app, JobOutput)
+            pump.stop()
 
     def execute_pipeline_tui(self, pipeline: PipelineConfig, app: PipelineApp) -> None:
         """Execute pipeline with live output routed to Textual TUI."""
-        use_threads = self.parallel_backend.backend == "thread"
+        use_threads = self.parallel_backend.backend in ("thread", "asyncio")
 
         if use_threads:
             # Threads share memory — a plain queue.Queue avoids the Manager
@@ -458,6 +485,8 @@ class TUIOrchestrator:
         mdop = self.maximum_degree_of_parallelism
         if mdop == 1:
             backend_label = "serial"
+        elif self.parallel_backend.backend == "asyncio":
+            backend_label = f"asyncio × {mdop}"
         elif use_threads:
             backend_label = f"threads × {mdop}"
         else:
@@ -476,9 +505,11 @@ class TUIOrchestrator:
                 parallel_backend=self.parallel_backend,
                 worktree_config=self.worktree_config,
                 fingerprints=self.fingerprints,
+                scheduler_config=self.scheduler_config,
             )
             runner.execute_pipeline(pipeline)
         finally:
+            tui_callbacks.close()
             if mgr is not None:
                 mgr.shutdown()
 
@@ -495,17 +526,8 @@ class TUIOrchestrator:
             parallel_backend=self.parallel_backend,
             worktree_config=self.worktree_config,
             fingerprints=self.fingerprints,
+            scheduler_config=self.scheduler_config,
         )
         runner.execute_pipeline(pipeline)
         summary = self.event_collector_instance.summary()
         print(summary.format_text())
-
-    def drain_queue_sync(self, queue: Any, app: PipelineApp, job_output_cls: Any) -> None:
-        """Drain remaining items from queue after single-job inline execution."""
-        while True:
-            try:
-                job_name, text = queue.get_nowait()
-                if text is not None:
-                    app.call_from_thread(app.post_message, job_output_cls(job_name, text))
-            except Empty:
-                break
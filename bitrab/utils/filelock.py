@@ -6,7 +6,7 @@ run, and concurrent bitrab processes (watch mode + a manual run).
 
 Implementation:
   - Windows: ``msvcrt.locking`` on the first byte of the lock file.
-  - POSIX: ``fcntl.flock`` with ``LOCK_EX``.
+  - POSIX: ``fcntl.flock`` with ``LOCK_EX`` (``LOCK_SH`` for shared locks).
 
 Both are advisory — all cooperating writers must go through :class:`FileLock`.
 Acquisition is non-blocking with a poll loop so a timeout can be enforced
@@ -25,8 +25,11 @@ from types import TracebackType
 if sys.platform == "win32":
     import msvcrt
 
-    def lock_fd(fd: int) -> None:
-        """Try to lock *fd* without blocking. Raises OSError if already locked."""
+    def lock_fd(fd: int, shared: bool = False) -> None:
+        """Try to lock *fd* without blocking. Raises OSError if already locked.
+
+        ``msvcrt`` has no shared locks, so *shared* locks are exclusive here.
+        """
         os.lseek(fd, 0, os.SEEK_SET)
         msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
 
@@ -38,9 +41,9 @@ if sys.platform == "win32":
 else:
     import fcntl
 
-    def lock_fd(fd: int) -> None:
+    def lock_fd(fd: int, shared: bool = False) -> None:
         """Try to lock *fd* without blocking. Raises OSError if already locked."""
-        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
 
     def unlock_fd(fd: int) -> None:
         """Release the lock held on *fd*."""
@@ -67,12 +70,15 @@ class FileLock:
         path: Location of the lock file (parent directories are created).
         timeout: Maximum seconds to wait for acquisition.
         poll_interval: Sleep between non-blocking acquisition attempts.
+        shared: Take a shared (reader) lock: any number of shared holders, but
+            none while an exclusive lock is held.  Exclusive on Windows.
     """
 
-    def __init__(self, path: Path, timeout: float = 30.0, poll_interval: float = 0.05):
+    def __init__(self, path: Path, timeout: float = 30.0, poll_interval: float = 0.05, shared: bool = False):
         self.path = Path(path)
         self.timeout = timeout
         self.poll_interval = poll_interval
+        self.shared = shared
         self.fd: int | None = None
 
     def acquire(self) -> None:
@@ -91,7 +97,7 @@ class FileLock:
         try:
             while True:
                 try:
-                    lock_fd(fd)
+                    lock_fd(fd, self.shared)
                     self.fd = fd
                     return
                 except OSError:
@@ -0,0 +1,214 @@
+"""Tests for CPU / memory weighted admission of parallel jobs."""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+from bitrab.execution import admission
+from bitrab.execution.admission import (
+    JobWeight,
+    PressureGate,
+    PressureSample,
+    ResourceBudget,
+    job_weight,
+    read_psi_some_avg10,
+)
+from bitrab.execution.job import JobExecutor
+from bitrab.execution.stage_runner import DagPipelineRunner, JobOutcome, PipelineCallbacks, StagePipelineRunner
+from bitrab.execution.variables import VariableManager
+from bitrab.models.pipeline import JobConfig, PipelineConfig
+from bitrab.mutation import (
+    AdaptiveConfig,
+    ParallelBackendConfig,
+    ResourceConfig,
+    SchedulerConfig,
+    load_scheduler_config,
+)
+
+
+def test_job_weight_defaults_to_one_core():
+    assert job_weight(JobConfig(name="a", stage="test"), ResourceConfig()) == JobWeight(cpu=1.0, mem_mb=0.0)
+
+
+def test_job_weight_from_variables_and_table():
+    job = JobConfig(name="build", stage="test", variables={"BITRAB_CPU_WEIGHT": "4", "BITRAB_MEM_MB": "512"})
+    assert job_weight(job, ResourceConfig()) == JobWeight(cpu=4.0, mem_mb=512.0)
+    table = ResourceConfig(jobs={"build": {"cpu": 2}})
+    assert job_weight(job, table) == JobWeight(cpu=2.0, mem_mb=512.0)
+
+
+def test_job_weight_ignores_garbage():
+    job = JobConfig(name="a", stage="test", variables={"BITRAB_CPU_WEIGHT": "lots", "BITRAB_MEM_MB": "-3"})
+    assert job_weight(job, ResourceConfig()) == JobWeight()
+
+
+def test_budget_fits_and_releases():
+    budget = ResourceBudget(cpus=4, memory_mb=1000)
+    budget.acquire("a", JobWeight(cpu=3, mem_mb=100))
+    assert budget.fits(JobWeight(cpu=1, mem_mb=100))
+    assert not budget.fits(JobWeight(cpu=2))
+    assert not budget.fits(JobWeight(cpu=0.5, mem_mb=950))
+    budget.release("a")
+    assert budget.used_cpu == 0.0
+    # An oversized job is admitted when nothing else holds the budget.
+    assert budget.fits(JobWeight(cpu=16, mem_mb=5000))
+
+
+def test_load_resources_table(tmp_path):
+    (tmp_path / "pyproject.toml").write_text(
+        "[tool.bitrab.resources]\ncpus = 6\nmemory_mb = 2048\n\n[tool.bitrab.resources.jobs.build]\ncpu = 4\n",
+        encoding="utf-8",
+    )
+    resources = load_scheduler_config(tmp_path).resources
+    assert resources.enabled
+    assert resources.cpus == 6.0
+    assert resources.memory_mb == 2048.0
+    assert resources.jobs == {"build": {"cpu": 4}}
+
+
+def test_resources_disabled_without_table(tmp_path):
+    (tmp_path / "pyproject.toml").write_text("[tool.bitrab]\nrelax_stages = true\n", encoding="utf-8")
+    assert not load_scheduler_config(tmp_path).resources.enabled
+
+
+class CpuTracker(PipelineCallbacks):
+    """Records the peak total CPU weight of concurrently running jobs."""
+
+    def __init__(self, weights: dict[str, float]) -> None:
+        self.weights = weights
+        self.current = 0.0
+        self.peak = 0.0
+        self.lock = threading.Lock()
+
+    def on_job_start(self, job: JobConfig) -> None:
+        with self.lock:
+            self.current += self.weights.get(job.name, 1.0)
+            self.peak = max(self.peak, self.current)
+
+    def on_job_complete(self, outcome: JobOutcome) -> None:
+        with self.lock:
+            self.current -= self.weights.get(outcome.job.name, 1.0)
+
+
+def heavy_pipeline(needs: bool = False) -> tuple[PipelineConfig, dict[str, float]]:
+    weights = {"compile": 2.0, "link": 2.0, "lint": 1.0, "fmt": 1.0}
+    jobs = [
+        JobConfig(
+            name=name,
+            stage="test",
+            script=["sleep 0.2"],
+            variables={"BITRAB_CPU_WEIGHT": str(weight)},
+            needs=["setup"] if needs else [],
+        )
+        for name, weight in weights.items()
+    ]
+    stages = ["test"]
+    if needs:
+        jobs.insert(0, JobConfig(name="setup", stage="setup", script=["true"]))
+        stages.insert(0, "setup")
+    return PipelineConfig(stages=stages, jobs=jobs), weights
+
+
+def make_runner(runner_cls, tmp_path: Path, callbacks: PipelineCallbacks, **kwargs):
+    vm = VariableManager({}, project_dir=tmp_path)
+    return runner_cls(
+        JobExecutor(vm, project_dir=tmp_path),
+        callbacks=callbacks,
+        maximum_degree_of_parallelism=4,
+        parallel_backend=ParallelBackendConfig(backend="thread"),
+        **kwargs,
+    )
+
+
+def test_stage_jobs_respect_cpu_budget(tmp_path):
+    pipeline, weights = heavy_pipeline()
+    tracker = CpuTracker(weights)
+    scheduler = SchedulerConfig(resources=ResourceConfig(enabled=True, cpus=3))
+    make_runner(StagePipelineRunner, tmp_path, tracker, scheduler_config=scheduler).execute_pipeline(pipeline)
+    assert tracker.peak <= 3.0
+    assert tracker.current == 0.0
+
+
+def test_continuous_dag_respects_cpu_budget(tmp_path):
+    pipeline, weights = heavy_pipeline(needs=True)
+    tracker = CpuTracker(weights)
+    scheduler = SchedulerConfig(dag_dispatch="continuous", resources=ResourceConfig(enabled=True, cpus=2))
+    make_runner(DagPipelineRunner, tmp_path, tracker, scheduler_config=scheduler).execute_pipeline(pipeline)
+    assert tracker.peak <= 2.0
+
+
+def test_oversized_job_still_runs(tmp_path):
+    jobs = [
+        JobConfig(name="huge", stage="test", script=["true"], variables={"BITRAB_CPU_WEIGHT": "64"}),
+        JobConfig(name="small", stage="test", script=["true"]),
+    ]
+    tracker = CpuTracker({"huge": 64.0})
+    scheduler = SchedulerConfig(resources=ResourceConfig(enabled=True, cpus=2))
+    runner = make_runner(StagePipelineRunner, tmp_path, tracker, scheduler_config=scheduler)
+    runner.execute_pipeline(PipelineConfig(stages=["test"], jobs=jobs))
+    assert sorted(runner.completed_jobs) == ["huge", "small"]
+    assert tracker.peak == 64.0  # ran alone, never alongside "small"
+
+
+def test_no_weights_keeps_job_count_limit(tmp_path):
+    pipeline = PipelineConfig(stages=["test"], jobs=[JobConfig(name="a", stage="test", script=["true"])])
+    runner = make_runner(StagePipelineRunner, tmp_path, PipelineCallbacks())
+    runner.execute_pipeline(pipeline)
+    assert runner.budget is None
+
+
+def test_read_psi_some_avg10(tmp_path):
+    psi = tmp_path / "cpu"
+    psi.write_text(
+        "some avg10=12.50 avg60=3.00 avg300=1.00 total=123\nfull avg10=0.00 avg60=0.00 avg300=0.00 total=0\n",
+        encoding="utf-8",
+    )
+    assert read_psi_some_avg10(psi) == 12.5
+    assert read_psi_some_avg10(tmp_path / "missing") is None
+
+
+def test_pressure_gate_thresholds_ignore_missing_sources():
+    gate = PressureGate(AdaptiveConfig(enabled=True))
+    assert not gate.over_threshold(PressureSample())
+    assert not gate.over_threshold(PressureSample(load_per_cpu=1.0, cpu_pressure=10.0, memory_pressure=0.0))
+    assert gate.over_threshold(PressureSample(load_per_cpu=3.0))
+    assert gate.over_threshold(PressureSample(memory_pressure=25.0))
+
+
+def test_pressure_gate_reuses_sample_within_interval():
+    samples = [PressureSample(cpu_pressure=90.0), PressureSample(cpu_pressure=0.0)]
+    gate = PressureGate(AdaptiveConfig(enabled=True), sampler=lambda: samples.pop(0), interval=60.0)
+    assert gate.hold()
+    assert gate.hold()
+    assert len(samples) == 1
+
+
+def test_load_adaptive_table(tmp_path):
+    (tmp_path / "pyproject.toml").write_text(
+        "[tool.bitrab.adaptive]\nmax_cpu_pressure = 20\n",
+        encoding="utf-8",
+    )
+    adaptive = load_scheduler_config(tmp_path).adaptive
+    assert adaptive.enabled
+    assert adaptive.max_cpu_pressure == 20.0
+    assert adaptive.max_memory_pressure == AdaptiveConfig().max_memory_pressure
+
+
+def run_under_pressure(tmp_path: Path, monkeypatch, sample: PressureSample) -> float:
+    monkeypatch.setattr(admission, "sample_pressure", lambda: sample)
+    jobs = [JobConfig(name=f"job{i}", stage="test", script=["sleep 0.1"]) for i in range(3)]
+    tracker = CpuTracker({})  # every job weighs 1, so peak == peak concurrency
+    scheduler = SchedulerConfig(adaptive=AdaptiveConfig(enabled=True))
+    runner = make_runner(StagePipelineRunner, tmp_path, tracker, scheduler_config=scheduler)
+    runner.execute_pipeline(PipelineConfig(stages=["test"], jobs=jobs))
+    assert len(runner.completed_jobs) == 3
+    return tracker.peak
+
+
+def test_adaptive_holds_starts_under_pressure(tmp_path, monkeypatch):
+    assert run_under_pressure(tmp_path, monkeypatch, PressureSample(cpu_pressure=95.0)) == 1.0
+
+
+def test_adaptive_runs_in_parallel_when_quiet(tmp_path, monkeypatch):
+    assert run_under_pressure(tmp_path, monkeypatch, PressureSample(cpu_pressure=0.0)) == 3.0
@@ -0,0 +1,112 @@
+"""Tests for the asyncio subprocess backend (``parallel_backend = "asyncio"``)."""
+
+from __future__ import annotations
+
+import io
+import subprocess  # nosec
+import sys
+import time
+
+import pytest
+
+from bitrab.exceptions import JobExecutionError, JobTimeoutError
+from bitrab.execution.aio import run_bash_on_loop, shared_loop
+from bitrab.execution.events import EventCollector
+from bitrab.execution.job import JobExecutor
+from bitrab.execution.stage_runner import StagePipelineRunner
+from bitrab.execution.variables import VariableManager
+from bitrab.models.pipeline import JobConfig, PipelineConfig
+from bitrab.mutation import ParallelBackendConfig, SchedulerConfig, load_parallel_config
+
+
+def test_streams_output_to_targets():
+    out, err = io.StringIO(), io.StringIO()
+    result = run_bash_on_loop(
+        "echo hello; echo oops >&2; printf partial",
+        check=False,
+        force_color=False,
+        stdout_target=out,
+        stderr_target=err,
+    )
+    assert result.returncode == 0
+    assert out.getvalue() == "hello\npartial"
+    assert err.getvalue() == "oops\n"
+    assert result.stdout == out.getvalue()
+
+
+def test_env_cwd_and_exit_code(tmp_path):
+    result = run_bash_on_loop(
+        'echo "$GREETING" > greeting.txt; exit 3',
+        env={"GREETING": "hi"},
+        cwd=tmp_path,
+        check=False,
+        stdout_target=io.StringIO(),
+        stderr_target=io.StringIO(),
+    )
+    assert result.returncode == 3
+    assert (tmp_path / "greeting.txt").read_text().strip() == "hi"
+    with pytest.raises(subprocess.CalledProcessError):
+        run_bash_on_loop("false", stdout_target=io.StringIO(), stderr_target=io.StringIO())
+
+
+def test_timeout_kills_script():
+    started = time.monotonic()
+    with pytest.raises(JobTimeoutError):
+        run_bash_on_loop("sleep 10", timeout=0.3, stdout_target=io.StringIO(), stderr_target=io.StringIO())
+    assert time.monotonic() - started < 5
+
+
+def test_one_loop_is_shared():
+    assert shared_loop() is shared_loop()
+
+
+def test_backend_accepted_in_pyproject(tmp_path):
+    (tmp_path / "pyproject.toml").write_text('[tool.bitrab]\nparallel_backend = "asyncio"\n', encoding="utf-8")
+    assert load_parallel_config(tmp_path).backend == "asyncio"
+
+
+def make_runner(tmp_path, collector, **scheduler):
+    vm = VariableManager({}, project_dir=tmp_path)
+    return StagePipelineRunner(
+        JobExecutor(vm, project_dir=tmp_path),
+        callbacks=collector,
+        maximum_degree_of_parallelism=4,
+        parallel_backend=ParallelBackendConfig(backend="asyncio"),
+        scheduler_config=SchedulerConfig(**scheduler),
+    )
+
+
+def test_pipeline_runs_on_asyncio_backend(tmp_path):
+    jobs = [JobConfig(name=f"lint{i}", stage="lint", script=[f"echo {i} > out{i}.txt"]) for i in range(8)]
+    collector = EventCollector()
+    runner = make_runner(tmp_path, collector)
+    runner.execute_pipeline(PipelineConfig(stages=["lint"], jobs=jobs))
+    assert runner.job_executor.async_subprocess
+    assert all((tmp_path / f"out{i}.txt").exists() for i in range(8))
+    assert {job.status for job in collector.summary().jobs} == {"success"}
+
+
+def test_job_timeout_on_asyncio_backend(tmp_path):
+    jobs = [
+        JobConfig(name="hangs", stage="test", script=["sleep 10"], timeout=0.3),
+        JobConfig(name="fine", stage="test", script=["true"]),
+    ]
+    collector = EventCollector()
+    with pytest.raises(JobTimeoutError):
+        make_runner(tmp_path, collector).execute_pipeline(PipelineConfig(stages=["test"], jobs=jobs))
+    assert {job.name: job.status for job in collector.summary().jobs} == {"hangs": "failed", "fine": "success"}
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="process-group signalling is POSIX-specific here")
+def test_fail_fast_on_asyncio_backend(tmp_path):
+    jobs = [
+        JobConfig(name="bad", stage="test", script=["sleep 0.3", "exit 1"]),
+        JobConfig(name="slow", stage="test", script=["sleep 30"], after_script=["touch after.txt"]),
+    ]
+    collector = EventCollector()
+    started = time.monotonic()
+    with pytest.raises(JobExecutionError, match="bad"):
+        make_runner(tmp_path, collector, fail_fast=True).execute_pipeline(PipelineConfig(stages=["test"], jobs=jobs))
+    assert time.monotonic() - started < 15
+    assert {job.name: job.status for job in collector.summary().jobs}["slow"] == "aborted"
+    assert (tmp_path / "after.txt").exists()
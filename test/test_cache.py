@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
+import io
+import logging
+import os
 import sys
+import tarfile
 import threading
 from pathlib import Path
 
@@ -12,8 +16,12 @@ from bitrab.config.capabilities import DiagnosticLevel, check_capabilities
 from bitrab.execution.cache import (
     DEFAULT_CACHE_KEY,
     _safe_copy2,
+    blob_path,
+    collect_garbage,
+    enforce_size_limit,
     expand_variables,
     read_latest_generation,
+    read_manifest,
     resolve_cache_key,
     restore_cache_entry,
     restore_caches,
@@ -22,6 +30,7 @@ from bitrab.execution.cache import (
     save_caches,
 )
 from bitrab.models.pipeline import CacheConfig, JobConfig
+from bitrab.mutation import CacheStoreConfig, load_cache_store_config
 from bitrab.plan import LocalGitLabRunner, PipelineProcessor
 from bitrab.utils.filelock import FileLock, FileLockTimeout
 
@@ -449,14 +458,360 @@ def test_concurrent_saves_produce_complete_cache(tmp_path):
     assert not errors
 
     # The published cache must be exactly one writer's complete set.
-    gen_dir = read_latest_generation(store, sanitize_cache_key("shared"))
-    assert gen_dir is not None
-    contents = {p.name: p.read_text() for p in (gen_dir / "out").iterdir()}
+    generation = read_latest_generation(store, sanitize_cache_key("shared"))
+    assert generation is not None
+    manifest = read_manifest(generation)
+    contents = {
+        Path(rel).name: blob_path(store, digest, mode).read_text() for rel, digest, mode, *_ in manifest["files"]
+    }
     assert len(contents) == n_files
     tags = {v.split("-")[0] for v in contents.values()}
     assert len(tags) == 1, f"interleaved cache content from writers: {tags}"
 
 
+# ---------------------------------------------------------------------------
+# Content-addressed store: dedupe, link modes, symlinks, legacy, sweep
+# ---------------------------------------------------------------------------
+
+
+def blob_files(store: Path) -> list[Path]:
+    return [p for p in (store / "blobs").rglob("*") if p.is_file()]
+
+
+class TestBlobStore:
+    def save_tree(self, tmp_path: Path, key: str, files: dict[str, str]) -> Path:
+        src = tmp_path / f"src_{key}"
+        for rel, content in files.items():
+            (src / rel).parent.mkdir(parents=True, exist_ok=True)
+            (src / rel).write_text(content)
+        assert save_cache_entry(CacheConfig(paths=["out/"], key=key), key, make_store(tmp_path), src)
+        return src
+
+    def test_identical_contents_are_stored_once(self, tmp_path):
+        self.save_tree(tmp_path, "a", {"out/x.txt": "same", "out/sub/y.txt": "same", "out/z.txt": "other"})
+        self.save_tree(tmp_path, "b", {"out/x.txt": "same"})
+        assert sorted(p.read_text() for p in blob_files(make_store(tmp_path))) == ["other", "same"]
+
+    def test_hardlink_restore_shares_the_blob_inode(self, tmp_path):
+        self.save_tree(tmp_path, "k", {"out/bin/tool": "#!/bin/sh\n"})
+        os.chmod(tmp_path / "src_k" / "out" / "bin" / "tool", 0o755)
+        self.save_tree(tmp_path, "k", {})
+        target = tmp_path / "target"
+        target.mkdir()
+        assert restore_cache_entry(CacheConfig(paths=["out/"]), "k", make_store(tmp_path), target, link="hardlink")
+        restored = target / "out" / "bin" / "tool"
+        assert restored.stat().st_nlink > 1
+        assert os.access(restored, os.X_OK)
+        # Restoring again over the same links is a no-op, not an error.
+        assert restore_cache_entry(CacheConfig(paths=["out/"]), "k", make_store(tmp_path), target, link="hardlink")
+
+    def test_default_restore_cannot_corrupt_the_store(self, tmp_path):
+        self.save_tree(tmp_path, "a", {"out/stats.txt": "hits=1\n"})
+        self.save_tree(tmp_path, "b", {"out/stats.txt": "hits=1\n"})
+        (blob,) = blob_files(make_store(tmp_path))
+        target = tmp_path / "target"
+        target.mkdir()
+        assert restore_cache_entry(CacheConfig(paths=["out/"]), "a", make_store(tmp_path), target)
+        restored = target / "out" / "stats.txt"
+        assert restored.stat().st_nlink == 1
+        # Append and chmod in place, as tools keeping stats next to their cache do.
+        with open(restored, "a", encoding="utf-8") as handle:
+            handle.write("hits=2\n")
+        os.chmod(restored, 0o600)
+        assert blob.read_text() == "hits=1\n"
+        other = tmp_path / "other"
+        other.mkdir()
+        assert restore_cache_entry(CacheConfig(paths=["out/"]), "b", make_store(tmp_path), other)
+        assert (other / "out" / "stats.txt").read_text() == "hits=1\n"
+        if sys.platform != "win32":
+            assert (other / "out" / "stats.txt").stat().st_mode & 0o777 == blob.stat().st_mode & 0o777 != 0o600
+
+    def test_copy_mode_restores_independent_files_with_mtimes(self, tmp_path):
+        src = self.save_tree(tmp_path, "k", {"out/data.txt": "v1"})
+        os.utime(src / "out" / "data.txt", ns=(1_000_000_000, 1_000_000_000))
+        self.save_tree(tmp_path, "k", {})
+        target = tmp_path / "target"
+        (target / "out").mkdir(parents=True)
+        (target / "out" / "data.txt").write_text("stale")
+        before = (target / "out" / "data.txt").stat().st_ino
+        assert restore_cache_entry(CacheConfig(paths=["out/"]), "k", make_store(tmp_path), target, link="copy")
+        restored = target / "out" / "data.txt"
+        assert restored.read_text() == "v1"
+        assert restored.stat().st_nlink == 1
+        assert restored.stat().st_ino != before  # replaced, never written in place
+        assert restored.stat().st_mtime_ns == 1_000_000_000
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="symlinks need privileges on Windows")
+    def test_symlinks_round_trip(self, tmp_path):
+        src = self.save_tree(tmp_path, "k", {"out/real.txt": "data"})
+        os.symlink("real.txt", src / "out" / "link.txt")
+        os.symlink("../out", src / "out" / "loop")
+        self.save_tree(tmp_path, "k", {})
+        target = tmp_path / "target"
+        target.mkdir()
+        assert restore_cache_entry(CacheConfig(paths=["out/"]), "k", make_store(tmp_path), target)
+        assert os.readlink(target / "out" / "link.txt") == "real.txt"
+        assert os.readlink(target / "out" / "loop") == "../out"
+        assert (target / "out" / "link.txt").read_text() == "data"
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="symlinks need privileges on Windows")
+    def test_recursive_glob_through_a_symlinked_directory(self, tmp_path):
+        src = tmp_path / "src"
+        (src / ".venv" / "lib" / "pkg").mkdir(parents=True)
+        (src / ".venv" / "lib" / "pkg" / "mod.py").write_text("x = 1\n")
+        os.symlink("lib", src / ".venv" / "lib64")
+        cache = CacheConfig(paths=[".venv/**"], key="k")
+        assert save_cache_entry(cache, "k", make_store(tmp_path), src)
+        manifest = read_manifest(read_latest_generation(make_store(tmp_path), "k"))
+        assert [rel for rel, *_rest in manifest["files"]] == [".venv/lib/pkg/mod.py"]
+        target = tmp_path / "target"
+        target.mkdir()
+        assert restore_cache_entry(cache, "k", make_store(tmp_path), target)
+        assert os.readlink(target / ".venv" / "lib64") == "lib"
+        assert (target / ".venv" / "lib64" / "pkg" / "mod.py").read_text() == "x = 1\n"
+
+    def test_legacy_directory_generation_still_restores(self, tmp_path):
+        store = make_store(tmp_path)
+        (store / "old" / "gen1" / "out").mkdir(parents=True)
+        (store / "old" / "gen1" / "out" / "f.txt").write_text("legacy")
+        (store / "old" / "latest").write_text("gen1")
+        target = tmp_path / "target"
+        target.mkdir()
+        assert restore_cache_entry(CacheConfig(paths=["out/"]), "old", store, target)
+        assert (target / "out" / "f.txt").read_text() == "legacy"
+
+    def test_sweep_removes_only_unreferenced_blobs(self, tmp_path):
+        store = make_store(tmp_path)
+        self.save_tree(tmp_path, "k", {"out/a.txt": "first"})
+        (tmp_path / "src_k" / "out" / "a.txt").write_text("second")
+        self.save_tree(tmp_path, "k", {})
+        assert len(blob_files(store)) == 2
+        assert collect_garbage(store, force=True) == len("first")
+        assert [p.read_text() for p in blob_files(store)] == ["second"]
+        # Swept within the interval: the next call is a no-op.
+        assert collect_garbage(store) == 0
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="msvcrt locks are always exclusive")
+    def test_sweep_waits_for_saves_in_progress(self, tmp_path):
+        store = make_store(tmp_path)
+        self.save_tree(tmp_path, "k", {"out/a.txt": "x"})
+        (store / "blobs" / "ff").mkdir()
+        (store / "blobs" / "ff" / "orphan-644").write_text("being saved")
+        with FileLock(store / "store.lock", shared=True), FileLock(store / "store.lock", shared=True):
+            assert collect_garbage(store, force=True) == 0
+        assert collect_garbage(store, force=True) == len("being saved")
+
+
+class TestArchiveFormat:
+    @pytest.mark.parametrize("cache_format", ["tar", "tar.gz"])
+    def test_archive_round_trip(self, tmp_path, cache_format):
+        store = make_store(tmp_path)
+        src = tmp_path / "src"
+        (src / "out" / "sub").mkdir(parents=True)
+        (src / "out" / "a.txt").write_text("alpha")
+        (src / "out" / "sub" / "tool").write_text("#!/bin/sh\n")
+        os.chmod(src / "out" / "sub" / "tool", 0o755)
+        os.link(src / "out" / "a.txt", src / "out" / "same.txt")
+        cache = CacheConfig(paths=["out/", "out/a.txt"], key="k")
+        assert save_cache_entry(cache, "k", store, src, cache_format=cache_format)
+        generation = read_latest_generation(store, "k")
+        assert generation is not None and generation.name.endswith(f".{cache_format}")
+        assert not (store / "blobs").exists()
+
+        target = tmp_path / "target"
+        (target / "out").mkdir(parents=True)
+        (target / "out" / "a.txt").write_text("stale")
+        assert restore_cache_entry(cache, "k", store, target)
+        assert (target / "out" / "a.txt").read_text() == "alpha"
+        assert (target / "out" / "same.txt").read_text() == "alpha"
+        assert os.access(target / "out" / "sub" / "tool", os.X_OK)
+
+    def test_switching_formats_replaces_the_old_generation(self, tmp_path):
+        store = make_store(tmp_path)
+        src = tmp_path / "src"
+        (src / "out").mkdir(parents=True)
+        (src / "out" / "f.txt").write_text("v1")
+        cache = CacheConfig(paths=["out/"], key="k")
+        assert save_cache_entry(cache, "k", store, src, cache_format="tar")
+        (src / "out" / "f.txt").write_text("v2")
+        assert save_cache_entry(cache, "k", store, src)
+        generations = [p.name for p in (store / "k").iterdir() if p.name not in ("latest", "last-used")]
+        assert len(generations) == 1 and generations[0].endswith(".manifest.json")
+        target = tmp_path / "target"
+        target.mkdir()
+        assert restore_cache_entry(cache, "k", store, target)
+        assert (target / "out" / "f.txt").read_text() == "v2"
+
+    def test_store_settings_come_from_pyproject(self, tmp_path, caplog):
+        assert load_cache_store_config(tmp_path) == CacheStoreConfig()
+        (tmp_path / "pyproject.toml").write_text('[tool.bitrab]\ncache_link = "Copy"\ncache_format = "tar.gz"\n')
+        assert load_cache_store_config(tmp_path) == CacheStoreConfig(link="copy", format="tar.gz")
+        bogus = tmp_path / "bogus"
+        bogus.mkdir()
+        (bogus / "pyproject.toml").write_text('[tool.bitrab]\ncache_link = "symlink"\ncache_format = "tar.gzip"\n')
+        with caplog.at_level(logging.WARNING, logger="bitrab.mutation"):
+            assert load_cache_store_config(bogus) == CacheStoreConfig()
+        assert "Unknown cache_format 'tar.gzip'" in caplog.text
+        assert "Unknown cache_link 'symlink'" in caplog.text
+
+    def test_archive_members_cannot_escape_the_target(self, tmp_path):
+        store = make_store(tmp_path)
+        (store / "k").mkdir(parents=True)
+        with tarfile.open(store / "k" / "gen.tar", "w") as tar:
+            data = b"owned"
+            info = tarfile.TarInfo("../escaped.txt")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+        (store / "k" / "latest").write_text("gen.tar")
+        target = tmp_path / "target"
+        target.mkdir()
+        assert restore_cache_entry(CacheConfig(paths=["x"]), "k", store, target) is False
+        assert not (tmp_path / "escaped.txt").exists()
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="symlinks need privileges on Windows")
+    @pytest.mark.parametrize("cache_format", ["tar", "tar.gz"])
+    def test_archives_never_write_through_symlinks(self, tmp_path, cache_format):
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "f.txt").write_text("original")
+        src = tmp_path / "src"
+        src.mkdir()
+        os.symlink(outside, src / "out")
+        store = make_store(tmp_path)
+        cache = CacheConfig(paths=["out", "out/**"], key="k")
+        assert save_cache_entry(cache, "k", store, src, cache_format=cache_format)
+        # Only the link is archived, not the files seen through it.
+        (outside / "f.txt").write_text("changed since the save")
+        target = tmp_path / "target"
+        target.mkdir()
+        assert restore_cache_entry(cache, "k", store, target)
+        assert os.readlink(target / "out") == str(outside)
+        assert (outside / "f.txt").read_text() == "changed since the save"
+
+        # A crafted archive that tries the same is refused.
+        with tarfile.open(store / "k" / "evil.tar", "w") as tar:
+            link = tarfile.TarInfo("out")
+            link.type, link.linkname = tarfile.SYMTYPE, str(outside)
+            tar.addfile(link)
+            info = tarfile.TarInfo("out/f.txt")
+            info.size = 5
+            tar.addfile(info, io.BytesIO(b"owned"))
+        (store / "k" / "latest").write_text("evil.tar")
+        fresh = tmp_path / "fresh"
+        fresh.mkdir()
+        assert restore_cache_entry(cache, "k", store, fresh) is False
+        assert (outside / "f.txt").read_text() == "changed since the save"
+
+
+class TestUnchangedCacheSkip:
+    def restore(self, tmp_path: Path, job: JobConfig) -> tuple[Path, dict]:
+        target = tmp_path / "target"
+        target.mkdir(exist_ok=True)
+        return target, restore_caches(job, make_store(tmp_path), target, {})
+
+    def test_unchanged_cache_is_not_saved_again(self, tmp_path, caplog):
+        seed_cache(tmp_path, "k", "cached/data.txt", "hello")
+        job = make_job(cache=[CacheConfig(paths=["cached/"], key="k")])
+        live = read_latest_generation(make_store(tmp_path), "k")
+        target, restored = self.restore(tmp_path, job)
+        assert set(restored) == {"k"}
+        with caplog.at_level(logging.INFO, logger="bitrab.execution.cache"):
+            save_caches(job, make_store(tmp_path), target, {}, succeeded=True, restored=restored)
+        assert "cache unchanged" in caplog.text
+        assert read_latest_generation(make_store(tmp_path), "k") == live
+
+    @pytest.mark.parametrize("change", ["edit", "add", "remove"])
+    def test_changed_cache_is_saved(self, tmp_path, change):
+        seed_cache(tmp_path, "k", "cached/data.txt", "hello")
+        job = make_job(cache=[CacheConfig(paths=["cached/"], key="k")])
+        live = read_latest_generation(make_store(tmp_path), "k")
+        target, restored = self.restore(tmp_path, job)
+        data = target / "cached" / "data.txt"
+        if change == "edit":
+            data.write_text("hello, world")
+        elif change == "add":
+            (target / "cached" / "more.txt").write_text("more")
+        else:
+            data.unlink()
+            (target / "cached" / "other.txt").write_text("other")
+        save_caches(job, make_store(tmp_path), target, {}, succeeded=True, restored=restored)
+        assert read_latest_generation(make_store(tmp_path), "k") != live
+
+    def test_miss_or_new_key_is_saved(self, tmp_path):
+        job = make_job(cache=[CacheConfig(paths=["cached/"], key="$REF")])
+        target, restored = self.restore(tmp_path, job)
+        assert restored == {}
+        (target / "cached").mkdir()
+        (target / "cached" / "data.txt").write_text("hello")
+        save_caches(job, make_store(tmp_path), target, {}, succeeded=True, restored=restored)
+        assert read_latest_generation(make_store(tmp_path), DEFAULT_CACHE_KEY) is not None
+        # Same files, but the key resolves differently at save time.
+        restored = restore_caches(job, make_store(tmp_path), target, {})
+        save_caches(job, make_store(tmp_path), target, {"REF": "main"}, succeeded=True, restored=restored)
+        assert read_latest_generation(make_store(tmp_path), "main") is not None
+
+
+class TestSizeLimit:
+    def save(self, tmp_path: Path, key: str, max_bytes: int | None = None) -> None:
+        src = tmp_path / f"src_{key}"
+        (src / "out").mkdir(parents=True, exist_ok=True)
+        (src / "out" / "data.bin").write_bytes(key.encode() * 10_000)
+        save_cache_entry(CacheConfig(paths=["out/"], key=key), key, make_store(tmp_path), src, max_bytes=max_bytes)
+
+    def age(self, tmp_path: Path, **stamps: int) -> None:
+        for key, stamp in stamps.items():
+            os.utime(make_store(tmp_path) / key / "last-used", (stamp, stamp))
+
+    def keys(self, tmp_path: Path) -> list[str]:
+        return sorted(k for k in "abcd" if read_latest_generation(make_store(tmp_path), k) is not None)
+
+    def test_least_recently_used_keys_go_first(self, tmp_path):
+        for key in "abc":
+            self.save(tmp_path, key)
+        self.age(tmp_path, a=100, b=200, c=300)
+        # Restoring "a" makes it the most recently used of the three.
+        target = tmp_path / "target"
+        target.mkdir()
+        assert restore_cache_entry(CacheConfig(paths=["out/"]), "a", make_store(tmp_path), target)
+        self.save(tmp_path, "d", max_bytes=25_000)
+        assert self.keys(tmp_path) == ["a", "d"]
+        # Evicted keys' blobs are swept straight away.
+        assert sorted(p.read_bytes()[:1] for p in blob_files(make_store(tmp_path))) == [b"a", b"d"]
+
+    def test_key_in_use_is_not_evicted(self, tmp_path):
+        for key in "abc":
+            self.save(tmp_path, key)
+        self.age(tmp_path, a=100, b=200, c=300)
+        holder = FileLock(make_store(tmp_path) / "a.lock", timeout=1.0)
+        holder.acquire()
+        try:
+            assert enforce_size_limit(make_store(tmp_path), 25_000, keep="c") == 1
+        finally:
+            holder.release()
+        assert self.keys(tmp_path) == ["a", "c"]
+
+    def test_just_saved_key_is_kept_even_if_too_big(self, tmp_path):
+        self.save(tmp_path, "a")
+        self.save(tmp_path, "b", max_bytes=1)
+        assert self.keys(tmp_path) == ["b"]
+
+    def test_under_the_limit_nothing_is_evicted(self, tmp_path):
+        for key in "abc":
+            self.save(tmp_path, key, max_bytes=1_000_000)
+        assert self.keys(tmp_path) == ["a", "b", "c"]
+
+    def test_limit_comes_from_pyproject(self, tmp_path, caplog):
+        (tmp_path / "pyproject.toml").write_text("[tool.bitrab]\ncache_max_bytes = 1073741824\n")
+        assert load_cache_store_config(tmp_path).max_bytes == 1 << 30
+        assert CacheStoreConfig(max_bytes=0).max_bytes is None
+        bogus = tmp_path / "bogus"
+        bogus.mkdir()
+        (bogus / "pyproject.toml").write_text('[tool.bitrab]\ncache_max_bytes = "10GB"\n')
+        with caplog.at_level(logging.WARNING, logger="bitrab.mutation"):
+            assert load_cache_store_config(bogus).max_bytes is None
+        assert "'10GB' is not a whole number of bytes" in caplog.text
+
+
 # ---------------------------------------------------------------------------
 # Wiring: JobExecutor + pipeline E2E
 # ---------------------------------------------------------------------------
@@ -0,0 +1,64 @@
+"""Tests for the event-driven completion wakeup of the dispatch loops."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from bitrab.execution.completion import CompletionQueue
+from bitrab.execution.events import EventCollector
+from bitrab.execution.job import JobExecutor
+from bitrab.execution.stage_runner import DagPipelineRunner, StagePipelineRunner
+from bitrab.execution.variables import VariableManager
+from bitrab.models.pipeline import JobConfig, PipelineConfig
+from bitrab.mutation import ParallelBackendConfig, SchedulerConfig
+
+
+def test_finished_futures_are_returned_in_completion_order():
+    completions = CompletionQueue()
+    first: Future[int] = Future()
+    second: Future[int] = Future()
+    completions.watch(first)
+    completions.watch(second)
+    second.set_result(2)
+    first.set_result(1)
+    assert completions.wait(0) == [second, first]
+    assert completions.wait(0.01) == []
+
+
+def test_wait_wakes_as_soon_as_a_future_finishes():
+    completions = CompletionQueue()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        future = pool.submit(time.sleep, 0.2)
+        completions.watch(future)
+        started = time.monotonic()
+        assert completions.wait(None) == [future]
+        assert time.monotonic() - started < 2
+
+
+class CountingCollector(EventCollector):
+    def __init__(self) -> None:
+        super().__init__()
+        self.polls = 0
+        self.lock = threading.Lock()
+
+    def poll_during_parallel(self, futures):
+        with self.lock:
+            self.polls += 1
+
+
+def test_dispatch_loop_sleeps_until_a_job_finishes(tmp_path):
+    for dispatch, runner_class in (("batch", StagePipelineRunner), ("continuous", DagPipelineRunner)):
+        collector = CountingCollector()
+        jobs = [JobConfig(name=f"{dispatch}{i}", stage="test", script=["sleep 0.5"]) for i in range(2)]
+        runner_class(
+            JobExecutor(VariableManager({}, project_dir=tmp_path), project_dir=tmp_path),
+            callbacks=collector,
+            maximum_degree_of_parallelism=2,
+            parallel_backend=ParallelBackendConfig(backend="thread"),
+            scheduler_config=SchedulerConfig(dag_dispatch=dispatch),
+        ).execute_pipeline(PipelineConfig(stages=["test"], jobs=jobs))
+        assert {job.status for job in collector.summary().jobs} == {"success"}
+        # A 50 ms poll would have woken ~10 times per job.
+        assert collector.polls <= 2
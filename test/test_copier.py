@@ -0,0 +1,150 @@
+"""Tests for the shared parallel copy engine in :mod:`bitrab.execution.copier`."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from bitrab.execution import copier
+from bitrab.execution.artifacts import artifact_dir, collect_artifacts, inject_dependencies
+from bitrab.execution.cache import disjoint_paths, restore_caches, save_cache_entry
+from bitrab.models.pipeline import CacheConfig, JobConfig
+
+
+def make_tree(root: Path, files: int = 100) -> None:
+    for i in range(files):
+        path = root / f"pkg{i % 7}" / f"sub{i % 3}" / f"f{i}.txt"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(f"content {i}\n".encode() * (i + 1))
+    (root / "empty").mkdir()
+
+
+def tree_contents(root: Path) -> dict[str, bytes]:
+    return {p.relative_to(root).as_posix(): p.read_bytes() for p in root.rglob("*") if p.is_file()}
+
+
+def test_copy_tree_copies_contents_modes_times_and_empty_dirs(tmp_path):
+    src, dest = tmp_path / "src", tmp_path / "dest"
+    make_tree(src)
+    tool = src / "pkg0" / "tool"
+    tool.write_text("#!/bin/sh\n")
+    os.chmod(tool, 0o750)
+    os.utime(tool, ns=(1_000_000_000, 2_000_000_000))
+    assert copier.copy_tree(src, dest) == 101
+    assert tree_contents(dest) == tree_contents(src)
+    assert (dest / "empty").is_dir()
+    assert (dest / "pkg0" / "tool").stat().st_mtime_ns == 2_000_000_000
+    if sys.platform != "win32":
+        assert (dest / "pkg0" / "tool").stat().st_mode & 0o777 == 0o750
+
+
+@pytest.mark.parametrize("methods", [{"copy_file_range": False}, {"copy_file_range": False, "sendfile": False}])
+def test_fallback_copy_methods(tmp_path, monkeypatch, methods):
+    for method, enabled in methods.items():
+        monkeypatch.setitem(copier.KERNEL_COPY, method, enabled)
+    monkeypatch.setattr(copier, "COPY_CHUNK", 1000)
+    src = tmp_path / "big.bin"
+    src.write_bytes(os.urandom(10_500))
+    copier.copy_file(src, tmp_path / "copy.bin")
+    assert (tmp_path / "copy.bin").read_bytes() == src.read_bytes()
+
+
+def test_replace_never_writes_into_the_existing_inode(tmp_path):
+    src, dest = tmp_path / "new", tmp_path / "live"
+    src.write_text("new")
+    dest.write_text("old")
+    keeper = tmp_path / "keeper"
+    os.link(dest, keeper)
+    copier.copy_file(src, dest, replace=True)
+    assert dest.read_text() == "new"
+    assert keeper.read_text() == "old"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["keeper", "live", "new"]
+
+
+def test_work_is_spread_over_the_pool_and_errors_surface(tmp_path):
+    threads: set[str] = set()
+    done: list[int] = []
+
+    def work(item: int) -> None:
+        threads.add(threading.current_thread().name)
+        if item == 5:
+            raise ValueError("bad item")
+        done.append(item)
+
+    with pytest.raises(ValueError, match="bad item"):
+        copier.run_in_batches(work, list(range(10 * copier.BATCH_FILES)))
+    # The failing batch stopped at its bad item; every other batch ran to the end.
+    assert len(done) == 5 + 9 * copier.BATCH_FILES
+    assert any(name.startswith("bitrab-copy") for name in threads)
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs named pipes")
+def test_named_pipes_are_refused_not_opened(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "real.txt").write_text("data")
+    os.mkfifo(src / "pipe")
+    # Opening the FIFO for reading would block until a writer shows up.
+    with pytest.raises(shutil.SpecialFileError, match="named pipe"):
+        copier.copy_tree(src, tmp_path / "dest")
+    assert (tmp_path / "dest" / "real.txt").read_text() == "data"
+    assert not (tmp_path / "dest" / "pipe").exists()
+
+
+def test_later_duplicate_destination_wins(tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.write_text("first")
+    second.write_text("second")
+    dest = tmp_path / "out" / "file"
+    assert copier.copy_files([(str(first), str(dest)), (str(second), str(dest))]) == 1
+    assert dest.read_text() == "second"
+
+
+def test_artifact_collection_and_injection_round_trip(tmp_path):
+    workdir = tmp_path / "work"
+    make_tree(workdir / "dist")
+    (workdir / "report.txt").write_text("report")
+    producer = JobConfig(name="build", stage="build", script=["true"], artifacts_paths=["dist/", "report.txt"])
+    collect_artifacts(producer, tmp_path, succeeded=True, effective_dir=workdir)
+    assert tree_contents(artifact_dir(tmp_path, "build") / "dist") == tree_contents(workdir / "dist")
+
+    consumer = JobConfig(name="test", stage="test", script=["true"])
+    target = tmp_path / "consumer"
+    target.mkdir()
+    inject_dependencies(consumer, tmp_path, ["build"], effective_dir=target)
+    assert tree_contents(target / "dist") == tree_contents(workdir / "dist")
+    assert (target / "report.txt").read_text() == "report"
+    assert (target / "dist" / "empty").is_dir()
+
+
+def test_disjoint_cache_entries():
+    assert disjoint_paths([CacheConfig(paths=["node_modules/"]), CacheConfig(paths=[".venv/", "./build/**"])])
+    assert not disjoint_paths([CacheConfig(paths=["build/a"]), CacheConfig(paths=["build/b"])])
+    assert not disjoint_paths([CacheConfig(paths=["*.whl"]), CacheConfig(paths=["dist/"])])
+    assert not disjoint_paths([CacheConfig(paths=["/abs"]), CacheConfig(paths=["dist/"])])
+
+
+@pytest.mark.parametrize("overlapping", [False, True])
+def test_cache_entries_restore_together(tmp_path, overlapping):
+    store = tmp_path / "store"
+    names = ["a", "b", "c", "d"]
+    for name in names:
+        src = tmp_path / f"src_{name}"
+        rel = f"shared/{name}" if overlapping else name
+        make_tree(src / rel, files=40)
+        (src / rel / "owner.txt").write_text(name)
+        assert save_cache_entry(CacheConfig(paths=[rel], key=name), name, store, src)
+    caches = [CacheConfig(paths=[f"shared/{n}" if overlapping else n], key=n) for n in names]
+    target = tmp_path / "target"
+    target.mkdir()
+    restored = restore_caches(JobConfig(name="j", stage="test", script=["true"], cache=caches), store, target, {})
+    assert sorted(restored) == names
+    for name in names:
+        rel = f"shared/{name}" if overlapping else name
+        assert (target / rel / "owner.txt").read_text() == name
+        assert len(tree_contents(target / rel)) == 41
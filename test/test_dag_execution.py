@@ -404,3 +404,176 @@ job_d:
     assert (tmp_path / "b.txt").exists()
     assert (tmp_path / "c.txt").exists()
     assert (tmp_path / "d.txt").exists()
+
+
+CONTINUOUS_CONFIG = """\
+stages:
+  - build
+  - test
+
+slow:
+  stage: build
+  script:
+    - sleep 2
+    - date +%s%N > slow_done.txt
+
+fast:
+  stage: build
+  script:
+    - echo "fast" > fast.txt
+
+after_fast:
+  stage: test
+  needs:
+    - fast
+  script:
+    - date +%s%N > after_fast_started.txt
+"""
+
+
+def test_dag_continuous_dispatch_does_not_wait_for_batch(tmp_path):
+    """Continuous dispatch starts a job as soon as its needs finish, not when the batch does."""
+    (tmp_path / ".gitlab-ci.yml").write_text(CONTINUOUS_CONFIG)
+    runner = LocalGitLabRunner(tmp_path)
+    runner.run_pipeline(maximum_degree_of_parallelism=3, parallel_backend="thread", dag_dispatch="continuous")
+
+    slow_done = int((tmp_path / "slow_done.txt").read_text().strip())
+    after_fast_started = int((tmp_path / "after_fast_started.txt").read_text().strip())
+    assert after_fast_started < slow_done
+
+
+def test_dag_continuous_dispatch_from_pyproject(tmp_path):
+    """``[tool.bitrab] dag_dispatch`` selects continuous dispatch without a CLI flag."""
+    (tmp_path / ".gitlab-ci.yml").write_text(CONTINUOUS_CONFIG)
+    (tmp_path / "pyproject.toml").write_text('[tool.bitrab]\ndag_dispatch = "continuous"\n')
+    runner = LocalGitLabRunner(tmp_path)
+    runner.run_pipeline(maximum_degree_of_parallelism=3, parallel_backend="thread")
+
+    slow_done = int((tmp_path / "slow_done.txt").read_text().strip())
+    after_fast_started = int((tmp_path / "after_fast_started.txt").read_text().strip())
+    assert after_fast_started < slow_done
+
+
+def test_dag_continuous_dispatch_failure_blocks_downstream(tmp_path):
+    """Under continuous dispatch a hard failure still skips its on_success dependents."""
+    config_content = """\
+stages:
+  - build
+  - test
+
+broken:
+  stage: build
+  script:
+    - exit 1
+
+other:
+  stage: build
+  script:
+    - echo "other" > other.txt
+
+downstream:
+  stage: test
+  needs:
+    - broken
+  script:
+    - echo "should not run" > downstream.txt
+
+independent:
+  stage: test
+  needs:
+    - other
+  script:
+    - echo "ran" > independent.txt
+"""
+    (tmp_path / ".gitlab-ci.yml").write_text(config_content)
+    runner = LocalGitLabRunner(tmp_path)
+    with pytest.raises(JobExecutionError):
+        runner.run_pipeline(maximum_degree_of_parallelism=2, parallel_backend="thread", dag_dispatch="continuous")
+    assert not (tmp_path / "downstream.txt").exists()
+    assert (tmp_path / "independent.txt").exists()
+
+
+def test_dag_continuous_dispatch_stage_events(tmp_path):
+    """Each stage gets exactly one start and one complete event under continuous dispatch."""
+    from bitrab.execution.events import EventType
+
+    (tmp_path / ".gitlab-ci.yml").write_text(CONTINUOUS_CONFIG)
+    runner = LocalGitLabRunner(tmp_path)
+    runner.run_pipeline(maximum_degree_of_parallelism=3, parallel_backend="thread", dag_dispatch="continuous")
+
+    events = runner.orchestrator.event_collector.events
+    starts = [e.stage for e in events if e.event_type == EventType.STAGE_START]
+    completes = {e.stage: e for e in events if e.event_type == EventType.STAGE_COMPLETE}
+    assert sorted(starts) == ["build", "test"]
+    assert len(completes["build"].data["outcomes"]) == 2
+    assert len(completes["test"].data["outcomes"]) == 1
+
+
+RELAXED_CONFIG = """\
+stages:
+  - build
+  - test
+
+build_a:
+  stage: build
+  script:
+    - echo "a" > a.txt
+
+build_b:
+  stage: build
+  script:
+    - sleep 2
+    - date +%s%N > b_done.txt
+
+test_a:
+  stage: test
+  dependencies:
+    - build_a
+  script:
+    - date +%s%N > test_a_started.txt
+
+test_all:
+  stage: test
+  script:
+    - test -f b_done.txt
+"""
+
+
+def test_relax_stages_starts_on_dependencies(tmp_path):
+    """With relax_stages, a job waits only for the jobs in its dependencies: list."""
+    (tmp_path / ".gitlab-ci.yml").write_text(RELAXED_CONFIG)
+    runner = LocalGitLabRunner(tmp_path)
+    runner.run_pipeline(maximum_degree_of_parallelism=3, parallel_backend="thread", relax_stages=True)
+
+    b_done = int((tmp_path / "b_done.txt").read_text().strip())
+    test_a_started = int((tmp_path / "test_a_started.txt").read_text().strip())
+    assert test_a_started < b_done
+
+
+def test_relax_stages_off_keeps_stage_barrier(tmp_path):
+    """Without relax_stages the dependencies: list does not bypass the stage barrier."""
+    (tmp_path / ".gitlab-ci.yml").write_text(RELAXED_CONFIG)
+    runner = LocalGitLabRunner(tmp_path)
+    runner.run_pipeline(maximum_degree_of_parallelism=3, parallel_backend="thread")
+
+    b_done = int((tmp_path / "b_done.txt").read_text().strip())
+    test_a_started = int((tmp_path / "test_a_started.txt").read_text().strip())
+    assert test_a_started > b_done
+
+
+def test_needs_from_dependencies_only_uses_prior_stages():
+    from bitrab.execution.stage_runner import needs_from_dependencies
+    from bitrab.models.pipeline import JobConfig, PipelineConfig
+
+    pipeline = PipelineConfig(
+        stages=["build", "test"],
+        jobs=[
+            JobConfig(name="build", stage="build"),
+            JobConfig(name="peer", stage="test"),
+            JobConfig(name="unit", stage="test", dependencies=["build", "peer", "missing"]),
+            JobConfig(name="none", stage="test", dependencies=[]),
+            JobConfig(name="all", stage="test"),
+        ],
+    )
+    relaxed = {job.name: job.needs for job in needs_from_dependencies(pipeline).jobs}
+    assert relaxed == {"build": [], "peer": [], "unit": ["build"], "none": [], "all": []}
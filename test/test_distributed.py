@@ -0,0 +1,123 @@
+"""Tests for distributing jobs to ``bitrab agent`` workers."""
+
+from __future__ import annotations
+
+import io
+import sys
+import tarfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from bitrab.distributed import AgentHub, RemoteJobExecutor, pack_store, parse_address, run_agent, unpack_store
+from bitrab.exceptions import AgentConnectionError, JobExecutionError
+from bitrab.execution.events import EventCollector
+from bitrab.execution.stage_runner import StagePipelineRunner
+from bitrab.execution.variables import VariableManager
+from bitrab.models.pipeline import JobConfig, PipelineConfig
+from bitrab.mutation import ParallelBackendConfig
+
+
+def test_parse_address():
+    assert str(parse_address("tcp://127.0.0.1:7878")) == "tcp://127.0.0.1:7878"
+    assert str(parse_address("localhost:9000")) == "tcp://localhost:9000"
+    assert str(parse_address("unix:/tmp/bitrab.sock")) == "unix:/tmp/bitrab.sock"
+    with pytest.raises(AgentConnectionError):
+        parse_address("tcp://nohost")
+
+
+def test_store_round_trip(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    (source / ".bitrab" / "artifacts" / "build").mkdir(parents=True)
+    (source / ".bitrab" / "artifacts" / "build" / "app.bin").write_text("v2", encoding="utf-8")
+    (target / ".bitrab" / "artifacts" / "build").mkdir(parents=True)
+    (target / ".bitrab" / "artifacts" / "build" / "stale.bin").write_text("v1", encoding="utf-8")
+    unpack_store(pack_store(source, ["build", "missing"]), target)
+    assert [p.name for p in (target / ".bitrab" / "artifacts" / "build").iterdir()] == ["app.bin"]
+    assert pack_store(source, ["missing"]) == b""
+
+
+def test_unsafe_store_entry_is_refused(tmp_path):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        info = tarfile.TarInfo("../escape.txt")
+        tar.addfile(info, io.BytesIO(b""))
+    with pytest.raises(AgentConnectionError, match="unsafe"):
+        unpack_store(buf.getvalue(), tmp_path)
+    assert not (tmp_path / ".bitrab" / "escape.txt").exists()
+
+
+def start_agents(address: str, project_dir: Path, slots: int) -> tuple[threading.Thread, list[int]]:
+    served: list[int] = []
+    thread = threading.Thread(
+        target=lambda: served.append(run_agent(address, project_dir, slots=slots, connect_timeout=10)),
+        daemon=True,
+    )
+    thread.start()
+    return thread, served
+
+
+def run_distributed(
+    tmp_path: Path, address: str, jobs: list[JobConfig], stages: list[str], collector: EventCollector
+) -> list[int]:
+    hub = AgentHub(address, wait_timeout=30)
+    hub.start()
+    thread, served = start_agents(str(hub.address), tmp_path, slots=2)
+    try:
+        executor = RemoteJobExecutor(VariableManager({}, project_dir=tmp_path), hub, project_dir=tmp_path)
+        StagePipelineRunner(
+            executor,
+            callbacks=collector,
+            maximum_degree_of_parallelism=2,
+            parallel_backend=ParallelBackendConfig(backend="thread"),
+        ).execute_pipeline(PipelineConfig(stages=stages, jobs=jobs))
+    finally:
+        hub.close()
+        thread.join(timeout=10)
+    assert not thread.is_alive()
+    return served
+
+
+def artifact_jobs() -> list[JobConfig]:
+    return [
+        JobConfig(
+            name="build",
+            stage="build",
+            script=["mkdir -p out", "echo built > out/app.txt", "echo VERSION=1.2 > build.env"],
+            artifacts_paths=["out/"],
+            artifacts_dotenv="build.env",
+        ),
+        JobConfig(
+            name="test",
+            stage="test",
+            script=['test "$VERSION" = 1.2', "cat out/app.txt > result.txt"],
+            artifacts_paths=["result.txt"],
+        ),
+    ]
+
+
+def test_artifacts_and_dotenv_flow_between_agents(tmp_path):
+    collector = EventCollector()
+    served = run_distributed(tmp_path, "tcp://127.0.0.1:0", artifact_jobs(), ["build", "test"], collector)
+    assert served == [2]
+    assert {job.status for job in collector.summary().jobs} == {"success"}
+    result = tmp_path / ".bitrab" / "artifacts" / "test" / "result.txt"
+    assert result.read_text().strip() == "built"
+    assert not (tmp_path / ".bitrab" / "agents").exists() or not any((tmp_path / ".bitrab" / "agents").iterdir())
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix domain sockets")
+def test_failures_map_back_to_coordinator_over_unix_socket(tmp_path):
+    jobs = [
+        JobConfig(name="flaky", stage="test", script=["exit 3"], allow_failure=True, allow_failure_exit_codes=[3]),
+        JobConfig(name="ok", stage="test", script=["true"]),
+        JobConfig(name="broken", stage="test", script=["sleep 0.2", "exit 1"]),
+    ]
+    collector = EventCollector()
+    with pytest.raises(JobExecutionError, match="broken"):
+        run_distributed(tmp_path, f"unix:{tmp_path / 'hub.sock'}", jobs, ["test"], collector)
+    statuses = {job.name: job.status for job in collector.summary().jobs}
+    assert statuses["ok"] == "success"
+    assert statuses["flaky"] != "success" and statuses["broken"] == "failed"
+    assert not (tmp_path / "hub.sock").exists()
@@ -0,0 +1,119 @@
+"""Tests for --fail-fast: killing in-flight siblings on the first hard failure."""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from bitrab.exceptions import JobExecutionError
+from bitrab.execution.abort import abort_requested, register_process_group, request_abort, reset_abort
+from bitrab.execution.events import EventCollector
+from bitrab.execution.job import JobExecutor
+from bitrab.execution.stage_runner import DagPipelineRunner, StagePipelineRunner
+from bitrab.execution.variables import VariableManager
+from bitrab.models.pipeline import JobConfig, PipelineConfig
+from bitrab.mutation import ParallelBackendConfig, SchedulerConfig
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="process-group signalling is POSIX-specific here")
+
+
+def doomed_sibling(**extra) -> JobConfig:
+    return JobConfig(
+        name="slow",
+        stage="test",
+        script=["echo started > slow.log", "sleep 30"],
+        after_script=["echo cleaned > after.txt"],
+        artifacts_paths=["slow.log"],
+        artifacts_when="on_failure",
+        **extra,
+    )
+
+
+def failing_job(**extra) -> JobConfig:
+    return JobConfig(name="bad", stage="test", script=["sleep 0.3", "exit 1"], **extra)
+
+
+def run(tmp_path: Path, runner_cls, pipeline: PipelineConfig, backend: str = "thread", **scheduler) -> EventCollector:
+    vm = VariableManager({}, project_dir=tmp_path)
+    collector = EventCollector()
+    runner = runner_cls(
+        JobExecutor(vm, project_dir=tmp_path),
+        callbacks=collector,
+        maximum_degree_of_parallelism=3,
+        parallel_backend=ParallelBackendConfig(backend=backend),
+        scheduler_config=SchedulerConfig(fail_fast=True, **scheduler),
+    )
+    started = time.monotonic()
+    with pytest.raises(JobExecutionError, match="bad"):
+        runner.execute_pipeline(pipeline)
+    assert time.monotonic() - started < 15
+    return collector
+
+
+def statuses(collector: EventCollector) -> dict[str, str]:
+    return {job.name: job.status for job in collector.summary().jobs}
+
+
+def test_abort_marker_round_trip(tmp_path):
+    register_process_group(tmp_path, 999_999_999)  # no such group; must not raise
+    assert not abort_requested(tmp_path)
+    request_abort(tmp_path)
+    assert abort_requested(tmp_path)
+    reset_abort(tmp_path)
+    assert not abort_requested(tmp_path)
+
+
+def test_stage_fail_fast_kills_sibling_and_honours_after_script(tmp_path):
+    pipeline = PipelineConfig(
+        stages=["test", "deploy"],
+        jobs=[
+            failing_job(),
+            doomed_sibling(),
+            JobConfig(name="deploy", stage="deploy", script=["true"], when="always"),
+        ],
+    )
+    collector = run(tmp_path, StagePipelineRunner, pipeline)
+    assert statuses(collector) == {"bad": "failed", "slow": "aborted"}
+    assert (tmp_path / "after.txt").read_text().strip() == "cleaned"
+    assert (tmp_path / ".bitrab" / "artifacts" / "slow" / "slow.log").exists()
+
+
+def test_stage_fail_fast_process_backend(tmp_path):
+    pipeline = PipelineConfig(stages=["test"], jobs=[failing_job(), doomed_sibling()])
+    collector = run(tmp_path, StagePipelineRunner, pipeline, backend="process")
+    assert statuses(collector)["slow"] == "aborted"
+    assert (tmp_path / "after.txt").exists()
+
+
+def test_allowed_failure_does_not_trigger_fail_fast(tmp_path):
+    vm = VariableManager({}, project_dir=tmp_path)
+    jobs = [
+        JobConfig(name="flaky", stage="test", script=["exit 1"], allow_failure=True),
+        JobConfig(name="ok", stage="test", script=["sleep 0.3", "echo ok > ok.txt"]),
+    ]
+    StagePipelineRunner(
+        JobExecutor(vm, project_dir=tmp_path),
+        maximum_degree_of_parallelism=2,
+        parallel_backend=ParallelBackendConfig(backend="thread"),
+        scheduler_config=SchedulerConfig(fail_fast=True),
+    ).execute_pipeline(PipelineConfig(stages=["test"], jobs=jobs))
+    assert (tmp_path / "ok.txt").exists()
+
+
+def test_continuous_dag_fail_fast_stops_dispatch(tmp_path):
+    pipeline = PipelineConfig(
+        stages=["build", "test"],
+        jobs=[
+            JobConfig(name="setup", stage="build", script=["true"]),
+            failing_job(needs=["setup"]),
+            doomed_sibling(needs=["setup"]),
+            JobConfig(name="later", stage="test", script=["true"], needs=["slow"], when="always"),
+        ],
+    )
+    collector = run(tmp_path, DagPipelineRunner, pipeline, dag_dispatch="continuous")
+    result = statuses(collector)
+    assert result["slow"] == "aborted"
+    assert "later" not in result
@@ -0,0 +1,100 @@
+"""Tests for the shared per-run git snapshot in :mod:`bitrab.git_state`."""
+
+from __future__ import annotations
+
+import subprocess  # nosec
+from pathlib import Path
+
+import pytest
+
+from bitrab.changes import discover_changes
+from bitrab.execution.variables import derive_git_variables
+from bitrab.git_state import GitRepoState, repo_state, shared_repo_state
+
+
+def git(repo: Path, *args: str) -> str:
+    result = subprocess.run(["git", "-C", str(repo), *args], capture_output=True, text=True, check=True)  # nosec
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "-b", "main")
+    git(path, "config", "user.email", "bitrab@example.test")
+    git(path, "config", "user.name", "Bitrab Tests")
+    git(path, "remote", "add", "origin", "git@gitlab.example.test:MyOrg/MyRepo.git")
+    (path / "app.py").write_text("print('base')\n", encoding="utf-8")
+    git(path, "add", ".")
+    git(path, "commit", "-m", "base")
+    git(path, "tag", "-a", "v1.0.0", "-m", "release")
+    git(path, "branch", "feature/x")
+    return path
+
+
+def test_answers_match_git(repo):
+    git(repo, "pack-refs", "--all")
+    state = GitRepoState(repo)
+    assert state.is_repo()
+    assert state.head_metadata()[0] == git(repo, "rev-parse", "HEAD")
+    assert state.branch() == git(repo, "branch", "--show-current") == "main"
+    assert state.tag() == git(repo, "describe", "--tags", "--exact-match", "HEAD") == "v1.0.0"
+    assert state.remote_url("origin") == git(repo, "remote", "get-url", "origin")
+    assert state.remote_url("upstream") == ""
+    assert state.is_commit("feature/x") and state.is_commit("v1.0.0")
+    assert not state.is_commit("no-such-branch")
+    assert not state.is_dirty()
+
+
+def test_linked_worktree_and_detached_head(repo, tmp_path):
+    linked = tmp_path / "linked"
+    git(repo, "worktree", "add", str(linked), "feature/x")
+    state = GitRepoState(linked)
+    assert state.branch() == "feature/x"
+    assert state.remote_url() == git(repo, "remote", "get-url", "origin")
+
+    git(repo, "checkout", "--detach", "HEAD")
+    assert GitRepoState(repo).branch() == ""
+    assert not GitRepoState(tmp_path).is_repo()
+
+
+def test_worktree_changes_cover_staged_unstaged_untracked_and_renames(repo):
+    (repo / "app.py").write_text("print('changed')\n", encoding="utf-8")
+    (repo / "new.txt").write_text("new\n", encoding="utf-8")
+    (repo / "staged.txt").write_text("staged\n", encoding="utf-8")
+    git(repo, "add", "staged.txt")
+    git(repo, "mv", "app.py", "main.py")
+    state = GitRepoState(repo)
+    assert state.is_dirty()
+    assert state.worktree_changes() == {"main.py", "new.txt", "staged.txt"}
+
+
+def test_one_snapshot_is_shared_for_the_run(repo):
+    with shared_repo_state(repo) as state:
+        first = derive_git_variables(repo)
+        calls = state.calls
+        assert derive_git_variables(repo) == first
+        assert repo_state(repo / ".") is state
+        with shared_repo_state(repo) as inner:
+            assert inner is state
+        assert state.calls == calls
+    assert first["CI_COMMIT_REF_NAME"] == "v1.0.0"
+    assert first["CI_PROJECT_PATH"] == "MyOrg/MyRepo"
+    # Commit metadata and the tag come from a single `git log`.
+    assert calls == 1
+    assert repo_state(repo) is not state
+
+
+def test_changes_are_read_from_one_status_call(repo):
+    git(repo, "checkout", "-b", "topic")
+    (repo / "lib.py").write_text("x = 1\n", encoding="utf-8")
+    git(repo, "add", "lib.py")
+    git(repo, "commit", "-m", "lib")
+    (repo / "notes.md").write_text("draft\n", encoding="utf-8")
+    with shared_repo_state(repo) as state:
+        changes = discover_changes(repo)
+        assert state.calls <= 3
+        assert discover_changes(repo) == changes
+    assert changes.baseline is not None
+    assert changes.evaluable and changes.files == {"lib.py", "notes.md"}
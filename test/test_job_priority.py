@@ -0,0 +1,108 @@
+"""Tests for critical-path-first job ordering driven by run-log history."""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+from bitrab.execution.history import load_job_durations, read_job_durations, remaining_path_lengths
+from bitrab.execution.job import JobExecutor
+from bitrab.execution.stage_runner import PipelineCallbacks, StagePipelineRunner, dag_dependencies
+from bitrab.execution.variables import VariableManager
+from bitrab.folder import write_run_log
+from bitrab.models.pipeline import JobConfig, PipelineConfig
+from bitrab.mutation import ParallelBackendConfig, SchedulerConfig
+
+
+def fake_run(project_dir: Path, durations: dict[str, float], cached: tuple[str, ...] = ()) -> None:
+    events = []
+    clock = 100.0
+    for job, seconds in durations.items():
+        events.append({"event_type": "job_start", "timestamp": clock, "job": job, "data": {}})
+        clock += seconds
+        status = "cached" if job in cached else "success"
+        events.append({"event_type": "job_complete", "timestamp": clock, "job": job, "data": {"status": status}})
+    write_run_log(project_dir, events, "", {"started_at": 0.0})
+
+
+def test_read_job_durations_skips_cached(tmp_path):
+    fake_run(tmp_path, {"a": 3.0, "b": 0.01}, cached=("b",))
+    run_dir = next((tmp_path / ".bitrab" / "logs").iterdir())
+    assert read_job_durations(run_dir / "events.jsonl") == {"a": 3.0}
+
+
+def test_load_job_durations_averages_recent_runs(tmp_path):
+    fake_run(tmp_path, {"a": 2.0})
+    fake_run(tmp_path, {"a": 4.0, "b": 1.0})
+    durations = load_job_durations(tmp_path)
+    assert durations["a"] == 3.0
+    assert durations["b"] == 1.0
+
+
+def test_load_job_durations_without_logs(tmp_path):
+    assert load_job_durations(tmp_path) == {}
+
+
+def test_remaining_path_lengths_follow_longest_chain():
+    deps = {"a": [], "b": [], "a2": ["a"], "a3": ["a2"], "b2": ["b"]}
+    durations = {"a": 1.0, "a2": 1.0, "a3": 1.0, "b": 2.0, "b2": 0.5}
+    lengths = remaining_path_lengths(deps, durations)
+    assert lengths["a"] == 3.0
+    assert lengths["b"] == 2.5
+    assert lengths["a3"] == 1.0
+
+
+def test_remaining_path_lengths_default_is_median():
+    lengths = remaining_path_lengths({"x": [], "y": [], "z": []}, {"x": 1.0, "y": 5.0})
+    assert lengths["z"] == 5.0
+
+
+def test_dag_dependencies_mixed_mode():
+    pipeline = PipelineConfig(
+        stages=["build", "test"],
+        jobs=[
+            JobConfig(name="build", stage="build"),
+            JobConfig(name="lint", stage="build"),
+            JobConfig(name="unit", stage="test", needs=["build"]),
+            JobConfig(name="e2e", stage="test"),
+        ],
+    )
+    assert dag_dependencies(pipeline) == {"build": [], "lint": [], "unit": ["build"], "e2e": ["build", "lint"]}
+
+
+class StartOrder(PipelineCallbacks):
+    def __init__(self) -> None:
+        self.started: list[str] = []
+        self.lock = threading.Lock()
+
+    def on_job_start(self, job: JobConfig) -> None:
+        with self.lock:
+            self.started.append(job.name)
+
+
+def run_stage(tmp_path: Path, scheduler: SchedulerConfig) -> list[str]:
+    jobs = [JobConfig(name=name, stage="test", script=["true"]) for name in ("quick", "medium", "slow")]
+    vm = VariableManager({}, project_dir=tmp_path)
+    callbacks = StartOrder()
+    StagePipelineRunner(
+        JobExecutor(vm, project_dir=tmp_path),
+        callbacks=callbacks,
+        maximum_degree_of_parallelism=2,
+        parallel_backend=ParallelBackendConfig(backend="thread"),
+        scheduler_config=scheduler,
+    ).execute_pipeline(PipelineConfig(stages=["test"], jobs=jobs))
+    return callbacks.started
+
+
+def test_longest_job_is_submitted_first(tmp_path):
+    fake_run(tmp_path, {"quick": 0.1, "medium": 5.0, "slow": 30.0})
+    assert run_stage(tmp_path, SchedulerConfig()) == ["slow", "medium", "quick"]
+
+
+def test_yaml_priority_keeps_declared_order(tmp_path):
+    fake_run(tmp_path, {"quick": 0.1, "medium": 5.0, "slow": 30.0})
+    assert run_stage(tmp_path, SchedulerConfig(job_priority="yaml")) == ["quick", "medium", "slow"]
+
+
+def test_no_history_keeps_declared_order(tmp_path):
+    assert run_stage(tmp_path, SchedulerConfig()) == ["quick", "medium", "slow"]
@@ -0,0 +1,97 @@
+"""Tests for compressed, seekable job logs and ``bitrab logs show --job``."""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import time
+from unittest.mock import patch
+
+import pytest
+
+from bitrab.cli import cmd_logs
+from bitrab.execution.job import JobExecutor
+from bitrab.execution.joblog import BlockLog, index_path, open_job_log, read_job_log, tail_job_log
+from bitrab.execution.shell import run_bash
+from bitrab.execution.variables import VariableManager
+from bitrab.folder import find_job_log, list_runs, write_run_log
+from bitrab.models.pipeline import JobConfig, PipelineConfig
+from bitrab.plan import run_job_logs
+from bitrab.tui.orchestrator import run_single_job_file
+
+LINES = [f"PASSED tests/test_module_{i % 40}.py::test_case_{i} [{i % 100:3d}%]\n" for i in range(200_000)]
+TEXT = "".join(LINES)
+
+
+def write_log(path, text: str = TEXT, block_bytes: int = 64 * 1024) -> None:
+    with BlockLog(path, block_bytes=block_bytes) as log:
+        log.write(text.encode())
+
+
+def test_log_is_plain_gzip_and_much_smaller(tmp_path):
+    path = tmp_path / "output.log.gz"
+    write_log(path)
+    assert gzip.decompress(path.read_bytes()).decode() == TEXT
+    assert read_job_log(path) == TEXT
+    assert path.stat().st_size * 10 < len(TEXT)
+
+
+def test_tail_reads_only_the_last_blocks(tmp_path):
+    path = tmp_path / "output.log.gz"
+    write_log(path)
+    with patch("bitrab.execution.joblog.gzip.decompress", wraps=gzip.decompress) as decompress:
+        assert tail_job_log(path, 200) == "".join(LINES[-200:])
+    assert decompress.call_count <= 2
+    assert tail_job_log(path, len(LINES) + 5) == TEXT
+    assert tail_job_log(path, 0) == ""
+
+
+def test_tail_without_index_or_with_a_truncated_log(tmp_path):
+    path = tmp_path / "output.log.gz"
+    write_log(path)
+    index_path(path).unlink()
+    assert tail_job_log(path, 3) == "".join(LINES[-3:])
+    data = path.read_bytes()
+    path.write_bytes(data[: len(data) - 100])
+    assert TEXT.startswith(read_job_log(path))
+    plain = tmp_path / "output.log"
+    plain.write_text("a\nb\nc", encoding="utf-8")
+    assert tail_job_log(plain, 2) == "b\nc"
+
+
+def test_script_output_reaches_the_log_as_bytes(tmp_path):
+    path = tmp_path / "output.log.gz"
+    with open_job_log(path) as writer:
+        writer.write("header\n")
+        run_bash("printf 'one\\r\\ntwo\\n'", check=False, stdout_target=writer, stderr_target=io.StringIO())
+    assert read_job_log(path) == "header\none\r\ntwo\n"
+
+
+def test_run_log_keeps_job_output_for_logs_show(tmp_path, capsys):
+    started_at = time.time() - 1
+    job = JobConfig(name="unit tests", stage="test", script=["seq 1 5000"])
+    job_dir = tmp_path / ".bitrab" / "temp" / "unit tests"
+    executor = JobExecutor(VariableManager({}, project_dir=tmp_path), project_dir=tmp_path)
+    run_single_job_file(job, executor, job_dir, log_path=str(job_dir / "output.log.gz"))
+
+    job_logs = run_job_logs(tmp_path, PipelineConfig(stages=["test"], jobs=[job]), started_at)
+    run_dir = write_run_log(tmp_path, [], "summary", {"started_at": started_at}, job_logs=job_logs)
+    rec = list_runs(tmp_path)[0]
+    assert rec.job_logs == {"unit tests": "jobs/unit tests.log.gz"}
+    assert find_job_log(rec, "unit tests") == run_dir / "jobs" / "unit tests.log.gz"
+    assert index_path(run_dir / "jobs" / "unit tests.log.gz").exists()
+    assert not (job_dir / "output.log.gz").exists()
+
+    args = argparse.Namespace(config=str(tmp_path / "ci.yml"), logs_cmd="show", run_id=None, job="unit tests", tail=3)
+    cmd_logs(args)
+    assert capsys.readouterr().out == "4999\n5000\n✅ Job unit tests completed successfully\n"
+
+    args.tail = None
+    cmd_logs(args)
+    assert "$ seq 1 5000" in capsys.readouterr().out
+
+    args.job = "missing"
+    with pytest.raises(SystemExit):
+        cmd_logs(args)
+    assert "unit tests" in capsys.readouterr().err
@@ -5,7 +5,13 @@ from __future__ import annotations
 from pathlib import Path
 
 from bitrab.models.pipeline import PipelineConfig
-from bitrab.mutation import ParallelBackendConfig, load_parallel_config, load_worktree_config
+from bitrab.mutation import (
+    ParallelBackendConfig,
+    SchedulerConfig,
+    load_parallel_config,
+    load_scheduler_config,
+    load_worktree_config,
+)
 from bitrab.plan import PipelineProcessor
 
 # ---------------------------------------------------------------------------
@@ -484,6 +490,18 @@ class TestLoadParallelConfig:
         assert cfg.backend == "thread"
 
 
+class TestLoadSchedulerConfig:
+    def test_default_is_batch(self, tmp_path):
+        assert load_scheduler_config(tmp_path).dag_dispatch == "batch"
+
+    def test_continuous(self, tmp_path):
+        (tmp_path / "pyproject.toml").write_text('[tool.bitrab]\ndag_dispatch = "Continuous"\n')
+        assert load_scheduler_config(tmp_path).dag_dispatch == "continuous"
+
+    def test_invalid_falls_back_to_batch(self):
+        assert SchedulerConfig(dag_dispatch="eager").dag_dispatch == "batch"
+
+
 class TestLoadWorktreeConfig:
     def test_default_root_is_none(self, tmp_path):
         (tmp_path / "pyproject.toml").write_text("[project]\nname = 'foo'\n")
@@ -10,11 +10,13 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from bitrab.execution.job import JobExecutor
+from bitrab.execution.joblog import read_job_log
 from bitrab.execution.stage_runner import JobOutcome
 from bitrab.execution.variables import VariableManager
 from bitrab.models.pipeline import JobConfig, PipelineConfig
 from bitrab.tui.orchestrator import (
     CIFileCallbacks,
+    OutputPump,
     QueueWriter,
     TUIOrchestrator,
     run_single_job_file,
@@ -73,6 +75,35 @@ class TestQueueWriter:
         assert q.get_nowait() == ("job-a", "line2")
 
 
+class TestOutputPump:
+    def test_flush_delivers_everything_queued_before_it(self):
+        q: SimpleQueue = SimpleQueue()
+        delivered: list[tuple[str, str | None]] = []
+        pump = OutputPump(q, lambda name, text: delivered.append((name, text)))
+        pump.start()
+        q.put(("job", "one\n"))
+        q.put(("job", None))
+        pump.flush()
+        assert delivered == [("job", "one\n"), ("job", None)]
+        pump.stop()
+        assert pump.thread is None
+
+    def test_stop_drains_the_queue_first(self):
+        q: SimpleQueue = SimpleQueue()
+        delivered: list[str | None] = []
+        pump = OutputPump(q, lambda name, text: delivered.append(text))
+        pump.start()
+        for i in range(100):
+            q.put(("job", str(i)))
+        pump.stop()
+        assert delivered == [str(i) for i in range(100)]
+
+    def test_flush_and_stop_before_start_are_noops(self):
+        pump = OutputPump(SimpleQueue(), lambda name, text: None)
+        pump.flush()
+        pump.stop()
+
+
 # ---------------------------------------------------------------------------
 # run_single_job_queued
 # ---------------------------------------------------------------------------
@@ -296,7 +327,7 @@ class TestCIFileCallbacks:
         fh.write("hello")
         fh.close()
 
-        assert (job_dir / "output.log").read_text() == "hello"
+        assert read_job_log(job_dir / "output.log.gz") == "hello"
 
     def test_make_output_writer_registers_log_path(self, tmp_path):
         cb = CIFileCallbacks()
@@ -308,7 +339,7 @@ class TestCIFileCallbacks:
         fh.close()
 
         assert "j1" in cb.log_paths
-        assert cb.log_paths["j1"] == job_dir / "output.log"
+        assert cb.log_paths["j1"] == job_dir / "output.log.gz"
 
     def test_get_worker_func_returns_file_worker(self):
         cb = CIFileCallbacks()
@@ -321,7 +352,7 @@ class TestCIFileCallbacks:
 
         args = cb.make_worker_args(job, job_dir)
         assert "log_path" in args
-        assert args["log_path"] == str(job_dir / "output.log")
+        assert args["log_path"] == str(job_dir / "output.log.gz")
 
     def test_make_worker_args_registers_log_path(self, tmp_path):
         cb = CIFileCallbacks()
@@ -329,7 +360,7 @@ class TestCIFileCallbacks:
         job_dir = tmp_path / "j1"
 
         cb.make_worker_args(job, job_dir)
-        assert cb.log_paths["j1"] == job_dir / "output.log"
+        assert cb.log_paths["j1"] == job_dir / "output.log.gz"
 
 
 # ---------------------------------------------------------------------------
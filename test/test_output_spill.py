@@ -0,0 +1,100 @@
+"""Tests for bounded-memory job output (spill to ``.bitrab/temp/<job>/``)."""
+
+from __future__ import annotations
+
+import io
+import sys
+
+import pytest
+
+from bitrab.exceptions import JobExecutionError
+from bitrab.execution.job import JobExecutor
+from bitrab.execution.shell import PARTIAL_LINE_BYTES, READ_CHUNK, RunResult, run_bash
+from bitrab.execution.variables import VariableManager
+from bitrab.models.pipeline import JobConfig
+
+# `seq 1 N` prints this many characters; comfortably past the in-memory tail.
+SEQ_N = 400_000
+SEQ_TEXT = "".join(f"{i}\n" for i in range(1, SEQ_N + 1))
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.writes: list[int] = []
+
+    def write(self, s: str) -> None:
+        self.writes.append(len(s))
+
+    def flush(self) -> None:
+        pass
+
+
+def test_large_output_spills_and_stays_readable(tmp_path):
+    spill_dir = tmp_path / "job"
+    result = run_bash(
+        f"seq 1 {SEQ_N}",
+        force_color=False,
+        stdout_target=io.StringIO(),
+        stderr_target=io.StringIO(),
+        spill_dir=spill_dir,
+    )
+    assert result.stdout_file is not None and result.stdout_file.parent == spill_dir
+    assert result.stderr_file is None
+    assert len(result.stdout) < len(SEQ_TEXT)
+    assert SEQ_TEXT.endswith(result.stdout)
+    assert result.full_stdout() == SEQ_TEXT
+    with result.open_stdout() as handle:
+        assert handle.readline() == "1\n"
+
+
+def test_small_output_stays_in_memory(tmp_path):
+    spill_dir = tmp_path / "job"
+    result = run_bash(
+        "echo hi; echo oops >&2",
+        force_color=False,
+        stdout_target=io.StringIO(),
+        stderr_target=io.StringIO(),
+        spill_dir=spill_dir,
+    )
+    assert (result.stdout_file, result.stderr_file) == (None, None)
+    assert not spill_dir.exists()
+    assert result.full_stdout() == "hi\n"
+    assert result.full_stderr() == "oops\n"
+    assert RunResult(0, "a", "").full_stdout() == "a"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses /dev/zero")
+def test_output_without_newlines_is_passed_on_in_pieces():
+    recorder = Recorder()
+    run_bash(
+        "head -c 300000 /dev/zero | tr '\\0' x",
+        force_color=False,
+        stdout_target=recorder,
+        stderr_target=io.StringIO(),
+    )
+    assert sum(recorder.writes) == 300000
+    assert max(recorder.writes) < PARTIAL_LINE_BYTES + READ_CHUNK
+
+
+def test_job_output_spills_into_job_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("NO_COLOR", "1")
+    job_dir = tmp_path / ".bitrab" / "temp" / "chatty"
+    job_dir.mkdir(parents=True)
+    executor = JobExecutor(VariableManager({}, project_dir=tmp_path), project_dir=tmp_path)
+    job = JobConfig(name="chatty", stage="test", script=[f"seq 1 {SEQ_N}"])
+    executor.execute_job(job, job_dir=job_dir, output_writer=io.StringIO())
+    result = executor.job_history[-1]
+    assert result.stdout_file is None
+    assert not list(job_dir.glob("*.log"))
+    assert result.full_stdout().endswith(f"\n{SEQ_N}\n")
+
+
+def test_timed_out_job_leaves_no_spill_files(tmp_path, monkeypatch):
+    monkeypatch.setenv("NO_COLOR", "1")
+    job_dir = tmp_path / ".bitrab" / "temp" / "stuck"
+    job_dir.mkdir(parents=True)
+    executor = JobExecutor(VariableManager({}, project_dir=tmp_path), project_dir=tmp_path)
+    job = JobConfig(name="stuck", stage="test", script=[f"seq 1 {SEQ_N}; sleep 3"])
+    with pytest.raises(JobExecutionError):
+        executor.execute_job(job, job_dir=job_dir, output_writer=io.StringIO(), timeout=1)
+    assert not list(job_dir.glob("*.log"))
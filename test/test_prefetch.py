@@ -0,0 +1,126 @@
+"""Tests for prepare-ahead setup of upcoming jobs under continuous DAG dispatch."""
+
+from __future__ import annotations
+
+import subprocess  # nosec
+from pathlib import Path
+
+import pytest
+
+from bitrab.exceptions import JobExecutionError
+from bitrab.execution import prefetch
+from bitrab.execution.events import EventCollector
+from bitrab.execution.job import JobExecutor
+from bitrab.execution.prefetch import Prefetcher
+from bitrab.execution.stage_runner import DagPipelineRunner
+from bitrab.execution.variables import VariableManager
+from bitrab.git_worktree import is_git_available
+from bitrab.models.pipeline import CacheConfig, JobConfig, PipelineConfig
+from bitrab.mutation import ParallelBackendConfig, SchedulerConfig, load_scheduler_config
+
+pytestmark = pytest.mark.skipif(not is_git_available(), reason="git binary not available")
+
+
+def init_repo(path: Path) -> None:
+    subprocess.run(["git", "init", "-q", str(path)], check=True)  # nosec
+    subprocess.run(["git", "-C", str(path), "config", "user.email", "test@example.com"], check=True)  # nosec
+    subprocess.run(["git", "-C", str(path), "config", "user.name", "Test"], check=True)  # nosec
+    (path / "seed.txt").write_text("seed\n", encoding="utf-8")
+    subprocess.run(["git", "-C", str(path), "add", "seed.txt"], check=True)  # nosec
+    subprocess.run(["git", "-C", str(path), "commit", "-q", "-m", "seed"], check=True)  # nosec
+
+
+def record_preparations(monkeypatch) -> dict[str, list[str]]:
+    prepared: dict[str, list[str]] = {}
+    original = prefetch.prepare_job
+
+    def spy(job, executor, **kwargs):
+        result = original(job, executor, **kwargs)
+        prepared[job.name] = result.injected
+        return result
+
+    monkeypatch.setattr(prefetch, "prepare_job", spy)
+    return prepared
+
+
+def run(tmp_path: Path, jobs: list[JobConfig], **scheduler) -> EventCollector:
+    collector = EventCollector()
+    DagPipelineRunner(
+        JobExecutor(VariableManager({}, project_dir=tmp_path), project_dir=tmp_path),
+        callbacks=collector,
+        maximum_degree_of_parallelism=2,
+        parallel_backend=ParallelBackendConfig(backend="thread"),
+        scheduler_config=SchedulerConfig(dag_dispatch="continuous", **scheduler),
+    ).execute_pipeline(PipelineConfig(stages=["build", "test"], jobs=jobs))
+    return collector
+
+
+def worktrees_left(tmp_path: Path) -> list[Path]:
+    root = tmp_path / ".bitrab" / "worktrees"
+    return list(root.iterdir()) if root.exists() else []
+
+
+def test_job_is_prepared_while_last_upstream_runs(tmp_path, monkeypatch):
+    init_repo(tmp_path)
+    prepared = record_preparations(monkeypatch)
+    jobs = [
+        JobConfig(name="fast", stage="build", script=["echo fast > fast.txt"], artifacts_paths=["fast.txt"]),
+        JobConfig(name="slow", stage="build", script=["sleep 1", "echo slow > slow.txt"], artifacts_paths=["slow.txt"]),
+        JobConfig(
+            name="consumer",
+            stage="test",
+            needs=["fast", "slow"],
+            script=["test -f fast.txt", "test -f slow.txt", "cat fast.txt slow.txt > both.txt"],
+            artifacts_paths=["both.txt"],
+        ),
+    ]
+    collector = run(tmp_path, jobs)
+    assert {job.status for job in collector.summary().jobs} == {"success"}
+    assert prepared == {"consumer": ["fast"]}
+    both = tmp_path / ".bitrab" / "artifacts" / "consumer" / "both.txt"
+    assert both.read_text().split() == ["fast", "slow"]
+    assert worktrees_left(tmp_path) == []
+
+
+def test_skipped_job_preparation_is_discarded(tmp_path, monkeypatch):
+    init_repo(tmp_path)
+    prepared = record_preparations(monkeypatch)
+    jobs = [
+        JobConfig(name="fast", stage="build", script=["true"]),
+        JobConfig(name="slow", stage="build", script=["sleep 1", "exit 1"]),
+        JobConfig(name="consumer", stage="test", needs=["fast", "slow"], script=["true"]),
+    ]
+    with pytest.raises(JobExecutionError, match="slow"):
+        run(tmp_path, jobs)
+    assert "consumer" in prepared
+    assert worktrees_left(tmp_path) == []
+
+
+def test_prefetch_can_be_disabled(tmp_path, monkeypatch):
+    init_repo(tmp_path)
+    prepared = record_preparations(monkeypatch)
+    jobs = [
+        JobConfig(name="fast", stage="build", script=["true"]),
+        JobConfig(name="slow", stage="build", script=["sleep 0.5"]),
+        JobConfig(name="consumer", stage="test", needs=["fast", "slow"], script=["true"]),
+    ]
+    run(tmp_path, jobs, prefetch=False)
+    assert prepared == {}
+    (tmp_path / "pyproject.toml").write_text("[tool.bitrab]\nprefetch = false\n", encoding="utf-8")
+    assert load_scheduler_config(tmp_path).prefetch is False
+
+
+def test_cache_is_restored_ahead_only_with_finished_fixed_sources(tmp_path):
+    executor = JobExecutor(VariableManager({}, project_dir=tmp_path), project_dir=tmp_path)
+    prefetcher = Prefetcher(executor, tmp_path, None, limit=1)
+    try:
+        cache = [CacheConfig(paths=["vendor/"], key="deps")]
+        job = JobConfig(name="test", stage="test", cache=cache, needs=["build"], dependencies=["build"])
+        assert prefetcher.can_restore_cache(job, ["build"])
+        assert not prefetcher.can_restore_cache(job, [])
+        inherits_all = JobConfig(name="test", stage="test", cache=cache, needs=["build"])
+        assert not prefetcher.can_restore_cache(inherits_all, ["build"])
+        no_cache = JobConfig(name="test", stage="test", dependencies=[])
+        assert not prefetcher.can_restore_cache(no_cache, [])
+    finally:
+        prefetcher.close()
@@ -0,0 +1,81 @@
+"""Tests for the shared output / timeout reactor behind ``run_bash`` stream mode."""
+
+from __future__ import annotations
+
+import io
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bitrab.exceptions import JobTimeoutError
+from bitrab.execution.shell import run_bash, shared_reactor
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Windows pipes fall back to reader threads")
+
+JOBS = 12
+
+
+def quiet_run(script: str, **kwargs):
+    return run_bash(
+        script, check=False, force_color=False, stdout_target=io.StringIO(), stderr_target=io.StringIO(), **kwargs
+    )
+
+
+def test_thread_count_does_not_grow_with_parallel_scripts():
+    shared_reactor()
+    baseline = threading.active_count()
+    with ThreadPoolExecutor(max_workers=JOBS) as pool:
+        futures = [pool.submit(quiet_run, "echo out; echo err >&2; sleep 0.4", timeout=30) for _ in range(JOBS)]
+        time.sleep(0.2)
+        during = threading.active_count()
+        results = [future.result() for future in futures]
+    # One pool worker per script and nothing else: no reader or timer threads.
+    assert during <= baseline + JOBS
+    assert {(result.stdout, result.stderr) for result in results} == {("out\n", "err\n")}
+
+
+def test_timeout_fires_from_the_reactor():
+    started = time.monotonic()
+    with pytest.raises(JobTimeoutError):
+        quiet_run("exec sleep 10", timeout=0.3)
+    assert time.monotonic() - started < 5
+    assert quiet_run("echo still-serving", timeout=5).stdout == "still-serving\n"
+
+
+def test_failing_output_target_fails_only_its_script():
+    class Broken:
+        def write(self, _s: str) -> None:
+            raise RuntimeError("sink is gone")
+
+        def flush(self) -> None:
+            pass
+
+    with pytest.raises(RuntimeError, match="sink is gone"):
+        run_bash("echo hi", check=False, stdout_target=Broken(), stderr_target=io.StringIO())
+    assert quiet_run("echo fine").stdout == "fine\n"
+
+
+def test_newlines_are_translated_like_a_text_pipe():
+    assert quiet_run("printf 'a\\r\\nb\\rc'").stdout == "a\nb\nc"
+
+
+def test_files_get_raw_bytes_and_only_terminals_get_colour(tmp_path, monkeypatch):
+    monkeypatch.delenv("NO_COLOR", raising=False)
+    log = tmp_path / "job.log"
+    with open(log, "w", encoding="utf-8") as fh:
+        fh.write("header\n")
+        result = run_bash("printf 'one\\r\\ntwo\\n'", check=False, stdout_target=fh, stderr_target=io.StringIO())
+    assert log.read_bytes() == b"header\none\r\ntwo\n"
+    assert result.stdout == "one\ntwo\n"
+
+    class Terminal(io.StringIO):
+        def isatty(self) -> bool:
+            return True
+
+    terminal, plain = Terminal(), io.StringIO()
+    run_bash("echo hi; echo oops >&2", stdout_target=terminal, stderr_target=plain)
+    assert terminal.getvalue() == "\033[92mhi\n\033[0m"
+    assert plain.getvalue() == "oops\n"
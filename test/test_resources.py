@@ -0,0 +1,79 @@
+"""Tests for per-job resource accounting (CPU time, peak RSS, block I/O)."""
+
+from __future__ import annotations
+
+import io
+import sys
+
+import pytest
+
+from bitrab.execution.events import EventCollector, EventType
+from bitrab.execution.job import JobExecutor
+from bitrab.execution.resources import ResourceUsage, total_usage
+from bitrab.execution.shell import run_bash
+from bitrab.execution.stage_runner import StagePipelineRunner
+from bitrab.execution.variables import VariableManager
+from bitrab.models.pipeline import JobConfig, PipelineConfig
+from bitrab.mutation import ParallelBackendConfig
+
+posix_only = pytest.mark.skipif(sys.platform == "win32", reason="os.wait4 is POSIX-only")
+
+BURN = "i=0; while [ $i -lt 30000 ]; do i=$((i+1)); done"
+
+
+def test_usage_arithmetic_and_round_trip():
+    a = ResourceUsage(user_cpu_s=1.0, system_cpu_s=0.5, max_rss_kb=100, block_input=1, block_output=2)
+    b = ResourceUsage(user_cpu_s=2.0, max_rss_kb=300, block_output=3)
+    total = total_usage([a, None, b])
+    assert total == ResourceUsage(user_cpu_s=3.0, system_cpu_s=0.5, max_rss_kb=300, block_input=1, block_output=5)
+    assert ResourceUsage.from_dict(total.to_dict()) == total
+    assert total_usage([None]) is None
+    assert ResourceUsage(user_cpu_s=1.0).profile(1.5) == "cpu-bound"
+    assert ResourceUsage(block_output=10).profile(2.0) == "io-bound"
+    assert ResourceUsage().profile(2.0) == "waiting"
+
+
+@posix_only
+def test_run_bash_measures_the_script_tree():
+    result = run_bash(f"bash -c '{BURN}'", check=False, stdout_target=io.StringIO(), stderr_target=io.StringIO())
+    assert result.returncode == 0
+    assert result.usage is not None
+    assert result.usage.cpu_s > 0
+    assert result.usage.max_rss_kb > 0
+
+
+@posix_only
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_usage_reaches_job_complete_events(tmp_path, backend):
+    jobs = [
+        JobConfig(name="burn", stage="test", script=[BURN]),
+        JobConfig(name="broken", stage="test", script=[BURN, "exit 2"], allow_failure=True),
+    ]
+    collector = EventCollector()
+    StagePipelineRunner(
+        JobExecutor(VariableManager({}, project_dir=tmp_path), project_dir=tmp_path),
+        callbacks=collector,
+        maximum_degree_of_parallelism=2,
+        parallel_backend=ParallelBackendConfig(backend=backend),
+    ).execute_pipeline(PipelineConfig(stages=["test"], jobs=jobs))
+    usage = {event.job: event.data["usage"] for event in collector.events if event.event_type == EventType.JOB_COMPLETE}
+    assert usage["burn"]["user_cpu_s"] + usage["burn"]["system_cpu_s"] > 0
+    assert usage["broken"] is not None
+    text = collector.summary().format_text()
+    assert "peak rss" in text
+    assert "cores busy on average" in text
+
+
+@posix_only
+def test_serial_jobs_only_count_their_own_scripts(tmp_path):
+    jobs = [JobConfig(name="burn", stage="build", script=[BURN]), JobConfig(name="idle", stage="test", script=["true"])]
+    collector = EventCollector()
+    StagePipelineRunner(
+        JobExecutor(VariableManager({}, project_dir=tmp_path), project_dir=tmp_path),
+        callbacks=collector,
+        maximum_degree_of_parallelism=1,
+    ).execute_pipeline(PipelineConfig(stages=["build", "test"], jobs=jobs))
+    timings = {job.name: job for job in collector.summary().jobs}
+    burn, idle = timings["burn"].usage, timings["idle"].usage
+    assert burn is not None and idle is not None
+    assert idle.cpu_s < burn.cpu_s
@@ -202,7 +202,7 @@ class TestVariableManager:
         subprocess.run(["git", "-C", str(tmp_path), "add", "README.md"], check=True)  # nosec
         subprocess.run(["git", "-C", str(tmp_path), "commit", "-q", "-m", "init"], check=True)  # nosec
 
-        monkeypatch.setattr("bitrab.execution.variables.subprocess.run", counting_run)
+        monkeypatch.setattr("bitrab.git_state.subprocess.run", counting_run)
 
         vm = VariableManager(project_dir=tmp_path)
         env = vm.prepare_environment(JobConfig(name="j", stage="test", variables={}))
@@ -212,11 +212,9 @@ class TestVariableManager:
         assert env["CI_PROJECT_NAMESPACE"] == "octo-org"
         assert env["CI_PROJECT_PATH"] == "octo-org/sample-repo"
         assert env["CI_PROJECT_URL"] == "https://github.com/octo-org/sample-repo"
-        assert len(commands) == 4
-        assert commands[0][1:3] == ("log", "-1")
-        assert commands[1][1:] == ("branch", "--show-current")
-        assert commands[2][1:4] == ("describe", "--tags", "--exact-match")
-        assert commands[3][1:4] == ("remote", "get-url", "origin")
+        # Branch and remote are read from .git; the tag rides along with `git log`.
+        assert len(commands) == 1
+        assert commands[0][3:5] == ("log", "-1")
 
 
 # ===========================================================================
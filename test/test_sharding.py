@@ -0,0 +1,81 @@
+"""Tests for duration-balanced ``--shard I/N`` splitting."""
+
+from __future__ import annotations
+
+import argparse
+
+import pytest
+
+from bitrab.cli import shard_spec
+from bitrab.models.pipeline import JobConfig, PipelineConfig
+from bitrab.sharding import assign_shards, parse_shard, shard_groups
+
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    for bad in ["2", "0/4", "5/4", "a/b", "1/0"]:
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+    with pytest.raises(argparse.ArgumentTypeError):
+        shard_spec("3/2")
+
+
+def test_artifact_links_keep_jobs_together():
+    pipeline = PipelineConfig(
+        stages=["build", "test", "deploy"],
+        jobs=[
+            JobConfig(name="compile", stage="build", artifacts_paths=["dist/"]),
+            JobConfig(name="lint", stage="build"),
+            JobConfig(name="docs", stage="build"),
+            JobConfig(name="unit", stage="test", needs=["lint"]),
+            JobConfig(name="smoke", stage="test"),
+            JobConfig(name="fmt", stage="test", dependencies=[]),
+            JobConfig(name="publish", stage="deploy", needs=["docs"], dependencies=["docs"]),
+        ],
+    )
+    assert shard_groups(pipeline) == [["compile", "smoke"], ["lint", "unit"], ["docs", "publish"], ["fmt"]]
+
+
+def test_shards_balance_history_and_cover_every_job_once():
+    jobs = [JobConfig(name=f"job{i}", stage="test") for i in range(6)]
+    pipeline = PipelineConfig(stages=["test"], jobs=jobs)
+    durations = {"job0": 40.0, "job1": 30.0, "job2": 20.0, "job3": 10.0, "job4": 10.0, "job5": 10.0}
+    shards = assign_shards(pipeline, 3, durations)
+    assert sorted(name for shard in shards for name in shard.jobs) == sorted(job.name for job in jobs)
+    assert [shard.estimate for shard in shards] == [40.0, 40.0, 40.0]
+    assert shards == assign_shards(pipeline, 3, dict(reversed(durations.items())))
+
+
+def test_more_shards_than_groups_leaves_some_empty():
+    pipeline = PipelineConfig(stages=["test"], jobs=[JobConfig(name="only", stage="test")])
+    assert [shard.jobs for shard in assign_shards(pipeline, 2, {})] == [["only"], []]
+
+
+def test_run_pipeline_shards_cover_the_pipeline(tmp_path):
+    from bitrab.plan import LocalGitLabRunner
+
+    config = """
+stages: [build, test]
+build:
+  stage: build
+  script: mkdir -p out && echo built > out/app.txt
+  artifacts:
+    paths: [out/]
+check:
+  stage: test
+  script: cat out/app.txt > check.out
+lint:
+  stage: build
+  dependencies: []
+  script: echo lint > lint.out
+""".lstrip()
+    outputs: list[str] = []
+    for index in (1, 2):
+        container = tmp_path / f"container{index}"
+        container.mkdir()
+        (container / ".gitlab-ci.yml").write_text(config, encoding="utf-8")
+        LocalGitLabRunner(container).run_pipeline(shard=(index, 2), serial=True, use_worktrees=False)
+        outputs.extend(path.name for path in container.glob("*.out"))
+        if (container / "check.out").exists():
+            assert (container / "check.out").read_text().strip() == "built"
+    assert sorted(outputs) == ["check.out", "lint.out"]
@@ -3,21 +3,37 @@
 from __future__ import annotations
 
 import os
-import subprocess
+import pickle
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
+from bitrab.execution.job import JobExecutor
+from bitrab.execution.shell import merge_env
+from bitrab.execution.stage_runner import StagePipelineRunner
 from bitrab.execution.variables import (
+    LayeredEnv,
+    SharedEnv,
     VariableManager,
     derive_git_variables,
     derive_github_actions_variables,
-    git,
     git_head_metadata,
     load_dotenv_files,
     parse_dotenv,
     project_identity_from_remote,
+    ship_env,
 )
-from bitrab.models.pipeline import JobConfig
+from bitrab.models.pipeline import JobConfig, PipelineConfig
+from bitrab.mutation import ParallelBackendConfig
+
+
+def fake_state(branch: str = "", tag: str = "", remote: str = "", meta: tuple[str, ...] = ("",) * 6) -> MagicMock:
+    """A stand-in for :class:`bitrab.git_state.GitRepoState` with fixed answers."""
+    state = MagicMock()
+    state.head_metadata.return_value = meta
+    state.branch.return_value = branch
+    state.tag.return_value = tag
+    state.remote_url.return_value = remote
+    return state
 
 
 class TestParseDotenv:
@@ -169,13 +185,13 @@ class TestGitHeadMetadata:
         assert result == ("", "", "", "", "", "")
 
     def test_returns_empty_strings_on_git_failure(self, tmp_path):
-        with patch("bitrab.execution.variables.git", return_value=""):
+        with patch("bitrab.git_state.GitRepoState.git", return_value=None):
             result = git_head_metadata(tmp_path)
         assert result == ("", "", "", "", "", "")
 
     def test_returns_empty_strings_when_wrong_field_count(self, tmp_path):
         # git output with wrong number of \x1f separators
-        with patch("bitrab.execution.variables.git", return_value="only\x1ffour\x1ffields"):
+        with patch("bitrab.git_state.GitRepoState.git", return_value=b"only\x1ffour\x1ffields"):
             result = git_head_metadata(tmp_path)
         assert result == ("", "", "", "", "", "")
 
@@ -209,64 +225,56 @@ class TestDeriveGitVariables:
 
     def test_short_sha_is_first_8_chars(self):
         fake_sha = "abcdef1234567890"
-        with patch("bitrab.execution.variables.git_head_metadata") as mock_meta:
-            mock_meta.return_value = (fake_sha, "Author", "a@b.com", "2024-01-01", "msg", "msg")
-            with patch("bitrab.execution.variables.git", return_value="main"):
-                result = derive_git_variables(Path.cwd())
+        state = fake_state("main", meta=(fake_sha, "Author", "a@b.com", "2024-01-01", "msg", "msg"))
+        with patch("bitrab.execution.variables.repo_state", return_value=state):
+            result = derive_git_variables(Path.cwd())
         assert result["CI_COMMIT_SHORT_SHA"] == fake_sha[:8]
 
     def test_tag_takes_precedence_over_branch_for_ref_name(self):
-        with patch("bitrab.execution.variables.git_head_metadata") as mock_meta:
-            mock_meta.return_value = ("abc123", "A", "a@b.com", "ts", "title", "msg")
-            # git is called multiple times: branch, tag, remote
-            with patch("bitrab.execution.variables.git", side_effect=["main", "v1.0.0", ""]):
-                result = derive_git_variables(Path.cwd())
+        state = fake_state("main", "v1.0.0", "", meta=("abc123", "A", "a@b.com", "ts", "title", "msg"))
+        with patch("bitrab.execution.variables.repo_state", return_value=state):
+            result = derive_git_variables(Path.cwd())
         assert result["CI_COMMIT_REF_NAME"] == "v1.0.0"
         assert result["CI_COMMIT_TAG"] == "v1.0.0"
 
     def test_branch_used_when_no_tag(self):
-        with patch("bitrab.execution.variables.git_head_metadata") as mock_meta:
-            mock_meta.return_value = ("abc123", "A", "a@b.com", "ts", "title", "msg")
-            with patch("bitrab.execution.variables.git", side_effect=["feature/my-branch", "", ""]):
-                result = derive_git_variables(Path.cwd())
+        state = fake_state("feature/my-branch", "", "", meta=("abc123", "A", "a@b.com", "ts", "title", "msg"))
+        with patch("bitrab.execution.variables.repo_state", return_value=state):
+            result = derive_git_variables(Path.cwd())
         assert result["CI_COMMIT_REF_NAME"] == "feature/my-branch"
         assert result["CI_COMMIT_TAG"] == ""
 
     def test_ref_slug_replaces_slashes(self):
-        with patch("bitrab.execution.variables.git_head_metadata") as mock_meta:
-            mock_meta.return_value = ("abc123", "A", "a@b.com", "ts", "title", "msg")
-            with patch("bitrab.execution.variables.git", side_effect=["feature/my-branch", "", ""]):
-                result = derive_git_variables(Path.cwd())
+        state = fake_state("feature/my-branch", "", "", meta=("abc123", "A", "a@b.com", "ts", "title", "msg"))
+        with patch("bitrab.execution.variables.repo_state", return_value=state):
+            result = derive_git_variables(Path.cwd())
         assert "/" not in result["CI_COMMIT_REF_SLUG"]
         assert result["CI_COMMIT_REF_SLUG"] == "feature-my-branch"
 
     def test_ref_slug_truncated_to_63_chars(self):
         long_branch = "a" * 80
-        with patch("bitrab.execution.variables.git_head_metadata") as mock_meta:
-            mock_meta.return_value = ("abc123", "A", "a@b.com", "ts", "title", "msg")
-            with patch("bitrab.execution.variables.git", side_effect=[long_branch, "", ""]):
-                result = derive_git_variables(Path.cwd())
+        state = fake_state(long_branch, "", "", meta=("abc123", "A", "a@b.com", "ts", "title", "msg"))
+        with patch("bitrab.execution.variables.repo_state", return_value=state):
+            result = derive_git_variables(Path.cwd())
         assert len(result["CI_COMMIT_REF_SLUG"]) <= 63
 
     def test_author_formatted_correctly(self):
-        with patch("bitrab.execution.variables.git_head_metadata") as mock_meta:
-            mock_meta.return_value = ("abc123", "Jane Doe", "jane@example.com", "ts", "title", "msg")
-            with patch("bitrab.execution.variables.git", side_effect=["main", "", ""]):
-                result = derive_git_variables(Path.cwd())
+        state = fake_state("main", "", "", meta=("abc123", "Jane Doe", "jane@example.com", "ts", "title", "msg"))
+        with patch("bitrab.execution.variables.repo_state", return_value=state):
+            result = derive_git_variables(Path.cwd())
         assert result["CI_COMMIT_AUTHOR"] == "Jane Doe <jane@example.com>"
 
     def test_author_empty_when_no_author_name(self):
-        with patch("bitrab.execution.variables.git_head_metadata") as mock_meta:
-            mock_meta.return_value = ("abc123", "", "", "ts", "title", "msg")
-            with patch("bitrab.execution.variables.git", side_effect=["main", "", ""]):
-                result = derive_git_variables(Path.cwd())
+        state = fake_state("main", "", "", meta=("abc123", "", "", "ts", "title", "msg"))
+        with patch("bitrab.execution.variables.repo_state", return_value=state):
+            result = derive_git_variables(Path.cwd())
         assert result["CI_COMMIT_AUTHOR"] == ""
 
     def test_project_path_slug_lowercased(self):
-        with patch("bitrab.execution.variables.git_head_metadata") as mock_meta:
-            mock_meta.return_value = ("abc123", "A", "a@b.com", "ts", "title", "msg")
-            with patch("bitrab.execution.variables.git", side_effect=["main", "", "git@gitlab.com:MyOrg/MyRepo.git"]):
-                result = derive_git_variables(Path.cwd())
+        meta = ("abc123", "A", "a@b.com", "ts", "title", "msg")
+        state = fake_state("main", "", "git@gitlab.com:MyOrg/MyRepo.git", meta=meta)
+        with patch("bitrab.execution.variables.repo_state", return_value=state):
+            result = derive_git_variables(Path.cwd())
         assert result["CI_PROJECT_PATH_SLUG"] == result["CI_PROJECT_PATH_SLUG"].lower()
 
 
@@ -373,38 +381,57 @@ class TestVariableManager:
         assert env["CI_PIPELINE_ID"].isdigit()
 
 
-def _init_repo_with_commit(path: Path) -> None:
-    """Create a git repo at ``path`` with a single committed file."""
-    subprocess.run(["git", "init"], cwd=path, capture_output=True, check=True)
-    subprocess.run(["git", "config", "user.email", "test@example.com"], cwd=path, capture_output=True, check=True)
-    subprocess.run(["git", "config", "user.name", "Test User"], cwd=path, capture_output=True, check=True)
-    (path / "file.txt").write_text("hello", encoding="utf-8")
-    subprocess.run(["git", "add", "."], cwd=path, capture_output=True, check=True)
-    subprocess.run(["git", "commit", "-m", "initial commit"], cwd=path, capture_output=True, check=True)
-
-
-class TestGitHelper:
-    """Happy-path and failure behaviour of the low-level ``git`` helper."""
-
-    def test_returns_stdout_on_success(self, tmp_path):
-        _init_repo_with_commit(tmp_path)
-        sha = git(["rev-parse", "HEAD"], tmp_path)
-        assert len(sha) == 40
-        assert all(c in "0123456789abcdef" for c in sha)
-
-    def test_output_is_stripped(self, tmp_path):
-        _init_repo_with_commit(tmp_path)
-        title = git(["log", "-1", "--pretty=%s"], tmp_path)
-        assert title == "initial commit"
-        assert not title.endswith("\n")
-
-    def test_nonzero_exit_returns_empty_string(self, tmp_path):
-        _init_repo_with_commit(tmp_path)
-        # rev-parse on a bogus ref exits non-zero; helper swallows it.
-        assert git(["rev-parse", "does-not-exist"], tmp_path) == ""
-
-    def test_non_repo_returns_empty_string(self, tmp_path):
-        assert git(["rev-parse", "HEAD"], tmp_path) == ""
+class TestLayeredEnv:
+    def test_overlay_wins_and_base_is_untouched(self):
+        base = SharedEnv({"A": "1", "B": "2"})
+        env = LayeredEnv(base, {"B": "job"})
+        env["C"] = "3"
+        del env["A"]
+        assert dict(env) == env.materialize() == {"B": "job", "C": "3"}
+        assert len(env) == 2 and "A" not in env
+        env["A"] = "back"
+        assert env == {"A": "back", "B": "job", "C": "3"}
+        assert dict(base) == {"A": "1", "B": "2"}
+
+    def test_popen_env_is_the_layered_env(self, monkeypatch):
+        monkeypatch.setenv("CI_JOB_URL", "https://outer.example/job")
+        env = LayeredEnv(SharedEnv({"A": "1", "B": "2"}), {"C": "3"})
+        del env["A"]
+        # Neither a deleted base key nor the process environment comes back.
+        assert merge_env(env) == {"B": "2", "C": "3"}
+
+    def test_copy_shares_the_base_but_not_the_overlay(self):
+        env = LayeredEnv(SharedEnv({"A": "1"}))
+        clone = env.copy()
+        clone["A"] = "2"
+        assert env["A"] == "1" and clone.base is env.base
+
+    def test_shipped_base_pickles_by_reference(self, tmp_path):
+        vm = VariableManager(project_dir=tmp_path)
+        executor = JobExecutor(vm, project_dir=tmp_path)
+        before = len(pickle.dumps(executor))
+        payload = ship_env(vm.shared_base_env)
+        data = pickle.dumps(executor)
+        assert len(data) < before - len(pickle.dumps(payload[1])) // 2
+        assert pickle.loads(data).variable_manager.shared_base_env is vm.shared_base_env
+        env = pickle.loads(pickle.dumps(vm.prepare_environment(JobConfig(name="j", stage="test"))))
+        assert env["CI_JOB_NAME"] == "j" and env.base is vm.shared_base_env
+
+    def test_process_workers_receive_the_base_once(self, tmp_path):
+        vm = VariableManager({"PIPELINE_VAR": "from-base"}, project_dir=tmp_path)
+        jobs = [
+            JobConfig(name=f"job{i}", stage="test", script=[f'echo "$PIPELINE_VAR $CI_JOB_NAME" > out{i}.txt'])
+            for i in range(2)
+        ]
+        StagePipelineRunner(
+            JobExecutor(vm, project_dir=tmp_path),
+            maximum_degree_of_parallelism=2,
+            parallel_backend=ParallelBackendConfig(backend="process"),
+        ).execute_pipeline(PipelineConfig(stages=["test"], jobs=jobs))
+        assert [(tmp_path / f"out{i}.txt").read_text(encoding="utf-8") for i in range(2)] == [
+            "from-base job0\n",
+            "from-base job1\n",
+        ]
 
 
 class TestDeriveGithubActionsVariables:
@@ -0,0 +1,81 @@
+"""Tests for the pipeline-lifetime warm worker pool."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from bitrab.execution.job import JobExecutor
+from bitrab.execution.stage_runner import BaseRunner, DagPipelineRunner, StagePipelineRunner, warm_worker
+from bitrab.execution.variables import VariableManager
+from bitrab.models.pipeline import JobConfig, PipelineConfig
+from bitrab.mutation import ParallelBackendConfig
+
+
+def three_stage_pipeline() -> PipelineConfig:
+    stages = ["one", "two", "three"]
+    jobs = [
+        JobConfig(name=f"{stage}_{i}", stage=stage, script=['echo "$PPID" > "$CI_JOB_DIR/ppid.txt"'])
+        for stage in stages
+        for i in range(2)
+    ]
+    return PipelineConfig(stages=stages, jobs=jobs)
+
+
+def make_runner(tmp_path: Path, backend: str, warm_pool: bool, runner_cls: type = StagePipelineRunner) -> BaseRunner:
+    vm = VariableManager({}, project_dir=tmp_path)
+    executor = JobExecutor(vm, project_dir=tmp_path)
+    return runner_cls(
+        executor,
+        maximum_degree_of_parallelism=2,
+        parallel_backend=ParallelBackendConfig(backend=backend, warm_pool=warm_pool),
+    )
+
+
+def count_pools(monkeypatch) -> list[int]:
+    created: list[int] = []
+    original = BaseRunner.make_pool
+
+    def counting(self, max_workers):
+        created.append(max_workers)
+        return original(self, max_workers)
+
+    monkeypatch.setattr(BaseRunner, "make_pool", counting)
+    return created
+
+
+def test_warm_pool_is_created_once_per_pipeline(tmp_path, monkeypatch):
+    created = count_pools(monkeypatch)
+    make_runner(tmp_path, "thread", warm_pool=True).execute_pipeline(three_stage_pipeline())
+    assert created == [2]
+
+
+def test_warm_pool_disabled_creates_pool_per_stage(tmp_path, monkeypatch):
+    created = count_pools(monkeypatch)
+    make_runner(tmp_path, "thread", warm_pool=False).execute_pipeline(three_stage_pipeline())
+    assert len(created) == 3
+
+
+def test_warm_pool_shared_by_dag_batches(tmp_path, monkeypatch):
+    created = count_pools(monkeypatch)
+    pipeline = three_stage_pipeline()
+    pipeline.jobs[2].needs = ["one_0"]
+    make_runner(tmp_path, "thread", warm_pool=True, runner_cls=DagPipelineRunner).execute_pipeline(pipeline)
+    assert created == [2]
+
+
+def test_warm_pool_is_released_after_run(tmp_path):
+    runner = make_runner(tmp_path, "thread", warm_pool=True)
+    runner.execute_pipeline(three_stage_pipeline())
+    assert runner.shared_pool is None
+
+
+def test_process_workers_survive_across_stages(tmp_path):
+    make_runner(tmp_path, "process", warm_pool=True).execute_pipeline(three_stage_pipeline())
+    temp = tmp_path / ".bitrab" / "temp"
+    pids = {(temp / job / "ppid.txt").read_text().strip() for job in (p.name for p in temp.iterdir())}
+    # Two long-lived workers serve all six jobs.
+    assert len(pids) <= 2
+
+
+def test_warm_worker_imports_execution_modules():
+    warm_worker()
@@ -0,0 +1,110 @@
+"""Tests for the pre-started bash pool (``warm_shells``)."""
+
+from __future__ import annotations
+
+import io
+import sys
+
+import pytest
+
+from bitrab.execution.events import EventCollector
+from bitrab.execution.job import JobExecutor
+from bitrab.execution.shell import pick_bash, run_bash
+from bitrab.execution.stage_runner import StagePipelineRunner
+from bitrab.execution.variables import VariableManager
+from bitrab.execution.warm_shell import close_pools, env_preamble, shell_pool
+from bitrab.models.pipeline import JobConfig, PipelineConfig
+from bitrab.mutation import ParallelBackendConfig, load_parallel_config
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="exercises POSIX bash environments")
+
+
+@pytest.fixture(autouse=True)
+def fresh_pools(monkeypatch):
+    monkeypatch.delenv("BITRAB_RUN_LOAD_BASHRC", raising=False)
+    close_pools()
+    yield
+    close_pools()
+
+
+def test_preamble_applies_the_environment_difference(tmp_path):
+    preamble = env_preamble({"KEEP": "1", "DROP": "x", "PWD": "/"}, {"KEEP": "1", "NEW": "it's"}, tmp_path)
+    assert preamble is not None
+    lines = preamble.splitlines()
+    assert "unset DROP" in lines
+    assert "export NEW='it'\"'\"'s'" in lines
+    assert not any("KEEP" in line or "PWD" in line for line in lines)
+    assert lines[-1] == f"cd -- {tmp_path} || exit 127"
+
+
+def test_preamble_refuses_startup_variables_and_odd_names():
+    assert env_preamble({}, {"BASH_ENV": "/tmp/rc"}, None) is None
+    assert env_preamble({"BASH_FUNC_f%%": "() { :; }"}, {}, None) is None
+
+
+def test_script_runs_in_a_prestarted_shell(tmp_path, monkeypatch):
+    monkeypatch.setenv("WARM_DROPPED", "stale")
+    pool = shell_pool(pick_bash(False), 2)
+    pool.fill()
+    prestarted = {shell.proc.pid for shell in pool.ready}
+    monkeypatch.delenv("WARM_DROPPED")
+
+    spawned: list[int] = []
+    out = io.StringIO()
+    result = run_bash(
+        'echo "$GREETING|${WARM_DROPPED-unset}|$(pwd)"; exit 4',
+        env={"GREETING": "hello world"},
+        cwd=tmp_path,
+        check=False,
+        force_color=False,
+        stdout_target=out,
+        stderr_target=io.StringIO(),
+        on_spawn=spawned.append,
+        warm_shells=2,
+    )
+    assert spawned[0] in prestarted
+    assert result.returncode == 4
+    assert out.getvalue() == f"hello world|unset|{tmp_path}\n"
+    assert result.usage is not None
+
+
+def test_empty_pool_falls_back_to_a_fresh_bash(tmp_path):
+    result = run_bash(
+        "pwd",
+        cwd=tmp_path,
+        check=False,
+        force_color=False,
+        stdout_target=io.StringIO(),
+        stderr_target=io.StringIO(),
+        warm_shells=1,
+    )
+    assert result.stdout.strip() == str(tmp_path)
+
+
+def test_close_lets_idle_shells_exit():
+    pool = shell_pool(pick_bash(False), 2)
+    pool.fill()
+    procs = [shell.proc for shell in pool.ready]
+    close_pools()
+    assert [proc.returncode for proc in procs] == [0, 0]
+    assert pool.take() is None
+
+
+def test_warm_shells_in_pyproject(tmp_path):
+    (tmp_path / "pyproject.toml").write_text("[tool.bitrab]\nwarm_shells = 3\n", encoding="utf-8")
+    assert load_parallel_config(tmp_path).warm_shells == 3
+
+
+def test_pipeline_uses_warm_shells(tmp_path):
+    jobs = [JobConfig(name=f"job{i}", stage="test", script=[f'echo "$CI_JOB_NAME" > out{i}.txt']) for i in range(6)]
+    collector = EventCollector()
+    runner = StagePipelineRunner(
+        JobExecutor(VariableManager({}, project_dir=tmp_path), project_dir=tmp_path),
+        callbacks=collector,
+        maximum_degree_of_parallelism=2,
+        parallel_backend=ParallelBackendConfig(backend="thread", warm_shells=2),
+    )
+    runner.execute_pipeline(PipelineConfig(stages=["test"], jobs=jobs))
+    assert runner.job_executor.warm_shells == 2
+    assert [(tmp_path / f"out{i}.txt").read_text().strip() for i in range(6)] == [f"job{i}" for i in range(6)]
+    assert {job.status for job in collector.summary().jobs} == {"success"}
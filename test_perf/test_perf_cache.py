@@ -0,0 +1,56 @@
+"""Cache save + restore round trips: blob-store manifests vs single-archive generations.
+
+Two shapes bracket real caches: many small files (``node_modules``,
+``.venv`` site-packages) and a few large ones (build outputs, wheels).  Each
+round saves a generation over the previous one and restores it into a fresh
+directory, so the numbers include publishing and superseded-generation cleanup.
+The contents do not change between rounds, which is the common case and the
+one where the blob store only hashes and links; the archive formats rewrite
+and re-extract everything, trading that time for one inode per generation.
+"""
+
+import itertools
+import os
+import shutil
+
+import pytest
+
+from bitrab.execution.cache import restore_cache_entry, save_cache_entry
+from bitrab.models.pipeline import CacheConfig
+
+CACHE = CacheConfig(paths=["deps/"], key="bench")
+
+SHAPES = {
+    # 5,000 files of 200 bytes across 50 directories.
+    "small_files": (5000, 200, 100),
+    # 4 files of 8 MiB.
+    "large_files": (4, 8 * 1024 * 1024, 1),
+}
+
+
+def make_tree(root, files: int, size: int, per_dir: int) -> None:
+    for i in range(files):
+        directory = root / "deps" / f"pkg{i // per_dir}"
+        directory.mkdir(parents=True, exist_ok=True)
+        # Distinct content per file so the blob store cannot dedupe it away.
+        (directory / f"mod{i}.py").write_bytes(os.urandom(size))
+
+
+@pytest.mark.parametrize("shape", sorted(SHAPES))
+@pytest.mark.parametrize("cache_format", ["blobs", "tar", "tar.gz"])
+def test_benchmark_cache_round_trip(benchmark, tmp_path, shape, cache_format):
+    source = tmp_path / "source"
+    make_tree(source, *SHAPES[shape])
+    store = tmp_path / "store"
+    rounds = itertools.count()
+
+    def round_trip():
+        target = tmp_path / f"target{next(rounds)}"
+        target.mkdir()
+        assert save_cache_entry(CACHE, "bench", store, source, cache_format=cache_format)
+        assert restore_cache_entry(CACHE, "bench", store, target)
+        return target
+
+    target = benchmark.pedantic(round_trip, rounds=5, warmup_rounds=1)
+    assert len(list((target / "deps").rglob("*.py"))) == SHAPES[shape][0]
+    shutil.rmtree(target)
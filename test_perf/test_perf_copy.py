@@ -0,0 +1,41 @@
+"""Tree copies: the shared parallel copy engine vs ``shutil.copytree``.
+
+The tree is artifact-shaped: 3,000 files of 4 KiB in 60 directories plus a
+few 16 MiB files.  Each round copies into a fresh destination.
+"""
+
+import itertools
+import os
+import shutil
+
+import pytest
+
+from bitrab.execution.copier import copy_tree
+
+
+@pytest.fixture(scope="module")
+def source(tmp_path_factory):
+    root = tmp_path_factory.mktemp("copy_source")
+    for i in range(3000):
+        directory = root / f"pkg{i % 60}"
+        directory.mkdir(exist_ok=True)
+        (directory / f"mod{i}.py").write_bytes(os.urandom(4096))
+    for i in range(3):
+        (root / f"blob{i}.bin").write_bytes(os.urandom(16 * 1024 * 1024))
+    return root
+
+
+@pytest.mark.parametrize("engine", ["copier", "shutil"])
+def test_benchmark_copy_tree(benchmark, tmp_path, source, engine):
+    rounds = itertools.count()
+
+    def copy():
+        dest = tmp_path / f"dest{next(rounds)}"
+        if engine == "copier":
+            copy_tree(source, dest)
+        else:
+            shutil.copytree(source, dest)
+        return dest
+
+    dest = benchmark.pedantic(copy, rounds=5, warmup_rounds=1)
+    assert len(list(dest.rglob("*.py"))) == 3000
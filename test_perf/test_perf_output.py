@@ -0,0 +1,30 @@
+"""Memory use of the output pipeline on a log far larger than its in-memory tail.
+
+Writes 1 GiB to disk, so it lives here rather than in the unit tests.
+"""
+
+import tracemalloc
+
+from bitrab.execution.shell import OUTPUT_TAIL_BYTES, Buffer
+
+
+def test_memory_stays_flat_for_a_1gb_log(tmp_path):
+    body = (b"x" * 99 + b"\n") * 655
+    chunks = (1024**3) // (len(body) + 8) + 1
+    buf = Buffer(tmp_path, "stdout")
+    tracemalloc.start()
+    try:
+        for i in range(chunks):
+            buf.write(b"%07d\n%s" % (i, body))
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    path = buf.close()
+    try:
+        assert path is not None and path.parent == tmp_path
+        assert path.stat().st_size == chunks * (len(body) + 8) >= 1024**3
+        assert peak < 4 * OUTPUT_TAIL_BYTES
+        assert buf.getvalue().startswith(f"{chunks - len(buf.buf):07d}\n")
+        assert buf.getvalue().endswith(body.decode())
+    finally:
+        path.unlink()
@@ -0,0 +1,43 @@
+"""Per-stage pool overhead: a fresh process pool per stage vs one warm pool per run.
+
+Compare the two benchmarks' means and divide the difference by ``STAGES`` to
+get the spawn + import overhead each stage pays without the warm pool.
+"""
+
+from ruamel.yaml import YAML
+
+from bitrab.plan import LocalGitLabRunner
+
+yaml = YAML(typ="safe")
+
+STAGES = 6
+
+
+def write_project(tmp_path, warm_pool: bool):
+    config = {"stages": [f"stage_{i}" for i in range(STAGES)]}
+    for i in range(STAGES):
+        for j in range(2):
+            config[f"job_{i}_{j}"] = {"stage": f"stage_{i}", "script": ["true"]}
+    ci_file = tmp_path / ".gitlab-ci.yml"
+    with open(ci_file, "w") as f:
+        yaml.dump(config, f)
+    (tmp_path / "pyproject.toml").write_text(f"[tool.bitrab]\nwarm_pool = {'true' if warm_pool else 'false'}\n")
+    return ci_file
+
+
+def run_stages(benchmark, tmp_path, warm_pool: bool):
+    ci_file = write_project(tmp_path, warm_pool)
+    runner = LocalGitLabRunner(base_path=tmp_path)
+
+    def run():
+        runner.run_pipeline(config_path=ci_file, maximum_degree_of_parallelism=2, parallel_backend="process")
+
+    benchmark.pedantic(run, rounds=3, iterations=1)
+
+
+def test_benchmark_pool_per_stage(benchmark, tmp_path):
+    run_stages(benchmark, tmp_path, warm_pool=False)
+
+
+def test_benchmark_warm_pool(benchmark, tmp_path):
+    run_stages(benchmark, tmp_path, warm_pool=True)
@@ -0,0 +1,42 @@
+"""Per-script interpreter startup: a fresh ``bash`` per script vs a warm shell pool.
+
+Both benchmarks run the same trivial script through ``run_bash``; the
+difference of their means is the spawn (and, with ``BITRAB_RUN_LOAD_BASHRC``,
+profile) cost each ``execute_scripts`` call saves with ``warm_shells``.
+"""
+
+import io
+import time
+
+from bitrab.execution.shell import run_bash
+from bitrab.execution.warm_shell import close_pools
+
+ENV = {"CI": "true", "CI_JOB_NAME": "bench"}
+
+
+def run_script(tmp_path, warm_shells: int):
+    run_bash(
+        "true",
+        env=ENV,
+        cwd=tmp_path,
+        check=False,
+        stdout_target=io.StringIO(),
+        stderr_target=io.StringIO(),
+        warm_shells=warm_shells,
+    )
+
+
+def test_benchmark_cold_bash(benchmark, tmp_path):
+    benchmark(run_script, tmp_path, 0)
+
+
+def test_benchmark_warm_shells(benchmark, tmp_path):
+    # Refills happen in the background; a short pause between rounds lets the
+    # pool keep up, as the gaps between a job's scripts do in a real run.
+    def setup():
+        time.sleep(0.005)
+
+    try:
+        benchmark.pedantic(run_script, args=(tmp_path, 4), setup=setup, rounds=200, warmup_rounds=5)
+    finally:
+        close_pools()